@@ -0,0 +1,51 @@
+"""
+Benchmarks the RollingRange window functions against calling apply with the
+matching pandas aggregation on each window, for a few window sizes, and checks
+that both give the same results.
+
+To run this file, run python dev/benchmarks/rolling_range.py [num_rows]
+from the mitosheet folder.
+"""
+
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.rolling_range import RollingRange
+
+AGGREGATIONS = {
+    'sum': lambda df: df.sum().sum(),
+    'count': lambda df: df.count().sum(),
+    'max': lambda df: df.max().max(),
+    'min': lambda df: df.min().min(),
+    'prod': lambda df: df.prod().prod(),
+    'std': lambda df: df.stack().std(),
+    'var': lambda df: df.stack().var(),
+}
+
+
+def main() -> None:
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    random_state = np.random.RandomState(0)
+    floats = random_state.uniform(-100, 100, num_rows)
+    floats[random_state.rand(num_rows) < .1] = np.nan
+    df = pd.DataFrame({'int': random_state.randint(-100, 100, num_rows), 'float': floats})
+
+    print(f'{"function (window), " + str(num_rows) + " rows":<40}{"apply":>14}{"vectorized":>14}{"speedup":>11}')
+    for window, offset in [(2, -1), (31, -30), (1000, 0)]:
+        rolling_range = RollingRange(df, window, offset)
+        for name, aggregation in AGGREGATIONS.items():
+            pd.testing.assert_series_equal(rolling_range.apply(aggregation), getattr(rolling_range, name)())
+
+            apply_time = min(timeit.repeat(lambda: rolling_range.apply(aggregation), number=1, repeat=3))
+            vectorized_time = min(timeit.repeat(lambda: getattr(rolling_range, name)(), number=1, repeat=3))
+            print(f'{name + " (" + str(window) + ")":<40}{apply_time * 1000:>12.2f}ms{vectorized_time * 1000:>12.2f}ms{apply_time / vectorized_time:>10.1f}x')
+
+
+if __name__ == '__main__':
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        main()
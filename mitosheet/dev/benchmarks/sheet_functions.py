@@ -0,0 +1,119 @@
+"""
+Benchmarks the vectorized IF, IFS, GETPREVIOUSVALUE and GETNEXTVALUE sheet
+functions against the row by row implementations they replaced, for a few
+different dtypes.
+
+For each case, it also checks that both implementations return exactly the
+same series, including the dtype.
+
+To run this file, run python dev/benchmarks/sheet_functions.py [num_rows]
+from the mitosheet folder.
+"""
+
+import sys
+import timeit
+import warnings
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import (is_bool_dtype, is_datetime_dtype,
+                                     is_float_dtype, is_int_dtype,
+                                     is_string_dtype)
+from mitosheet.public.v3.sheet_functions.bool_functions import IF, IFS
+from mitosheet.public.v3.sheet_functions.misc_functions import (
+    GETNEXTVALUE, GETPREVIOUSVALUE)
+from mitosheet.public.v3.sheet_functions.utils import \
+    get_series_from_primitive_or_series
+
+
+def row_by_row_if(condition: pd.Series, true_series: Any, false_series: Any) -> pd.Series:
+    true_series = get_series_from_primitive_or_series(true_series, condition.index)
+    false_series = get_series_from_primitive_or_series(false_series, condition.index)
+
+    return pd.Series(
+        data=[true_series.loc[i] if c else false_series.loc[i] for i, c in condition.items()],
+        index=condition.index
+    )
+
+
+def row_by_row_ifs(*argv: Any) -> pd.Series:
+    base_index = next(iter(s.index for s in argv if isinstance(s, pd.Series)))
+    argv_series = tuple([get_series_from_primitive_or_series(arg, base_index) for arg in argv])
+    results = pd.Series(index=base_index)
+    for index in range(0, len(argv_series), 2):
+        results = results.combine_first(argv_series[index + 1][argv_series[index]])
+    return results
+
+
+def row_by_row_getpreviousvalue(series: pd.Series, condition: pd.Series) -> pd.Series:
+    column_dtype = str(series.dtype)
+    last_occurrence: Any = -1
+    if is_int_dtype(column_dtype) or is_float_dtype(column_dtype):
+        last_occurrence = -1
+    elif is_string_dtype(column_dtype):
+        last_occurrence = ''
+    elif is_bool_dtype(column_dtype):
+        last_occurrence = False
+    elif is_datetime_dtype(column_dtype):
+        last_occurrence = pd.NaT
+
+    result = []
+    for index, value in condition.items():
+        if value:
+            last_occurrence = series[index]
+        result.append(last_occurrence)
+
+    return pd.Series(result, index=series.index)
+
+
+def row_by_row_getnextvalue(series: pd.Series, condition: pd.Series) -> pd.Series:
+    return row_by_row_getpreviousvalue(series[::-1], condition[::-1])[::-1]
+
+
+def get_series_by_dtype(num_rows: int) -> List[Tuple[str, pd.Series]]:
+    random_state = np.random.RandomState(0)
+    floats = random_state.uniform(-100, 100, num_rows)
+    floats[random_state.rand(num_rows) < .1] = np.nan
+
+    return [
+        ('int', pd.Series(random_state.randint(-100, 100, num_rows))),
+        ('float', pd.Series(floats)),
+        ('bool', pd.Series(random_state.rand(num_rows) < .5)),
+        ('string', pd.Series(random_state.choice(['a', 'b', 'c'], num_rows)).astype(object)),
+        ('datetime', pd.Series(pd.to_datetime(random_state.randint(0, 10 ** 9, num_rows), unit='s'))),
+        ('mixed', pd.Series(random_state.choice(np.array([1, 'a', 2.5, None], dtype=object), num_rows))),
+    ]
+
+
+def benchmark(name: str, old: Callable[[], pd.Series], new: Callable[[], pd.Series]) -> None:
+    old_result = old()
+    new_result = new()
+    pd.testing.assert_series_equal(old_result.sort_index(), new_result.sort_index())
+
+    old_time = min(timeit.repeat(old, number=1, repeat=3))
+    new_time = min(timeit.repeat(new, number=1, repeat=3))
+    print(f'{name:<40}{old_time * 1000:>12.2f}ms{new_time * 1000:>12.2f}ms{old_time / new_time:>10.1f}x')
+
+
+def main() -> None:
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random_state = np.random.RandomState(1)
+    condition = pd.Series(random_state.rand(num_rows) < .5)
+    other_condition = pd.Series(random_state.rand(num_rows) < .5)
+
+    print(f'{"function (dtype), " + str(num_rows) + " rows":<40}{"old":>14}{"new":>14}{"speedup":>11}')
+    for dtype, series in get_series_by_dtype(num_rows):
+        other_series = series.sample(frac=1, random_state=random_state).reset_index(drop=True)
+
+        benchmark(f'IF ({dtype})', lambda: row_by_row_if(condition, series, other_series), lambda: IF(condition, series, other_series))
+        benchmark(f'IFS ({dtype})', lambda: row_by_row_ifs(condition, series, other_condition, other_series), lambda: IFS(condition, series, other_condition, other_series))
+        benchmark(f'GETPREVIOUSVALUE ({dtype})', lambda: row_by_row_getpreviousvalue(series, condition), lambda: GETPREVIOUSVALUE(series, condition))
+        benchmark(f'GETNEXTVALUE ({dtype})', lambda: row_by_row_getnextvalue(series, condition), lambda: GETNEXTVALUE(series, condition))
+
+
+if __name__ == '__main__':
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        main()
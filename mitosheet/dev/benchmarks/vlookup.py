@@ -0,0 +1,71 @@
+"""
+Benchmarks VLOOKUP, which finds matching rows with a hash index of the lookup
+range, against the merge and row by row apply implementation it replaced.
+
+For each case, it also checks that both implementations return exactly the
+same series, including the dtype.
+
+To run this file, run python dev/benchmarks/vlookup.py [num_lookup_values] [num_rows_in_range]
+from the mitosheet folder.
+"""
+
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.lookup_index import LOOKUP_INDEX_CACHE
+from mitosheet.public.v3.sheet_functions.misc_functions import (
+    VLOOKUP, _get_vlookup_result_from_merge)
+
+
+def merge_vlookup(lookup_value: pd.Series, where: pd.DataFrame, index: int) -> pd.Series:
+    value = lookup_value.copy()
+    value.name = 'lookup_value'
+    return _get_vlookup_result_from_merge(value, where, pd.Series(index + 1, index=value.index))
+
+
+def benchmark(name: str, lookup_value: pd.Series, where: pd.DataFrame, index: int, check: bool) -> None:
+    if check:
+        pd.testing.assert_series_equal(merge_vlookup(lookup_value, where, index), VLOOKUP(lookup_value, where, index))
+        old_time = min(timeit.repeat(lambda: merge_vlookup(lookup_value, where, index), number=1, repeat=1))
+    
+    LOOKUP_INDEX_CACHE.clear()
+    uncached_time = min(timeit.repeat(lambda: VLOOKUP(lookup_value, where, index), number=1, repeat=1))
+    cached_time = min(timeit.repeat(lambda: VLOOKUP(lookup_value, where, index), number=1, repeat=3))
+
+    old = f'{old_time * 1000:>12.2f}ms' if check else f'{"-":>14}'
+    print(f'{name:<24}{old}{uncached_time * 1000:>12.2f}ms{cached_time * 1000:>12.2f}ms')
+
+
+def main() -> None:
+    num_lookup_values = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_rows_in_range = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    # The row by row implementation is too slow to run on very long columns
+    check = num_lookup_values <= 100_000
+
+    random_state = np.random.RandomState(0)
+    int_keys = random_state.permutation(num_rows_in_range)
+    int_where = pd.DataFrame({
+        'key': int_keys,
+        'int': random_state.randint(0, 100, num_rows_in_range),
+        'float': random_state.rand(num_rows_in_range),
+    })
+    # Some of the lookup values are not in the range
+    int_lookup_value = pd.Series(random_state.randint(0, int(num_rows_in_range * 1.1), num_lookup_values))
+
+    string_where = int_where.assign(key=pd.Series(['Key' + str(key) for key in int_keys]))
+    string_lookup_value = pd.Series(['key' + str(key) for key in int_lookup_value])
+
+    print(f'{str(num_lookup_values) + " lookups, " + str(num_rows_in_range) + " rows":<24}{"old":>14}{"uncached":>14}{"cached":>14}')
+    benchmark('int keys', int_lookup_value, int_where, 2, check)
+    benchmark('int keys, mixed row', int_lookup_value, int_where, 3, check)
+    benchmark('string keys', string_lookup_value, string_where, 2, check)
+
+
+if __name__ == '__main__':
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        main()
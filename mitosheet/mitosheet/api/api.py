@@ -6,11 +6,13 @@
 """
 Contains handlers for the Mito API
 """
-from queue import Queue
-from threading import Thread
+from threading import Lock
 from time import perf_counter
-from typing import Any, Callable, Dict, NoReturn, Optional
+from typing import Any, Callable, Dict, Optional, cast
 
+from mitosheet.api.api_worker_pool import (APICall, APICallCancelledError,
+                                           APIWorkerPool, StepsManagerSnapshot,
+                                           is_api_call_cancelled)
 from mitosheet.api.get_saved_analysis_code import get_saved_analysis_code
 from mitosheet.api.get_all_params_for_step_type import get_all_params_for_step_type
 from mitosheet.api.get_ai_completion import get_ai_completion
@@ -48,9 +50,6 @@ from mitosheet.telemetry.telemetry_utils import log_event_processed
 from mitosheet.types import MitoWidgetType
 from mitosheet.user.location import is_dash, is_jupyterlite, is_streamlit
 
-# As the column summary statistics tab does three calls, we defaulted to this max
-MAX_QUEUED_API_CALLS = 3
-
 # NOTE: BE CAREFUL WITH THIS. When in development mode, you can set it to False
 # so the API calls are handled in the main thread, to make printing easy.
 # In newer versions of JupyterLab, to see these print statements:
@@ -80,56 +79,64 @@ def get_api_should_be_threaded() -> bool:
 
 class API:
     """
-    The API provides a wrapper around a thread that responds to API calls.
+    The API provides a wrapper around a pool of worker threads that respond to API calls.
 
     Some notes:
-    -   We allow at most MAX_QUEUED_API_CALLS API calls to be in the queue, which practically
-        Stops a backlog of calls from building up.
+    -   API calls are split into an interactive and a heavy lane, which each allow at most
+        MAX_QUEUED_API_CALLS API calls to be in their queue, which practically stops a
+        backlog of calls from building up. See api_worker_pool.py.
     -   All API calls should only be reads. This stops us from having to worry
-        about most concurrency issues
+        about most concurrency issues. As API calls run while the user edits, each
+        reads a snapshot of the steps from when it was made
     -   Note that printing inside of a thread does not work properly! Use sys.stdout.flush() after the print statement.
         See here: https://stackoverflow.com/questions/18234469/python-multithreaded-print-statements-delayed-until-all-threads-complete-executi
     """
 
     def __init__(self, steps_manager: StepsManager, mito_backend: MitoWidgetType):
-        self.api_queue: Queue = Queue(MAX_QUEUED_API_CALLS)
-
         # Save some variables for ease
         self.steps_manager = steps_manager
         self.mito_backend = mito_backend
 
-        self.thread: Optional[Thread] = None
+        self.worker_pool: Optional[APIWorkerPool] = None
         self.had_first_api_call = False
 
+        # Held while sending the response to an API call, as they are sent from multiple threads
+        self.send_lock = Lock()
+
     def start_api_thread(self) -> None:
-        # Note that we make the thread a daemon thread, which practically means that when
-        # The process that starts this thread terminate, our API will terminate as well.
-        self.thread = Thread(
-            target=handle_api_event_thread,
-            args=(self.api_queue, self.steps_manager, self.mito_backend),
-            daemon=True,
-        )
+        # The worker threads are started when the first API calls in their lane are made
+        self.worker_pool = APIWorkerPool(self.handle_api_call, self.drop_api_call)
+
+    def send(self, message: Dict[str, Any]) -> None:
+        with self.send_lock:
+            self.mito_backend.mito_send(message)
 
-        self.thread.start()
+    def handle_api_call(self, api_call: APICall) -> None:
+        # The snapshot has the attributes of the steps manager that API calls read
+        handle_api_event(self.send, api_call.event, cast(StepsManager, api_call.steps_manager))
 
+    def drop_api_call(self, api_call: APICall) -> None:
+        self.send({"event": "api_response", "id": api_call.event["id"], "data": None})
 
     def process_new_api_call(self, event: Dict[str, Any]) -> None:
         """
         We privilege new API calls over old calls, and evict the old ones
-        if the API queue is full.
+        if the queue of their lane is full, or if they are superseded by the
+        new call.
 
         Because we are using a queue, only events that have not been started
-        being processed will get removed.
+        being processed will get removed. Events that have started are cancelled,
+        and stop if they check if they are cancelled.
 
-        If the key 'priority' is in the event, then we handle it in the main
-        thread, as we don't want to drop the event. For example, lazy loading
-        data has priority!
+        If the key 'priority' is in the event, then we handle it before the other
+        events in its lane, and never drop it. For example, lazy loading data has 
+        priority!
         """
         # On the first API call , we check if the API should be threaded, and if the it is not already created -- and create it in this case
         global THREADED
 
         if not self.had_first_api_call:
-            if self.thread is None and get_api_should_be_threaded():
+            if self.worker_pool is None and get_api_should_be_threaded():
                 self.start_api_thread()
                 THREADED = True
             else:
@@ -137,42 +144,20 @@ class API:
             
             self.had_first_api_call = True
 
-        if THREADED and "priority" not in event:
-
-            if self.api_queue.full():
-                # If the queue is full, we drop the first event, and just return a None
-                lost_event = self.api_queue.get()
-
-                self.mito_backend.mito_send({"event": "api_response", "id": lost_event["id"], "data": None})
-
-            self.api_queue.put(event)
+        if THREADED and self.worker_pool is not None:
+            # We take the snapshot on this thread, so it is the steps from when the call was made
+            self.worker_pool.submit(APICall(event, StepsManagerSnapshot(self.steps_manager)))
         else:
             handle_api_event(self.mito_backend.mito_send, event, self.steps_manager)
 
-
-def handle_api_event_thread(
-    queue: Queue, steps_manager: StepsManager, mito_backend: MitoWidgetType
-) -> NoReturn:
-    """
-    This is the worker thread function, that actually is
-    responsible for handling at the API call events.
-
-    It lives forever, and just handles events as it
-    receives them from the queue
-    """
-    while True:
-        # Note that this blocks when there is nothing in the queue,
-        # and waits till there is something there - so no infinite
-        # loop as it is waiting!
-        event = queue.get()
-        # We place the API handling inside of a try catch,
-        # because otherwise if an error is thrown, then the entire thread crashes,
-        # and then the API never works again
-        try:
-            handle_api_event(mito_backend.mito_send, event, steps_manager)
-        except:
-            # Log in error if it occurs
-            log_event_processed(event, steps_manager, failed=True)
+    def api_call_times_info(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns how long each type of API call waited in the queue and took
+        to run, in seconds.
+        """
+        if self.worker_pool is None:
+            return {}
+        return self.worker_pool.api_call_times.times_info()
 
 
 def handle_api_event(
@@ -187,6 +172,7 @@ def handle_api_event(
     params = event['params']
     start_time = perf_counter()
     failed = False
+    cancelled = False
 
     try:
         if event["type"] == "get_path_contents":
@@ -243,8 +229,15 @@ def handle_api_event(
         else:
             raise Exception(f"Event: {event} is not a valid API call")
 
+    except APICallCancelledError:
+        cancelled = True
     except:
         failed = True
+
+    # If a newer call superseded this one, its result is out of date
+    if cancelled or is_api_call_cancelled():
+        send({"event": "api_response", "id": event["id"], "data": None})
+        return
     
     # Log processing this event (with potential failure)
     log_event_processed(event, steps_manager, failed=failed, start_time=start_time)
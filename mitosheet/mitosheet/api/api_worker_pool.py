@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+API calls are handled by a small pool of worker threads, split into lanes,
+so that a slow API call (e.g. creating the column summary graph) does not
+stall the API calls the user is waiting on (e.g. searching the sheet).
+
+Each lane has its own queue and worker threads. If a lane gets backed up, the
+oldest call in its queue is dropped. When the frontend makes an API call that
+supersedes an earlier one (e.g. getting the unique values of a column with a
+new search string), the earlier one is cancelled: removed from the queue if it
+has not started, and otherwise told to stop at the next point it checks
+raise_if_api_call_cancelled. Cancelled and dropped calls respond with None.
+
+As the API calls run while the user keeps editing, each call reads a snapshot
+of the steps from when it was made (see StepsManagerSnapshot).
+"""
+from collections import deque
+from contextvars import ContextVar
+from copy import copy
+from threading import Condition, Lock, Thread
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, Hashable, List, NoReturn, Optional, Union
+
+import pandas as pd
+
+from mitosheet.column_statistics import ColumnStatisticsCache
+from mitosheet.enterprise.mito_config import MitoConfig
+from mitosheet.enterprise.telemetry.mito_log_uploader import MitoLogUploader
+from mitosheet.search_index import SearchIndex
+from mitosheet.types import StepsManagerType
+
+INTERACTIVE_LANE = 'interactive'
+HEAVY_LANE = 'heavy'
+
+# The API calls that can take a long time, which are handled in the heavy lane so they
+# do not block the interactive API calls
+HEAVY_API_CALL_TYPES = [
+    'get_column_summary_graph',
+    'get_dataframe_as_csv',
+    'get_dataframe_as_excel',
+    'get_csv_files_metadata',
+    'get_excel_file_metadata',
+    'get_test_imports',
+    'get_available_snowflake_options_and_defaults',
+    'get_validate_snowflake_credentials',
+    'get_ai_completion',
+    'get_pr_url_of_new_pr',
+]
+
+# The API calls that are superseded by a newer call of the same type for the same
+# column, or for the same sheet, if the call is not for a column
+SUPERSEDABLE_API_CALL_TYPES = [
+    'get_column_describe',
+    'get_unique_value_counts',
+    'get_column_summary_graph',
+    'get_search_matches',
+]
+
+# The number of worker threads in each lane
+API_LANE_NUM_WORKERS = {
+    INTERACTIVE_LANE: 2,
+    HEAVY_LANE: 1,
+}
+
+# As the column summary statistics tab does three calls, we defaulted to this max
+MAX_QUEUED_API_CALLS = 3
+
+_CURRENT_API_CALL: ContextVar[Optional['APICall']] = ContextVar('current_api_call', default=None)
+
+
+class APICallCancelledError(Exception):
+    pass
+
+
+class StepsManagerSnapshot:
+    """
+    The steps of the steps manager at the time an API call was made, so that the
+    API call reads the same steps and dataframes, even if the user makes edits
+    while it runs. The other attributes that API calls read (e.g. the caches) are
+    read from the steps manager.
+
+    Steps are copied, as steps can get a new state when they are executed again, but
+    states are not changed once they are created, so the copy keeps the same states.
+    """
+
+    def __init__(self, steps_manager: StepsManagerType):
+        self.steps_manager = steps_manager
+        self.steps_including_skipped = [copy(step) for step in steps_manager.steps_including_skipped]
+        self.curr_step_idx = steps_manager.curr_step_idx
+        # The dataframes of older steps can be evicted to save memory, so we keep the current ones
+        self._dfs = list(self.curr_step.dfs)
+
+    @property
+    def curr_step(self) -> Any:
+        return self.steps_including_skipped[self.curr_step_idx]
+
+    @property
+    def dfs(self) -> List[pd.DataFrame]:
+        return self._dfs
+
+    @property
+    def column_statistics_cache(self) -> ColumnStatisticsCache:
+        return self.steps_manager.column_statistics_cache
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self.steps_manager.search_index
+
+    @property
+    def mito_config(self) -> MitoConfig:
+        return self.steps_manager.mito_config
+
+    @property
+    def mito_log_uploader(self) -> Optional[MitoLogUploader]:
+        return self.steps_manager.mito_log_uploader
+
+    @property
+    def analysis_name(self) -> str:
+        return self.steps_manager.analysis_name
+
+    @property
+    def analysis_to_replay(self) -> Optional[str]:
+        return self.steps_manager.analysis_to_replay
+
+    @property
+    def original_args_raw_strings(self) -> List[str]:
+        return self.steps_manager.original_args_raw_strings
+
+    @property
+    def input_cell_execution_count(self) -> Optional[int]:
+        return self.steps_manager.input_cell_execution_count
+
+    @property
+    def public_interface_version(self) -> int:
+        return self.steps_manager.public_interface_version
+
+    @property
+    def render_count(self) -> int:
+        return self.steps_manager.render_count
+
+
+def get_api_call_lane(event: Dict[str, Any]) -> str:
+    return HEAVY_LANE if event['type'] in HEAVY_API_CALL_TYPES else INTERACTIVE_LANE
+
+
+def get_api_call_supersede_key(event: Dict[str, Any]) -> Optional[Hashable]:
+    """
+    Returns a key that is the same for API calls that supersede each other,
+    or None if this API call is not superseded by other calls.
+    """
+    if event['type'] not in SUPERSEDABLE_API_CALL_TYPES:
+        return None
+    params = event.get('params', {})
+    return (event['type'], params.get('sheet_index'), str(params.get('column_id')))
+
+
+class APICall:
+    """
+    An API call that has been made, and the snapshot of the steps it reads.
+    """
+
+    def __init__(self, event: Dict[str, Any], steps_manager: Union[StepsManagerType, StepsManagerSnapshot]):
+        self.event = event
+        self.steps_manager = steps_manager
+        self.lane = get_api_call_lane(event)
+        self.supersede_key = get_api_call_supersede_key(event)
+        # Priority calls (e.g. lazy loading data) are never dropped, and skip the queue
+        self.priority = 'priority' in event
+        self.queued_time = perf_counter()
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+def raise_if_api_call_cancelled() -> None:
+    """
+    API calls that take a long time should call this between steps, so that they
+    stop if they are superseded by a newer call.
+    """
+    api_call = _CURRENT_API_CALL.get()
+    if api_call is not None and api_call.cancelled:
+        raise APICallCancelledError()
+
+
+def is_api_call_cancelled() -> bool:
+    api_call = _CURRENT_API_CALL.get()
+    return api_call is not None and api_call.cancelled
+
+
+class APICallTimes:
+    """
+    How long each type of API call waited in the queue, and took to run, in seconds.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._times: Dict[str, Dict[str, float]] = {}
+
+    def _get_times(self, api_call_type: str) -> Dict[str, float]:
+        if api_call_type not in self._times:
+            self._times[api_call_type] = {
+                'num_calls': 0,
+                'num_cancelled': 0,
+                'num_dropped': 0,
+                'total_queue_wait_time': 0,
+                'max_queue_wait_time': 0,
+                'total_execution_time': 0,
+                'max_execution_time': 0,
+            }
+        return self._times[api_call_type]
+
+    def record_call(self, api_call_type: str, queue_wait_time: float, execution_time: float, cancelled: bool) -> None:
+        with self._lock:
+            times = self._get_times(api_call_type)
+            times['num_calls'] += 1
+            times['num_cancelled'] += 1 if cancelled else 0
+            times['total_queue_wait_time'] += queue_wait_time
+            times['max_queue_wait_time'] = max(times['max_queue_wait_time'], queue_wait_time)
+            times['total_execution_time'] += execution_time
+            times['max_execution_time'] = max(times['max_execution_time'], execution_time)
+
+    def record_dropped(self, api_call_type: str, cancelled: bool) -> None:
+        with self._lock:
+            times = self._get_times(api_call_type)
+            times['num_cancelled' if cancelled else 'num_dropped'] += 1
+
+    def times_info(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {api_call_type: dict(times) for api_call_type, times in self._times.items()}
+
+
+class APILane:
+    """
+    A queue of API calls, and the worker threads that handle them.
+    """
+
+    def __init__(self, name: str, num_workers: int, max_queued: int, pool: 'APIWorkerPool'):
+        self.name = name
+        self.num_workers = num_workers
+        self.max_queued = max_queued
+        self.pool = pool
+
+        self._queue: Deque[APICall] = deque()
+        self._running: List[APICall] = []
+        self._condition = Condition()
+        self._threads: List[Thread] = []
+
+    def submit(self, api_call: APICall) -> List[APICall]:
+        """
+        Adds the API call to the queue, cancelling the calls it supersedes. Returns
+        the calls that were removed from the queue, which should respond with None.
+        """
+        removed_api_calls: List[APICall] = []
+        with self._condition:
+            if api_call.supersede_key is not None:
+                for queued_api_call in list(self._queue):
+                    if queued_api_call.supersede_key == api_call.supersede_key:
+                        queued_api_call.cancel()
+                        self._queue.remove(queued_api_call)
+                        removed_api_calls.append(queued_api_call)
+                for running_api_call in self._running:
+                    if running_api_call.supersede_key == api_call.supersede_key:
+                        running_api_call.cancel()
+
+            if api_call.priority:
+                self._queue.appendleft(api_call)
+            else:
+                # If the queue is full, we drop the oldest call that does not have priority
+                droppable_api_calls = [queued_api_call for queued_api_call in self._queue if not queued_api_call.priority]
+                if len(droppable_api_calls) >= self.max_queued:
+                    self._queue.remove(droppable_api_calls[0])
+                    removed_api_calls.append(droppable_api_calls[0])
+                self._queue.append(api_call)
+
+            if len(self._threads) < self.num_workers:
+                # Note that we make the threads daemon threads, which practically means that when
+                # the process that starts them terminates, our API will terminate as well.
+                thread = Thread(target=self._run, name=f'mito-api-{self.name}-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+            self._condition.notify()
+
+        return removed_api_calls
+
+    def _run(self) -> NoReturn:
+        while True:
+            with self._condition:
+                while len(self._queue) == 0:
+                    self._condition.wait()
+                api_call = self._queue.popleft()
+                self._running.append(api_call)
+
+            try:
+                self.pool.run_api_call(api_call)
+            finally:
+                with self._condition:
+                    self._running.remove(api_call)
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+
+class APIWorkerPool:
+    """
+    The lanes of worker threads that handle API calls.
+
+    handle_api_call is called on a worker thread for each API call, and
+    drop_api_call for each API call that is dropped or cancelled before it
+    starts running.
+    """
+
+    def __init__(
+            self,
+            handle_api_call: Callable[[APICall], None],
+            drop_api_call: Callable[[APICall], None],
+            lane_num_workers: Dict[str, int]=API_LANE_NUM_WORKERS,
+            max_queued: int=MAX_QUEUED_API_CALLS
+        ):
+        self.handle_api_call = handle_api_call
+        self.drop_api_call = drop_api_call
+        self.lanes = {
+            name: APILane(name, num_workers, max_queued, self)
+            for name, num_workers in lane_num_workers.items()
+        }
+        self.api_call_times = APICallTimes()
+
+    def submit(self, api_call: APICall) -> None:
+        for removed_api_call in self.lanes[api_call.lane].submit(api_call):
+            self.api_call_times.record_dropped(removed_api_call.event['type'], removed_api_call.cancelled)
+            self.drop_api_call(removed_api_call)
+
+    def run_api_call(self, api_call: APICall) -> None:
+        start_time = perf_counter()
+        token = _CURRENT_API_CALL.set(api_call)
+        try:
+            self.handle_api_call(api_call)
+        except:
+            # If an error is thrown, we don't want to crash the worker thread,
+            # as then the API never works again
+            pass
+        finally:
+            _CURRENT_API_CALL.reset(token)
+
+        self.api_call_times.record_call(
+            api_call.event['type'],
+            start_time - api_call.queued_time,
+            perf_counter() - start_time,
+            api_call.cancelled
+        )
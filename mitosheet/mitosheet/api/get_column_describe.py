@@ -23,7 +23,13 @@ def get_column_describe(params: Dict[str, Any], steps_manager: StepsManagerType)
     
     series: pd.Series = steps_manager.dfs[sheet_index][column_header]
     column_dtype = str(series.dtype)
-    describe = series.describe()
+
+    # These statistics are cached until the column changes. For very large columns, they are
+    # approximate, unless the exact statistics are requested and have been computed
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(
+        sheet_index, column_id, series, exact=params.get('exact', False)
+    )
+    describe = column_statistics.describe
 
     describe_obj = {}
 
@@ -39,11 +45,14 @@ def get_column_describe(params: Dict[str, Any], steps_manager: StepsManagerType)
         describe_obj[index] = str(row)
 
     # We fill in some specific values that dont get filled by default
-    describe_obj['count: NaN'] = str(series.isna().sum())
+    describe_obj['count: NaN'] = str(column_statistics.num_nan)
 
     # NOTE: be careful adding things here, as we dont want to destroy performance 
     if is_number_dtype(column_dtype):
-        describe_obj['median'] = str(round(series.median(), 2))
-        describe_obj['sum'] = str(round(series.sum(), 2))
+        describe_obj['median'] = str(round(column_statistics.median, 2))
+        describe_obj['sum'] = str(round(column_statistics.sum, 2))
+
+    if column_statistics.is_approximate:
+        describe_obj['is_approximate'] = 'true'
 
     return describe_obj
@@ -5,10 +5,13 @@
 # Distributed under the terms of the GPL License.
 
 import json
+import numpy as np
 import pandas as pd
 from typing import Any, Dict, List, Optional
 import plotly.express as px
 import plotly.graph_objects as go
+from mitosheet.api.api_worker_pool import raise_if_api_call_cancelled
+from mitosheet.column_statistics import ApproximateColumnStatistics, ColumnStatistics
 from mitosheet.step_performers.graph_steps.graph_utils import (
     get_html_and_script_from_figure,
 )
@@ -35,26 +38,35 @@ def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManager
     width = params['width']
     include_plotlyjs = params['include_plotlyjs']
 
-
-    # Create a copy of the dataframe, just for safety.
-    df: pd.DataFrame = steps_manager.dfs[sheet_index].copy()
-
     column_header = steps_manager.curr_step.final_defined_state.column_ids.get_column_header_by_id(sheet_index, column_id)
-    fig = _get_column_summary_graph(df, column_header)
-        
-    # Get rid of some of the default white space
-    fig.update_layout(
-        margin=dict(
-            l=0,
-            r=0,
-            t=30,
-            b=30,
-        )
+    series: pd.Series = steps_manager.dfs[sheet_index][column_header]
+
+    # The graph is cached with the other statistics of the column, until the column changes (or is
+    # renamed, as the column header is in the title of the graph). For
+    # very large columns, it is a graph of a sample of the rows, unless the exact graph is requested
+    # and has been computed
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(
+        sheet_index, column_id, series, exact=params.get('exact', False)
     )
 
-    return_object = get_html_and_script_from_figure(fig, height, width, include_plotlyjs)
+    def get_return_object() -> Dict[str, Any]:
+        fig = _get_column_summary_graph(series, column_header, column_statistics)
+        # Turning the graph into html is slow, so we stop if this graph is no longer needed
+        raise_if_api_call_cancelled()
+            
+        # Get rid of some of the default white space
+        fig.update_layout(
+            margin=dict(
+                l=0,
+                r=0,
+                t=30,
+                b=30,
+            )
+        )
 
-    return return_object
+        return get_html_and_script_from_figure(fig, height, width, include_plotlyjs)
+
+    return column_statistics.get_statistic(('summary_graph', str(column_header), height, width, include_plotlyjs), get_return_object)
 
 def filter_df_to_top_unique_values_in_series(
     df: pd.DataFrame,
@@ -85,26 +97,28 @@ def filter_df_to_top_unique_values_in_series(
     return df[main_series.isin(most_frequent_values_list)]
 
 
-def _get_column_summary_graph(df: pd.DataFrame, column_header: ColumnHeader) -> go.Figure:
+def _get_column_summary_graph(series: pd.Series, column_header: ColumnHeader, column_statistics: ColumnStatistics) -> go.Figure:
     """
     One Axis Graphs heuristics:
     1. Number Column - we do no filtering. These graphs are pretty efficient up to 1M rows
     2. Non-number column. We filter to the top 10k values, as the graphs get pretty laggy
        beyond that
+    3. If the statistics are approximate, we graph the sample of the rows they are 
+       estimated from, with each row counting for the rows it represents
     """
-    series: pd.Series = df[column_header]
     column_dtype = str(series.dtype)
 
     graph_title = f"{column_header} Frequencies"
+    if isinstance(column_statistics, ApproximateColumnStatistics):
+        series = column_statistics.sample
+        graph_title = f"{column_header} Frequencies (approximate)"
 
     filtered = False
     if not is_number_dtype(column_dtype):
-        if series.nunique() > MAX_UNIQUE_NON_NUMBER_VALUES:
-            df = filter_df_to_top_unique_values_in_series(
-                df, series, MAX_UNIQUE_NON_NUMBER_VALUES
-            )
-            # Set series as the newly filtered series
-            series = df[column_header]
+        if column_statistics.nunique > MAX_UNIQUE_NON_NUMBER_VALUES:
+            # Filter to the most common values, which we get from the cached value counts
+            most_frequent_values_list = column_statistics.get_most_common_values(MAX_UNIQUE_NON_NUMBER_VALUES)
+            series = series[series.isin(most_frequent_values_list)]
 
             filtered = True
 
@@ -119,8 +133,16 @@ def _get_column_summary_graph(df: pd.DataFrame, column_header: ColumnHeader) ->
         "title": graph_title,
     }
 
+    if isinstance(column_statistics, ApproximateColumnStatistics):
+        kwargs["y"] = np.full(len(series), column_statistics.scale)
+        kwargs["histfunc"] = "sum"
+
+    raise_if_api_call_cancelled()
     fig = px.histogram(**kwargs)
 
+    if isinstance(column_statistics, ApproximateColumnStatistics):
+        fig.update_yaxes(title_text="count")
+
     log(f"generate_column_summary_stat_graph", {"param_filtered": filtered})
 
     return fig
@@ -3,48 +3,125 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
-import json
+import io
 import os
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk import DEFAULT_DECIMAL, DEFAULT_DELIMITER, DEFAULT_ENCODING, DEFAULT_SKIPROWS
-from mitosheet.step_performers.import_steps.simple_import import read_csv_get_delimiter_and_encoding
+from mitosheet.lru_cache import LRUCache
+from mitosheet.step_performers.import_steps.simple_import import decode_sample_guessing_encoding, is_url_to_file, read_file_sample, sniff_delimeter
 from mitosheet.types import StepsManagerType
 
+MAX_PROBE_WORKERS = 8
+
+# The metadata of the files we have probed, keyed by (file_name, size, modified time), so
+# that we probe a file again if it changes
+CSV_FILE_METADATA_CACHE: LRUCache[Dict[str, Any]] = LRUCache(max_size=256)
+
+
+def get_default_csv_file_metadata() -> Dict[str, Any]:
+    # The default values displayed in the UI
+    return {
+        'delimeter': DEFAULT_DELIMITER,
+        'encoding': DEFAULT_ENCODING,
+        'estimated_row_count': None,
+        'column_preview': [],
+    }
+
+
+def probe_csv_file(file_name: str) -> Dict[str, Any]:
+    """
+    Guesses the delimeter and encoding of the CSV file, estimates how many
+    rows it has, and gets its column headers, all from the start of the file,
+    without reading all of it. If the rest of the file cannot be decoded with 
+    the encoding we guess, the import guesses it again (see SimpleImportStepPerformer).
+    """
+    if is_url_to_file(file_name):
+        return get_default_csv_file_metadata()
+
+    file_stat = os.stat(file_name)
+    cache_key = (file_name, file_stat.st_size, file_stat.st_mtime_ns)
+    csv_file_metadata = CSV_FILE_METADATA_CACHE.get(cache_key)
+    if csv_file_metadata is not None:
+        return csv_file_metadata
+
+    sample, is_entire_file = read_file_sample(file_name)
+    text, encoding = decode_sample_guessing_encoding(sample, is_entire_file)
+    delimeter = sniff_delimeter(text, is_entire_file)
+
+    # Only use the lines that were not cut off
+    lines = text.splitlines(True)
+    if not is_entire_file and len(lines) > 1:
+        lines = lines[:-1]
+    complete_text = ''.join(lines)
+
+    csv_file_metadata = {
+        'delimeter': delimeter,
+        'encoding': encoding,
+        'estimated_row_count': get_estimated_row_count(lines, encoding, file_stat.st_size, is_entire_file),
+        'column_preview': get_column_preview(complete_text, delimeter),
+    }
+    CSV_FILE_METADATA_CACHE.set(cache_key, csv_file_metadata)
+    return csv_file_metadata
+
+
+def get_estimated_row_count(lines: List[str], encoding: str, file_size: int, is_entire_file: bool) -> Optional[int]:
+    """
+    Estimates the number of rows in the file from the average size of the lines
+    at the start of it. Notably, this is exact if we read the entire file and no
+    values contain newlines.
+    """
+    non_empty_lines = [line for line in lines if line.strip() != '']
+    if len(non_empty_lines) == 0:
+        return 0 if is_entire_file else None
+    
+    if is_entire_file:
+        return len(non_empty_lines) - 1
+
+    average_line_size = len(''.join(lines).encode(encoding)) / len(lines)
+    return max(round(file_size / average_line_size) - 1, 0)
+
+
+def get_column_preview(text: str, delimeter: str) -> List[str]:
+    try:
+        df = pd.read_csv(io.StringIO(text), sep=delimeter, nrows=0)
+        return [str(column_header) for column_header in df.columns]
+    except:
+        return []
+
 
 def get_csv_files_metadata(params: Dict[str, Any], steps_manager: StepsManagerType) -> Dict[str, Any]:
     """
     Given a list of 'file_names' that should be CSV files,
     this returns our guesses for delimeters and encodings
     for these files, as well as other default parameters that we 
-    don't try to guess
+    don't try to guess.
+
+    It also returns an estimate of the number of rows in each file, 
+    and the column headers of each file, if we can read them.
     """
     file_names = params['file_names']
 
-    delimeters = []
-    encodings = []
-    decimals = []
-    skiprows = []
-    for file_name in file_names:
+    def _probe_csv_file(file_name: str) -> Dict[str, Any]:
         try:
-            _, delimiter, encoding = read_csv_get_delimiter_and_encoding(file_name)
-            delimeters.append(delimiter)
-            encodings.append(encoding)
+            return probe_csv_file(file_name)
         except:
-            # The default values displayed in the UI
-            delimeters.append(DEFAULT_DELIMITER)
-            encodings.append(DEFAULT_ENCODING)
+            return get_default_csv_file_metadata()
 
-        # We don't have a good way to guess these params, so we always use the defaults
-        decimals.append(DEFAULT_DECIMAL)
-        skiprows.append(DEFAULT_SKIPROWS)
+    if len(file_names) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_PROBE_WORKERS, len(file_names))) as executor:
+            csv_files_metadata = list(executor.map(_probe_csv_file, file_names))
+    else:
+        csv_files_metadata = [_probe_csv_file(file_name) for file_name in file_names]
 
     return {
-        'delimeters': delimeters,
-        'encodings': encodings,
-        'decimals': decimals,
-        'skiprows': skiprows 
+        'delimeters': [csv_file_metadata['delimeter'] for csv_file_metadata in csv_files_metadata],
+        'encodings': [csv_file_metadata['encoding'] for csv_file_metadata in csv_files_metadata],
+        # We don't have a good way to guess these params, so we always use the defaults
+        'decimals': [DEFAULT_DECIMAL for _ in file_names],
+        'skiprows': [DEFAULT_SKIPROWS for _ in file_names],
+        'estimated_row_counts': [csv_file_metadata['estimated_row_count'] for csv_file_metadata in csv_files_metadata],
+        'column_previews': [csv_file_metadata['column_preview'] for csv_file_metadata in csv_files_metadata],
     }
-
-
@@ -3,11 +3,10 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
-import json
 import os
 from typing import Any, Dict
 
-import pandas as pd
+from mitosheet.public.v2.excel_utils import get_excel_sheet_names
 from mitosheet.types import StepsManagerType
 
 
@@ -22,8 +21,8 @@ def get_excel_file_metadata(params: Dict[str, Any], steps_manager: StepsManagerT
     """
     file_path = params['file_path']
 
-    file = pd.ExcelFile(file_path, engine='openpyxl')
-    sheet_names = file.sheet_names
+    # We only read the list of sheets from the workbook, and not the sheets themselves
+    sheet_names = get_excel_sheet_names(file_path)
 
     return {
         'sheet_names': sheet_names,
@@ -7,6 +7,7 @@ import json
 from typing import Any, Dict
 
 import pandas as pd
+from mitosheet.api.api_worker_pool import raise_if_api_call_cancelled
 from mitosheet.types import StepsManagerType
 from mitosheet.utils import get_row_data_array
 
@@ -37,20 +38,32 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
     
     series: pd.Series = steps_manager.dfs[sheet_index][column_header]
 
-    unique_value_counts_percents_series = series.value_counts(normalize=True, dropna=False)
-    unique_value_counts_series = series.value_counts(dropna=False)
-    
-    unique_value_counts_df = pd.DataFrame({
-        'values': unique_value_counts_percents_series.index,
-        'percents': unique_value_counts_percents_series, 
-        'counts': unique_value_counts_series
-    })
+    # The value counts are cached until the column changes, so we don't count the values
+    # again for each search string and sort. For very large columns, they are approximate,
+    # unless the exact value counts are requested and have been computed. As approximate
+    # value counts only have the values in a sample, we search the exact value counts, so
+    # that values that are not in the sample can be found (and filtered on)
+    if search_string != '':
+        column_statistics = steps_manager.column_statistics_cache.get_exact_column_statistics(sheet_index, column_id, series)
+    else:
+        column_statistics = steps_manager.column_statistics_cache.get_column_statistics(
+            sheet_index, column_id, series, exact=params.get('exact', False)
+        )
+    unique_value_counts_df: pd.DataFrame = column_statistics.get_statistic('unique_value_counts_df', lambda: pd.DataFrame({
+        'values': column_statistics.normalized_value_counts.index,
+        'percents': column_statistics.normalized_value_counts, 
+        'counts': column_statistics.value_counts
+    }))
 
     if len(unique_value_counts_df) > MAX_UNIQUE_VALUES:
+        # Sorting and filtering many values is slow, so we stop if these values are no longer needed
+        raise_if_api_call_cancelled()
+
         # First, we turn the series into a string series, so that we can
         # easily filter on it without issues (and sort in some cases)
-        new_unique_value_counts_df = unique_value_counts_df.copy(deep=True)
-        new_unique_value_counts_df['values_strings'] = new_unique_value_counts_df['values'].astype('str')
+        new_unique_value_counts_df = unique_value_counts_df.assign(
+            values_strings=column_statistics.get_statistic('unique_values_strings', lambda: unique_value_counts_df['values'].astype('str'))
+        )
 
         # First, we sort in the order they want
         try:
@@ -87,9 +100,14 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
 
     else:
         is_all_data = True
+
+    # Approximate value counts only have the values in the sample, which might not be all of them
+    if not column_statistics.includes_all_values:
+        is_all_data = False
     
     return {
         'uniqueValueRowDataArray': get_row_data_array(unique_value_counts_df),
-        'isAllData': is_all_data
+        'isAllData': is_all_data,
+        'isApproximate': column_statistics.is_approximate
     }
 
@@ -26,6 +26,10 @@ def get_code_chunks(all_steps: List[Step], optimize: bool=True) -> List[CodeChun
 
     optimize is by default True, which results in these CodeChunks being optimized
     down to the smallest possible list of CodeChunks that implements the same ops.
+
+    NOTE: the code chunks of each step are cached on the step, and the optimized
+    code chunks are cached on the last step, so that transpiling the same steps 
+    again (e.g. after an undo, or for the step summaries) does not redo this work.
     """
     from mitosheet.steps_manager import get_step_indexes_to_skip
     step_indexes_to_skip = get_step_indexes_to_skip(all_steps)
@@ -36,18 +40,22 @@ def get_code_chunks(all_steps: List[Step], optimize: bool=True) -> List[CodeChun
         if step.step_type == 'initialize' or step_index in step_indexes_to_skip:
             continue
 
-        all_code_chunks.extend(step.step_performer.transpile(
-            step.prev_state, # type: ignore
-            step.params,
-            step.execution_data,
-        ))
+        all_code_chunks.extend(step.get_code_chunks())
+
+    if not optimize or len(all_steps) == 0:
+        return all_code_chunks
+
+    # If these are the same code chunks we optimized last time, we can reuse the result
+    last_step = all_steps[-1]
+    if last_step.optimized_code_chunks_cache is not None:
+        cached_code_chunks, cached_optimized_code_chunks = last_step.optimized_code_chunks_cache
+        if len(cached_code_chunks) == len(all_code_chunks) and all(cached_code_chunk is code_chunk for cached_code_chunk, code_chunk in zip(cached_code_chunks, all_code_chunks)):
+            return copy(cached_optimized_code_chunks)
 
-    if optimize:
-        code_chunks_list = optimize_code_chunks(all_code_chunks)
-    else:
-        code_chunks_list = all_code_chunks
+    code_chunks_list = optimize_code_chunks(all_code_chunks)
+    last_step.optimized_code_chunks_cache = (all_code_chunks, code_chunks_list)
 
-    return code_chunks_list
+    return copy(code_chunks_list)
 
 
 # NOTE: we cannot use get_right_combine_with_column_delete_code_chunk on sort/filter, 
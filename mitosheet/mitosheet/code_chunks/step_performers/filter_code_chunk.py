@@ -5,6 +5,7 @@
 # Distributed under the terms of the GPL License.
 
 
+import re
 from copy import copy
 from datetime import date
 from typing import List, Optional, Tuple, Union
@@ -66,6 +67,9 @@ FILTER_FORMAT_STRING_DICT = {
 
 # Dict used when there a specific filter condition has multiple
 # filters that use it. Helps us write cleaner filter code!
+# NOTE: these are all vectorized, as applying a lambda to each value is very slow 
+# for long columns. Comparisons against any or all of the values become comparisons 
+# against the min or max value, and string conditions become a single regex search
 FILTER_FORMAT_STRING_MULTIPLE_VALUES_DICT = {
     FC_EMPTY: {
         "Or": "{df_name}[{transpiled_column_header}].isna()",
@@ -93,27 +97,27 @@ FILTER_FORMAT_STRING_MULTIPLE_VALUES_DICT = {
     },
     FC_NUMBER_EXACTLY: {
         "Or": "{df_name}[{transpiled_column_header}].isin({values})",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val == n for n in {values}))",
+        "And": "({df_name}[{transpiled_column_header}] == min({values})) & ({df_name}[{transpiled_column_header}] == max({values}))",
     },
     FC_NUMBER_NOT_EXACTLY: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val != n for n in {values}))",
+        "Or": "({df_name}[{transpiled_column_header}] != min({values})) | ({df_name}[{transpiled_column_header}] != max({values}))",
         "And": "~{df_name}[{transpiled_column_header}].isin({values})",
     },
     FC_NUMBER_GREATER: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val > n for n in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val > n for n in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] > min({values})",
+        "And": "{df_name}[{transpiled_column_header}] > max({values})",
     },
     FC_NUMBER_GREATER_THAN_OR_EQUAL: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val >= n for n in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val >= n for n in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] >= min({values})",
+        "And": "{df_name}[{transpiled_column_header}] >= max({values})",
     },
     FC_NUMBER_LESS: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val < n for n in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val < n for n in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] < max({values})",
+        "And": "{df_name}[{transpiled_column_header}] < min({values})",
     },
     FC_NUMBER_LESS_THAN_OR_EQUAL: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val <= n for n in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val <= n for n in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] <= max({values})",
+        "And": "{df_name}[{transpiled_column_header}] <= min({values})",
     },
     FC_NUMBER_LOWEST: {
         "Or": '{df_name}[{transpiled_column_header}].isin({df_name}[{transpiled_column_header}].nsmallest(max({values}), keep=\'all\'))',
@@ -124,56 +128,56 @@ FILTER_FORMAT_STRING_MULTIPLE_VALUES_DICT = {
         "And": '{df_name}[{transpiled_column_header}].isin({df_name}[{transpiled_column_header}].nlargest(min({values}), keep=\'all\'))'
     },
     FC_STRING_CONTAINS: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(s in str(val) for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(s in str(val) for s in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}].astype(str).str.contains({contains_any_pattern}, regex=True)",
+        "And": "{df_name}[{transpiled_column_header}].astype(str).str.contains({contains_all_pattern}, regex=True)",
     },
     FC_STRING_DOES_NOT_CONTAIN: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(s not in str(val) for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(s not in str(val) for s in {values}))",
+        "Or": "~{df_name}[{transpiled_column_header}].astype(str).str.contains({contains_all_pattern}, regex=True)",
+        "And": "~{df_name}[{transpiled_column_header}].astype(str).str.contains({contains_any_pattern}, regex=True)",
     },
     FC_STRING_EXACTLY: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val == s for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val == s for s in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}].isin({values})",
+        "And": "({df_name}[{transpiled_column_header}] == min({values})) & ({df_name}[{transpiled_column_header}] == max({values}))",
     },
     FC_STRING_NOT_EXACTLY: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val != s for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val != s for s in {values}))",
+        "Or": "({df_name}[{transpiled_column_header}] != min({values})) | ({df_name}[{transpiled_column_header}] != max({values}))",
+        "And": "~{df_name}[{transpiled_column_header}].isin({values})",
     },
     FC_STRING_STARTS_WITH: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(str(val).startswith(s) for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(str(val).startswith(s) for s in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}].astype(str).str.startswith({values_tuple})",
+        "And": "{df_name}[{transpiled_column_header}].astype(str).str.contains({starts_with_all_pattern}, regex=True)",
     },
     FC_STRING_ENDS_WITH: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(str(val).endswith(s) for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(str(val).endswith(s) for s in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}].astype(str).str.endswith({values_tuple})",
+        "And": "{df_name}[{transpiled_column_header}].astype(str).str.contains({ends_with_all_pattern}, regex=True)",
     },
     FC_STRING_CONTAINS_CASE_INSENSITIVE: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(s.upper() in str(val).upper() for s in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(s.upper() in str(val).upper() for s in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}].astype(str).str.upper().str.contains({upper_contains_any_pattern}, regex=True)",
+        "And": "{df_name}[{transpiled_column_header}].astype(str).str.upper().str.contains({upper_contains_all_pattern}, regex=True)",
     },
     FC_DATETIME_EXACTLY: {
         "Or": "{df_name}[{transpiled_column_header}].isin({values})",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val == d for d in {values}))",
+        "And": "({df_name}[{transpiled_column_header}] == min({values})) & ({df_name}[{transpiled_column_header}] == max({values}))",
     },
     FC_DATETIME_NOT_EXACTLY: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val != d for d in {values}))",
+        "Or": "({df_name}[{transpiled_column_header}] != min({values})) | ({df_name}[{transpiled_column_header}] != max({values}))",
         "And": "~{df_name}[{transpiled_column_header}].isin({values})",
     },
     FC_DATETIME_GREATER: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val > d for d in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val > d for d in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] > min({values})",
+        "And": "{df_name}[{transpiled_column_header}] > max({values})",
     },
     FC_DATETIME_GREATER_THAN_OR_EQUAL: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val >= d for d in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val >= d for d in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] >= min({values})",
+        "And": "{df_name}[{transpiled_column_header}] >= max({values})",
     },
     FC_DATETIME_LESS: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val < d for d in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val < d for d in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] < max({values})",
+        "And": "{df_name}[{transpiled_column_header}] < min({values})",
     },
     FC_DATETIME_LESS_THAN_OR_EQUAL: {
-        "Or": "{df_name}[{transpiled_column_header}].apply(lambda val: any(val <= d for d in {values}))",
-        "And": "{df_name}[{transpiled_column_header}].apply(lambda val: all(val <= d for d in {values}))",
+        "Or": "{df_name}[{transpiled_column_header}] <= max({values})",
+        "And": "{df_name}[{transpiled_column_header}] <= min({values})",
     },
 }
 
@@ -231,15 +235,42 @@ def get_multiple_filter_string(
 
     transpiled_column_header = get_column_header_as_transpiled_code(column_header)
 
+    # String conditions search the values as strings, with all the values at once
+    string_values = list(dict.fromkeys(str(filter["value"]) for filter in filters))
+    upper_string_values = [string_value.upper() for string_value in string_values]
+
     return FILTER_FORMAT_STRING_MULTIPLE_VALUES_DICT[condition][
         original_operator
     ].format(
         df_name=df_name,
         transpiled_column_header=transpiled_column_header,
         values=values,
+        values_tuple=repr(tuple(string_values)),
+        contains_any_pattern=repr(get_regex_matching_any(string_values)),
+        contains_all_pattern=repr(get_regex_matching_all(string_values, prefix='.*')),
+        starts_with_all_pattern=repr(get_regex_matching_all(string_values)),
+        ends_with_all_pattern=repr(get_regex_matching_all(string_values, prefix='.*', suffix='\\Z')),
+        upper_contains_any_pattern=repr(get_regex_matching_any(upper_string_values)),
+        upper_contains_all_pattern=repr(get_regex_matching_all(upper_string_values, prefix='.*')),
     )
 
 
+def get_regex_matching_any(strings: List[str]) -> str:
+    """
+    Returns a regex that is found in a string if any of the strings are in it.
+    """
+    return '|'.join(re.escape(string) for string in strings)
+
+
+def get_regex_matching_all(strings: List[str], prefix: str='', suffix: str='') -> str:
+    """
+    Returns a regex that is found in a string if it matches prefix + string + suffix
+    from it's start for all of the strings, using a lookahead for each string.
+    """
+    lookaheads = ''.join(f'(?={prefix}{re.escape(string)}{suffix})' for string in strings)
+    return f'(?s)^{lookaheads}'
+
+
 def combine_filter_strings(
     operator: OperatorType, filter_strings: List[str], split_lines: bool = False
 ) -> str:
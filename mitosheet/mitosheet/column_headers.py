@@ -111,6 +111,23 @@ class ColumnIDMap():
                 self.column_id_to_column_header[sheet_index][column_id] = column_header
                 self.column_header_to_column_id[sheet_index][column_header] = column_id
 
+    def copy(self, sheet_indexes_to_copy: Collection[int]) -> "ColumnIDMap":
+        """
+        Returns a copy of this map, where the mappings of any sheet not 
+        in sheet_indexes_to_copy are shared with this map. As such, only
+        the sheets in sheet_indexes_to_copy can be edited in the copy.
+        """
+        new_column_id_map = ColumnIDMap([])
+        new_column_id_map.column_id_to_column_header = [
+            dict(mapping) if sheet_index in sheet_indexes_to_copy else mapping
+            for sheet_index, mapping in enumerate(self.column_id_to_column_header)
+        ]
+        new_column_id_map.column_header_to_column_id = [
+            dict(mapping) if sheet_index in sheet_indexes_to_copy else mapping
+            for sheet_index, mapping in enumerate(self.column_header_to_column_id)
+        ]
+        return new_column_id_map
+
     def set_column_header(self, sheet_index: int, column_id: ColumnID, column_header: ColumnHeader) -> None:
         """
         Sets a column id and column header to match to eachother. 
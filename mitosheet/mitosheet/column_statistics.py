@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Opening the column control panel asks for the describe statistics, the
+unique value counts, and the summary graph of the column, all at once, and
+users often click back and forth between columns.
+
+The ColumnStatisticsCache keeps the ColumnStatistics of the columns that were
+looked at most recently, which compute each statistic the first time it is
+needed, and derive what they can from the value counts of the column. Like the
+SheetDataCache, columns are keyed by the memory their values are stored in, so
+the statistics of a column are only recomputed once a step modifies it.
+
+Counting the values of a very large column can take tens of seconds, so for
+columns with at least approximate_statistics_min_rows rows, we instead estimate
+the statistics from a random sample of the rows (see ApproximateColumnStatistics),
+and compute the exact statistics on a background thread only when asked to.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_number_dtype
+from mitosheet.lru_cache import LRUCache
+from mitosheet.sheet_data_cache import get_column_values_key
+from mitosheet.types import ColumnID
+
+COLUMN_STATISTICS_CACHE_MAX_SIZE = 16
+
+# The number of rows that approximate statistics are estimated from
+APPROXIMATE_STATISTICS_SAMPLE_SIZE = 1_000_000
+
+# The statistics of describe that are cheap to compute exactly, even for very large columns,
+# and the function of the series that computes them. NOTE: describe returns the first and
+# last datetimes in earlier versions of pandas
+EXACT_DESCRIBE_STATISTICS = {
+    'mean': 'mean',
+    'std': 'std',
+    'min': 'min',
+    'max': 'max',
+    'first': 'min',
+    'last': 'max',
+}
+
+T = TypeVar('T')
+
+
+class ColumnStatistics:
+    """
+    The statistics of one column, each computed the first time it is needed.
+
+    Safe to use from multiple threads. If two threads need the same statistic
+    at the same time, it is only computed once.
+    """
+
+    is_approximate = False
+
+    def __init__(self, series: pd.Series, values: Any):
+        self.series = series
+        # We keep a reference to the values, so their memory cannot be reused by a
+        # different column while they are in the cache
+        self.values = values
+
+        self._statistics: Dict[Hashable, Any] = {}
+        # Reentrant, as statistics are computed from other statistics
+        self._lock = RLock()
+
+    def get_statistic(self, name: Hashable, compute: Callable[[], T]) -> T:
+        """
+        Returns the statistic with this name, computing it with compute if it
+        has not been computed yet.
+        """
+        with self._lock:
+            if name not in self._statistics:
+                self._statistics[name] = compute()
+            return self._statistics[name]
+
+    @property
+    def value_counts(self) -> pd.Series:
+        """
+        The number of times each value occurs in the series, including NaN values,
+        with the most common values first.
+        """
+        return self.get_statistic('value_counts', lambda: self.series.value_counts(dropna=False))
+
+    @property
+    def normalized_value_counts(self) -> pd.Series:
+        # This is what value_counts(normalize=True) does
+        return self.get_statistic('normalized_value_counts', lambda: self.value_counts / self.value_counts.sum())
+
+    @property
+    def num_nan(self) -> int:
+        return self.get_statistic('num_nan', lambda: int(self.value_counts[self.value_counts.index.isna()].sum()))
+
+    @property
+    def nunique(self) -> int:
+        """
+        The number of unique values that are not NaN, like series.nunique()
+        """
+        return self.get_statistic('nunique', lambda: int(self.value_counts.index.notna().sum()))
+
+    @property
+    def includes_all_values(self) -> bool:
+        """
+        If every value in the series is in the value counts.
+        """
+        return True
+
+    def get_most_common_values(self, num_values: int) -> List[Any]:
+        """
+        Returns the num_values most common values that are not NaN.
+        """
+        value_counts = self.value_counts
+        return value_counts[value_counts.index.notna()].head(num_values).index.tolist()
+
+    @property
+    def describe(self) -> pd.Series:
+        return self.get_statistic('describe', lambda: self.series.describe())
+
+    @property
+    def median(self) -> Any:
+        return self.get_statistic('median', lambda: self.series.median())
+
+    @property
+    def sum(self) -> Any:
+        return self.get_statistic('sum', lambda: self.series.sum())
+
+    def compute(self) -> None:
+        """
+        Computes the statistics that the column control panel displays.
+        """
+        self.value_counts
+        self.describe
+        if is_number_dtype(str(self.series.dtype)):
+            self.median
+            self.sum
+
+
+class ApproximateColumnStatistics(ColumnStatistics):
+    """
+    The statistics of one column, estimated from a uniform random sample of 
+    sample_size of its rows:
+    1. The value counts are the value counts of the sample, scaled up to the 
+       number of rows. So, the most common values are very likely included, 
+       but values that are not in the sample are not.
+    2. The number of unique values is estimated with the Chao1 estimator, from 
+       how many values occur once and twice in the sample.
+    3. The percentiles and median are the percentiles and median of the sample.
+
+    The other statistics (e.g. the number of NaN values, the sum, and the min) 
+    are cheap to compute exactly, and so are.
+    """
+
+    is_approximate = True
+
+    def __init__(self, series: pd.Series, values: Any, sample_size: int=APPROXIMATE_STATISTICS_SAMPLE_SIZE):
+        super().__init__(series, values)
+        self.sample_size = min(sample_size, len(series))
+
+    @property
+    def sample(self) -> pd.Series:
+        def get_sample() -> pd.Series:
+            # We use the same sample each time, so the estimates do not change between calls
+            row_indexes = np.random.default_rng(0).choice(len(self.series), size=self.sample_size, replace=False)
+            return self.series.iloc[np.sort(row_indexes)]
+
+        return self.get_statistic('sample', get_sample)
+
+    @property
+    def scale(self) -> float:
+        return len(self.series) / self.sample_size if self.sample_size > 0 else 1
+
+    @property
+    def value_counts(self) -> pd.Series:
+        return self.get_statistic(
+            'value_counts', 
+            lambda: (self.sample.value_counts(dropna=False) * self.scale).round().astype('int64')
+        )
+
+    @property
+    def num_nan(self) -> int:
+        return self.get_statistic('num_nan', lambda: int(self.series.isna().sum()))
+
+    @property
+    def nunique(self) -> int:
+        def get_nunique() -> int:
+            sample_value_counts = self.sample.value_counts()
+            num_values_occuring_once = int((sample_value_counts == 1).sum())
+            num_values_occuring_twice = int((sample_value_counts == 2).sum())
+            if num_values_occuring_twice > 0:
+                num_values_not_in_sample = num_values_occuring_once ** 2 / (2 * num_values_occuring_twice)
+            else:
+                num_values_not_in_sample = num_values_occuring_once * (num_values_occuring_once - 1) / 2
+            nunique = len(sample_value_counts) + num_values_not_in_sample
+            return int(min(round(nunique), len(self.series) - self.num_nan))
+
+        return self.get_statistic('nunique', get_nunique)
+
+    @property
+    def includes_all_values(self) -> bool:
+        # Unless we estimate that there are values that are not in the sample
+        return int(self.value_counts.index.notna().sum()) >= self.nunique
+
+    @property
+    def describe(self) -> pd.Series:
+        def get_describe() -> pd.Series:
+            describe = self.sample.describe()
+            describe['count'] = len(self.series) - self.num_nan
+            for statistic, function_name in EXACT_DESCRIBE_STATISTICS.items():
+                if statistic in describe.index:
+                    describe[statistic] = getattr(self.series, function_name)()
+            if 'unique' in describe.index:
+                describe['unique'] = self.nunique
+            if 'freq' in describe.index and not pd.isna(describe['freq']):
+                describe['freq'] = int(round(describe['freq'] * self.scale))
+            return describe
+
+        return self.get_statistic('describe', get_describe)
+
+    @property
+    def median(self) -> Any:
+        return self.get_statistic('median', lambda: self.sample.median())
+
+
+class ColumnStatisticsCache:
+    """
+    Maps a column to its ColumnStatistics, for the COLUMN_STATISTICS_CACHE_MAX_SIZE
+    columns that were looked at most recently.
+
+    Columns with at least approximate_statistics_min_rows rows get approximate 
+    statistics, unless their exact statistics have been computed. If 
+    approximate_statistics_min_rows is None, all statistics are exact.
+    """
+
+    def __init__(
+            self, 
+            max_size: int=COLUMN_STATISTICS_CACHE_MAX_SIZE, 
+            approximate_statistics_min_rows: Optional[int]=None,
+            approximate_statistics_sample_size: int=APPROXIMATE_STATISTICS_SAMPLE_SIZE
+        ):
+        self._column_statistics: LRUCache[ColumnStatistics] = LRUCache(max_size)
+        self.approximate_statistics_min_rows = approximate_statistics_min_rows
+        self.approximate_statistics_sample_size = approximate_statistics_sample_size
+
+        # Held while getting or creating the statistics of a column, so that API calls for
+        # the same column at the same time share them
+        self._lock = Lock()
+
+        # The exact statistics being computed in the background, so each is only computed once
+        self._exact_column_statistics_futures: Dict[Hashable, 'Future[ColumnStatistics]'] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get_column_statistics(self, sheet_index: int, column_id: ColumnID, series: pd.Series, exact: bool=False) -> ColumnStatistics:
+        """
+        Returns the statistics of the column. If exact and these statistics are
+        approximate, also starts computing the exact statistics in the background,
+        which are returned once they are computed.
+        """
+        values_key, values = get_column_values_key(series, None)
+        key = (sheet_index, column_id, values_key)
+        with self._lock:
+            column_statistics = self._column_statistics.get(key)
+            if column_statistics is None:
+                if self.approximate_statistics_min_rows is not None and len(series) >= self.approximate_statistics_min_rows:
+                    column_statistics = ApproximateColumnStatistics(series, values, self.approximate_statistics_sample_size)
+                else:
+                    column_statistics = ColumnStatistics(series, values)
+                self._column_statistics.set(key, column_statistics)
+
+            if exact and column_statistics.is_approximate:
+                self._compute_exact_column_statistics(key, series, values)
+
+            return column_statistics
+
+    def _compute_exact_column_statistics(self, key: Hashable, series: pd.Series, values: Any) -> 'Future[ColumnStatistics]':
+        """
+        Computes the exact statistics of the column on a background thread, and then
+        replaces the approximate statistics in the cache with them. Must hold the lock.
+        """
+        future = self._exact_column_statistics_futures.get(key)
+        if future is not None:
+            return future
+
+        def compute_exact_column_statistics() -> ColumnStatistics:
+            try:
+                column_statistics = ColumnStatistics(series, values)
+                column_statistics.compute()
+                with self._lock:
+                    self._column_statistics.set(key, column_statistics)
+                return column_statistics
+            finally:
+                with self._lock:
+                    self._exact_column_statistics_futures.pop(key, None)
+
+        if self._executor is None:
+            # We compute one column at a time, so we don't use all of the memory at once
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mito-column-statistics')
+        future = self._executor.submit(compute_exact_column_statistics)
+        self._exact_column_statistics_futures[key] = future
+        return future
+
+    def get_exact_column_statistics(self, sheet_index: int, column_id: ColumnID, series: pd.Series) -> ColumnStatistics:
+        """
+        Returns the exact statistics of the column, waiting for them to be computed
+        if the statistics of the column are approximate.
+        """
+        column_statistics = self.get_column_statistics(sheet_index, column_id, series)
+        if not column_statistics.is_approximate:
+            return column_statistics
+
+        values_key, values = get_column_values_key(series, None)
+        key = (sheet_index, column_id, values_key)
+        with self._lock:
+            # The exact statistics may have been computed since we got the statistics
+            column_statistics = self._column_statistics.get(key) or column_statistics
+            if not column_statistics.is_approximate:
+                return column_statistics
+            future = self._compute_exact_column_statistics(key, series, values)
+        return future.result()
+
+    def get_exact_column_statistics_future(self, sheet_index: int, column_id: ColumnID, series: pd.Series) -> Optional['Future[ColumnStatistics]']:
+        """
+        Returns the future for the exact statistics of the column, if they are 
+        being computed in the background.
+        """
+        values_key, _ = get_column_values_key(series, None)
+        with self._lock:
+            return self._exact_column_statistics_futures.get((sheet_index, column_id, values_key))
+
+    def clear(self) -> None:
+        self._column_statistics.clear()
+
+    def cache_info(self) -> Dict[str, Any]:
+        return self._column_statistics.cache_info()
+
+    @property
+    def hits(self) -> int:
+        return self._column_statistics.hits
+
+    @property
+    def misses(self) -> int:
+        return self._column_statistics.misses
@@ -37,6 +37,10 @@ MITO_CONFIG_CUSTOM_SHEET_FUNCTIONS_PATH = 'MITO_CONFIG_CUSTOM_SHEET_FUNCTIONS_PA
 MITO_CONFIG_CUSTOM_IMPORTERS_PATH = 'MITO_CONFIG_CUSTOM_IMPORTERS_PATH'
 MITO_CONFIG_LOG_SERVER_URL = 'MITO_CONFIG_LOG_SERVER_URL'
 MITO_CONFIG_LOG_SERVER_BATCH_INTERVAL = 'MITO_CONFIG_LOG_SERVER_BATCH_INTERVAL'
+MITO_CONFIG_STATE_MEMORY_BUDGET_MB = 'MITO_CONFIG_STATE_MEMORY_BUDGET_MB'
+MITO_CONFIG_STATE_CHECKPOINT_INTERVAL = 'MITO_CONFIG_STATE_CHECKPOINT_INTERVAL'
+MITO_CONFIG_STATE_EVICTION_POLICY = 'MITO_CONFIG_STATE_EVICTION_POLICY'
+MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS = 'MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS'
 
 
 # Note: The below keys can change since they are not set by the user.
@@ -45,6 +49,12 @@ MITO_CONFIG_CODE_SNIPPETS = 'MITO_CONFIG_CODE_SNIPPETS'
 # The default values to use if the mec does not define them
 DEFAULT_MITO_CONFIG_SUPPORT_EMAIL = 'founders@sagacollab.com'
 DEFAULT_MITO_CONFIG_CODE_SNIPPETS_SUPPORT_EMAIL = 'founders@sagacollab.com'
+DEFAULT_MITO_CONFIG_STATE_CHECKPOINT_INTERVAL = 10
+DEFAULT_MITO_CONFIG_STATE_EVICTION_POLICY = 'oldest'
+DEFAULT_MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS = 10_000_000
+
+# The policies for picking which states to evict first when over the memory budget
+STATE_EVICTION_POLICIES = ['oldest', 'largest']
 
 # Since Mito needs to look up individual environment variables, we need to 
 # know the names of the variables associated with each mito config version. 
@@ -73,6 +83,10 @@ MEC_VERSION_KEYS = {
         MITO_CONFIG_ENTERPRISE_TEMP_LICENSE,
         MITO_CONFIG_CUSTOM_SHEET_FUNCTIONS_PATH,
         MITO_CONFIG_CUSTOM_IMPORTERS_PATH,
+        MITO_CONFIG_STATE_MEMORY_BUDGET_MB,
+        MITO_CONFIG_STATE_CHECKPOINT_INTERVAL,
+        MITO_CONFIG_STATE_EVICTION_POLICY,
+        MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS,
     ]
 }
 
@@ -397,6 +411,51 @@ class MitoConfig:
             self.mec[MITO_CONFIG_ENTERPRISE_TEMP_LICENSE]
         )
 
+    @property
+    def state_memory_budget_mb(self) -> Optional[int]:
+        """
+        The number of megabytes that the dataframes in the step history can
+        take up before older states are evicted. If not set, nothing is evicted.
+        """
+        if self.mec is None or self.mec[MITO_CONFIG_STATE_MEMORY_BUDGET_MB] is None:
+            return None
+        return int(self.mec[MITO_CONFIG_STATE_MEMORY_BUDGET_MB])
+
+    @property
+    def state_checkpoint_interval(self) -> int:
+        """
+        Every state_checkpoint_interval steps, the state is kept as a checkpoint that 
+        is never evicted, so that evicted states can be recomputed from it.
+        """
+        if self.mec is None or self.mec[MITO_CONFIG_STATE_CHECKPOINT_INTERVAL] is None:
+            return DEFAULT_MITO_CONFIG_STATE_CHECKPOINT_INTERVAL
+        return max(int(self.mec[MITO_CONFIG_STATE_CHECKPOINT_INTERVAL]), 1)
+
+    @property
+    def state_eviction_policy(self) -> str:
+        if self.mec is None or self.mec[MITO_CONFIG_STATE_EVICTION_POLICY] is None:
+            return DEFAULT_MITO_CONFIG_STATE_EVICTION_POLICY
+
+        state_eviction_policy = self.mec[MITO_CONFIG_STATE_EVICTION_POLICY]
+        if state_eviction_policy not in STATE_EVICTION_POLICIES:
+            log('mito_config_error', {'mito_config_error_reason': 'mito_config_state_eviction_policy invalid'})
+            raise ValueError(
+                f"The MITO_CONFIG_STATE_EVICTION_POLICY environment variable is set to {state_eviction_policy}, but must be one of {STATE_EVICTION_POLICIES}."
+            )
+        return state_eviction_policy
+
+    @property
+    def approximate_statistics_min_rows(self) -> Optional[int]:
+        """
+        Columns with at least this many rows get approximate statistics in the column
+        control panel, estimated from a sample of the rows. If set to 0, the statistics
+        are always exact.
+        """
+        if self.mec is None or self.mec[MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS] is None:
+            return DEFAULT_MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS
+        approximate_statistics_min_rows = int(self.mec[MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS])
+        return approximate_statistics_min_rows if approximate_statistics_min_rows > 0 else None
+
     # Add new mito configuration options here ...
 
     @property
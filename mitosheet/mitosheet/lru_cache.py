@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+A small, bounded least-recently-used cache, for caching results that
+are expensive to recompute and keyed by something we build ourselves
+(rather than function arguments, where functools.lru_cache works).
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LRUCache(Generic[T]):
+    """
+    Maps keys to values, evicting the least recently used entry once
+    there are more than max_size entries. Keeps track of the number of
+    hits and misses, so we can tell if the cache is useful.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[Hashable, T]' = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: T) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cache
+
+    def cache_info(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+            'max_size': self.max_size,
+        }
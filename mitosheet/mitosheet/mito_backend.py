@@ -25,7 +25,7 @@ from mitosheet.api import API
 from mitosheet.enterprise.mito_config import MitoConfig
 from mitosheet.errors import (MitoError, get_recent_traceback,
                               make_execution_error)
-from mitosheet.saved_analyses import write_save_analysis_file
+from mitosheet.saved_analyses import schedule_save_analysis_file
 from mitosheet.steps_manager import StepsManager
 from mitosheet.telemetry.telemetry_utils import (log, log_event_processed,
                                                  telemetry_turned_on)
@@ -61,10 +61,14 @@ class MitoBackend():
             default_editing_mode: Optional[DefaultEditingMode]=None,
             theme: Optional[MitoTheme]=None,
             input_cell_execution_count: Optional[int]=None,
+            copy_args: bool=True,
         ):
         """
         Takes a list of dataframes and strings that are paths to CSV files
         passed through *args.
+
+        If copy_args is False, the dataframes passed are not copied, and must
+        not be changed by the caller while the backend is in use.
         """
         # Call the DOMWidget constructor to set up the widget properly
         super(MitoBackend, self).__init__()
@@ -110,7 +114,8 @@ class MitoBackend():
             column_definitions=column_definitions,
             theme=theme,
             default_editing_mode=default_editing_mode,
-            input_cell_execution_count=input_cell_execution_count
+            input_cell_execution_count=input_cell_execution_count,
+            copy_args=copy_args
         )
 
         # And the api
@@ -139,13 +144,23 @@ class MitoBackend():
     def analysis_name(self):
         return self.steps_manager.analysis_name
 
-    def get_shared_state_variables(self) -> Dict[str, Any]:
+    def get_shared_state_variables(self, event: Optional[Dict[str, Any]]=None) -> Dict[str, Any]:
         """
         Helper function for updating all the variables that are shared
         between the backend and the frontend through trailets.
+
+        If these are the response to an event from a frontend that fills in the data
+        of the columns it already has, which sends the id of the sheet data it last
+        received with each event, only the data of the columns that changed since 
+        then is sent.
         """
+        if event is not None and 'received_sheet_data_id' in event:
+            sheet_data_json = self.steps_manager.get_sheet_data_json(event['id'], event.get('received_sheet_data_id'))
+        else:
+            sheet_data_json = self.steps_manager.sheet_data_json
+
         return {
-            'sheet_data_json': self.steps_manager.sheet_data_json,
+            'sheet_data_json': sheet_data_json,
             'analysis_data_json': self.steps_manager.analysis_data_json,
             'user_profile_json': self.get_user_profile_json()
         }
@@ -183,8 +198,9 @@ class MitoBackend():
         # First, we send this new edit to the evaluator
         self.steps_manager.handle_edit_event(event)
 
-        # Also, write the analysis to a file!
-        write_save_analysis_file(self.steps_manager)
+        # Also, save the analysis to a file! This is written in the background, so
+        # the user does not wait for it
+        schedule_save_analysis_file(self.steps_manager)
 
         # Tell the front-end to render the new sheet and new code with an empty
         # response. NOTE: in the future, we can actually send back some data
@@ -192,7 +208,7 @@ class MitoBackend():
         self.mito_send({
             'event': 'response',
             'id': event['id'],
-            'shared_variables': self.get_shared_state_variables()
+            'shared_variables': self.get_shared_state_variables(event)
         })
 
 
@@ -222,15 +238,16 @@ class MitoBackend():
                     raise e
                 raise make_execution_error(error_modal=False)
             raise
-        # Also, write the analysis to a file!
-        write_save_analysis_file(self.steps_manager)
+        # Also, save the analysis to a file! This is written in the background, so
+        # the user does not wait for it
+        schedule_save_analysis_file(self.steps_manager)
 
         # Tell the front-end to render the new sheet and new code with an empty
         # response. 
         self.mito_send({
             'event': 'response',
             'id': event['id'],
-            'shared_variables': self.get_shared_state_variables()
+            'shared_variables': self.get_shared_state_variables(event)
         })
 
     def receive_message(self, content: Dict[str, Any]) -> bool:
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Dash runs callbacks on multiple threads, and so a session can receive a new
+message while it is still processing the last one. Messages must be applied
+to the backend one at a time, in the order they were received.
+
+The SessionMessageQueue holds the messages of a session that have not been
+processed. A thread that adds a message then processes all of the pending
+messages while holding the processing lock, so threads waiting for the lock
+find their message has already been processed as soon as they get it.
+"""
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# How many message ids we remember, to skip messages that are delivered twice
+MAX_PROCESSED_MESSAGE_IDS = 1000
+
+
+class SessionMessageQueue:
+    """
+    Processes the messages of one session in order, with process_message.
+
+    Messages with the same id as a message that was already processed are
+    coalesced into it, and not processed again.
+    """
+
+    def __init__(self, process_message: Callable[[Dict[str, Any]], Any]):
+        self.process_message = process_message
+
+        # (message, time it was added)
+        self._pending_messages: Deque[Tuple[Dict[str, Any], float]] = deque()
+        self._processed_message_ids: Deque[Any] = deque(maxlen=MAX_PROCESSED_MESSAGE_IDS)
+        self._queue_lock = Lock()
+        self._processing_lock = Lock()
+
+        self.num_messages_processed = 0
+        self.num_messages_coalesced = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.last_wait_time = 0.0
+
+    def put(self, message: Dict[str, Any]) -> None:
+        with self._queue_lock:
+            self._pending_messages.append((message, time.perf_counter()))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending_messages))
+
+    def put_and_process(self, message: Dict[str, Any]) -> None:
+        """
+        Adds the message to the queue, and returns once it has been processed.
+        """
+        self.put(message)
+        self.process_pending_messages()
+
+    def process_pending_messages(self) -> None:
+        """
+        Processes all of the messages in the queue, in the order they were
+        added. If another thread is already processing messages, this waits
+        until it is done, without polling.
+        """
+        with self._processing_lock:
+            while True:
+                message_and_put_time = self._pop_next_message()
+                if message_and_put_time is None:
+                    return
+                message, put_time = message_and_put_time
+
+                message_id = message.get('id', None) if isinstance(message, dict) else None
+                if message_id is not None and message_id in self._processed_message_ids:
+                    self.num_messages_coalesced += 1
+                    continue
+
+                wait_time = time.perf_counter() - put_time
+                self.last_wait_time = wait_time
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+
+                try:
+                    self.process_message(message)
+                except:
+                    # An error processing one message should not stop the other messages from being processed
+                    pass
+
+                if message_id is not None:
+                    self._processed_message_ids.append(message_id)
+                self.num_messages_processed += 1
+
+    def _pop_next_message(self) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._queue_lock:
+            if len(self._pending_messages) == 0:
+                return None
+            return self._pending_messages.popleft()
+
+    def __len__(self) -> int:
+        return len(self._pending_messages)
+
+    def queue_info(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': len(self._pending_messages),
+            'max_queue_depth': self.max_queue_depth,
+            'num_messages_processed': self.num_messages_processed,
+            'num_messages_coalesced': self.num_messages_coalesced,
+            'average_wait_time': self.total_wait_time / self.num_messages_processed if self.num_messages_processed > 0 else 0.0,
+            'max_wait_time': self.max_wait_time,
+            'last_wait_time': self.last_wait_time,
+        }
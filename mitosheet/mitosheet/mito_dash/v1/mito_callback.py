@@ -99,8 +99,8 @@ try:
             
             spreadsheet.num_messages += 1
 
-            spreadsheet.unprocessed_messages.put(msg)
-            spreadsheet.process_single_message(session_key)
+            spreadsheet.process_single_message(msg, session_key)
+            Spreadsheet.instances.update_session_memory_usage(mito_id, session_key)
             
             spreadsheet.spreadsheet_result = WRONG_CALLBACK_ERROR_MESSAGE.format(prop_name='spreadsheet_result', num_messages=spreadsheet.num_messages, id=spreadsheet.mito_id, session_key=session_key)
             return spreadsheet.get_all_json(), spreadsheet.spreadsheet_result
@@ -160,6 +160,7 @@ try:
                 editors=spreadsheet.editors,
                 theme=spreadsheet.theme
             )
+            Spreadsheet.instances.update_session_memory_usage(mito_id, session_key)
 
             return spreadsheet.get_all_json(), spreadsheet.spreadsheet_result, spreadsheet.spreadsheet_selection
         
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Each browser session of a Dash app gets its own copy of each Spreadsheet
+component, with its own MitoBackend (see Spreadsheet.get_instance).
+
+The SpreadsheetSessionRegistry holds the original Spreadsheet components, as
+well as the session copies of them. As every session holds on to its backend,
+session copies are evicted once they have been idle for idle_timeout_seconds,
+once there are more than max_sessions of them, or once they use more than
+max_memory_mb of memory in total. If an evicted session sends another message,
+it gets a new copy of the original Spreadsheet.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from mitosheet.state_eviction import get_state_memory_usage, get_steps_memory_usage
+
+DEFAULT_MAX_SESSIONS = 100
+DEFAULT_SESSION_IDLE_TIMEOUT_SECONDS = 60 * 60
+DEFAULT_MAX_SESSION_MEMORY_MB = 2048
+
+
+def get_spreadsheet_memory_usage(spreadsheet: Any) -> int:
+    """
+    Returns the number of bytes used by the dataframes in the states of the
+    spreadsheet's backend, including the strings in them.
+
+    NOTE: this does not count the initial state, as the dataframes in it are
+    shared with the original Spreadsheet component.
+    """
+    steps = spreadsheet.mito_backend.steps_manager.steps_including_skipped
+    return max(get_steps_memory_usage(steps, deep=True) - get_state_memory_usage(steps[0].final_defined_state, deep=True), 0)
+
+
+class SpreadsheetSessionRegistry:
+    """
+    Maps the mito_id of a Spreadsheet component to the original component,
+    and the mito_id and session key to the session copies of it.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(
+            self,
+            max_sessions: int=DEFAULT_MAX_SESSIONS,
+            idle_timeout_seconds: Optional[float]=DEFAULT_SESSION_IDLE_TIMEOUT_SECONDS,
+            max_memory_mb: Optional[float]=DEFAULT_MAX_SESSION_MEMORY_MB
+        ):
+        self.max_sessions = max_sessions
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_memory_mb = max_memory_mb
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._spreadsheets: Dict[str, Any] = {}
+        # (mito_id, session key) -> (spreadsheet, memory usage, last used time), in the order they were last used
+        self._sessions: 'OrderedDict[Tuple[str, str], Tuple[Any, int, float]]' = OrderedDict()
+        self._memory_usage = 0
+        self._lock = Lock()
+
+    def add_spreadsheet(self, mito_id: str, spreadsheet: Any) -> None:
+        """
+        Saves the original Spreadsheet component with this mito_id, if there
+        is not one already.
+        """
+        with self._lock:
+            if mito_id not in self._spreadsheets:
+                self._spreadsheets[mito_id] = spreadsheet
+
+    def get_spreadsheet(self, mito_id: str) -> Optional[Any]:
+        return self._spreadsheets.get(mito_id, None)
+
+    def get_session(self, mito_id: str, session_key: str, create_session: Callable[[Any], Any]) -> Optional[Any]:
+        """
+        Returns the session copy of the Spreadsheet component with this mito_id,
+        creating it from the original component with create_session if there
+        is no session copy yet. Returns None if there is no such component.
+        """
+        spreadsheet = self.get_spreadsheet(mito_id)
+        if spreadsheet is None:
+            return None
+
+        key = (mito_id, session_key)
+        with self._lock:
+            self._evict_idle_sessions()
+
+            session = self._sessions.get(key)
+            if session is not None:
+                self.hits += 1
+                self._sessions[key] = (session[0], session[1], time.monotonic())
+                self._sessions.move_to_end(key)
+                return session[0]
+
+            self.misses += 1
+
+        # We create the session outside of the lock, as this creates a new backend, which can be slow
+        session_spreadsheet = create_session(spreadsheet)
+        memory_usage = get_spreadsheet_memory_usage(session_spreadsheet)
+
+        with self._lock:
+            # If another thread created this session at the same time, we use that one
+            session = self._sessions.get(key)
+            if session is not None:
+                return session[0]
+
+            self._sessions[key] = (session_spreadsheet, memory_usage, time.monotonic())
+            self._memory_usage += memory_usage
+            self._evict_sessions_over_limits()
+
+        return session_spreadsheet
+
+    def update_session_memory_usage(self, mito_id: str, session_key: str) -> None:
+        """
+        Call after a session has been edited, so that we know how much memory
+        it uses, and can evict other sessions if they are over the memory limit.
+        """
+        key = (mito_id, session_key)
+        session = self._sessions.get(key)
+        if session is None:
+            return
+
+        memory_usage = get_spreadsheet_memory_usage(session[0])
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return
+
+            self._memory_usage += memory_usage - session[1]
+            self._sessions[key] = (session[0], memory_usage, session[2])
+            self._evict_sessions_over_limits()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spreadsheets.clear()
+            self._sessions.clear()
+            self._memory_usage = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __contains__(self, mito_id: str) -> bool:
+        return mito_id in self._spreadsheets
+
+    def _evict_session(self, key: Tuple[str, str]) -> None:
+        _, memory_usage, _ = self._sessions.pop(key)
+        self._memory_usage -= memory_usage
+        self.evictions += 1
+
+    def _evict_idle_sessions(self) -> None:
+        if self.idle_timeout_seconds is None:
+            return
+
+        now = time.monotonic()
+        while len(self._sessions) > 0:
+            key, (_, _, last_used_time) = next(iter(self._sessions.items()))
+            if now - last_used_time <= self.idle_timeout_seconds:
+                break
+            self._evict_session(key)
+
+    def _evict_sessions_over_limits(self) -> None:
+        self._evict_idle_sessions()
+
+        # We never evict the most recently used session, as it is being used right now
+        max_memory_usage = self.max_memory_mb * 1024 * 1024 if self.max_memory_mb is not None else None
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or
+            (max_memory_usage is not None and self._memory_usage > max_memory_usage)
+        ):
+            self._evict_session(next(iter(self._sessions)))
+
+    def session_info(self) -> Dict[str, Any]:
+        """
+        Returns metrics about the live sessions, including how many bytes
+        the dataframes in them use.
+        """
+        with self._lock:
+            live_sessions_by_mito_id: Dict[str, int] = {}
+            for mito_id, _ in self._sessions.keys():
+                live_sessions_by_mito_id[mito_id] = live_sessions_by_mito_id.get(mito_id, 0) + 1
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'live_sessions': len(self._sessions),
+                'live_sessions_by_mito_id': live_sessions_by_mito_id,
+                'session_bytes': self._memory_usage,
+                'shared_bytes': sum(get_steps_memory_usage(spreadsheet.mito_backend.steps_manager.steps_including_skipped, deep=True) for spreadsheet in self._spreadsheets.values()),
+                'max_sessions': self.max_sessions,
+                'max_memory_mb': self.max_memory_mb,
+            }
@@ -1,11 +1,11 @@
 import json
-import time
-from queue import Queue
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import pandas as pd
 
 from mitosheet.mito_backend import MitoBackend
+from mitosheet.mito_dash.v1.message_queue import SessionMessageQueue
+from mitosheet.mito_dash.v1.session_registry import SpreadsheetSessionRegistry
 from mitosheet.selection_utils import get_selected_element
 from mitosheet.streamlit.v1 import RunnableAnalysis
 from mitosheet.types import (CodeOptions, MitoFrontendIndexAndSelections,
@@ -65,7 +65,7 @@ try:
     class Spreadsheet(Component):
         
         # See documentation in the get_instance method
-        instances: Dict[str, Tuple[Any, Dict[str, Any]]] = dict()
+        instances = SpreadsheetSessionRegistry()
 
         _children_props: List[str] = []
         _base_nodes = ['children']
@@ -88,7 +88,8 @@ try:
             editors: Optional[List[Callable]]=None,
             theme: Optional[MitoTheme]=None,
             track_selection: bool=False,
-            mito_frontend_key: Optional[str]=None
+            mito_frontend_key: Optional[str]=None,
+            _copy_args: bool=True
         ):    
             
             # First, we check that the user has passed an ID in the appropriate format
@@ -118,10 +119,13 @@ try:
             # and spreadsheet_selection error strings change. This way, we can correctly trigger callbacks that correspond
             # to these values in all cases
             self.num_messages=0
-            self.args = args
+            # We copy the dataframes passed once, and then all session copies of this component share
+            # them, rather than each session having its own copy. Session copies pass _copy_args=False
+            self.args = tuple(arg.copy(deep=True) if isinstance(arg, pd.DataFrame) else arg for arg in args) if _copy_args else args
             self._set_new_mito_backend(
-                *args, 
+                *self.args, 
                 session_key='',
+                copy_args=False,
                 import_folder=import_folder, 
                 code_options=code_options,
                 df_names=df_names,
@@ -136,11 +140,10 @@ try:
 
             super(Spreadsheet, self).__init__()
 
-            # We save the unprocessed messages in a list -- so that we can process them
+            # We save the unprocessed messages in a queue -- so that we can process them
             # in the callback in the order that they were received -- without them interrupting
-            # eachother and having to deal with race conditions
-            self.unprocessed_messages: Any = Queue()
-            self.processing_messages = False
+            # eachother and having to deal with race conditions. See SessionMessageQueue
+            self.message_queue = SessionMessageQueue(lambda message: self.mito_backend.receive_message(message))
 
             self.index_and_selections: Optional[MitoFrontendIndexAndSelections] = None
 
@@ -157,14 +160,13 @@ try:
             self.all_json = self.get_all_json()
 
             # Save the instance, so we can look it up later
-            if self.mito_id not in self.__class__.instances:
-                self.__class__.instances[self.mito_id] = (self, dict())
+            self.__class__.instances.add_spreadsheet(self.mito_id, self)
 
         @classmethod
         def get_instance(cls, mito_id: str, session_key: str) -> Optional[Any]:
             """
-            The Spreadsheet component stores a map from the mito_id of the spreadsheet to a tuple of the 
-            original Spreadsheet instances, as well as a map from session key to the session instance.
+            The Spreadsheet component stores a map from the mito_id of the spreadsheet to the original 
+            Spreadsheet instance, as well as a map from mito_id and session key to the session instance.
 
             This is because Mito is not properly stateless yet. As a result, to work around limitaitons of Dash, 
             we have the frontend keep track of the session key of the Mito spreadsheet, and then we duplicate the
@@ -172,23 +174,12 @@ try:
 
             This way every user gets a new and unique Mito backend. When Mito is stateless, we can remove this, 
             but it will require larger refactors to the Mito app.
-            """
-
-            # First, lookup the instance by mito_id
-            instance = cls.instances.get(mito_id, None)
-
-            if instance is None:
-                return None
 
-            session_instance = instance[1].get(session_key, None)
-            if session_instance is not None:
-                return session_instance
-            
-            # If we don't have a session_instance, then we need to create one
-            # We do this by copying the instance, and then saving it
-            session_instance = instance[0].safe_copy()
-            cls.instances[mito_id][1][session_key] = session_instance
-            return session_instance
+            Session instances that are idle, or that are over the session or memory limits of the registry, 
+            are evicted (see SpreadsheetSessionRegistry). If we don't have a session instance, we create one 
+            by copying the original instance.
+            """
+            return cls.instances.get_session(mito_id, session_key, lambda instance: instance.safe_copy())
         
         def safe_copy(self):
             """
@@ -209,7 +200,8 @@ try:
                 editors=self.editors,
                 theme=self.theme,
                 track_selection=self.track_selection,
-                mito_frontend_key=self.mito_frontend_key
+                mito_frontend_key=self.mito_frontend_key,
+                _copy_args=False
             )
 
         def _set_new_mito_backend(
@@ -223,7 +215,8 @@ try:
                 importers: Optional[List[Callable]]=None,
                 editors: Optional[List[Callable]]=None,
                 theme: Optional[MitoTheme]=None,
-                mito_frontend_key: Optional[str]=None
+                mito_frontend_key: Optional[str]=None,
+                copy_args: bool=True
             ) -> None:
             """
             Called when the component is created, or when the input data is changed.
@@ -236,7 +229,8 @@ try:
                 user_defined_functions=sheet_functions,
                 user_defined_importers=importers,
                 user_defined_editors=editors,
-                theme=theme
+                theme=theme,
+                copy_args=copy_args
             )
             self.responses: List[Dict[str, Any]] = []
             def send(response):
@@ -266,27 +260,11 @@ try:
             self.spreadsheet_selection = WRONG_CALLBACK_ERROR_MESSAGE.format(prop_name='spreadsheet_selection', num_messages=self.num_messages, id=self.mito_id, session_key=session_key)
 
                 
-        def process_single_message(self, session_key: str) -> None:
-
-            # If we are already processing messages -- then wait until it is
-            if self.processing_messages:
-                while self.processing_messages:
-                    time.sleep(0.1)
-                
-            # Otherwise, set the processing flag to true
-            self.processing_messages = True
-
-            # Process all the messages in the queue
-            try:
-                if not self.unprocessed_messages.empty():
-                    value = self.unprocessed_messages.get()
-                    self.mito_backend.receive_message(value)
-            except:
-                # Make sure we always set the processing flag to false
-                pass
-                
-            # Set the processing flag to false
-            self.processing_messages = False
+        def process_single_message(self, message: Dict[str, Any], session_key: str) -> None:
+            """
+            Returns once the message, and any messages received before it, have been processed.
+            """
+            self.message_queue.put_and_process(message)
 
             self.spreadsheet_result = WRONG_CALLBACK_ERROR_MESSAGE.format(prop_name='spreadsheet_result', num_messages=self.num_messages, id=self.mito_id, session_key=session_key)
             
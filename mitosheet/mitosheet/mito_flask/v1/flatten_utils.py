@@ -1,10 +1,12 @@
 import json
+from typing import Optional
 from mitosheet.mito_backend import MitoBackend
 from mitosheet.saved_analyses import get_saved_analysis_string
 
 
-def flatten_mito_backend_to_json(mito_backend: MitoBackend) -> str:
-    saved_analysis_string = get_saved_analysis_string(mito_backend.steps_manager)
+def flatten_mito_backend_to_json(mito_backend: MitoBackend, saved_analysis_string: Optional[str]=None) -> str:
+    if saved_analysis_string is None:
+        saved_analysis_string = get_saved_analysis_string(mito_backend.steps_manager)
     return json.dumps({
         'backend_state': saved_analysis_string,
         'shared_state_variables': mito_backend.get_shared_state_variables()
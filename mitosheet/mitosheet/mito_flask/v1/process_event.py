@@ -1,18 +1,35 @@
 from typing import Any, Dict, Optional
 from mitosheet.mito_backend import MitoBackend
 from mitosheet.mito_flask.v1.flatten_utils import (flatten_mito_backend_to_json, read_backend_state_string_to_mito_backend)
+from mitosheet.mito_flask.v1.session_store import MITO_SESSION_STORE, MitoSessionStore
+from mitosheet.saved_analyses import get_saved_analysis_string
 
-def process_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[str, Any]]) -> Any:
+
+def get_processed_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[str, Any]], session_store: Optional[MitoSessionStore]=MITO_SESSION_STORE) -> Dict[str, Any]:
+    """
+    Applies the event to the backend with the given backend state, and returns the
+    new state and the response to the event. 
+    
+    If the session store has a live backend for this backend state, the event is 
+    just applied to it. Otherwise, the backend is rebuilt by replaying the analysis.
+    By default, live backends are kept in MITO_SESSION_STORE, which is shared by all
+    requests. Pass session_store=None to always replay the analysis.
+    """
+    mito_backend: Optional[MitoBackend]
 
     if backend_state is None:
         mito_backend = MitoBackend()
-        from flask import jsonify
-        return jsonify({
-            "state": flatten_mito_backend_to_json(mito_backend),
+        new_backend_state = get_saved_analysis_string(mito_backend.steps_manager)
+        if session_store is not None:
+            session_store.put(new_backend_state, mito_backend)
+        return {
+            "state": flatten_mito_backend_to_json(mito_backend, saved_analysis_string=new_backend_state),
             "response": None,
-        })
+        }
 
-    mito_backend = read_backend_state_string_to_mito_backend(backend_state)
+    mito_backend = session_store.take(backend_state) if session_store is not None else None
+    if mito_backend is None:
+        mito_backend = read_backend_state_string_to_mito_backend(backend_state)
 
     response = None
     def mito_send(message):
@@ -23,8 +40,16 @@ def process_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[s
     if mito_event:
         mito_backend.receive_message(mito_event)
 
-    from flask import jsonify
-    return jsonify({
-        "state": flatten_mito_backend_to_json(mito_backend),
+    new_backend_state = get_saved_analysis_string(mito_backend.steps_manager)
+    if session_store is not None:
+        session_store.put(new_backend_state, mito_backend)
+
+    return {
+        "state": flatten_mito_backend_to_json(mito_backend, saved_analysis_string=new_backend_state),
         "response": response,
-    })
\ No newline at end of file
+    }
+
+
+def process_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[str, Any]], session_store: Optional[MitoSessionStore]=MITO_SESSION_STORE) -> Any:
+    from flask import jsonify
+    return jsonify(get_processed_mito_event(backend_state, mito_event, session_store=session_store))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+The Flask backend is stateless: each request sends the backend state (the
+saved analysis), and we rebuild the MitoBackend from it by replaying all of
+the steps. This gets slower as the analysis gets longer.
+
+The MitoSessionStore keeps the live MitoBackends from previous requests, keyed
+by a session token that is the hash of the backend state they were flattened
+to. When a request sends a backend state we have a live backend for, we can
+just apply the new event to it, and only replay the analysis on a miss.
+
+A backend is taken out of the store while it is being used, so two requests
+that send the same backend state never share a backend, and a request for
+an old backend state (e.g. from another tab) replays the analysis instead of
+getting a backend that has since been edited.
+
+NOTE: the store is on by default, as process_mito_event uses MITO_SESSION_STORE
+unless another store is passed. By default, it keeps up to 32 backends, for up
+to 30 minutes, and up to 1GB of dataframes, including the strings in them. Pass
+session_store=None to process_mito_event to not keep any backends.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.state_eviction import get_steps_memory_usage
+
+DEFAULT_MAX_SESSIONS = 32
+DEFAULT_SESSION_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_SESSION_MEMORY_MB = 1024
+
+
+def get_session_token(backend_state: str) -> str:
+    return hashlib.sha256(backend_state.encode('utf-8')).hexdigest()
+
+
+class MitoSessionStore:
+    """
+    Maps session tokens to live MitoBackends. Evicts the least recently used
+    sessions once there are more than max_sessions of them, or once they use
+    more than max_memory_mb of memory in total, and evicts sessions that have
+    not been used in ttl_seconds.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(
+            self,
+            max_sessions: int=DEFAULT_MAX_SESSIONS,
+            ttl_seconds: Optional[float]=DEFAULT_SESSION_TTL_SECONDS,
+            max_memory_mb: Optional[float]=DEFAULT_MAX_SESSION_MEMORY_MB
+        ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_mb = max_memory_mb
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Session token -> (backend, memory usage, last used time)
+        self._sessions: 'OrderedDict[str, Tuple[MitoBackend, int, float]]' = OrderedDict()
+        self._memory_usage = 0
+        self._lock = Lock()
+
+    def take(self, backend_state: str) -> Optional[MitoBackend]:
+        """
+        Removes and returns the live backend for the backend state, or None if
+        there is no live backend for it.
+        """
+        session_token = get_session_token(backend_state)
+        with self._lock:
+            self._evict_expired_sessions()
+
+            session = self._sessions.pop(session_token, None)
+            if session is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._memory_usage -= session[1]
+            return session[0]
+
+    def put(self, backend_state: str, mito_backend: MitoBackend) -> None:
+        """
+        Stores the live backend, so it can be used for the next request that
+        sends this backend state.
+        """
+        if self.max_sessions <= 0:
+            return
+
+        session_token = get_session_token(backend_state)
+        memory_usage = get_steps_memory_usage(mito_backend.steps_manager.steps_including_skipped, deep=True)
+        with self._lock:
+            previous_session = self._sessions.pop(session_token, None)
+            if previous_session is not None:
+                self._memory_usage -= previous_session[1]
+
+            self._sessions[session_token] = (mito_backend, memory_usage, time.monotonic())
+            self._memory_usage += memory_usage
+
+            self._evict_expired_sessions()
+            max_memory_usage = self.max_memory_mb * 1024 * 1024 if self.max_memory_mb is not None else None
+            while len(self._sessions) > self.max_sessions or (max_memory_usage is not None and self._memory_usage > max_memory_usage and len(self._sessions) > 0):
+                self._evict_session(next(iter(self._sessions)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._memory_usage = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict_session(self, session_token: str) -> None:
+        _, memory_usage, _ = self._sessions.pop(session_token)
+        self._memory_usage -= memory_usage
+        self.evictions += 1
+
+    def _evict_expired_sessions(self) -> None:
+        if self.ttl_seconds is None:
+            return
+
+        # Sessions are in the order they were last used, so the expired ones are first
+        now = time.monotonic()
+        while len(self._sessions) > 0:
+            session_token, (_, _, last_used_time) = next(iter(self._sessions.items()))
+            if now - last_used_time <= self.ttl_seconds:
+                break
+            self._evict_session(session_token)
+
+    def session_info(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'memory_usage': self._memory_usage,
+            'max_memory_mb': self.max_memory_mb,
+        }
+
+
+# The sessions shared by all requests to the Flask backend
+MITO_SESSION_STORE = MitoSessionStore()
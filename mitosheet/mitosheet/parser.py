@@ -10,14 +10,19 @@ of the sheet as a dataframe
 """
 import datetime
 from distutils.version import LooseVersion
+from itertools import count
 import re
+from threading import Lock
 import warnings
-from typing import Any, List, Optional, Set, Tuple, Union
+import weakref
+from typing import Any, Collection, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple, Union
 
 import pandas as pd
 
 from mitosheet.column_headers import get_column_header_display
 from mitosheet.errors import make_invalid_formula_error
+from mitosheet.lru_cache import LRUCache
+from mitosheet.string_matcher import MultiStringMatcher
 from mitosheet.is_type_utils import (is_datetime_dtype,
                                                    is_number_dtype,
                                                    is_string_dtype)
@@ -419,6 +424,59 @@ def get_index_match_from_string_index(formula: str, formula_label: Union[str, bo
     return None
 
 
+def get_column_headers_cache_key(column_headers: Collection[ColumnHeader]) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+    """
+    Returns a key for these column headers to use in a cache. Column headers that
+    are equal in Python (e.g. 1, 1.0 and True) are displayed differently, and so
+    the key includes their types as well.
+    """
+    column_headers = tuple(column_headers)
+    column_header_types: Tuple[Any, ...] = tuple(map(type, column_headers))
+    if tuple in column_header_types:
+        column_header_types = tuple(
+            tuple(map(type, column_header)) if isinstance(column_header, tuple) else type(column_header)
+            for column_header in column_headers
+        )
+    return (column_headers, column_header_types)
+
+
+class ColumnHeaderMatcher(NamedTuple):
+    # Finds the column headers, as they are displayed on the frontend
+    matcher: MultiStringMatcher
+    # The indexes of the column headers, from the longest column header to the shortest
+    column_header_indexes_sorted: List[int]
+
+
+COLUMN_HEADER_MATCHER_CACHE_MAX_SIZE = 128
+COLUMN_HEADER_MATCHER_CACHE: LRUCache[ColumnHeaderMatcher] = LRUCache(COLUMN_HEADER_MATCHER_CACHE_MAX_SIZE)
+
+
+def get_column_header_matcher(column_headers: List[ColumnHeader]) -> ColumnHeaderMatcher:
+    """
+    Returns a matcher for finding these column headers in formulas. As building the
+    matcher requires going through every column header, we cache it for the 
+    column headers of each sheet.
+    """
+    try:
+        key: Optional[Tuple[Any, ...]] = get_column_headers_cache_key(column_headers)
+        hash(key)
+    except TypeError:
+        key = None
+
+    column_header_matcher = COLUMN_HEADER_MATCHER_CACHE.get(key) if key is not None else None
+    if column_header_matcher is None:
+        # NOTE: for booleans, and for multi-index headers, we need to make the same transformation 
+        # that we make on the frontend
+        column_header_matcher = ColumnHeaderMatcher(
+            MultiStringMatcher([get_column_header_display(column_header) for column_header in column_headers]),
+            sorted(range(len(column_headers)), key=lambda index: len(str(column_headers[index])), reverse=True)
+        )
+        if key is not None:
+            COLUMN_HEADER_MATCHER_CACHE.set(key, column_header_matcher)
+
+    return column_header_matcher
+
+
 def get_raw_parser_matches(
         formula: str,
         formula_label: Union[str, bool, int, float], # Where the formula is written,
@@ -476,7 +534,8 @@ def get_raw_parser_matches(
     raw_parser_matches: List[RawParserMatch] = []
 
     for other_sheet_index, sheet_name in enumerate(df_names):
-        if safe_contains(formula, f'{sheet_name}!', column_headers):
+        # NOTE: we check the sheet name is in the formula first, as safe_contains looks at every column header
+        if f'{sheet_name}!' in formula and safe_contains(formula, f'{sheet_name}!', column_headers):
             for match_info in re.finditer(f'{sheet_name}!', formula):
                 raw_parser_matches.append({
                     'type': '{SHEET}',
@@ -489,17 +548,21 @@ def get_raw_parser_matches(
             # Update to look at the column headers in the other sheet
             column_headers = deduplicate_array(column_headers + dfs[other_sheet_index].columns.to_list())
 
+    # We find all the places that column headers occur in the formula in one pass
+    column_header_matcher = get_column_header_matcher(column_headers)
+    column_header_occurrences = column_header_matcher.matcher.find_all_non_overlapping(formula)
+
     # We look for column headers from longest to shortest, to enable us
     # to issues if one column header is a substring of another
     # column header
-    column_headers_sorted = sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
-
-    # First, we go through and replace all the column headers
-    for column_header in column_headers_sorted:
-        def find_column_headers(match: Any) -> Any:
-            found_column_header: str = match.group() # type:ignore
-            start = match.start()
-            end = match.end()
+    for column_header_index in column_header_matcher.column_header_indexes_sorted:
+        if column_header_index not in column_header_occurrences:
+            continue
+
+        column_header = column_headers[column_header_index]
+
+        for start, end in column_header_occurrences[column_header_index]:
+            found_column_header = formula[start:end]
             match_range = (start, end)
 
             # Do not replace the column header if it is in a string
@@ -509,13 +572,13 @@ def get_raw_parser_matches(
                 ends_with_quote = is_quote(str(column_header)[-1])
 
                 if is_string and not (starts_with_quote and ends_with_quote):
-                    return found_column_header
+                    continue
 
             # If this column header was already covered by another column header
             # that has been found, then this column header is just a substring
             # of another column header, so we avoid matching it
             if match_covered_by_matches([match['substring_range'] for match in raw_parser_matches], match_range):
-                return found_column_header
+                continue
 
             # First, we check if it's an unqualified column header with no index
             if is_no_index_after_column_header_match(formula, index, start, end):
@@ -526,7 +589,7 @@ def get_raw_parser_matches(
                     'unparsed': found_column_header,
                     'row_offset': 0
                 })
-                return
+                continue
 
             # Second, check if column header is follwed by an index of any variety
             number_index_label_match = get_index_match_from_number_index(formula, formula_label, index, end)
@@ -543,17 +606,6 @@ def get_raw_parser_matches(
                     'row_offset': index_label_match['row_offset']
                 })
                 raw_parser_matches.append(index_label_match)
-                return 
-            
-            # NOTE: we add the column_header, not the found column header
-            # as the found column header is a string, and the column_header 
-            # may not be
-            return found_column_header
-
-        # First, just find all of the matches, without changing the string, as this shifts indexes
-        # NOTE: for booleans, and for multi-index headers, we need to make the same transformation 
-        # that we make on the frontend
-        re.sub(re.escape(get_column_header_display(column_header)), find_column_headers, formula)
 
     # Sort the matches from start to end
     raw_parser_matches = sorted(raw_parser_matches, key=lambda x: x['substring_range'][0])
@@ -981,6 +1033,93 @@ def replace_functions(
     return formula_with_functions, functions
 
 
+# Parsing a formula scans the formula for every column header in the sheet, which is slow
+# on wide sheets, and the same formula is parsed many times (saturate, execute, transpile, 
+# and every replay). So we cache parsed formulas by the formula and the sheet schema
+PARSE_FORMULA_CACHE_MAX_SIZE = 2048
+PARSE_FORMULA_CACHE: LRUCache[Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]] = LRUCache(PARSE_FORMULA_CACHE_MAX_SIZE)
+
+
+# Hashing the labels of a large index is slower than parsing the formula, so we give each
+# index a number instead, which is the same for as long as the index object is alive. As
+# indexes are immutable, and the dataframes in a state share their index when they are 
+# copied, this is the same for every parse of the same sheet.
+_INDEX_NUMBERS: Dict[int, Tuple['weakref.ReferenceType[pd.Index]', int]] = {}
+_INDEX_NUMBERS_LOCK = Lock()
+_NEXT_INDEX_NUMBER = count()
+
+
+def _get_index_number(index: pd.Index) -> int:
+    index_id = id(index)
+    with _INDEX_NUMBERS_LOCK:
+        index_ref_and_number = _INDEX_NUMBERS.get(index_id)
+        if index_ref_and_number is not None and index_ref_and_number[0]() is index:
+            return index_ref_and_number[1]
+
+        def remove_index_number(index_ref: 'weakref.ReferenceType[pd.Index]') -> None:
+            # NOTE: this is called when the index is deleted, which can happen while the lock 
+            # is held, so we don't take it. The id is only reused once the index is deleted
+            if _INDEX_NUMBERS.get(index_id, (None, None))[0] is index_ref:
+                _INDEX_NUMBERS.pop(index_id, None)
+
+        index_number = next(_NEXT_INDEX_NUMBER)
+        _INDEX_NUMBERS[index_id] = (weakref.ref(index, remove_index_number), index_number)
+        return index_number
+
+
+def get_index_cache_key(index: pd.Index) -> Hashable:
+    """
+    Returns a key that is the same for the same index. Index labels matter 
+    when parsing, as they determine the row offsets.
+    """
+    if isinstance(index, pd.RangeIndex):
+        return ('range', index.start, index.stop, index.step)
+    return ('index', _get_index_number(index))
+
+
+def get_parse_formula_cache_key(
+        formula: str, 
+        column_header: ColumnHeader, 
+        formula_label: Union[str, bool, int, float],
+        index_labels_formula_is_applied_to: FormulaAppliedToType,
+        dfs: List[pd.DataFrame],
+        df_names: List[str],
+        sheet_index: int,
+        include_df_set: bool,
+    ) -> Optional[Hashable]:
+    """
+    Returns the key of this formula in the PARSE_FORMULA_CACHE, which includes everything
+    that parsing reads: the headers of all sheets (for cross sheet references), and the 
+    dtypes and index of this sheet. Returns None if the formula cannot be cached.
+    """
+    df = dfs[sheet_index]
+    key = (
+        formula,
+        get_column_headers_cache_key([column_header]),
+        (formula_label, type(formula_label)),
+        repr(index_labels_formula_is_applied_to),
+        tuple(df_names),
+        sheet_index,
+        include_df_set,
+        tuple(get_column_headers_cache_key(other_df.columns) for other_df in dfs),
+        tuple(str(dtype) for dtype in df.dtypes),
+        get_index_cache_key(df.index)
+    )
+
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+def get_parse_formula_cache_info() -> Dict[str, Any]:
+    """
+    Returns the hits, misses and size of the parse formula cache.
+    """
+    return PARSE_FORMULA_CACHE.cache_info()
+
+
 def parse_formula(
         formula: Optional[str], 
         column_header: ColumnHeader, 
@@ -998,7 +1137,36 @@ def parse_formula(
 
     If include_df_set, then will return {df_name}[{column_header}] = {parsed formula}, and if
     not then will just return {parsed formula}
+
+    Formulas that parse successfully are cached, see PARSE_FORMULA_CACHE.
     """
+    # If the column doesn't have a formula, then there are no dependencies, duh!
+    if formula is None or formula == '':
+        return '', set(), set(), set()
+
+    key = get_parse_formula_cache_key(formula, column_header, formula_label, index_labels_formula_is_applied_to, dfs, df_names, sheet_index, include_df_set)
+    parsed_formula = PARSE_FORMULA_CACHE.get(key) if key is not None else None
+
+    if parsed_formula is None:
+        parsed_formula = _parse_formula(formula, column_header, formula_label, index_labels_formula_is_applied_to, dfs, df_names, sheet_index, include_df_set)
+        if key is not None:
+            PARSE_FORMULA_CACHE.set(key, parsed_formula)
+
+    # Return copies of the sets, so callers cannot edit the cached values
+    python_code, functions, column_header_dependencies, index_label_dependencies = parsed_formula
+    return python_code, set(functions), set(column_header_dependencies), set(index_label_dependencies)
+
+
+def _parse_formula(
+        formula: Optional[str], 
+        column_header: ColumnHeader, 
+        formula_label: Union[str, bool, int, float],
+        index_labels_formula_is_applied_to: FormulaAppliedToType,
+        dfs: List[pd.DataFrame],
+        df_names: List[str],
+        sheet_index: int,
+        include_df_set: bool=True,
+    ) -> Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]:
     df = dfs[sheet_index]
     df_name = df_names[sheet_index]
 
@@ -2,13 +2,120 @@
 
 import csv
 import os
-from typing import Optional, Tuple, Union
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple, TypeVar, Union
 
 import openpyxl
 from openpyxl import load_workbook
 
 from mitosheet.excel_utils import (get_col_and_row_indexes_from_range,
                                    get_column_from_column_index)
+from mitosheet.lru_cache import LRUCache
+
+# What we read from workbooks (e.g. the values in a sheet), until the file changes. We don't 
+# keep the workbooks themselves, as an open workbook keeps its file open. As sheets can be
+# large, we only keep a few, which is enough to find all the ranges imported from a sheet
+EXCEL_FILE_DATA_CACHE: LRUCache[Any] = LRUCache(max_size=8)
+
+T = TypeVar('T')
+
+
+def _get_excel_file_data(file_path: Any, data_key: Hashable, read: Callable[[], T]) -> T:
+    """
+    Returns what read returns for the Excel file at file_path, and caches it until the
+    file changes, which we tell by the size and modification time of the file.
+    """
+    if not isinstance(file_path, (str, os.PathLike)) or not os.path.isfile(file_path):
+        return read()
+
+    file_stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns, data_key)
+    data = EXCEL_FILE_DATA_CACHE.get(cache_key)
+    if data is None:
+        data = read()
+        EXCEL_FILE_DATA_CACHE.set(cache_key, data)
+    return data
+
+
+@contextmanager
+def open_read_only_workbook(file_path: Any) -> Iterator[Any]:
+    """
+    Opens the workbook at file_path in read only mode, so that its sheets are 
+    streamed from the file rather than loaded into memory, and closes it after.
+    """
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        yield workbook
+    finally:
+        workbook.close()
+
+
+def get_excel_sheet_names(file_path: Any) -> List[str]:
+    """
+    Returns the names of the sheets in the workbook, without reading the sheets.
+    """
+    def read_sheet_names() -> List[str]:
+        with open_read_only_workbook(file_path) as workbook:
+            return workbook.sheetnames
+
+    return _get_excel_file_data(file_path, 'sheet_names', read_sheet_names)
+
+
+class ExcelSheetValues:
+    """
+    The values in a sheet of a workbook, which we read one row at a time, so 
+    that we don't keep a cell object for each cell in memory. 
+
+    NOTE: openpyxl indexes from 1, so all the indexes here do as well.
+    """
+
+    def __init__(self, sheet: Any):
+        # If the file does not say how large the sheet is, we have to read it to find out
+        if sheet.max_row is None or sheet.max_column is None:
+            sheet.calculate_dimension(force=True)
+        self.min_row, self.min_col, self.max_row, self.max_col = sheet.min_row, sheet.min_column, sheet.max_row, sheet.max_column
+
+        width = max(self.max_col - self.min_col + 1, 0)
+        self.rows: List[Tuple[Any, ...]] = []
+        if width > 0 and self.min_row <= self.max_row:
+            for values in sheet.iter_rows(min_row=self.min_row, max_row=self.max_row, min_col=self.min_col, max_col=self.max_col, values_only=True):
+                if len(self.rows) == self.max_row - self.min_row + 1:
+                    break
+                self.rows.append(tuple(values[:width]) + (None,) * (width - len(values)))
+
+    def iter_row_values(self, min_row: int, max_row: int, min_col: int, max_col: int) -> Iterator[Tuple[int, Tuple[Any, ...]]]:
+        """
+        Yields the index and the values of each row from min_row to max_row, between min_col
+        and max_col. Cells that are outside of the sheet are None.
+        """
+        width = max(max_col - min_col + 1, 0)
+        for row_index in range(min_row, max_row + 1):
+            row_offset = row_index - self.min_row
+            if row_offset < 0 or row_offset >= len(self.rows):
+                yield row_index, (None,) * width
+            elif min_col >= self.min_col and max_col <= self.max_col:
+                yield row_index, self.rows[row_offset][min_col - self.min_col:max_col - self.min_col + 1]
+            else:
+                row = self.rows[row_offset]
+                yield row_index, tuple(row[col - self.min_col] if self.min_col <= col <= self.max_col else None for col in range(min_col, max_col + 1))
+
+    def iter_column_values(self, min_row: int, max_row: int, col: int) -> Iterator[Tuple[int, Any]]:
+        for row_index, values in self.iter_row_values(min_row, max_row, col, col):
+            yield row_index, values[0]
+
+
+def get_excel_sheet_values(file_path: Any, sheet_name: Optional[str]=None, sheet_index: Optional[int]=None) -> ExcelSheetValues:
+    """
+    Returns the values in the sheet with sheet_name, or at sheet_index, of the workbook,
+    only reading the sheet again if the file changed. This means finding multiple ranges
+    in the same sheet reads it once.
+    """
+    def read_sheet_values() -> ExcelSheetValues:
+        with open_read_only_workbook(file_path) as workbook:
+            sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[sheet_index]
+            return ExcelSheetValues(sheet)
+
+    return _get_excel_file_data(file_path, ('sheet_values', sheet_name, sheet_index), read_sheet_values)
 
 
 def get_table_range(
@@ -32,40 +139,38 @@ def get_table_range(
     """
     Given a string, this function will look through the excel tab sheet_name at the given
     file_path and find a range that meets the conditions expressed by it's parameters.
-    """
-    workbook = load_workbook(file_path)
 
+    The values in the sheet are read once, and then cached until the file changes,
+    so finding multiple ranges in the same sheet only reads it once.
+    """
     if sheet_name is None and sheet_index is None:
         raise ValueError('Either sheet_name or sheet_index must be defined')
     elif sheet_name is not None and sheet_index is not None:
         raise ValueError('Only one of sheet_name or sheet_index can be defined')
-    elif sheet_name is not None:
-        sheet = workbook[sheet_name]
-    else:
-        sheet = workbook.worksheets[sheet_index] # type : ignore
+
+    sheet_values = get_excel_sheet_values(file_path, sheet_name=sheet_name, sheet_index=sheet_index)
 
     # We get the last defined rows, so we don't waste time searching data we don't need
-    dimension = sheet.calculate_dimension()
-    (min_search_col, min_search_row), (max_search_col, max_search_row) = get_col_and_row_indexes_from_range(dimension)
-    # Unfortunately, openpyxl indexes from 1, so we add one to treat everything in that range
-    (min_search_col, min_search_row), (max_search_col, max_search_row) = (min_search_col + 1, min_search_row + 1), (max_search_col + 1, max_search_row + 1)
+    # NOTE: openpyxl indexes from 1, so all the indexes below do as well
+    min_search_col, min_search_row, max_search_col, max_search_row = sheet_values.min_col, sheet_values.min_row, sheet_values.max_col, sheet_values.max_row
 
-    # Loop over the columns one by one to find where this value is set
+    def is_upper_left_value(value: Any) -> bool:
+        return (upper_left_value is not None and value == upper_left_value) or \
+            (upper_left_value_starts_with is not None and str(value).startswith(str(upper_left_value_starts_with))) or \
+            (upper_left_value_contains is not None and str(upper_left_value_contains) in str(value))
+
+    # Find the first column where this value is set, and the first row in that column. As we read
+    # the sheet by row, we keep the leftmost match so far, and only look to the left of it after
     min_found_col_index, min_found_row_index = None, None
-    for col in sheet.iter_cols(min_row=min_search_row, max_row=max_search_row, min_col=min_search_col, max_col=max_search_col):
-        for cell in col:
-            if upper_left_value is not None and cell.value == upper_left_value:
-                min_found_col_index, min_found_row_index = cell.column, cell.row
-                break
-            if upper_left_value_starts_with is not None and str(cell.value).startswith(str(upper_left_value_starts_with)):
-                min_found_col_index, min_found_row_index = cell.column, cell.row
-                break
-            if upper_left_value_contains is not None and str(upper_left_value_contains) in str(cell.value):
-                min_found_col_index, min_found_row_index = cell.column, cell.row
+    for row_index, values in sheet_values.iter_row_values(min_search_row, max_search_row, min_search_col, max_search_col):
+        num_cols_to_search = min_found_col_index - min_search_col if min_found_col_index is not None else len(values)
+        for col_offset in range(num_cols_to_search):
+            if is_upper_left_value(values[col_offset]):
+                min_found_col_index, min_found_row_index = min_search_col + col_offset, row_index
                 break
-        
-        # As soon as we find something, stop looking
-        if min_found_col_index is not None or min_found_row_index is not None:
+
+        # As soon as we find something in the first column, stop looking
+        if min_found_col_index == min_search_col:
             break
 
     if min_found_col_index is None or min_found_row_index is None:
@@ -74,10 +179,10 @@ def get_table_range(
     # Then we find find where the columns are defined to
     if num_columns is None:
         max_found_col_index = None
-        for row in sheet.iter_rows(min_row=min_found_row_index, max_row=min_found_row_index, min_col=min_found_col_index):
-            for cell in row:
-                if cell.value is None:
-                    max_found_col_index = cell.column - 1 # minus b/c this is one past the end
+        for _, values in sheet_values.iter_row_values(min_found_row_index, min_found_row_index, min_found_col_index, max_search_col):
+            for col_offset, value in enumerate(values):
+                if value is None:
+                    max_found_col_index = min_found_col_index + col_offset - 1 # minus b/c this is one past the end
                     break
     else:
         max_found_col_index = min_found_col_index + num_columns - 1
@@ -87,100 +192,100 @@ def get_table_range(
     if max_found_col_index is None:
         max_found_col_index = max_search_col
 
+    def iter_rows_in_table() -> Iterator[Tuple[int, Tuple[Any, ...]]]:
+        # NOTE: we include the row after the end of the sheet, which is empty
+        return sheet_values.iter_row_values(min_found_row_index, max_search_row + 1, min_found_col_index, max_found_col_index) # type: ignore
+
+    def iter_first_column_below_upper_left() -> Iterator[Tuple[int, Any]]:
+        return sheet_values.iter_column_values(min_found_row_index + 1, max_search_row, min_found_col_index) # type: ignore
+
     # Then we find the max row index
-    column = sheet[get_column_from_column_index(min_found_col_index - 1)] # We need to subtract 1 as we 0 index
     max_found_row_index = None
 
     # Check for number of empty cells conditions for rows
     if bottom_left_corner_consecutive_empty_cells is not None or row_entirely_empty is not None:
-        for row in sheet.iter_rows(min_row=min_found_row_index, max_row=sheet.max_row+1, min_col=min_found_col_index, max_col=max_found_col_index):
-            empty_count = sum([1 if c.value is None else 0 for c in row])
+        for row_index, values in iter_rows_in_table():
+            empty_count = sum([1 if value is None else 0 for value in values])
             if (bottom_left_corner_consecutive_empty_cells is not None and empty_count >= bottom_left_corner_consecutive_empty_cells) or \
-                (row_entirely_empty is not None and empty_count >= len(row)):
-                max_found_row_index = row[0].row - 1 # minus b/c this is one past the end
+                (row_entirely_empty is not None and empty_count >= len(values)):
+                max_found_row_index = row_index - 1 # minus b/c this is one past the end
                 break
-            
+
     # Check for number of empty cells conditions for columns
     if max_found_row_index is None and bottom_left_consecutive_empty_cells_in_first_column is not None:
         empty_count = 0
-        for cell in column:
-            if cell.row <= min_found_row_index:
-                continue
-
-            if cell.value is None:
+        for row_index, value in iter_first_column_below_upper_left():
+            if value is None:
                 empty_count += 1
             else:
                 empty_count = 0
 
             # Check if we're at the end of the column, in which case the last cell is the max
-            if cell.row == sheet.max_row:
-                max_found_row_index = cell.row - empty_count # minus b/c we don't want to take the empty cells
+            if row_index == max_search_row:
+                max_found_row_index = row_index - empty_count # minus b/c we don't want to take the empty cells
                 break
 
             if empty_count == bottom_left_consecutive_empty_cells_in_first_column:
-                max_found_row_index = cell.row - empty_count # minus b/c we don't want to take the empty cells
+                max_found_row_index = row_index - empty_count # minus b/c we don't want to take the empty cells
                 break
-            
+
 
     if max_found_row_index is None and cumulative_number_of_empty_rows is not None:
         num_empty = 0
-        for row in sheet.iter_rows(min_row=min_found_row_index, max_row=sheet.max_row+1, min_col=min_found_col_index, max_col=max_found_col_index):
-            is_empty_row = all([c.value is None for c in row])
+        for row_index, values in iter_rows_in_table():
+            is_empty_row = all([value is None for value in values])
             if is_empty_row:
                 num_empty += 1
-            
+
             if num_empty >= cumulative_number_of_empty_rows:
-                max_found_row_index = row[0].row - 1 # minus b/c this is one past the end
+                max_found_row_index = row_index - 1 # minus b/c this is one past the end
                 break
-            if row[0].row == sheet.max_row:
-                max_found_row_index = row[0].row # Stop at the end as well
+            if row_index == max_search_row:
+                max_found_row_index = row_index # Stop at the end as well
                 break
 
     if max_found_row_index is None and consecutive_number_of_empty_rows is not None:
         num_empty = 0
-        for row in sheet.iter_rows(min_row=min_found_row_index, max_row=sheet.max_row+1, min_col=min_found_col_index, max_col=max_found_col_index):
-            is_empty_row = all([c.value is None for c in row])
+        for row_index, values in iter_rows_in_table():
+            is_empty_row = all([value is None for value in values])
             if is_empty_row:
                 num_empty += 1
             else:
                 num_empty = 0
 
             if num_empty >= consecutive_number_of_empty_rows:
-                max_found_row_index = row[0].row - consecutive_number_of_empty_rows # minus b/c this is past the end, empty rows
+                max_found_row_index = row_index - consecutive_number_of_empty_rows # minus b/c this is past the end, empty rows
                 break
-            if row[0].row == sheet.max_row:
-                max_found_row_index = row[0].row # stop at the end as well
+            if row_index == max_search_row:
+                max_found_row_index = row_index # stop at the end as well
                 break
 
     # Then check for other ending conditions
     if max_found_row_index is None:
-        for cell in column:
-            if cell.row <= min_found_row_index:
-                continue
-            
+        for row_index, value in iter_first_column_below_upper_left():
             # Stop as soon as we match the final value
-            if bottom_left_value is not None and bottom_left_value == cell.value:
-                max_found_row_index = cell.row
+            if bottom_left_value is not None and bottom_left_value == value:
+                max_found_row_index = row_index
                 break
-            if bottom_left_value_starts_with is not None and str(cell.value).startswith(str(bottom_left_value_starts_with)):
-                max_found_row_index = cell.row
+            if bottom_left_value_starts_with is not None and str(value).startswith(str(bottom_left_value_starts_with)):
+                max_found_row_index = row_index
                 break
-            if bottom_left_value_contains is not None and str(bottom_left_value_contains) in str(cell.value):
-                max_found_row_index = cell.row
+            if bottom_left_value_contains is not None and str(bottom_left_value_contains) in str(value):
+                max_found_row_index = row_index
                 break
             # NOTE: IF you add more conditions here, then add them to the condition below as well checking they are None
             # so that we can continue to handle the default case of finding the first empty cells
             if (bottom_left_value is None) and (bottom_left_value_starts_with is None) and (bottom_left_value_contains is None) \
-                  and cell.value is None: 
+                  and value is None: 
                 # NOTE: Check this condition last, as it's the final end condition, and for backwards compatibility
                 # this means that the user is looking for the first empty cell. NOTE
-                max_found_row_index = cell.row - 1 # minus b/c this is one past the end
+                max_found_row_index = row_index - 1 # minus b/c this is one past the end
                 break
 
     # If we looped over the entire column without ending, then we set the max row index
     # as the length of the entire column
     if max_found_row_index is None:
-        max_found_row_index = len(column)
+        max_found_row_index = max_search_row
 
     return f'{get_column_from_column_index(min_found_col_index - 1)}{min_found_row_index}:{get_column_from_column_index(max_found_col_index - 1)}{max_found_row_index}'
 
@@ -0,0 +1,83 @@
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_string_dtype
+from mitosheet.lru_cache import LRUCache
+
+
+class LookupIndex():
+    """
+    A hash index over the first column of a VLOOKUP range, which maps each
+    case insensitive key to the position of the first row it occurs in.
+
+    Building the index hashes every key in the range, so we build it once per
+    range and then use it to find the rows for all of the lookup values at once,
+    rather than searching the range for each lookup value.
+    """
+
+    def __init__(self, keys: pd.Series):
+        # We keep a copy of the keys the index was built from, so we can check if
+        # a cached index is still valid, as cells can be edited in place
+        self.keys = keys.copy()
+
+        self.case_insensitive_keys = get_case_insensitive_series(keys)
+
+        index_keys = _get_series_with_single_null_value(self.case_insensitive_keys)
+        self.first_occurrence_positions = np.flatnonzero(~index_keys.duplicated().to_numpy())
+        self._index = pd.Index(index_keys.iloc[self.first_occurrence_positions])
+
+    def get_positions(self, case_insensitive_lookup_values: pd.Series) -> np.ndarray:
+        """
+        Returns the position of the first row in the range that matches each of
+        the lookup values, or -1 if there is no matching row. Like a merge, NaN
+        lookup values match NaN keys.
+        """
+        positions_in_index = self._index.get_indexer(_get_series_with_single_null_value(case_insensitive_lookup_values))
+        positions = np.full(len(positions_in_index), -1)
+        has_match = positions_in_index != -1
+        positions[has_match] = self.first_occurrence_positions[positions_in_index[has_match]]
+        return positions
+
+
+# Formulas that look up into the same range share the index for that range
+LOOKUP_INDEX_CACHE: LRUCache[LookupIndex] = LRUCache(max_size=8)
+
+
+def get_case_insensitive_series(series: pd.Series) -> pd.Series:
+    """
+    Lowercases string series, as VLOOKUP is case insensitive.
+    """
+    if is_string_dtype(str(series.dtype)):
+        return series.str.lower()
+    return series
+
+
+def _get_series_with_single_null_value(series: pd.Series) -> pd.Series:
+    """
+    A merge matches all null values (e.g. None and NaN) to each other, but
+    an index does not, so we replace them with NaN in object series.
+    """
+    if series.dtype == object and series.isna().any():
+        return series.where(series.notna(), np.nan)
+    return series
+
+
+def _get_lookup_index_cache_key(keys: pd.Series) -> Tuple[Hashable, ...]:
+    return (str(keys.name), len(keys), str(keys.dtype))
+
+
+def get_lookup_index(keys: pd.Series) -> LookupIndex:
+    """
+    Returns a lookup index for the keys, reusing the cached index if it was
+    built from exactly these keys.
+    """
+    cache_key = _get_lookup_index_cache_key(keys)
+    lookup_index: Optional[LookupIndex] = LOOKUP_INDEX_CACHE.get(cache_key)
+    if lookup_index is not None and lookup_index.keys.dtype == keys.dtype and lookup_index.keys.equals(keys):
+        return lookup_index
+
+    lookup_index = LookupIndex(keys)
+    LOOKUP_INDEX_CACHE.set(cache_key, lookup_index)
+    return lookup_index
@@ -1,14 +1,17 @@
 
 from datetime import datetime, timedelta
-from typing import Callable, Union
+from typing import Any, Callable, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+PrimitiveValue = Union[str, float, int, bool, datetime, timedelta]
+
 
 class RollingRange():
     """
     A rolling range is a helper object that is passed to sheet functions when the user
-    references a range. 
+    references a range.
 
     Some examples:
     - A0 = SUM(B0:B0) => SUM(RollingRange(df[['B']], 1, 0))
@@ -17,17 +20,21 @@ class RollingRange():
     - A1 = SUM(B0:B2) => SUM(RollingRange(df[['B']], 3, -1))
 
     We use this object rather than pandas .shifts and rolling windows for a simple reason. Consider
-    the formula A1 = SUM(B0:B2). 
+    the formula A1 = SUM(B0:B2).
 
     In this case:
-    1.  if we shift df[['B']] before calling .rolling, we will loose some of the values 
-    in the column B - but this formula clearly uses all of them. 
-    2.  if we call .rolling on df[['B']] first, then we loose the ability to shift the 
-        object in a single expression. But it needs to be in a single expression as 
+    1.  if we shift df[['B']] before calling .rolling, we will loose some of the values
+    in the column B - but this formula clearly uses all of them.
+    2.  if we call .rolling on df[['B']] first, then we loose the ability to shift the
+        object in a single expression. But it needs to be in a single expression as
         it's inside a SUM function.
 
     Thus, we need to attach both the window size and the offset in a single expression, and
     thus this is exactly what we capture in this new object.
+
+    The sum, count, min, max, prod, std and var functions compute the same result as calling
+    apply with the matching pandas aggregation, but work on the whole columns at once rather
+    than on each window, which is much faster for long columns.
     """
 
     def __init__(self, obj: pd.DataFrame, window: int, offset: int):
@@ -35,36 +42,276 @@ class RollingRange():
         self.window = window
         self.offset = offset
 
-    def apply(self, func: Callable[[pd.DataFrame], Union[str, float, int, bool, datetime, timedelta]], default_value: Union[str, float, int, bool, datetime, timedelta]=0) -> pd.Series:
+    def get_window_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the start and end (exclusive) row positions of the window for each
+        row, clipped to the rows in the dataframe. A window is empty if it's start
+        is not before it's end.
+        """
+        num_rows = len(self.obj)
+        unclipped_starts = np.arange(num_rows) + self.offset
+        starts = np.clip(unclipped_starts, 0, num_rows)
+        ends = np.clip(unclipped_starts + max(self.window, 0), 0, num_rows)
+        return starts, np.maximum(starts, ends)
+
+    def apply(self, func: Callable[[pd.DataFrame], PrimitiveValue], default_value: PrimitiveValue=0) -> pd.Series:
         """
         Calls the func with each of the windows, and returns a series with
         the same index as the original dataframe.
         """
         result = []
+        starts, ends = self.get_window_bounds()
 
-        # Then, we get each window, and call the function with it
-        start = 0 + self.offset
-        end = start + self.window
-
-        while (start - self.offset) < len(self.obj): 
-            df_subset = self.obj[max(0, start):end] # avoid negative start, as this wraps around to the end
-
+        for start, end in zip(starts, ends):
             # We manually detect the default value case, as it messes up types otherwise (e.g. .sum().sum() returns a float with an empty df)
-            if len(df_subset) == 0:
+            if start == end:
                 result.append(default_value)
             else:
-                result.append(func(df_subset))
+                result.append(func(self.obj[start:end]))
 
-            start, end = start + 1, end + 1
+        return pd.Series(result, index=self.obj.index)
 
-        # If we haven't filled up the results fully, we append default value. If the offset is negative, we
-        # put them at the start - otherwise we put them at the end
-        if len(result) < len(self.obj):
-            default_values = [default_value for _ in range(len(self.obj) - len(result))]
-            # If the offset is negative
-            if self.offset < 0:
-                result = default_values + result
-            else:
-                result = result + default_values
+    def sum(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.sum().sum(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.sum().sum(), default_value)
+
+        column_sums = [
+            self._reduce_windows(np.where(np.isnan(values), 0, values) if values.dtype == float else values, np.add, 0)
+            for values in self._get_column_values()
+        ]
+        return self._get_result_series(self._combine_column_results(column_sums, np.add), default_value)
+
+    def count(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.count().sum(), default_value)
+        """
+        if len(self.obj) == 0 or len(self.obj.columns) == 0 or self.window <= 0:
+            return self.apply(lambda df: df.count().sum(), default_value)
+
+        column_counts = [
+            self._reduce_windows(self.obj.iloc[:, column_index].notna().to_numpy().astype(np.int64), np.add, 0)
+            for column_index in range(len(self.obj.columns))
+        ]
+        return self._get_result_series(self._combine_column_results(column_counts, np.add), default_value)
+
+    def max(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.max().max(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.max().max(), default_value)
+
+        column_maxes = [
+            self._reduce_windows(values, np.fmax, np.nan if values.dtype == float else np.iinfo(np.int64).min)
+            for values in self._get_column_values()
+        ]
+        return self._get_result_series(self._combine_column_results(column_maxes, np.fmax), default_value)
+
+    def min(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.min().min(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.min().min(), default_value)
+
+        column_mins = [
+            self._reduce_windows(values, np.fmin, np.nan if values.dtype == float else np.iinfo(np.int64).max)
+            for values in self._get_column_values()
+        ]
+        return self._get_result_series(self._combine_column_results(column_mins, np.fmin), default_value)
+
+    def prod(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.prod().prod(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.prod().prod(), default_value)
+
+        column_products = [
+            self._reduce_windows(np.where(np.isnan(values), 1, values) if values.dtype == float else values, np.multiply, 1)
+            for values in self._get_column_values()
+        ]
+        return self._get_result_series(self._combine_column_results(column_products, np.multiply), default_value)
+
+    def var(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.stack().var(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.stack().var(), default_value)
+
+        return self._get_result_series(self._get_window_variances(), default_value)
+
+    def std(self, default_value: PrimitiveValue=0) -> pd.Series:
+        """
+        The same as apply(lambda df: df.stack().std(), default_value)
+        """
+        if not self._can_compute_with_numpy():
+            return self.apply(lambda df: df.stack().std(), default_value)
+
+        return self._get_result_series(np.sqrt(self._get_window_variances()), default_value)
+
+    def _can_compute_with_numpy(self) -> bool:
+        """
+        We only compute windows of int and float columns with numpy, where numpy and
+        pandas give the same results. Everything else is passed to apply.
+        """
+        if len(self.obj) == 0 or len(self.obj.columns) == 0 or self.window <= 0:
+            return False
+
+        return all(dtype == np.int64 or dtype == np.float64 for dtype in self.obj.dtypes)
+
+    def _get_column_values(self) -> List[np.ndarray]:
+        return [self.obj.iloc[:, column_index].to_numpy() for column_index in range(len(self.obj.columns))]
+
+    def _combine_column_results(self, column_results: List[np.ndarray], ufunc: np.ufunc) -> np.ndarray:
+        """
+        Combines the results for each column in order, like pandas does when reducing
+        the per column results. If any column is a float column, the result is a float.
+        """
+        if any(column_result.dtype == float for column_result in column_results):
+            column_results = [column_result.astype(float) for column_result in column_results]
+
+        result = column_results[0]
+        for column_result in column_results[1:]:
+            result = ufunc(result, column_result)
+        return result
+
+    def _get_result_series(self, result: np.ndarray, default_value: PrimitiveValue) -> pd.Series:
+        """
+        Puts the default value in for the empty windows, letting pandas pick the dtype of the result
+        series the same way it does in apply.
+        """
+        starts, ends = self.get_window_bounds()
+        is_empty = starts == ends
+
+        if not is_empty.any():
+            return pd.Series(result, index=self.obj.index)
+
+        default_value_keeps_dtype = not is_empty.all() and not isinstance(default_value, bool) and (
+            isinstance(default_value, int) or (isinstance(default_value, float) and result.dtype == float)
+        )
+        if default_value_keeps_dtype:
+            result[is_empty] = default_value
+            return pd.Series(result, index=self.obj.index)
+
+        result_with_default_value = result.astype(object)
+        result_with_default_value[is_empty] = default_value
+        return pd.Series(result_with_default_value.tolist(), index=self.obj.index)
+
+    def _reduce_windows(self, values: np.ndarray, ufunc: np.ufunc, identity: Any) -> np.ndarray:
+        """
+        Returns the result of reducing the values in each row's window with the ufunc, where
+        identity is a value that the ufunc ignores. Empty windows get the identity.
+
+        When the window is at least as long as the dataframe, each window either starts at
+        the first row or ends at the last row, so we can read the result from the cumulative
+        reductions of the values from the start and from the end.
+
+        Otherwise, we use the van Herk/Gil-Werman algorithm: we pad the values with the identity
+        so every window has the full window length, and split the padded values into blocks of the
+        window length. Each window then covers the end of one block and the start of the next,
+        and so is the reduction of a suffix of one block and a prefix of the next.
+        """
+        num_rows = len(values)
+        window = self.window
+        starts, ends = self.get_window_bounds()
+        is_empty = starts == ends
+
+        if window >= num_rows:
+            reductions_from_start = ufunc.accumulate(values)
+            reductions_from_end = ufunc.accumulate(values[::-1])[::-1]
+            result = np.where(
+                starts == 0,
+                reductions_from_start[np.maximum(ends - 1, 0)],
+                reductions_from_end[np.minimum(starts, num_rows - 1)]
+            )
+        else:
+            num_blocks = -(-(num_rows + 2 * window) // window)
+            padded_values = np.full(num_blocks * window, identity, dtype=values.dtype)
+            padded_values[window:window + num_rows] = values
+
+            blocks = padded_values.reshape(num_blocks, window)
+            block_prefixes = ufunc.accumulate(blocks, axis=1).ravel()
+            block_suffixes = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+            # The start of each window in the padded values. Empty windows may be far outside
+            # of the padded values, so we clip them to stay in bounds
+            padded_starts = np.clip(np.arange(num_rows) + self.offset + window, 0, num_rows + window)
+            padded_ends = padded_starts + window - 1
+            result = np.where(
+                padded_starts % window == 0,
+                block_prefixes[padded_ends],
+                ufunc(block_suffixes[padded_starts], block_prefixes[padded_ends])
+            )
+
+        result[is_empty] = identity
+        return result
+
+    def _get_window_variances(self) -> np.ndarray:
+        """
+        Returns the sample variance of all the non-NaN values in each row's window, across
+        all columns.
+
+        We get the count, mean and variance of each column's window from pandas, which computes
+        these in a numerically stable way, and then combine the columns with Chan et al's
+        parallel algorithm.
+        """
+        num_rows = len(self.obj)
+        starts, ends = self.get_window_bounds()
+
+        total_count = np.zeros(num_rows)
+        total_mean = np.zeros(num_rows)
+        total_squared_differences = np.zeros(num_rows)
+
+        for values in self._get_column_values():
+            count, mean, variance = self._get_column_window_moments(values.astype(float), starts, ends)
+            squared_differences = np.where(count > 1, variance * (count - 1), 0)
+
+            new_count = total_count + count
+            with np.errstate(invalid='ignore', divide='ignore'):
+                delta = np.where(count > 0, mean - total_mean, 0)
+                new_mean = np.where(new_count > 0, total_mean + delta * count / new_count, 0)
+                total_squared_differences = total_squared_differences + squared_differences + np.where(
+                    new_count > 0, delta ** 2 * total_count * count / new_count, 0
+                )
+            total_count, total_mean = new_count, new_mean
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total_count > 1, np.maximum(total_squared_differences, 0) / (total_count - 1), np.nan)
+
+    def _get_column_window_moments(self, values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the count, mean and sample variance of the non-NaN values in each row's window
+        of the values.
+        """
+        num_rows = len(values)
+        window = self.window
+
+        if window >= num_rows:
+            # As in _reduce_windows, each window starts at the first row or ends at the last row
+            from_start = pd.Series(values).expanding(min_periods=1)
+            from_end = pd.Series(values[::-1]).expanding(min_periods=1)
+            use_from_start = starts == 0
+            from_start_positions = np.maximum(ends - 1, 0)
+            from_end_positions = num_rows - 1 - np.minimum(starts, num_rows - 1)
+
+            return tuple( # type: ignore
+                np.where(use_from_start, getattr(from_start, moment)().to_numpy()[from_start_positions], getattr(from_end, moment)().to_numpy()[from_end_positions])
+                for moment in ('count', 'mean', 'var')
+            )
+
+        # Pad the values with NaN so every window has the full window length, and
+        # then take the rolling window that ends at the end of each row's window
+        padded_values = np.full(num_rows + 2 * window, np.nan)
+        padded_values[window:window + num_rows] = values
+        rolling = pd.Series(padded_values).rolling(window, min_periods=1)
+        padded_ends = np.clip(np.arange(num_rows) + self.offset + window, 0, num_rows + window) + window - 1
 
-        return pd.Series(result, index=self.obj.index)
\ No newline at end of file
+        return tuple( # type: ignore
+            getattr(rolling, moment)().to_numpy()[padded_ends]
+            for moment in ('count', 'mean', 'var')
+        )
@@ -13,14 +13,18 @@ in more detail in docs/README.md.
 NOTE: This file is alphabetical order!
 """
 
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from mitosheet.errors import MitoError
 from mitosheet.public.v3.errors import handle_sheet_function_errors
 from mitosheet.public.v3.sheet_functions.utils import (
-    get_final_result_series_or_primitive, get_series_from_primitive_or_series)
+    get_final_result_series_or_primitive, get_series_aligned_to_index,
+    get_series_from_primitive_or_series,
+    get_series_from_values_with_inferred_dtype, get_truthy_mask,
+    is_numpy_native_dtype)
 from mitosheet.public.v3.types.decorators import (
     cast_values_in_all_args_to_type, cast_values_in_arg_to_type)
 from mitosheet.public.v3.types.sheet_function_types import (
@@ -125,9 +129,19 @@ def IF(condition: pd.Series, true_series: AnyPrimitiveOrSeriesInputType, false_s
     true_series = get_series_from_primitive_or_series(true_series, condition.index)
     false_series = get_series_from_primitive_or_series(false_series, condition.index)
 
-    return pd.Series(
-        data=[true_series.loc[i] if c else false_series.loc[i] for i, c in condition.items()],
-        index=condition.index
+    true_series = get_series_aligned_to_index(true_series, condition.index)
+    false_series = get_series_aligned_to_index(false_series, condition.index)
+    mask = get_truthy_mask(condition)
+
+    if len(condition) > 0 and true_series.dtype == false_series.dtype and is_numpy_native_dtype(true_series.dtype):
+        return pd.Series(np.where(mask, true_series.to_numpy(), false_series.to_numpy()), index=condition.index)
+
+    # Otherwise, the values may have different types, so we let pandas infer 
+    # the dtype of the result from the values we selected (e.g. an int and 
+    # a string give an object series)
+    return get_series_from_values_with_inferred_dtype(
+        np.where(mask, true_series.to_numpy(dtype=object), false_series.to_numpy(dtype=object)),
+        condition.index
     )
 
 
@@ -173,25 +187,64 @@ def IFS(*argv: Optional[IfsInputType]) -> pd.Series:
     else:
         # Otherwise, we have at least one series -- so we can go through and turn all of the constants into series.
         argv_series = tuple([get_series_from_primitive_or_series(arg, base_index) for arg in argv])
-        results = pd.Series(index=base_index)
+        conditions = argv_series[0::2]
+        values = argv_series[1::2]
 
-        for index, condition in enumerate(argv_series):
-            if index % 2 == 0:
-                if condition.dtype != bool:
-                    raise MitoError(
-                        'invalid_args_error',
-                        'IFS',
-                        f"IFS requires all even indexed arguments to be boolean.",
-                        error_modal=False
-                    )
-                
-                # If it is, use the "true_series" to fill the value in the result series
-                true_series = argv_series[index+1]
-                new_series = true_series[condition]
-                results = results.combine_first(new_series)
+        for condition in conditions:
+            if condition.dtype != bool:
+                raise MitoError(
+                    'invalid_args_error',
+                    'IFS',
+                    f"IFS requires all even indexed arguments to be boolean.",
+                    error_modal=False
+                )
+
+        if _can_select_ifs_values_with_numpy(base_index, argv_series):
+            # The first condition that is True with a value that is not NaN decides the value, and 
+            # other rows are NaN. Ints become floats, as they would when combining them with NaN
+            choices = [
+                value.to_numpy(dtype=object) if value.dtype == object else value.to_numpy(dtype=float)
+                for value in values
+            ]
+            return pd.Series(
+                np.select([condition.to_numpy() & value.notna().to_numpy() for condition, value in zip(conditions, values)], choices, default=np.nan), 
+                index=base_index
+            )
+
+        results = pd.Series(index=base_index)
+        for condition, true_series in zip(conditions, values):
+            # If it is, use the "true_series" to fill the value in the result series
+            new_series = true_series[condition]
+            results = results.combine_first(new_series)
                 
     return results
 
+
+def _can_select_ifs_values_with_numpy(base_index: pd.Index, argv_series: Tuple[pd.Series, ...]) -> bool:
+    """
+    Returns True if selecting the IFS values with numpy gives exactly the same result as 
+    combining them one condition at a time. This is the case when all of the series share
+    one index, and all of the values are floats, ints that are exactly representable as 
+    floats, or strings.
+    """
+    if len(base_index) == 0 or not base_index.is_unique:
+        return False
+
+    if not all(series.index.equals(base_index) for series in argv_series):
+        return False
+
+    values = argv_series[1::2]
+    if all(value.dtype == object for value in values):
+        return all(pd.api.types.infer_dtype(value, skipna=False) == 'string' for value in values)
+
+    for value in values:
+        if value.dtype == 'int64':
+            if value.abs().max() > 2 ** 53:
+                return False
+        elif value.dtype != 'float64':
+            return False
+    return True
+
 @cast_values_in_all_args_to_type('bool')
 @handle_sheet_function_errors
 def OR(*argv: Optional[BoolInputType]) -> BoolFunctionReturnType:
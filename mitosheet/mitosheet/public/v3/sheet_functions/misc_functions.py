@@ -10,8 +10,12 @@ from mitosheet.is_type_utils import (is_bool_dtype, is_datetime_dtype,
                                      is_float_dtype, is_int_dtype,
                                      is_string_dtype)
 from mitosheet.public.v3.errors import handle_sheet_function_errors
-from mitosheet.public.v3.sheet_functions.utils import \
-    get_series_from_primitive_or_series
+from mitosheet.public.v3.lookup_index import (get_case_insensitive_series,
+                                              get_lookup_index)
+from mitosheet.public.v3.sheet_functions.utils import (
+    get_series_aligned_to_index, get_series_from_primitive_or_series,
+    get_series_from_values_with_inferred_dtype, get_truthy_mask,
+    is_numpy_native_dtype)
 from mitosheet.public.v3.types.decorators import cast_values_in_arg_to_type
 from mitosheet.public.v3.types.sheet_function_types import (
     AnyPrimitiveOrSeriesInputType, BoolRestrictedInputType,
@@ -121,15 +125,26 @@ def GETPREVIOUSVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> p
     elif is_datetime_dtype(column_dtype):
         last_occurrence = pd.NaT
 
+    # The condition is matched to the rows of the series by index label, so a condition with
+    # duplicate labels cannot be used unless it has the same index as the series
     condition = get_series_from_primitive_or_series(condition, series.index)
+    condition = get_series_aligned_to_index(condition, series.index)
 
-    result = []
-    for index, value in condition.items():
-        if value:
-            last_occurrence = series[index]
-        result.append(last_occurrence)
+    # For each row, find the position of the last row at or before it where the condition 
+    # is True, by forward filling the positions of the rows where the condition is True
+    positions = np.where(get_truthy_mask(condition), np.arange(len(series)), -1)
+    np.maximum.accumulate(positions, out=positions)
+    has_previous_value = positions >= 0
 
-    return pd.Series(result, index=series.index)
+    # If no row has a previous value, the result only has default values, and so 
+    # has the dtype of the default value rather than the dtype of the series
+    if is_numpy_native_dtype(series.dtype) and has_previous_value.any():
+        default_value = np.datetime64('NaT') if is_datetime_dtype(column_dtype) else last_occurrence
+        return pd.Series(np.where(has_previous_value, series.to_numpy()[positions], default_value), index=series.index)
+
+    result = series.to_numpy(dtype=object)[positions]
+    result[~has_previous_value] = last_occurrence
+    return get_series_from_values_with_inferred_dtype(result, series.index)
 
 @handle_sheet_function_errors
 def GETNEXTVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> pd.Series:
@@ -186,7 +201,6 @@ def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, in
     }
     """
     where_first_column_case_insensitive = where.iloc[:,0].copy()
-    where_first_column_case_insensitive.name = str(where_first_column_case_insensitive.name) + 'MITO_CASE_INSENSITIVE'
 
     # If the lookup value and index are both a primitive, we don't need to merge. 
     if not isinstance(lookup_value, pd.Series) and isinstance(index, int):
@@ -221,15 +235,35 @@ def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, in
             f'VLOOKUP requires the lookup value and the first column of the where range to be the same type. The lookup value is of type {value.dtype} and the first column of the where range is of type {where_first_column_case_insensitive.dtype}.'
         )
 
+    indices_to_return_from_range = indices_to_return_from_range + 1
+
+    # When we can, we find the matching rows with a hash index of the range, and then gather the
+    # values to return with numpy. Otherwise (e.g. for extension dtypes), we merge the lookup values with the range
+    can_use_lookup_index = (
+        (is_numpy_native_dtype(value.dtype) or value.dtype == object)
+        and all(isinstance(dtype, np.dtype) for dtype in where.dtypes)
+        and value.index.is_unique
+        and indices_to_return_from_range.index.equals(value.index)
+    )
+    if can_use_lookup_index:
+        return _get_vlookup_result_from_lookup_index(value, where, indices_to_return_from_range)
+
+    return _get_vlookup_result_from_merge(value, where, indices_to_return_from_range)
+
+
+def _get_vlookup_result_from_merge(value: pd.Series, where: pd.DataFrame, indices_to_return_from_range: pd.Series) -> pd.Series:
+    """
+    Returns the VLOOKUP result by merging the lookup values with the where range, and then
+    taking the value at the index from each row of the merged dataframe.
+    """
     # If the series is a string, convert it to lowercase because Excel's vlookup is case insensitive
-    if is_string_dtype(str(value.dtype)):
-        value = value.str.lower()
-        where_first_column_case_insensitive = where_first_column_case_insensitive.str.lower()
+    value = get_case_insensitive_series(value)
+    where_first_column_case_insensitive = get_case_insensitive_series(where.iloc[:,0].copy())
+    where_first_column_case_insensitive.name = str(where.iloc[:,0].name) + 'MITO_CASE_INSENSITIVE'
 
     # Add where_first_column_case_insensitive to the front of the dataframe so we can use the case insensitive merge 
     # without effecting the return values
     where = pd.concat([where_first_column_case_insensitive, where], axis=1)
-    indices_to_return_from_range = indices_to_return_from_range + 1
 
     where_deduplicated = where.drop_duplicates(subset=where_first_column_case_insensitive.name)
     
@@ -251,6 +285,81 @@ def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, in
             return None
     return merged.apply(get_value_at_index_in_row, axis=1)
 
+
+def _get_vlookup_result_from_lookup_index(value: pd.Series, where: pd.DataFrame, indices_to_return_from_range: pd.Series) -> pd.Series:
+    """
+    Returns exactly the same result as _get_vlookup_result_from_merge, but finds the matching
+    row for each lookup value with a (cached) hash index of the where range, and then gathers
+    the values to return from each column with numpy indexing, rather than merging and then
+    applying a function to each row.
+
+    The columns of the merged dataframe are the lookup value, the case insensitive first column
+    of the where range, and then the columns of the where range. Each row is a series with the
+    common dtype of these columns, so we convert the values we return to this dtype too.
+    """
+    value = get_case_insensitive_series(value)
+    lookup_index = get_lookup_index(where.iloc[:,0])
+    where_first_column_case_insensitive = lookup_index.case_insensitive_keys
+
+    if len(value) == 0:
+        return pd.Series([], index=value.index, dtype='float64')
+
+    row_positions = lookup_index.get_positions(value)
+    all_rows_matched = bool((row_positions != -1).all())
+
+    merged_columns = [value, where_first_column_case_insensitive] + [where.iloc[:,i] for i in range(where.shape[1])]
+
+    # Rows without a match are filled with NaN, which changes the dtype of some columns (e.g. int to float)
+    def get_merged_column_dtype(column_index: int, column: pd.Series) -> Any:
+        if column_index == 0 or all_rows_matched:
+            return column.dtype
+        return column.array.take([-1], allow_fill=True).dtype
+
+    merged_column_dtypes = [get_merged_column_dtype(column_index, column) for column_index, column in enumerate(merged_columns)]
+    row_dtype = pd.DataFrame({
+        column_index: pd.Series([], dtype=dtype) for column_index, dtype in enumerate(merged_column_dtypes)
+    }).values.dtype
+
+    # Find the column to return for each row, with the same semantics as row.iloc[index]
+    index_codes, unique_indexes = pd.factorize(indices_to_return_from_range.to_numpy())
+    all_column_positions = pd.Series(np.arange(len(merged_columns)))
+    unique_column_positions = np.full(len(unique_indexes) + 1, -1)
+    for unique_index_position, unique_index in enumerate(unique_indexes):
+        try:
+            unique_column_positions[unique_index_position] = all_column_positions.iloc[unique_index]
+        # Because we can't control what the user puts in the index, we need to catch any errors
+        except Exception:
+            pass
+    column_positions = unique_column_positions[index_codes]
+
+    def get_values_in_column(column_position: int) -> pd.Series:
+        column = merged_columns[column_position]
+        values = column.array if column_position == 0 else column.array.take(row_positions, allow_fill=True)
+        if row_dtype == object:
+            return pd.Series(values).astype(object)
+        return pd.Series(np.asarray(values, dtype=row_dtype))
+
+    returned_column_positions = pd.unique(column_positions[column_positions != -1])
+    if len(returned_column_positions) == 1 and (column_positions != -1).all() and is_numpy_native_dtype(row_dtype):
+        return pd.Series(get_values_in_column(returned_column_positions[0]).to_numpy(), index=value.index)
+
+    # Otherwise, we take each value as the object that row.iloc[index] would return, which
+    # is a numpy scalar for numeric and bool rows, and a python object otherwise
+    def get_row_values_in_column(column_position: int) -> np.ndarray:
+        values_in_column = get_values_in_column(column_position)
+        if row_dtype == object or row_dtype.kind in 'mM':
+            return values_in_column.astype(object).to_numpy()
+        row_values = np.empty(len(values_in_column), dtype=object)
+        row_values[:] = list(values_in_column.to_numpy())
+        return row_values
+
+    results = np.empty(len(value), dtype=object)
+    for column_position in returned_column_positions:
+        rows_in_column = column_positions == column_position
+        results[rows_in_column] = get_row_values_in_column(column_position)[rows_in_column]
+
+    return get_series_from_values_with_inferred_dtype(results, value.index)
+
 # TODO: we should see if we can list these automatically!
 MISC_FUNCTIONS = {
     'FILLNAN': FILLNAN,
@@ -19,6 +19,17 @@ def __get_default_value_if_value_is_none_or_nan(value: PrimitiveType, default_va
     return value
 
 
+def __is_series_of_default_value_type(series: pd.Series, default_value: PrimitiveType) -> bool:
+    # If all of the values are NaN, the result is only default values, and so has the type of the default value
+    if not series.notna().any():
+        return False
+    if type(default_value) == bool:
+        return series.dtype == bool
+    if type(default_value) == int or type(default_value) == float:
+        return series.dtype == np.int64 or series.dtype == np.float64
+    return False
+
+
 def __get_new_result_series_or_primitive_helper(
         default_value: PrimitiveType,
         previous_result: ResultType, 
@@ -45,6 +56,12 @@ def __get_new_result_series_or_primitive_helper(
             ))
     else:
         if isinstance(new_value, pd.Series):
+            # The default value does not change the values it is combined with (e.g. 0 for SUM), so
+            # combining it with a numeric or bool series just gives the series, with NaN values
+            # filled with the default value, and we can skip combining each value one at a time
+            if previous_result is default_value and __is_series_of_default_value_type(new_value, default_value):
+                return new_value.fillna(default_value)
+
             return new_value.apply(lambda v: get_new_result_from_primitive_values(
                 __get_default_value_if_value_is_none_or_nan(previous_result, default_value), 
                 __get_default_value_if_value_is_none_or_nan(v, default_value)
@@ -62,7 +79,8 @@ def __get_new_result_series_or_primitive(
         arg: Union[PrimitiveType, None, pd.Series, RollingRange, pd.DataFrame], 
         get_primitive_value_from_dataframe: Callable[[pd.DataFrame], PrimitiveType],
         get_new_result_from_primitive_values: Callable[[PrimitiveType, PrimitiveType], PrimitiveType],
-        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series]
+        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series],
+        get_series_from_rolling_range: Optional[Callable[[RollingRange], pd.Series]]
     ) -> ResultType:
     """
     This helper function does the preprocessing for a single arg, and then combines it
@@ -83,7 +101,10 @@ def __get_new_result_series_or_primitive(
         return get_new_result(previous_result, reduced_df)
 
     elif isinstance(arg, RollingRange):
-        new_series = arg.apply(lambda df: get_primitive_value_from_dataframe(df))
+        if get_series_from_rolling_range is not None:
+            new_series = get_series_from_rolling_range(arg)
+        else:
+            new_series = arg.apply(lambda df: get_primitive_value_from_dataframe(df))
         return get_new_result(previous_result, new_series)
         
     elif isinstance(arg, pd.Series):
@@ -101,16 +122,20 @@ def get_final_result_series_or_primitive(
         argv: Tuple[Union[PrimitiveType, None, pd.Series, RollingRange, pd.DataFrame], ...], 
         get_primitive_value_from_dataframe: Callable[[pd.DataFrame], PrimitiveType],
         get_new_result_from_primitive_values: Callable[[PrimitiveType, PrimitiveType], PrimitiveType],
-        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series]
+        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series],
+        get_series_from_rolling_range: Optional[Callable[[RollingRange], pd.Series]]=None
     ) -> ResultType:
     """
     This function is the main workhorse of many sheet functions that fit a common pattern:
 
-    1. The start with a default result (default_value).
+    1. The start with a default result (default_value). Combining the default value with any other value 
+       must give that other value (e.g. 0 for SUM, or True for AND).
     2. They update the result with each arg in two steps, preprocessing the arg and then combining that with the result
     3. Preprocessing the arg:
         - For dataframe values, they turned into primitive values with get_primitive_value_from_dataframe
-        - For rolling ranges, they are turned into series using repeated application of get_primitive_value_from_dataframe
+        - For rolling ranges, they are turned into series using repeated application of get_primitive_value_from_dataframe,
+          or with get_series_from_rolling_range if it is passed, which should compute the same series without calling a
+          function on each window (e.g. RollingRange.sum for df.sum().sum())
     4. Combining with the previous result. We are either combining two primtiive values, a primitive value and a series, or two series
         - If combining two primitive values, we combine with get_new_result_from_primitive_values
         - If combining a primitive value and a series, we use a .apply on the series with get_new_result_from_primitive_values
@@ -132,7 +157,8 @@ def get_final_result_series_or_primitive(
             arg,
             get_primitive_value_from_dataframe,
             get_new_result_from_primitive_values,
-            get_new_result_from_series
+            get_new_result_from_series,
+            get_series_from_rolling_range
         )
 
     return result 
@@ -153,4 +179,45 @@ def get_series_from_primitive_or_series(
     if isinstance(arg, pd.Series):
         return arg
     else:
-        return pd.Series([arg] * len(index), index=index)
\ No newline at end of file
+        # Filling a numpy array is much faster than building a series from a list 
+        # for long columns, and gives the same dtype for these primitives
+        if len(index) > 0 and isinstance(arg, (bool, int, float, str)):
+            dtype = pd.Series([arg]).dtype
+            if is_numpy_native_dtype(dtype) or (dtype == object and isinstance(arg, str)):
+                return pd.Series(np.full(len(index), arg, dtype=dtype), index=index)
+        return pd.Series([arg] * len(index), index=index)
+
+# Dtypes that pandas infers back exactly when building a series from a list of their
+# values, so we can compute results for them in numpy without changing the result dtype
+NUMPY_NATIVE_DTYPES = (np.dtype('int64'), np.dtype('float64'), np.dtype('bool'), np.dtype('datetime64[ns]'))
+
+def is_numpy_native_dtype(dtype: object) -> bool:
+    return isinstance(dtype, np.dtype) and dtype in NUMPY_NATIVE_DTYPES
+
+
+def get_truthy_mask(series: pd.Series) -> np.ndarray:
+    """
+    Returns a numpy array that is True wherever the value in the series is truthy, 
+    exactly like calling bool on each value in the series.
+    """
+    if series.dtype == bool:
+        return series.to_numpy()
+    return series.astype(bool).to_numpy()
+
+
+def get_series_aligned_to_index(series: pd.Series, index: pd.Index) -> pd.Series:
+    """
+    Returns the series with the values in the same order as the index, so that
+    they can be combined by position.
+    """
+    if series.index.equals(index):
+        return series
+    return series.loc[index]
+
+
+def get_series_from_values_with_inferred_dtype(values: np.ndarray, index: pd.Index) -> pd.Series:
+    """
+    Builds a series from an object array, letting pandas infer the dtype from the values
+    in the array, the same way it does when building a series from a list of values.
+    """
+    return pd.Series(values.tolist(), index=index)
@@ -2,6 +2,8 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
+import pandas as pd
+
 from mitosheet.public.v3.types.float import cast_string_to_float
 
 
@@ -20,4 +22,14 @@ def cast_to_number(unknown: Union[str, int, float, bool, datetime, timedelta]) -
         return unknown
     
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_number(series: pd.Series) -> pd.Series:
+    """
+    Int64 and float64 series are already numbers, so we only cast other series element-wise.
+    """
+    if str(series.dtype) in ('int64', 'float64'):
+        return series
+
+    return series.apply(cast_to_number)
@@ -9,7 +9,8 @@ from mitosheet.public.v3.types.bool import cast_to_bool
 from mitosheet.public.v3.types.datetime import cast_series_to_datetime, cast_to_datetime
 from mitosheet.public.v3.types.float import cast_to_float
 from mitosheet.public.v3.types.int import cast_to_int
-from mitosheet.public.v3.types.number import cast_to_number
+from mitosheet.public.v3.types.number import (cast_series_to_number,
+                                               cast_to_number)
 from mitosheet.public.v3.types.str import cast_to_string
 from mitosheet.public.v3.types.timedelta import cast_to_timedelta
 from mitosheet.types import PrimitiveTypeName
@@ -18,7 +19,7 @@ SERIES_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Optional[Callable[[pd.Serie
     'str': None,
     'int': None,
     'float': None,
-    'number': None,
+    'number': cast_series_to_number,
     'bool': None,
     'datetime': cast_series_to_datetime,
     'timedelta': None,
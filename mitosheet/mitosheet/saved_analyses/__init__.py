@@ -10,7 +10,7 @@ from mitosheet.saved_analyses.save_utils import (
     _get_all_analysis_filenames, _delete_analyses,
     SAVED_ANALYSIS_FOLDER, read_analysis,
     get_steps_obj_for_saved_analysis, get_analysis_exists, 
-    get_saved_analysis_string
+    get_saved_analysis_string, schedule_save_analysis_file
 )
 from mitosheet.saved_analyses.upgrade import is_prev_version
 from mitosheet.saved_analyses.upgrade import upgrade_saved_analysis_to_current_version
@@ -11,11 +11,13 @@ in analyses.
 from mitosheet.step import Step
 import os
 import json
-from typing import Any, Dict, List, Optional
+from copy import copy, deepcopy
+from typing import Any, Callable, Dict, List, Optional
 from mitosheet._version import __version__
 from mitosheet.types import CodeOptions, StepsManagerType
 from mitosheet.utils import NpEncoder
 from mitosheet.save_paths import MITO_FOLDER
+from mitosheet.saved_analyses.save_writer import SAVED_ANALYSIS_WRITER
 
 # The current version of the saved Mito analysis
 # where we save all the analyses for this version
@@ -31,6 +33,7 @@ def get_analysis_exists(analysis_name: Optional[str]) -> bool:
     if analysis_name is None:
         return False
 
+    SAVED_ANALYSIS_WRITER.flush()
     analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
     return os.path.exists(analysis_path)
 
@@ -41,6 +44,9 @@ def read_analysis(analysis_name: str) -> Optional[Dict[str, Any]]:
     representing it.
     """
 
+    # Make sure we read the latest version of the analysis
+    SAVED_ANALYSIS_WRITER.flush()
+
     analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
     if not os.path.exists(analysis_path):
         return None
@@ -66,6 +72,8 @@ def _get_all_analysis_filenames():
     """
     Returns the names of the files in the SAVED_ANALYSIS_FOLDER
     """
+    SAVED_ANALYSIS_WRITER.flush()
+
     if not os.path.exists(SAVED_ANALYSIS_FOLDER):
         return []
 
@@ -80,6 +88,8 @@ def _delete_analyses(analysis_filenames):
     """
     For bulk deleting analysis with file names. 
     """
+    SAVED_ANALYSIS_WRITER.flush()
+
     for filename in analysis_filenames:
         os.remove(os.path.join(SAVED_ANALYSIS_FOLDER, filename))
 
@@ -118,20 +128,33 @@ def rename_saved_analysis(old_analysis_name, new_analysis_name):
         raise Exception(f'Invalid rename, with old and new analysis are {old_analysis_name} and {new_analysis_name}')
 
 def get_saved_analysis_string(steps_manager: StepsManagerType) -> str:
-    saved_analysis_string = json.dumps({
-        'version': __version__,
-        'steps_data': get_steps_obj_for_saved_analysis(steps_manager.steps_including_skipped),
-        'public_interface_version': steps_manager.public_interface_version,
-        'args': steps_manager.original_args_raw_strings,
-        'code': steps_manager.code(),
-        'code_options': steps_manager.code_options
-    }, cls=NpEncoder)
-    return saved_analysis_string
-
-def _write_saved_analysis_file(analysis_path: str, steps_manager: StepsManagerType) -> None:
-    saved_analysis_string = get_saved_analysis_string(steps_manager)
-    with open(analysis_path, 'w+') as f:
-        f.write(saved_analysis_string)
+    return get_saved_analysis_string_getter(steps_manager)()
+
+def get_saved_analysis_string_getter(steps_manager: StepsManagerType) -> Callable[[], str]:
+    """
+    Returns a function that returns the saved analysis string for the analysis 
+    as it is now, even if the steps_manager is edited before it is called. 
+
+    This only copies what is cheap to copy, so the work of creating the string can 
+    be done later, on another thread.
+    """
+    steps = copy(steps_manager.steps_including_skipped)
+    public_interface_version = steps_manager.public_interface_version
+    args = copy(steps_manager.original_args_raw_strings)
+    code = steps_manager.code()
+    code_options = deepcopy(steps_manager.code_options)
+
+    def get_saved_analysis_string() -> str:
+        return json.dumps({
+            'version': __version__,
+            'steps_data': get_steps_obj_for_saved_analysis(steps),
+            'public_interface_version': public_interface_version,
+            'args': args,
+            'code': code,
+            'code_options': code_options
+        }, cls=NpEncoder)
+
+    return get_saved_analysis_string
 
 
 def get_steps_obj_for_saved_analysis(
@@ -185,6 +208,18 @@ def get_steps_obj_for_saved_analysis(
 
     return steps_json_obj
 
+def _get_analysis_path(steps_manager: StepsManagerType, analysis_name: Optional[str]) -> str:
+    if not os.path.exists(MITO_FOLDER):
+        os.mkdir(MITO_FOLDER)
+
+    if not os.path.exists(SAVED_ANALYSIS_FOLDER):
+        os.mkdir(SAVED_ANALYSIS_FOLDER)
+
+    if analysis_name is None:
+        analysis_name = steps_manager.analysis_name
+
+    return f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
+
 def write_save_analysis_file(steps_manager: StepsManagerType, analysis_name: Optional[str]=None) -> None:
     """
     Writes the analysis saved in steps_manager to
@@ -195,15 +230,15 @@ def write_save_analysis_file(steps_manager: StepsManagerType, analysis_name: Opt
     date steps, but we save them all, as they will play back validly
     as they were valid when they were added.
     """
+    analysis_path = _get_analysis_path(steps_manager, analysis_name)
+    SAVED_ANALYSIS_WRITER.write(analysis_path, get_saved_analysis_string(steps_manager))
 
-    if not os.path.exists(MITO_FOLDER):
-        os.mkdir(MITO_FOLDER)
-
-    if not os.path.exists(SAVED_ANALYSIS_FOLDER):
-        os.mkdir(SAVED_ANALYSIS_FOLDER)
-
-    if analysis_name is None:
-        analysis_name = steps_manager.analysis_name
-
-    analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
-    _write_saved_analysis_file(analysis_path, steps_manager)
\ No newline at end of file
+def schedule_save_analysis_file(steps_manager: StepsManagerType, analysis_name: Optional[str]=None) -> None:
+    """
+    Like write_save_analysis_file, but writes the file on a background thread, 
+    after the user stops editing the analysis for a moment. 
+    
+    Used after each edit, so that the user does not wait for the analysis to be saved.
+    """
+    analysis_path = _get_analysis_path(steps_manager, analysis_name)
+    SAVED_ANALYSIS_WRITER.schedule(analysis_path, get_saved_analysis_string_getter(steps_manager))
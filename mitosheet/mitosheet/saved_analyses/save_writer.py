@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+The analysis is saved to ~/.mito after every edit, so it can be replayed if the
+kernel restarts. Writing the saved analysis to disk should not slow down the edit,
+so the SavedAnalysisWriter writes saved analyses on a background thread.
+
+Saves are debounced, so when a user makes many edits in a row, only the last
+version of the analysis is written. Any saves that have not been written yet
+are written before a saved analysis is read, and when Python exits. If the file
+was changed by something else after it was saved, the save is dropped, so we
+never overwrite a newer file. As we write files after they are saved, we remember 
+the files we wrote, so that writing an older save does not drop a newer one.
+"""
+import atexit
+import os
+import tempfile
+import time
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# How long we wait after the last save of an analysis before writing it, and how long we
+# wait at most after the first save we have not written, if the analysis keeps changing
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+DEFAULT_MAX_DELAY_SECONDS = 5.0
+
+
+def write_file_atomically(path: str, contents: str) -> None:
+    """
+    Writes the contents to a temporary file next to path, and then renames it
+    to path, so that path never contains a partially written file.
+    """
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path) or None, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(contents)
+        os.replace(temporary_path, path)
+    except:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+class SavedAnalysisWriter:
+    """
+    Writes saved analyses on a background thread. Each save is a function that
+    returns the contents of the file, which is only called when the file is written,
+    and is dropped if a newer save of the same file is scheduled before then.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, debounce_seconds: float=DEFAULT_DEBOUNCE_SECONDS, max_delay_seconds: float=DEFAULT_MAX_DELAY_SECONDS):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+        # path -> (get contents, time of the first save we have not written, time of the last save, 
+        # and the time of the last save on the wall clock, to compare to when the file was modified)
+        self._pending_saves: Dict[str, Tuple[Callable[[], str], float, float, float]] = {}
+        self._condition = Condition()
+        # Held while writing, so that flushing waits for a write that is in progress
+        self._writing_lock = Lock()
+        self._thread: Optional[Thread] = None
+        # path -> (modified time, size) of the file the last time we wrote it
+        self._written_file_stats: Dict[str, Tuple[int, int]] = {}
+
+        self.num_saves_scheduled = 0
+        self.num_saves_coalesced = 0
+        self.num_files_written = 0
+        self.num_saves_dropped = 0
+        self.num_write_errors = 0
+
+    def schedule(self, path: str, get_contents: Callable[[], str]) -> None:
+        """
+        Writes the contents to path on the background thread, once there have been
+        no other saves of path for debounce_seconds.
+        """
+        now = time.monotonic()
+        with self._condition:
+            pending_save = self._pending_saves.get(path)
+            if pending_save is not None:
+                self.num_saves_coalesced += 1
+            first_save_time = pending_save[1] if pending_save is not None else now
+            self._pending_saves[path] = (get_contents, first_save_time, now, time.time())
+            self.num_saves_scheduled += 1
+
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='mito-saved-analysis-writer', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def write(self, path: str, contents: str) -> None:
+        """
+        Writes the contents to path right away, dropping any save of path that
+        has not been written yet, as it is older.
+        """
+        with self._writing_lock:
+            with self._condition:
+                self._pending_saves.pop(path, None)
+            self._write_file(path, contents)
+
+    def flush(self) -> None:
+        """
+        Writes all of the saves that have not been written yet, and returns once
+        they are written.
+        """
+        self._write_pending_saves(lambda path, first_save_time, last_save_time: True)
+
+    def _write_file(self, path: str, contents: str) -> None:
+        write_file_atomically(path, contents)
+        file_stat = os.stat(path)
+        self._written_file_stats[path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        self.num_files_written += 1
+
+    def _was_changed_after_save(self, path: str, last_save_wall_time: float) -> bool:
+        """
+        Returns True if the file at path was changed by something other than this 
+        writer after the save was made.
+        """
+        if not os.path.exists(path):
+            return False
+        file_stat = os.stat(path)
+        if self._written_file_stats.get(path) == (file_stat.st_mtime_ns, file_stat.st_size):
+            return False
+        return file_stat.st_mtime > last_save_wall_time
+
+    def _get_write_time(self, first_save_time: float, last_save_time: float) -> float:
+        return min(last_save_time + self.debounce_seconds, first_save_time + self.max_delay_seconds)
+
+    def _write_pending_saves(self, should_write: Callable[[str, float, float], bool]) -> None:
+        with self._writing_lock:
+            with self._condition:
+                saves_to_write: List[Tuple[str, Callable[[], str], float]] = []
+                for path, (get_contents, first_save_time, last_save_time, last_save_wall_time) in list(self._pending_saves.items()):
+                    if should_write(path, first_save_time, last_save_time):
+                        saves_to_write.append((path, get_contents, last_save_wall_time))
+                        del self._pending_saves[path]
+
+            for path, get_contents, last_save_wall_time in saves_to_write:
+                if self._was_changed_after_save(path, last_save_wall_time):
+                    self.num_saves_dropped += 1
+                    continue
+
+                try:
+                    self._write_file(path, get_contents())
+                except:
+                    # If we fail to save the analysis, the user can keep editing. We just
+                    # will not be able to replay this version of the analysis
+                    self.num_write_errors += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while len(self._pending_saves) == 0:
+                    self._condition.wait()
+
+                now = time.monotonic()
+                next_write_time = min(
+                    self._get_write_time(first_save_time, last_save_time)
+                    for _, first_save_time, last_save_time, _ in self._pending_saves.values()
+                )
+                if next_write_time > now:
+                    self._condition.wait(next_write_time - now)
+                    continue
+
+            self._write_pending_saves(
+                lambda path, first_save_time, last_save_time: self._get_write_time(first_save_time, last_save_time) <= time.monotonic()
+            )
+
+    def __len__(self) -> int:
+        return len(self._pending_saves)
+
+    def writer_info(self) -> Dict[str, Any]:
+        return {
+            'pending_saves': len(self._pending_saves),
+            'num_saves_scheduled': self.num_saves_scheduled,
+            'num_saves_coalesced': self.num_saves_coalesced,
+            'num_files_written': self.num_files_written,
+            'num_saves_dropped': self.num_saves_dropped,
+            'num_write_errors': self.num_write_errors,
+        }
+
+
+SAVED_ANALYSIS_WRITER = SavedAnalysisWriter()
+
+# Make sure the latest version of each analysis is saved when the kernel shuts down
+atexit.register(SAVED_ANALYSIS_WRITER.flush)
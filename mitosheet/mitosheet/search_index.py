@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+The search bar searches for a value in every cell of a sheet, as the user
+types, so we search the same sheet many times in a row.
+
+The SearchIndex keeps, for each column of the sheets that have been searched,
+the distinct values in the column as the strings we search (see SearchColumn).
+Each search then only looks at each distinct value once, and finds where the
+matches are with numpy. Like the SheetDataCache, columns are keyed by the
+memory their values are stored in, so only the columns that changed since the
+last search are indexed again.
+
+As the index keeps a string for each distinct value, it is bounded in size. The
+sheets that were searched least recently are removed first, and the columns of
+a sheet that do not fit are searched without an index (see UnindexedSearchColumn),
+as are number columns where most values are distinct, as an index of them keeps
+a string for almost every row.
+"""
+import sys
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_number_dtype
+from mitosheet.sheet_data_cache import get_column_values_key
+
+# The most bytes the index of all sheets can take up
+SEARCH_INDEX_MAX_BYTES = 256 * 1024 * 1024
+
+# Number columns with at least this many rows, where at least this fraction of the values 
+# are distinct, are searched without an index
+UNINDEXED_MIN_ROWS = 10_000
+UNINDEXED_MIN_DISTINCT_FRACTION = 0.5
+
+
+def _get_values_as_strings(values: Any) -> List[str]:
+    return [str(value).lower() for value in values]
+
+
+class SearchColumn:
+    """
+    The distinct values of a column, as the lowercased strings that are displayed
+    in the sheet, the code of the distinct value in each row, and the number of
+    non-null cells with each value.
+
+    Also keeps the distinct values that matched the last search, so when the
+    user types another character, we only search the values that matched.
+    """
+
+    def __init__(self, series: pd.Series, values: Any):
+        # We keep a reference to the values, so their memory cannot be reused by a
+        # different column while they are in the index
+        self.values = values
+
+        is_null = series.isna().to_numpy()
+        try:
+            codes, unique_values = pd.factorize(series)
+            self.strings = _get_values_as_strings(unique_values)
+
+            # Null values are not distinct values, but they are still displayed, and so can be matched
+            if is_null.any():
+                null_codes, null_strings = pd.factorize(np.array(_get_values_as_strings(series.to_numpy()[is_null]), dtype=object))
+                codes[is_null] = null_codes + len(self.strings)
+                self.strings.extend(null_strings)
+        except TypeError:
+            # If the values are not hashable (e.g. lists), we find the distinct strings instead
+            codes, unique_strings = pd.factorize(np.array(_get_values_as_strings(series.to_numpy()), dtype=object))
+            self.strings = list(unique_strings)
+
+        self.codes = codes.astype(np.min_scalar_type(max(len(self.strings) - 1, 0)))
+        # NOTE: null cells are not counted as matches, but are returned as matches
+        self.counts = np.bincount(codes[~is_null], minlength=len(self.strings))
+
+        self.last_search_value: Optional[str] = None
+        self.last_matching_codes: np.ndarray = np.arange(len(self.strings))
+
+        # NOTE: we don't count the matching codes, as they are at most as large as the codes
+        self.nbytes = self.codes.nbytes + self.counts.nbytes + self.last_matching_codes.nbytes + \
+            sys.getsizeof(self.strings) + sum(sys.getsizeof(string) for string in self.strings)
+
+    def get_matching_codes(self, search_value: str) -> np.ndarray:
+        """
+        Returns the codes of the distinct values that contain the lowercased search_value.
+        """
+        if search_value == self.last_search_value:
+            return self.last_matching_codes
+
+        strings = self.strings
+        if self.last_search_value is not None and self.last_search_value in search_value:
+            # Only values that contain the last search value can contain this one
+            matching_codes = [code for code in self.last_matching_codes.tolist() if search_value in strings[code]]
+        else:
+            matching_codes = [code for code, string in enumerate(strings) if search_value in string]
+
+        self.last_search_value = search_value
+        self.last_matching_codes = np.array(matching_codes, dtype=np.int64)
+        return self.last_matching_codes
+
+    def get_number_matches(self, search_value: str) -> int:
+        return int(self.counts[self.get_matching_codes(search_value)].sum())
+
+    def get_is_match(self, search_value: str, start_row: int, end_row: int) -> np.ndarray:
+        """
+        Returns if each row from start_row to end_row matches.
+        """
+        is_matching_code = np.zeros(len(self.strings), dtype=bool)
+        is_matching_code[self.get_matching_codes(search_value)] = True
+        return is_matching_code[self.codes[start_row:end_row]]
+
+
+class UnindexedSearchColumn:
+    """
+    A column that is searched without an index, by turning the values into strings
+    for each search. Keeps the rows that matched the last search, so when the user
+    types another character, we only search the rows that matched.
+    """
+
+    def __init__(self, series: pd.Series, values: Any):
+        # We keep a reference to the values, so their memory cannot be reused by a
+        # different column while they are in the index
+        self.values = values
+        self.series = series
+        self.is_null = series.isna().to_numpy()
+
+        self.last_search_value: Optional[str] = None
+        self.last_is_match: np.ndarray = np.ones(len(series), dtype=bool)
+
+        self.nbytes = self.is_null.nbytes + self.last_is_match.nbytes
+
+    def get_is_match_all_rows(self, search_value: str) -> np.ndarray:
+        """
+        Returns if each row contains the lowercased search_value.
+        """
+        if search_value == self.last_search_value:
+            return self.last_is_match
+
+        if self.last_search_value is not None and self.last_search_value in search_value:
+            # Only rows that contain the last search value can contain this one
+            row_indexes = np.flatnonzero(self.last_is_match)
+        else:
+            row_indexes = np.arange(len(self.series))
+
+        is_match = np.zeros(len(self.series), dtype=bool)
+        strings = _get_values_as_strings(self.series.to_numpy()[row_indexes])
+        is_match[row_indexes] = np.array([search_value in string for string in strings], dtype=bool)
+
+        self.last_search_value = search_value
+        self.last_is_match = is_match
+        return is_match
+
+    def get_number_matches(self, search_value: str) -> int:
+        return int((self.get_is_match_all_rows(search_value) & ~self.is_null).sum())
+
+    def get_is_match(self, search_value: str, start_row: int, end_row: int) -> np.ndarray:
+        return self.get_is_match_all_rows(search_value)[start_row:end_row]
+
+
+AnySearchColumn = Union[SearchColumn, UnindexedSearchColumn]
+
+
+def should_index_column(series: pd.Series) -> bool:
+    """
+    Returns False for number columns where most values are distinct, as the index
+    of these columns would keep a string for almost every row.
+    """
+    if len(series) < UNINDEXED_MIN_ROWS or not is_number_dtype(str(series.dtype)):
+        return True
+    return series.nunique(dropna=False) < len(series) * UNINDEXED_MIN_DISTINCT_FRACTION
+
+
+class SearchIndex:
+    """
+    Holds a SearchColumn for each column of the sheets that have been searched,
+    which is created the first time the column is searched. Holds at most max_bytes 
+    of indexes, removing the sheets that were searched least recently first. The 
+    columns that are searched without an index take up a couple of bytes per row, 
+    and are kept even if they do not fit.
+
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, max_bytes: int=SEARCH_INDEX_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        # Ordered from the sheet that was searched least recently to most recently
+        self._columns: Dict[int, Dict[Hashable, AnySearchColumn]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.num_sheets_evicted = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(search_column.nbytes for search_columns in self._columns.values() for search_column in search_columns.values())
+
+    def _get_search_columns(self, sheet_index: int, df: pd.DataFrame) -> List[AnySearchColumn]:
+        old_search_columns = self._columns.pop(sheet_index, {})
+        new_search_columns: Dict[Hashable, AnySearchColumn] = {}
+        search_columns: List[AnySearchColumn] = []
+        sheet_nbytes = 0
+
+        for column_index in range(len(df.columns)):
+            series = df.iloc[:, column_index]
+            key, values = get_column_values_key(series, None)
+            search_column = old_search_columns.get(key) or new_search_columns.get(key)
+            if search_column is None:
+                self.misses += 1
+                search_column = SearchColumn(series, values) if should_index_column(series) else UnindexedSearchColumn(series, values)
+                # If the index of this sheet does not fit, we search the column without one
+                if sheet_nbytes + search_column.nbytes > self.max_bytes:
+                    search_column = UnindexedSearchColumn(series, values)
+            else:
+                self.hits += 1
+
+            if key not in new_search_columns:
+                sheet_nbytes += search_column.nbytes
+            new_search_columns[key] = search_column
+            search_columns.append(search_column)
+
+        # We only keep the columns that are in the sheet now, and this sheet was searched most recently
+        self._columns[sheet_index] = new_search_columns
+
+        # Then, remove the sheets that were searched least recently, until the index fits
+        nbytes = self.nbytes
+        for other_sheet_index in list(self._columns.keys()):
+            if nbytes <= self.max_bytes or other_sheet_index == sheet_index:
+                break
+            nbytes -= sum(search_column.nbytes for search_column in self._columns.pop(other_sheet_index).values())
+            self.num_sheets_evicted += 1
+
+        return search_columns
+
+    def search(self, sheet_index: int, df: pd.DataFrame, search_value: str, start_row: int, end_row: int) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Returns the number of cells in the sheet that contain search_value, ignoring
+        case and not counting null cells, and the (row index, column index) of each
+        cell from start_row to end_row that contains it, in order.
+        """
+        search_value = search_value.lower()
+        with self._lock:
+            search_columns = self._get_search_columns(sheet_index, df)
+
+            total_number_matches = 0
+            is_match_columns = []
+            for search_column in search_columns:
+                total_number_matches += search_column.get_number_matches(search_value)
+                is_match_columns.append(search_column.get_is_match(search_value, start_row, end_row))
+
+        if len(is_match_columns) == 0:
+            return total_number_matches, []
+
+        # Get the matches row by row, as they are displayed
+        row_indexes, column_indexes = np.nonzero(np.column_stack(is_match_columns))
+        return total_number_matches, list(zip((row_indexes + start_row).tolist(), column_indexes.tolist()))
+
+    def remove_sheets(self, num_sheets: int) -> None:
+        """
+        Removes the index of sheets that no longer exist.
+        """
+        with self._lock:
+            for sheet_index in list(self._columns.keys()):
+                if sheet_index >= num_sheets:
+                    del self._columns[sheet_index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._columns.clear()
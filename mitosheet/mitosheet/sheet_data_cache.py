@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Every time a sheet is modified, we send the data in it to the frontend
+again. Most edits only change a few columns of the sheet, and so converting
+all of the columns to json again is mostly wasted work.
+
+The SheetDataCache keeps the converted data (and json string) of each
+column we last sent, keyed by the memory the column's values are stored in.
+As steps copy the columns they modify (see State.copy), a column that has
+the same values array as last time has the same data, and so we only convert
+the columns that changed.
+
+The frontend also keeps the data of the columns it was last sent, so when it
+tells us which sheet data it has, we only send the data of the columns that
+changed since then. Each column we send to the frontend has a columnDataKey,
+and for the columns the frontend already has, the columnData is null, and the
+frontend fills it in from the column with the same columnDataKey.
+"""
+import json
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.lru_cache import LRUCache
+
+# The number of sheet data we sent that we keep the column data keys of. The 
+# frontend tells us the last sheet data it received, which is almost always the
+# most recent one we sent, so we only keep a few
+MAX_SENT_SHEET_DATA = 10
+
+
+class CachedColumnData:
+    """
+    The data we sent for a column, as well as the values it was converted
+    from. We keep a reference to the values, so their memory cannot be reused
+    by a different column while they are in the cache.
+    """
+
+    def __init__(self, values: Any, column_data: List[Any], column_data_key: str):
+        self.values = values
+        self.column_data = column_data
+        self.column_data_key = column_data_key
+        self.column_data_json: Optional[str] = None
+
+
+def get_column_values_key(series: pd.Series, max_rows: Optional[int]) -> Tuple[Tuple[Hashable, ...], Any]:
+    """
+    Returns a key that identifies the values of the column, and the values
+    object that must be kept alive for the key to stay unique.
+    """
+    if isinstance(series.dtype, np.dtype):
+        # For numpy dtypes, each access returns a new view of the same memory
+        values = series.to_numpy()
+        array_interface = values.__array_interface__
+        return (array_interface['data'][0], values.strides, values.shape, str(values.dtype), max_rows), values
+
+    values = series.array
+    return (id(values), len(values), str(series.dtype), max_rows), values
+
+
+class SheetDataCache:
+    """
+    Caches the converted data of the columns in each sheet, and the json
+    strings of the data we send to the frontend.
+    """
+
+    def __init__(self) -> None:
+        self._column_data: Dict[int, Dict[Hashable, CachedColumnData]] = {}
+        self._next_column_data: Dict[int, Dict[Hashable, CachedColumnData]] = {}
+        # The column data keys of the sheet data we sent, by the id of the sheet data
+        self._sent_column_data_keys: LRUCache[Set[str]] = LRUCache(MAX_SENT_SHEET_DATA)
+        self._num_column_data = 0
+        self.hits = 0
+        self.misses = 0
+
+    def start_sheet(self, sheet_index: int) -> None:
+        """
+        Call before converting the columns of a sheet. Only the columns converted
+        between this and end_sheet stay in the cache for this sheet.
+        """
+        self._next_column_data[sheet_index] = {}
+
+    def end_sheet(self, sheet_index: int) -> None:
+        self._column_data[sheet_index] = self._next_column_data.pop(sheet_index, {})
+
+    def remove_sheets(self, num_sheets: int) -> None:
+        """
+        Removes the cached columns of sheets that no longer exist.
+        """
+        for sheet_index in list(self._column_data.keys()):
+            if sheet_index >= num_sheets:
+                del self._column_data[sheet_index]
+
+    def get_column_data(
+            self,
+            sheet_index: int,
+            series: pd.Series,
+            max_rows: Optional[int],
+            get_column_data_for_json: Callable[[pd.Series], List[Any]]
+        ) -> List[Any]:
+        """
+        Returns the converted data for the first max_rows rows of the series, only
+        converting it if the column has changed since it was last converted.
+        """
+        key, values = get_column_values_key(series, max_rows)
+        cached_column_data = self._column_data.get(sheet_index, {}).get(key)
+        if cached_column_data is None:
+            cached_column_data = self._next_column_data.get(sheet_index, {}).get(key)
+
+        if cached_column_data is None:
+            self.misses += 1
+            column_data = get_column_data_for_json(series if max_rows is None else series.head(max_rows))
+            cached_column_data = CachedColumnData(values, column_data, str(self._num_column_data))
+            self._num_column_data += 1
+        else:
+            self.hits += 1
+
+        if sheet_index in self._next_column_data:
+            self._next_column_data[sheet_index][key] = cached_column_data
+
+        return cached_column_data.column_data
+
+    def get_sheet_data_array_json(
+            self,
+            sheet_data_array: List[Dict[str, Any]],
+            encoder: Optional[Type[json.JSONEncoder]]=None,
+            sheet_data_id: Optional[str]=None,
+            received_sheet_data_id: Optional[str]=None
+        ) -> str:
+        """
+        Returns json.dumps(sheet_data_array, cls=encoder), but reuses the json
+        strings of the data of columns that have not changed.
+
+        If sheet_data_id is passed, the json is for a frontend that fills in the
+        data of the columns it already has: each column gets a columnDataKey, and
+        the columns that were in the sheet data with received_sheet_data_id have
+        null columnData.
+        """
+        received_column_data_keys: Set[str] = set()
+        if received_sheet_data_id is not None:
+            received_column_data_keys = self._sent_column_data_keys.get(received_sheet_data_id) or set()
+        sent_column_data_keys: Set[str] = set()
+
+        cached_column_data_by_id = {
+            id(cached_column_data.column_data): cached_column_data
+            for column_data in self._column_data.values()
+            for cached_column_data in column_data.values()
+        }
+
+        def dumps(obj: Any) -> str:
+            return json.dumps(obj, cls=encoder)
+
+        def get_column_data_json(column_data: List[Any]) -> str:
+            cached_column_data = cached_column_data_by_id.get(id(column_data))
+            if cached_column_data is None or cached_column_data.column_data is not column_data:
+                return dumps(column_data)
+            if cached_column_data.column_data_json is None:
+                cached_column_data.column_data_json = dumps(column_data)
+            return cached_column_data.column_data_json
+
+        def get_dict_json(obj: Dict[str, Any], get_value_json: Callable[[str, Any], str]) -> str:
+            # This is what json.dumps does for a dict with the default separators
+            return '{' + ', '.join(dumps(key) + ': ' + get_value_json(key, value) for key, value in obj.items()) + '}'
+
+        def get_column_value_json(key: str, value: Any) -> str:
+            return get_column_data_json(value) if key == 'columnData' else dumps(value)
+
+        def get_column_json(column: Dict[str, Any]) -> str:
+            cached_column_data = cached_column_data_by_id.get(id(column.get('columnData')))
+            if sheet_data_id is None or cached_column_data is None or cached_column_data.column_data is not column['columnData']:
+                return get_dict_json(column, get_column_value_json)
+
+            column_data_key = cached_column_data.column_data_key
+            sent_column_data_keys.add(column_data_key)
+            if column_data_key not in received_column_data_keys:
+                return get_dict_json({**column, 'columnDataKey': column_data_key}, get_column_value_json)
+            return get_dict_json({**column, 'columnData': None, 'columnDataKey': column_data_key}, lambda key, value: dumps(value))
+
+        def get_sheet_json(sheet_data: Dict[str, Any]) -> str:
+            return get_dict_json(
+                sheet_data,
+                lambda key, value: '[' + ', '.join(get_column_json(column) for column in value) + ']' if key == 'data' else dumps(value)
+            )
+
+        sheet_data_array_json = '[' + ', '.join(get_sheet_json(sheet_data) for sheet_data in sheet_data_array) + ']'
+        if sheet_data_id is not None:
+            self._sent_column_data_keys.set(sheet_data_id, sent_column_data_keys)
+        return sheet_data_array_json
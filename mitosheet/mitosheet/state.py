@@ -4,14 +4,14 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 from collections import OrderedDict
-from copy import deepcopy
-from typing import Any, Callable, Collection, List, Dict, Optional, Set, Union
+from copy import copy, deepcopy
+from typing import Any, Callable, Collection, List, Dict, Mapping, Optional, Set, Union
 import pandas as pd
 
 from mitosheet.column_headers import ColumnIDMap
 from mitosheet.types import FrontendFormulaAndLocation, OverwriteSheetIndexParams
 from mitosheet.types import ColumnHeader, ColumnID, DataframeFormat
-from mitosheet.utils import  get_first_unused_dataframe_name
+from mitosheet.utils import  get_first_unused_dataframe_name, is_prev_version
 
 # Constants for where the dataframe in the state came from
 DATAFRAME_SOURCE_PASSED = "passed"  # passed in mitosheet.sheet
@@ -32,6 +32,40 @@ NUMBER_FORMAT_PERCENTAGE = "percentage"
 NUMBER_FORMAT_SCIENTIFIC_NOTATION = "scientific notation"
 
 
+def is_copy_on_write_copy_supported() -> bool:
+    """
+    Returns True if assigning to a column of a shallow copy of a dataframe
+    replaces that column rather than writing into the shared data, which
+    is true from pandas 1.5 onwards. 
+    """
+    return not is_prev_version(pd.__version__, '1.5.0')
+
+
+def copy_dataframe_columns(df: pd.DataFrame, column_headers: Collection[ColumnHeader]) -> pd.DataFrame:
+    """
+    Returns a shallow copy of the dataframe where only the passed columns
+    are copied, so that they can be written to in place without changing the 
+    original dataframe. All other columns share their data with the original.
+    """
+    new_df = df.copy(deep=False)
+    for column_header in column_headers:
+        column_index = df.columns.get_loc(column_header)
+        new_df.isetitem(column_index, df.iloc[:, column_index].copy(deep=True))
+    return new_df
+
+
+def copy_sheet_metadata(sheet_metadata: List[Any], sheet_indexes_to_copy: Collection[int]) -> List[Any]:
+    """
+    Returns a new list of per sheet metadata, where only the metadata of
+    the sheets in sheet_indexes_to_copy is deep copied, and the rest is
+    shared with the original list.
+    """
+    return [
+        deepcopy(metadata) if sheet_index in sheet_indexes_to_copy else metadata
+        for sheet_index, metadata in enumerate(sheet_metadata)
+    ]
+
+
 def get_default_dataframe_format() -> DataframeFormat:
     return {
         "columns": {},
@@ -144,14 +178,31 @@ class State:
         self.user_defined_importers = user_defined_importers if user_defined_importers is not None else []
         self.user_defined_editors = user_defined_editors if user_defined_editors is not None else []
 
-    def copy(self, deep_sheet_indexes: Optional[Union[List[int], Set[int], None]]=None) -> "State":
+        # If the dataframes in this state are evicted to save memory, they are replaced with
+        # empty dataframes with the same columns and dtypes. These must be recomputed before
+        # the data is read. See mitosheet/state_eviction.py
+        self.evicted = False
+
+    def copy(
+        self, 
+        deep_sheet_indexes: Optional[Union[List[int], Set[int], None]]=None,
+        modified_column_ids: Optional[Mapping[int, Collection[ColumnID]]]=None
+    ) -> "State":
         """
         Returns a copy of the state, while only making deep copies of
-        those dataframes in the deep_sheet_indexes. Ideally, we'd copy
-        even less than that deeply.
+        those dataframes in the deep_sheet_indexes.
+
+        If modified_column_ids is passed, the copy is copy-on-write instead: for
+        each sheet index in modified_column_ids, only the listed columns are copied, 
+        and all other columns keep sharing their data with this state. The metadata 
+        of any sheet not in deep_sheet_indexes or modified_column_ids is also shared 
+        with this state, so the caller must only edit the sheets it passed.
         """
         if deep_sheet_indexes is None:
             deep_sheet_indexes = []
+
+        if modified_column_ids is not None and is_copy_on_write_copy_supported():
+            return self._copy_on_write(deep_sheet_indexes, modified_column_ids)
         
         return State(
             [df.copy(deep=index in deep_sheet_indexes) for index, df in enumerate(self.dfs)],
@@ -168,6 +219,40 @@ class State:
             user_defined_editors=deepcopy(self.user_defined_editors),
         )
 
+    def _copy_on_write(
+        self, 
+        deep_sheet_indexes: Union[List[int], Set[int]],
+        modified_column_ids: Mapping[int, Collection[ColumnID]]
+    ) -> "State":
+        copied_sheet_indexes = set(deep_sheet_indexes).union(modified_column_ids.keys())
+
+        dfs = []
+        for sheet_index, df in enumerate(self.dfs):
+            if sheet_index in modified_column_ids:
+                column_id_to_column_header = self.column_ids.get_column_ids_map(sheet_index)
+                column_headers = [
+                    column_id_to_column_header[column_id] for column_id in modified_column_ids[sheet_index]
+                    if column_id in column_id_to_column_header
+                ]
+                dfs.append(copy_dataframe_columns(df, column_headers))
+            else:
+                dfs.append(df.copy(deep=sheet_index in deep_sheet_indexes))
+
+        return State(
+            dfs,
+            self.public_interface_version,
+            df_names=copy(self.df_names),
+            df_sources=copy(self.df_sources),
+            column_ids=self.column_ids.copy(copied_sheet_indexes),
+            column_formulas=copy_sheet_metadata(self.column_formulas, copied_sheet_indexes),
+            column_filters=copy_sheet_metadata(self.column_filters, copied_sheet_indexes),
+            df_formats=copy_sheet_metadata(self.df_formats, copied_sheet_indexes),
+            graph_data_array=copy(self.graph_data_array),
+            user_defined_functions=copy(self.user_defined_functions),
+            user_defined_importers=copy(self.user_defined_importers),
+            user_defined_editors=copy(self.user_defined_editors),
+        )
+
     def add_df_to_state(
         self,
         new_df: pd.DataFrame,
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Every step keeps its prev_state and post_state around, so that users can
+check out or undo to any step. For long analyses on big data, this means
+the kernel can run out of memory. 
+
+When a memory budget is configured (see MitoConfig.state_memory_budget_mb), 
+the states of older steps are evicted: their dataframes are replaced with
+empty dataframes with the same columns and dtypes. All other metadata is 
+kept, so the evicted steps can still be transpiled and described.
+
+Every state_checkpoint_interval-th step is kept as a checkpoint, and is never
+evicted. When an evicted state is needed again, it is recomputed by 
+re-executing the steps from the nearest checkpoint before it.
+
+NOTE: evicted states are updated in place, as a state is shared by the 
+post_state of one step and the prev_state of the next step.
+"""
+from time import perf_counter
+from typing import Dict, List, Set
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.state import State
+from mitosheet.step import Step
+
+
+STATE_EVICTION_POLICY_OLDEST = 'oldest'
+STATE_EVICTION_POLICY_LARGEST = 'largest'
+
+# When estimating the memory used by the values in object columns (e.g. strings), we 
+# look at this many of them, as looking at all of them is slow on large dataframes
+DEEP_MEMORY_USAGE_SAMPLE_SIZE = 1000
+
+
+def _get_deep_memory_usage_estimate(values: pd.Series, sample_rows: np.ndarray) -> int:
+    """
+    Returns an estimate of the bytes used by the objects that the values point 
+    to, from the objects at sample_rows.
+    """
+    if len(values) == 0:
+        return 0
+    sample = values.iloc[sample_rows]
+    sample_deep_memory_usage = sample.memory_usage(index=False, deep=True) - sample.memory_usage(index=False, deep=False)
+    return int(sample_deep_memory_usage / len(sample_rows) * len(values))
+
+
+def get_dataframe_memory_usage(df: pd.DataFrame, deep: bool=False) -> int:
+    """
+    Returns the number of bytes used by the dataframe. If deep, this includes 
+    the objects in object columns and indexes (e.g. strings), which we estimate 
+    from a sample of them.
+    """
+    memory_usage = int(df.memory_usage(index=True, deep=False).sum())
+    if not deep or len(df) == 0:
+        return memory_usage
+
+    sample_rows = np.unique(np.linspace(0, len(df) - 1, num=min(len(df), DEEP_MEMORY_USAGE_SAMPLE_SIZE), dtype=np.int64))
+    for column_index, dtype in enumerate(df.dtypes):
+        if dtype == object or str(dtype) == 'string':
+            memory_usage += _get_deep_memory_usage_estimate(df.iloc[:, column_index], sample_rows)
+    if df.index.dtype == object:
+        memory_usage += _get_deep_memory_usage_estimate(df.index.to_series(), sample_rows)
+    return memory_usage
+
+
+def get_state_memory_usage(state: State, deep: bool=False) -> int:
+    """
+    Returns the number of bytes used by the dataframes in this state. 
+    
+    NOTE: unless deep, this does not look inside of object columns. It counts 
+    columns that are shared with other states in each state, as this is a best
+    guess that is cheap to compute.
+    """
+    if state.evicted:
+        return 0
+    return sum(get_dataframe_memory_usage(df, deep=deep) for df in state.dfs)
+
+
+def get_steps_memory_usage(steps: List[Step], deep: bool=False) -> int:
+    """
+    Returns the number of bytes used by the dataframes in all of the states
+    of the steps, counting states that are shared between steps once.
+    """
+    state_ids: Set[int] = set()
+    memory_usage = 0
+    for step in steps:
+        for state in [step.prev_state, step.post_state]:
+            if state is not None and id(state) not in state_ids:
+                state_ids.add(id(state))
+                memory_usage += get_state_memory_usage(state, deep=deep)
+    return memory_usage
+
+
+def evict_state(state: State) -> None:
+    """
+    Evicts the dataframes in the state, replacing them with empty
+    dataframes that have the same columns and dtypes.
+    """
+    state.dfs = [df.iloc[:0].copy(deep=True) for df in state.dfs]
+    state.evicted = True
+
+
+def get_checkpoint_step_indexes(steps: List[Step], step_indexes_to_skip: Set[int], checkpoint_interval: int) -> Set[int]:
+    """
+    Returns the indexes of the steps with states that are never evicted, so 
+    that evicted states can be recomputed from them.
+    """
+    return {
+        step_index for step_index in range(len(steps)) 
+        if step_index not in step_indexes_to_skip and step_index % checkpoint_interval == 0
+    }
+
+
+def evict_states_over_memory_budget(
+        steps: List[Step],
+        curr_step_idx: int,
+        step_indexes_to_skip: Set[int],
+        memory_budget: int,
+        checkpoint_interval: int,
+        eviction_policy: str
+    ) -> int:
+    """
+    Evicts states until the dataframes in the step history use less than
+    memory_budget bytes, or until only the checkpoints, the checked out 
+    step, and the final step are left.
+
+    Returns the number of states that were evicted.
+    """
+    retained_step_indexes = get_checkpoint_step_indexes(steps, step_indexes_to_skip, checkpoint_interval)
+    retained_step_indexes.update({0, curr_step_idx, len(steps) - 1})
+    retained_state_ids = {id(steps[step_index].final_defined_state) for step_index in retained_step_indexes}
+
+    # Collect each state once, in the order they are created
+    states: Dict[int, State] = {}
+    for step in steps:
+        for state in [step.prev_state, step.post_state]:
+            if state is not None and id(state) not in states:
+                states[id(state)] = state
+
+    memory_usage = {state_id: get_state_memory_usage(state) for state_id, state in states.items()}
+    total_memory_usage = sum(memory_usage.values())
+
+    evictable_state_ids = [
+        state_id for state_id, state in states.items() 
+        if state_id not in retained_state_ids and not state.evicted
+    ]
+    if eviction_policy == STATE_EVICTION_POLICY_LARGEST:
+        evictable_state_ids.sort(key=lambda state_id: memory_usage[state_id], reverse=True)
+
+    num_evicted_states = 0
+    for state_id in evictable_state_ids:
+        if total_memory_usage <= memory_budget:
+            break
+
+        evict_state(states[state_id])
+        total_memory_usage -= memory_usage[state_id]
+        num_evicted_states += 1
+    
+    return num_evicted_states
+
+
+def recompute_evicted_states(steps: List[Step], step_index: int, step_indexes_to_skip: Set[int]) -> float:
+    """
+    Makes sure the final defined state of the step at step_index is not 
+    evicted, by re-executing the steps from the nearest state before it
+    that is not evicted.
+
+    Returns the time it took to recompute the states, which is 0 if no 
+    states needed to be recomputed.
+    """
+    if not steps[step_index].final_defined_state.evicted:
+        return 0
+
+    start_time = perf_counter()
+
+    executed_step_indexes = [
+        index for index in range(step_index + 1) 
+        if index not in step_indexes_to_skip or index == step_index
+    ]
+
+    # Find the last step that has a post_state that we can start executing from
+    start_position = 0
+    for position in range(len(executed_step_indexes) - 1, -1, -1):
+        if not steps[executed_step_indexes[position]].final_defined_state.evicted:
+            start_position = position
+            break
+
+    for executed_step_index in executed_step_indexes[start_position + 1:]:
+        step = steps[executed_step_index]
+
+        # The prev_state is shared with the post_state of the step before, which 
+        # has just been recomputed, unless this step is the initialize step
+        if step.prev_state is None or step.post_state is None or not step.post_state.evicted:
+            continue
+
+        post_state_and_execution_data = step.step_performer.execute(step.prev_state, step.params)
+        recomputed_state = post_state_and_execution_data[0] if post_state_and_execution_data is not None else step.prev_state
+        step.post_state.dfs = recomputed_state.dfs
+        step.post_state.evicted = False
+
+    return perf_counter() - start_time
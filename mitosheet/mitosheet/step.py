@@ -4,7 +4,8 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
-from typing import Any, Dict, List, Optional, Set, Type
+from copy import copy
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
 import json
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.step_performers.step_performer import StepPerformer
@@ -64,6 +65,38 @@ class Step:
         # work if it has already been done. See simple_import for an example
         self.execution_data = execution_data if execution_data is not None else {}
 
+        # Transpiling a step is slow, and the code is transpiled on every edit, so we cache
+        # the code chunks of this step with the prev_state, params and execution_data that 
+        # they were transpiled from. See get_code_chunks
+        self.code_chunks_cache: Optional[Tuple[Optional[State], Dict[str, Any], Dict[str, Any], List[CodeChunk]]] = None
+        # We also cache the optimized code chunks for all the steps up to and including this 
+        # step, with the code chunks they were optimized from. See code_chunk_utils.get_code_chunks
+        self.optimized_code_chunks_cache: Optional[Tuple[List[CodeChunk], List[CodeChunk]]] = None
+
+    def get_code_chunks(self) -> List[CodeChunk]:
+        """
+        Returns the code chunks that this step transpiles to. These are only
+        transpiled again if the step is executed again.
+        """
+        if self.code_chunks_cache is not None:
+            prev_state, params, execution_data, code_chunks = self.code_chunks_cache
+            if prev_state is self.prev_state and params is self.params and execution_data is self.execution_data:
+                return copy(code_chunks)
+
+        code_chunks = self.step_performer.transpile(
+            self.prev_state, # type: ignore
+            self.params,
+            self.execution_data,
+        )
+        self.code_chunks_cache = (self.prev_state, self.params, self.execution_data, code_chunks)
+        return copy(code_chunks)
+
+    def clear_code_chunks_cache(self) -> None:
+        """
+        Call if the states of this step are changed without executing it again.
+        """
+        self.code_chunks_cache = None
+        self.optimized_code_chunks_cache = None
 
     @property
     def dfs(self):
@@ -187,12 +220,11 @@ class Step:
 
         step_indexes_to_skip = set()
 
+        filter_key = self.get_filter_key()
         for step_index, step in enumerate(all_steps_before_this_step):
             # Check (1)
-            if step.step_type == FilterStepPerformer.step_type() and self.step_type == FilterStepPerformer.step_type():
-                if step.params['sheet_index'] == self.params['sheet_index'] \
-                    and step.params['column_id'] == self.params['column_id']:
-                   step_indexes_to_skip.add(step_index) 
+            if filter_key is not None and step.get_filter_key() == filter_key:
+                step_indexes_to_skip.add(step_index) 
             
             # Check (2)
             elif step.step_id == self.step_id:
@@ -202,20 +234,40 @@ class Step:
             previous_step: Step = all_steps_before_this_step[-1]
             
             # Check (3) and (4)
-            if self.step_type == SetColumnFormulaStepPerformer.step_type() and previous_step.step_type == SetColumnFormulaStepPerformer.step_type():
-                both_entire_column = self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE
-                same_indexes = (
-                    self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE \
-                    and self.params['index_labels_formula_is_applied_to']['index_labels'] == previous_step.params['index_labels_formula_is_applied_to']['index_labels']
-                )
-                
-                if (both_entire_column or same_indexes) \
-                    and self.params['sheet_index'] == previous_step.params['sheet_index'] \
-                    and self.params['column_id'] == previous_step.params['column_id']:
-                    step_indexes_to_skip.add(len(all_steps_before_this_step) - 1)
+            if self.overwrites_formula_step(previous_step):
+                step_indexes_to_skip.add(len(all_steps_before_this_step) - 1)
 
         return step_indexes_to_skip
 
+    def get_filter_key(self) -> Optional[Tuple[Any, Any]]:
+        """
+        Returns the (sheet_index, column_id) this step filters if it is a 
+        filter step, and None otherwise. A filter step skips all the filter
+        steps before it with the same filter key.
+        """
+        if self.step_type != FilterStepPerformer.step_type():
+            return None
+        return (self.params['sheet_index'], self.params['column_id'])
+
+    def overwrites_formula_step(self, previous_step: 'Step') -> bool:
+        """
+        Returns True if this step and the step just before it both set a 
+        formula on the same column for the same indexes, and so this step 
+        skips the step before it.
+        """
+        if self.step_type != SetColumnFormulaStepPerformer.step_type() or previous_step.step_type != SetColumnFormulaStepPerformer.step_type():
+            return False
+
+        both_entire_column = self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE
+        same_indexes = (
+            self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE \
+            and self.params['index_labels_formula_is_applied_to']['index_labels'] == previous_step.params['index_labels_formula_is_applied_to']['index_labels']
+        )
+        
+        return (both_entire_column or same_indexes) \
+            and self.params['sheet_index'] == previous_step.params['sheet_index'] \
+            and self.params['column_id'] == previous_step.params['column_id']
+
     def get_column_headers_by_ids(self, sheet_index: int, column_ids: List[ColumnID]) -> List[Any]:
         """
         Utility for getting the column headers from column ids in a step.
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+When a step is edited, every step after it is re-executed. Most of these
+steps touch columns that have nothing to do with the edit, and so re-running
+them recomputes exactly what they computed before.
+
+To avoid this, each step reports the columns it reads (get_input_column_ids)
+and writes (get_modified_column_ids), which together make a dependency graph
+between the steps keyed by (sheet_index, column_id). While re-executing, we
+walk this graph forward from the edit with ChangedColumns, which tracks which
+columns differ from the previous execution. A step that does not read any
+changed column and only writes to specific columns is not re-executed: its
+output columns are reused from its previous post_state.
+"""
+from copy import deepcopy
+from typing import Dict, Optional, Set, Tuple
+
+from mitosheet.state import State, is_copy_on_write_copy_supported
+from mitosheet.step import Step
+from mitosheet.types import ColumnID
+
+
+class ChangedColumns:
+    """
+    Tracks which data differs between the state the steps are currently
+    being re-executed with, and the state these steps were previously
+    executed with.
+    """
+
+    def __init__(self) -> None:
+        # If a step changes sheets in a way we cannot track (e.g. adding or
+        # deleting a dataframe), we consider everything changed
+        self.all_sheets_changed = False
+        # Sheets where the data or structure may have changed anywhere
+        self.changed_sheet_indexes: Set[int] = set()
+        # Columns where the data or column metadata may have changed
+        self.changed_column_ids: Set[Tuple[int, ColumnID]] = set()
+
+    def is_empty(self) -> bool:
+        return not self.all_sheets_changed and len(self.changed_sheet_indexes) == 0 and len(self.changed_column_ids) == 0
+
+    def intersects(self, input_column_ids: Optional[Dict[int, Set[ColumnID]]]) -> bool:
+        """
+        Returns True if any of the input_column_ids are changed. If the inputs are
+        None, they are unknown, and so any change at all is a change to the inputs.
+        """
+        if input_column_ids is None:
+            return not self.is_empty()
+
+        if self.all_sheets_changed:
+            return True
+
+        for sheet_index, column_ids in input_column_ids.items():
+            if sheet_index in self.changed_sheet_indexes:
+                return True
+            if any((sheet_index, column_id) in self.changed_column_ids for column_id in column_ids):
+                return True
+
+        return False
+
+    def add_step_modifications(self, step: Step) -> None:
+        """
+        Marks everything that the step modifies as changed.
+        """
+        modified_column_ids = step.step_performer.get_modified_column_ids(step.params)
+        if modified_column_ids is not None and all(len(column_ids) > 0 for column_ids in modified_column_ids.values()):
+            for sheet_index, column_ids in modified_column_ids.items():
+                self.changed_column_ids.update((sheet_index, column_id) for column_id in column_ids)
+            return
+
+        modified_sheet_indexes = step.step_performer.get_modified_dataframe_indexes(step.params)
+        if len(modified_sheet_indexes) == 0 or -1 in modified_sheet_indexes:
+            self.all_sheets_changed = True
+        else:
+            self.changed_sheet_indexes.update(modified_sheet_indexes)
+
+
+def get_input_column_ids(step: Step, prev_state: State) -> Optional[Dict[int, Set[ColumnID]]]:
+    """
+    Returns the columns that the step reads when executed on the prev_state,
+    or None if we cannot tell.
+    """
+    try:
+        return step.step_performer.get_input_column_ids(prev_state, step.params)
+    except:
+        return None
+
+
+def can_reuse_post_state(step: Step, prev_state: State, changed_columns: ChangedColumns) -> bool:
+    """
+    Returns True if executing the step on prev_state would give the same
+    result in the columns it modifies as the last time it was executed.
+
+    This is only true for steps that write to specific columns, and that do
+    not read any changed columns. We also check the step does not write to a
+    changed column, as we would otherwise overwrite the changes.
+    """
+    if not is_copy_on_write_copy_supported():
+        return False
+
+    if step.prev_state is None or step.post_state is None or step.post_state.evicted:
+        return False
+
+    modified_column_ids = step.step_performer.get_modified_column_ids(step.params)
+    if modified_column_ids is None or any(len(column_ids) == 0 for column_ids in modified_column_ids.values()):
+        return False
+
+    if changed_columns.intersects(modified_column_ids):
+        return False
+
+    input_column_ids = get_input_column_ids(step, prev_state)
+    return input_column_ids is not None and not changed_columns.intersects(input_column_ids)
+
+
+def reuse_post_state(step: Step, new_prev_state: State) -> State:
+    """
+    Returns the state you get from executing the step on new_prev_state,
+    by copying the columns the step modifies from its previous post_state.
+
+    Only call this if can_reuse_post_state returns True.
+    """
+    old_prev_state: State = step.prev_state # type: ignore
+    old_post_state: State = step.post_state # type: ignore
+
+    # If the step did not change anything last time, it does not now either
+    if old_post_state is old_prev_state:
+        return new_prev_state
+
+    modified_column_ids: Dict[int, Set[ColumnID]] = step.step_performer.get_modified_column_ids(step.params) # type: ignore
+    post_state = new_prev_state.copy(modified_column_ids={sheet_index: set() for sheet_index in modified_column_ids})
+
+    for sheet_index, column_ids in modified_column_ids.items():
+        old_df = old_post_state.dfs[sheet_index]
+        new_df = post_state.dfs[sheet_index]
+        for column_id in column_ids:
+            column_header = old_post_state.column_ids.get_column_header_by_id(sheet_index, column_id)
+            new_df.isetitem(new_df.columns.get_loc(column_header), old_df[column_header].copy())
+
+            if column_id in old_post_state.column_formulas[sheet_index]:
+                post_state.column_formulas[sheet_index][column_id] = deepcopy(old_post_state.column_formulas[sheet_index][column_id])
+            if column_id in old_post_state.column_filters[sheet_index]:
+                post_state.column_filters[sheet_index][column_id] = deepcopy(old_post_state.column_filters[sheet_index][column_id])
+
+    return post_state
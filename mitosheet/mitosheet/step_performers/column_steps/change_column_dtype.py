@@ -106,4 +106,12 @@ class ChangeColumnDtypeStepPerformer(StepPerformer):
 
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
-        return {get_param(params, 'sheet_index')}
\ No newline at end of file
+        return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set(get_param(params, 'column_ids'))}
+
+    @classmethod
+    def get_input_column_ids(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set(get_param(params, 'column_ids'))}
\ No newline at end of file
@@ -11,6 +11,7 @@ from mitosheet.code_chunks.step_performers.column_steps.delete_column_code_chunk
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils.utils import get_param
+from mitosheet.types import ColumnID
 
 
 class DeleteColumnStepPerformer(StepPerformer):
@@ -43,4 +44,12 @@ class DeleteColumnStepPerformer(StepPerformer):
 
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
-        return {get_param(params, 'sheet_index')}
\ No newline at end of file
+        return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set()}
+
+    @classmethod
+    def get_input_column_ids(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set()}
\ No newline at end of file
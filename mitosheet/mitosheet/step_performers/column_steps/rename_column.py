@@ -14,6 +14,7 @@ from mitosheet.errors import make_column_exists_error
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils.utils import get_param
+from mitosheet.types import ColumnID
 
 
 class RenameColumnStepPerformer(StepPerformer):
@@ -78,4 +79,12 @@ class RenameColumnStepPerformer(StepPerformer):
     
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
-        return {get_param(params, 'sheet_index')}
\ No newline at end of file
+        return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set()}
+
+    @classmethod
+    def get_input_column_ids(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): set()}
\ No newline at end of file
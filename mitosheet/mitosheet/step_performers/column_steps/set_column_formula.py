@@ -180,6 +180,36 @@ class SetColumnFormulaStepPerformer(StepPerformer):
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
 
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): {get_param(params, 'column_id')}}
+
+    @classmethod
+    def get_input_column_ids(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        column_id: ColumnID = get_param(params, 'column_id')
+        new_formula: str = get_param(params, 'new_formula')
+
+        # Formulas that reference other sheets can depend on any of them
+        if '!' in new_formula:
+            return None
+
+        column_header = prev_state.column_ids.get_column_header_by_id(sheet_index, column_id)
+        _, _, column_header_dependencies, _ = parse_formula(
+            new_formula, 
+            column_header,
+            get_param(params, 'formula_label'),
+            get_param(params, 'index_labels_formula_is_applied_to'),
+            prev_state.dfs,
+            prev_state.df_names,
+            sheet_index,
+        )
+
+        # The column itself is an input, as a formula that only sets some index labels keeps the rest of the column
+        input_column_ids = set(prev_state.column_ids.get_column_ids(sheet_index, list(column_header_dependencies)))
+        input_column_ids.add(column_id)
+        return {sheet_index: input_column_ids}
+
 
 def _get_fixed_invalid_formula(
         new_formula: str, 
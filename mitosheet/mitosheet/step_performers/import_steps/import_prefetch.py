@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+When replaying an analysis, or refreshing its imports, the steps are executed
+one after another, as each step is executed on the state that the step before
+it created. For analyses that start with a bunch of imports, most of this time
+is spent reading files, one after another.
+
+However, imports that only create new dataframes do not depend on the steps
+before them. So, while the steps are executed in order, we also execute these
+import steps on a pool of threads, on the state from before all of them. The
+pandas readers in the code these threads execute save the dataframes they read,
+and when the import step is then executed in order, the same read just takes
+the dataframe that was already read.
+
+As the steps are still executed in order, and only the results of the exact same
+reads are reused, the result is the same as executing the steps one at a time.
+"""
+import builtins
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from copy import deepcopy
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from mitosheet.step_performers.import_steps.excel_import import ExcelImportStepPerformer
+from mitosheet.step_performers.import_steps.simple_import import SimpleImportStepPerformer
+
+if TYPE_CHECKING:
+    from mitosheet.state import State
+    from mitosheet.step import Step
+else:
+    State = Any
+    Step = Any
+
+# The import steps that we can execute ahead of time, as they only read files. Notably,
+# we don't execute other imports (e.g. from Snowflake) twice, as they might not be cheap
+PREFETCHABLE_STEP_TYPES = [
+    SimpleImportStepPerformer.step_type(),
+    ExcelImportStepPerformer.step_type(),
+]
+
+# The pandas functions that save what they read
+PREFETCHED_READERS = ['read_csv', 'read_excel']
+
+MAX_PREFETCH_WORKERS = 8
+
+# The pandas module that is passed to the code executed by steps, if we are prefetching
+_PREFETCHING_PANDAS: ContextVar[Optional['PrefetchingPandas']] = ContextVar('prefetching_pandas', default=None)
+
+
+def _copy_read_result(result: Any) -> Any:
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    if isinstance(result, dict):
+        return {key: _copy_read_result(value) for key, value in result.items()}
+    return deepcopy(result)
+
+
+class ReadAlreadyTakenError(Exception):
+    pass
+
+
+def _get_read_key(reader_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[str]:
+    try:
+        return repr((reader_name, args, sorted(kwargs.items())))
+    except:
+        return None
+
+
+class PrefetchedReads:
+    """
+    The results of the pandas reads, keyed by the reader and the arguments
+    passed to it. Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._reads: Dict[str, 'Future[Any]'] = {}
+        self._taken_keys: Set[str] = set()
+
+        # How long each read took, in seconds
+        self.read_times: Dict[str, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _get_future(self, key: str, take: bool) -> Tuple['Future[Any]', bool]:
+        """
+        Returns the future for the read with this key, and if the caller 
+        should do the read.
+        """
+        with self._lock:
+            if not take and key in self._taken_keys:
+                # If this was already read for the step that needed it, there is no need to read it again
+                raise ReadAlreadyTakenError()
+
+            future = self._reads.get(key)
+            should_read = future is None
+            if future is None:
+                future = Future()
+                self._reads[key] = future
+            if take:
+                self._reads.pop(key, None)
+                self._taken_keys.add(key)
+
+            return future, should_read
+
+    def _read(self, key: str, reader: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any], future: 'Future[Any]') -> None:
+        start_time = perf_counter()
+        try:
+            result = reader(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        self.read_times[key] = perf_counter() - start_time
+        future.set_result(result)
+
+    def read(self, reader_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any], take: bool) -> Any:
+        """
+        Returns the result of calling the pandas reader with these arguments,
+        reading it if no other thread has already read it.
+
+        If take, this is the read that the result is saved for, and so it is
+        removed. Otherwise, a copy of the result is returned.
+        """
+        reader: Callable[..., Any] = getattr(pd, reader_name)
+        key = _get_read_key(reader_name, args, kwargs)
+        if key is None:
+            return reader(*args, **kwargs)
+
+        future, should_read = self._get_future(key, take)
+        if should_read:
+            self._read(key, reader, args, kwargs, future)
+
+        if take:
+            if should_read:
+                self.misses += 1
+                return future.result()
+
+            try:
+                result = future.result()
+                self.hits += 1
+                return result
+            except:
+                # If the read failed on another thread, we read again, so that
+                # we raise the same error as we would have without prefetching
+                self.misses += 1
+                return reader(*args, **kwargs)
+
+        return _copy_read_result(future.result())
+
+    def prefetch(self, reader_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        """
+        Reads ahead of time, if no other thread is reading the same thing.
+        """
+        key = _get_read_key(reader_name, args, kwargs)
+        if key is None:
+            return
+
+        try:
+            future, should_read = self._get_future(key, take=False)
+            if should_read:
+                self._read(key, getattr(pd, reader_name), args, kwargs, future)
+        except:
+            # If this fails, it will also fail (and be reported) when it is read in order
+            pass
+
+    def get_read_time(self, reader_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[float]:
+        key = _get_read_key(reader_name, args, kwargs)
+        return self.read_times.get(key) if key is not None else None
+
+
+class PrefetchingPandas:
+    """
+    Passed to the code executed by import steps as pd, so that its reads go 
+    through the prefetched reads.
+    """
+
+    def __init__(self, prefetched_reads: PrefetchedReads, take: bool):
+        self.prefetched_reads = prefetched_reads
+        self.take = take
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PREFETCHED_READERS:
+            def read(*args: Any, **kwargs: Any) -> Any:
+                return self.prefetched_reads.read(name, args, kwargs, self.take)
+            return read
+        return getattr(pd, name)
+
+    def get_globals_for_exec(self) -> Dict[str, Any]:
+        """
+        Returns the globals to add to the globals for executing the code of an
+        import step, so that it uses this as pd, even after it imports pandas.
+        """
+        def _import(name: str, *args: Any, **kwargs: Any) -> Any:
+            module = builtins.__import__(name, *args, **kwargs)
+            return self if module is pd else module
+
+        return {
+            'pd': self,
+            '__builtins__': {**builtins.__dict__, '__import__': _import}
+        }
+
+
+def get_prefetching_pandas() -> Optional[PrefetchingPandas]:
+    """
+    Returns the pandas module that the code executed by steps should use, or
+    None if we are not prefetching imports.
+    """
+    return _PREFETCHING_PANDAS.get()
+
+
+def _execute_step_to_prefetch(step: Step, prev_state: State, prefetched_reads: PrefetchedReads) -> None:
+    _PREFETCHING_PANDAS.set(PrefetchingPandas(prefetched_reads, take=False))
+    try:
+        step.step_performer.execute(prev_state, step.params)
+    except:
+        # If this fails, it will also fail (and be reported) when the step is executed in order
+        pass
+
+
+@contextmanager
+def prefetch_import_steps(steps: List[Step], prev_state: State) -> Iterator[Optional[PrefetchedReads]]:
+    """
+    While in this context, the files read by the import steps are read on a
+    pool of threads, and the steps executed on this thread use what they read.
+
+    prev_state should be the state the first of the steps is executed on.
+    """
+    steps_to_prefetch = [step for step in steps if step.step_type in PREFETCHABLE_STEP_TYPES]
+
+    # If there is only one import, there is nothing to read at the same time
+    if len(steps_to_prefetch) < 2:
+        yield None
+        return
+
+    prefetched_reads = PrefetchedReads()
+    token = _PREFETCHING_PANDAS.set(PrefetchingPandas(prefetched_reads, take=True))
+    executor = ThreadPoolExecutor(max_workers=min(MAX_PREFETCH_WORKERS, len(steps_to_prefetch)), thread_name_prefix='mito-import-prefetch')
+    futures = [
+        executor.submit(copy_context().run, _execute_step_to_prefetch, step, prev_state, prefetched_reads)
+        for step in steps_to_prefetch
+    ]
+    try:
+        yield prefetched_reads
+    finally:
+        _PREFETCHING_PANDAS.reset(token)
+        # We wait for the reads that are running, so no files are read once we're done. As 
+        # the steps take what is read, these reads are usually finished or stop right away
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+@contextmanager
+def prefetch_reads(reads: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]]) -> Iterator[PrefetchedReads]:
+    """
+    While in this context, the given pandas reads, as (reader name, args, kwargs),
+    are read at the same time on a pool of threads, and the code executed by steps 
+    on this thread uses what they read.
+
+    Used by steps that read more than one file, so reading them takes as long as 
+    reading the largest file, rather than all of them.
+    """
+    # If we are already prefetching the imports, we add these reads to it
+    prefetching_pandas = get_prefetching_pandas()
+    if prefetching_pandas is not None:
+        prefetched_reads = prefetching_pandas.prefetched_reads
+        take = prefetching_pandas.take
+    else:
+        prefetched_reads = PrefetchedReads()
+        take = True
+
+    token = _PREFETCHING_PANDAS.set(PrefetchingPandas(prefetched_reads, take=take))
+    executor = None
+    futures: List['Future[None]'] = []
+    if len(reads) > 1:
+        executor = ThreadPoolExecutor(max_workers=min(MAX_PREFETCH_WORKERS, len(reads)), thread_name_prefix='mito-read-prefetch')
+        futures = [executor.submit(prefetched_reads.prefetch, *read) for read in reads]
+    try:
+        yield prefetched_reads
+    finally:
+        _PREFETCHING_PANDAS.reset(token)
+        for future in futures:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=True)
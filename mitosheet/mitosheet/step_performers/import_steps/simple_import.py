@@ -3,7 +3,9 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
+import codecs
 import csv
+import locale
 import os
 from os.path import basename, normpath
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -14,7 +16,8 @@ import pandas as pd
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk import (
     DEFAULT_DECIMAL, DEFAULT_DELIMITER, DEFAULT_ENCODING,
-    DEFAULT_ERROR_BAD_LINES, DEFAULT_SKIPROWS, SimpleImportCodeChunk)
+    DEFAULT_ERROR_BAD_LINES, DEFAULT_SKIPROWS, SimpleImportCodeChunk,
+    get_read_csv_params)
 from mitosheet.errors import (make_file_not_found_error,
                               make_invalid_simple_import_error,
                               make_is_directory_error)
@@ -23,6 +26,14 @@ from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils.utils import get_param
 from mitosheet.utils import get_valid_dataframe_names
 
+# We guess the delimeter and encoding of a file from its first lines, rather than reading all of it
+SNIFF_SAMPLE_BYTES = 64 * 1024
+SNIFF_MAX_LINES = 100
+SNIFF_DELIMETERS = ',;\t|'
+MIN_ENCODING_CONFIDENCE = 0.5
+# When we check that an entire file can be decoded, we read it in chunks of this size
+DECODE_CHUNK_BYTES = 1024 * 1024
+
 
 class SimpleImportStepPerformer(StepPerformer):
     """
@@ -68,6 +79,8 @@ class SimpleImportStepPerformer(StepPerformer):
         new_df_names = []
 
         just_final_file_names = [basename(normpath(file_name)) for file_name in file_names]
+        # The indexes of the files we guessed the delimeter and encoding for
+        guessed_file_indexes = []
 
         pandas_processing_time = 0.0
         for index, (file_name, df_name) in enumerate(zip(file_names, get_valid_dataframe_names(post_state.df_names, just_final_file_names))):
@@ -86,7 +99,8 @@ class SimpleImportStepPerformer(StepPerformer):
                 delimeter = delimeters[index]
                 encoding = encodings[index]
             else:
-                _, delimeter, encoding = read_csv_get_delimiter_and_encoding(file_name)
+                delimeter, encoding = guess_delimeter_and_encoding(file_name)
+                guessed_file_indexes.append(index)
                 
             decimal = decimals[index] if decimals is not None else DEFAULT_DECIMAL
             _skiprows = skiprows[index] if skiprows is not None else DEFAULT_SKIPROWS
@@ -113,19 +127,82 @@ class SimpleImportStepPerformer(StepPerformer):
         }
 
         try:
-            return cls.execute_through_transpile(
+            return cls._execute_reading_files_concurrently(prev_state, params, execution_data, file_names, use_deprecated_id_algorithm)
+        except:
+            pass
+
+        # We only guess the delimeter and encoding from the start of the file, so if the import
+        # fails, we read the entire files to guess them, and try again
+        for index in guessed_file_indexes:
+            _, file_delimeters[index], file_encodings[index] = read_csv_get_delimiter_and_encoding(file_names[index])
+
+        # The encodings that were passed are often guessed from the start of the file as well 
+        # (see get_csv_files_metadata), so if the entire file cannot be decoded with them, we 
+        # guess them again from the entire file
+        passed_encodings = list(file_encodings)
+        for index, file_name in enumerate(file_names):
+            if index not in guessed_file_indexes and not is_url_to_file(file_name):
+                file_encodings[index] = guess_encoding_of_entire_file(file_name, file_encodings[index])
+
+        if len(guessed_file_indexes) == 0 and file_encodings == passed_encodings:
+            raise make_invalid_simple_import_error()
+
+        try:
+            return cls._execute_reading_files_concurrently(prev_state, params, execution_data, file_names, use_deprecated_id_algorithm)
+        except:
+            raise make_invalid_simple_import_error()
+
+    @classmethod
+    def _execute_reading_files_concurrently(
+        cls,
+        prev_state: State,
+        params: Dict[str, Any],
+        execution_data: Dict[str, Any],
+        file_names: List[str],
+        use_deprecated_id_algorithm: bool
+    ) -> Tuple[State, Optional[Dict[str, Any]]]:
+        """
+        Executes the import, reading the files at the same time, and saves how
+        fast each file was read (in bytes per second) in the execution data.
+        """
+        from mitosheet.step_performers.import_steps.import_prefetch import prefetch_reads
+
+        reads: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = [
+            (
+                'read_csv', 
+                (file_name, ), 
+                get_read_csv_params(
+                    execution_data['file_delimeters'][index], 
+                    execution_data['file_encodings'][index], 
+                    decimal=execution_data['file_decimals'][index], 
+                    skiprows=execution_data['file_skiprows'][index], 
+                    error_bad_lines=execution_data['file_error_bad_lines'][index]
+                )
+            )
+            for index, file_name in enumerate(file_names)
+        ]
+
+        with prefetch_reads(reads) as prefetched_reads:
+            post_state, new_execution_data = cls.execute_through_transpile(
                 prev_state,
                 params,
                 execution_data,
                 new_dataframe_params={
                     'df_source': DATAFRAME_SOURCE_IMPORTED,
-                    'new_df_names': new_df_names,
+                    'new_df_names': execution_data['new_df_names'],
                     'overwrite': None
                 },
                 use_deprecated_id_algorithm=use_deprecated_id_algorithm
             )
-        except:
-            raise make_invalid_simple_import_error()
+
+        file_read_bytes_per_second: List[Optional[float]] = []
+        for file_name, read in zip(file_names, reads):
+            read_time = prefetched_reads.get_read_time(*read)
+            file_size = os.path.getsize(file_name) if not is_url_to_file(file_name) else None
+            file_read_bytes_per_second.append(file_size / read_time if file_size is not None and read_time else None)
+        new_execution_data['file_read_bytes_per_second'] = file_read_bytes_per_second
+
+        return post_state, new_execution_data
 
     @classmethod
     def transpile(
@@ -185,14 +262,65 @@ def read_csv_get_delimiter_and_encoding(file_name: str) -> Tuple[pd.DataFrame, s
     return df, delimeter, encoding
 
 
+def read_file_sample(file_name: str) -> Tuple[bytes, bool]:
+    """
+    Returns the first SNIFF_SAMPLE_BYTES of the file, and if this is the
+    entire file.
+    """
+    with open(file_name, 'rb') as f:
+        sample = f.read(SNIFF_SAMPLE_BYTES + 1)
+    return sample[:SNIFF_SAMPLE_BYTES], len(sample) <= SNIFF_SAMPLE_BYTES
+
+
+def decode_sample(sample: bytes, encoding: Optional[str], is_entire_file: bool) -> Optional[str]:
+    """
+    Returns the sample decoded with the encoding, or None if it cannot be 
+    decoded with it. If the sample is not the entire file, a character cut
+    off at the end of the sample is ignored.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding if encoding is not None else locale.getpreferredencoding(False))()
+        return decoder.decode(sample, final=is_entire_file)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def sniff_delimeter(text: str, is_entire_file: bool) -> str:
+    """
+    Guesses the delimeter from the first lines of the file. If this does not
+    give a common delimeter, we fall back to guessing from the first line, and
+    then to the default delimeter.
+    """
+    lines = text.splitlines(True)
+    # Don't use the last line if it was cut off
+    if not is_entire_file and len(lines) > 1:
+        lines = lines[:-1]
+
+    s = csv.Sniffer()
+    try:
+        return s.sniff(''.join(lines[:SNIFF_MAX_LINES]), delimiters=SNIFF_DELIMETERS).delimiter
+    except csv.Error:
+        pass
+
+    try:
+        delimeter = s.sniff(lines[0] if len(lines) > 0 else '').delimiter
+    except csv.Error:
+        return DEFAULT_DELIMITER
+
+    # For files with a single column, the sniffer guesses a character from the header
+    return delimeter if not delimeter.isalnum() else DEFAULT_DELIMITER
+
+
 def guess_delimeter(file_name: str, encoding: Optional[str]=None) -> str:
     """
     Given a path to a file that is assumed to exist and be a CSV, this
     function guesses the delimeter that is used by that file
     """
-    s = csv.Sniffer()
-    with open(file_name, 'r', encoding=encoding) as f:
-        return s.sniff(f.readline()).delimiter
+    sample, is_entire_file = read_file_sample(file_name)
+    text = decode_sample(sample, encoding, is_entire_file)
+    if text is None:
+        raise UnicodeDecodeError(str(encoding), sample, 0, len(sample), 'could not decode the start of the file')
+    return sniff_delimeter(text, is_entire_file)
 
 def guess_encoding(file_name: str) -> str:
     """
@@ -200,9 +328,92 @@ def guess_encoding(file_name: str) -> str:
     at the given file_name
     """
     # Attempt to determine the encoding and try again. 
+    sample, _ = read_file_sample(file_name)
+    return detect_encoding(sample)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Uses chardet to guess the encoding of the sample. As chardet often makes
+    a low confidence guess of an unusual encoding for files that are latin-1, 
+    we use latin-1 if it is not confident.
+    """
+    result = chardet.detect(sample)
+    if result['encoding'] is None or result['confidence'] < MIN_ENCODING_CONFIDENCE:
+        return 'latin-1'
+    return result['encoding']
+
+
+def guess_delimeter_and_encoding(file_name: str) -> Tuple[str, str]:
+    """
+    Guesses the delimeter and encoding of the file from the start of it, 
+    without reading the entire file.
+    """
+    if is_url_to_file(file_name):
+        return DEFAULT_DELIMITER, DEFAULT_ENCODING
+
+    sample, is_entire_file = read_file_sample(file_name)
+    text, encoding = decode_sample_guessing_encoding(sample, is_entire_file)
+    return sniff_delimeter(text, is_entire_file), encoding
+
+
+def decode_sample_guessing_encoding(sample: bytes, is_entire_file: bool) -> Tuple[str, str]:
+    """
+    Returns the decoded sample, and the encoding we guess it has.
+    """
+    encoding = DEFAULT_ENCODING
+    text = decode_sample(sample, encoding, is_entire_file)
+    if text is None:
+        # If we have an encoding error, try and get the encoding. Sometimes chardet 
+        # guesses 'ascii' when we want 'latin-1', so if this fails, we try latin-1
+        encoding = detect_encoding(sample)
+        text = decode_sample(sample, encoding, is_entire_file)
+        if text is None:
+            encoding = 'latin-1'
+            text = sample.decode(encoding)
+
+    return text, encoding
+
+
+def get_undecodable_chunk(file_name: str, encoding: str) -> Optional[bytes]:
+    """
+    Returns the chunk of the file that cannot be decoded with the encoding, or None
+    if the entire file can be decoded with it. The file is decoded a chunk at a time,
+    so that we never have all of it in memory.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+    except LookupError:
+        return b''
+
     with open(file_name, 'rb') as f:
-        result = chardet.detect(f.readline())
-        return result['encoding']
+        while True:
+            chunk = f.read(DECODE_CHUNK_BYTES)
+            try:
+                decoder.decode(chunk, final=len(chunk) == 0)
+            except UnicodeDecodeError:
+                return chunk
+            if len(chunk) == 0:
+                return None
+
+
+def guess_encoding_of_entire_file(file_name: str, encoding: str) -> str:
+    """
+    Returns the encoding if the entire file can be decoded with it, and otherwise
+    guesses the encoding again from where the file cannot be decoded. As this reads
+    the entire file, we only do this once reading the file with the encoding fails.
+    """
+    undecodable_chunk = get_undecodable_chunk(file_name, encoding)
+    if undecodable_chunk is None:
+        return encoding
+    
+    sample, _ = read_file_sample(file_name)
+    new_encoding = detect_encoding(sample + undecodable_chunk)
+    if new_encoding != encoding and get_undecodable_chunk(file_name, new_encoding) is None:
+        return new_encoding
+
+    # Every file can be decoded as latin-1
+    return 'latin-1'
 
 
 def is_url_to_file(file_name: str) -> bool:
@@ -136,7 +136,10 @@ class StepPerformer(ABC, object):
         if modified_dataframe_indexes == {-1}:
             modified_dataframe_indexes = set()
 
-        post_state = prev_state.copy(deep_sheet_indexes=modified_dataframe_indexes)
+        post_state = prev_state.copy(
+            deep_sheet_indexes=modified_dataframe_indexes, 
+            modified_column_ids=cls.get_modified_column_ids(params)
+        )
 
         code_chunks = cls.transpile(post_state, params, execution_data)
         code = []
@@ -149,7 +152,7 @@ class StepPerformer(ABC, object):
 
         # TODO: this is weird. This will not always be updated, accoring to exec documentation, 
         # but in practice is seems to work...
-        exec_globals = get_globals_for_exec(post_state, post_state.public_interface_version)
+        exec_globals = get_globals_for_exec(post_state, post_state.public_interface_version, cls.step_type())
         exec_locals = {**exec_globals}
         
         pandas_start_time = perf_counter()
@@ -239,4 +242,31 @@ class StepPerformer(ABC, object):
         If it returned -1, then it modified all new dataframes (on
         the left side of the dfs array).
         """
-        pass
\ No newline at end of file
+        pass
+
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        """
+        Returns a mapping from sheet index to the column ids that this
+        step writes to in place. When executing through transpile, only 
+        these columns are copied, and the rest of the data and metadata 
+        is shared with the previous state.
+
+        Only override this if the transpiled code writes in place to no other
+        existing columns, and execute only edits the metadata of these sheets.
+        By default, this returns None, and the modified dataframes are fully copied.
+        """
+        return None
+
+    @classmethod
+    def get_input_column_ids(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        """
+        Returns a mapping from sheet index to the column ids that the result
+        of this step depends on. An empty set means the step reads the structure 
+        of the sheet (e.g. the column headers) but none of the data in it.
+
+        This is used to only re-execute the steps that depend on the columns 
+        changed by an edit, see mitosheet/step_dependencies.py. By default, this 
+        returns None, which means the step depends on all of the data in all sheets.
+        """
+        return None
@@ -23,12 +23,16 @@ from mitosheet.step_performers.import_steps.excel_range_import import ExcelRange
 from mitosheet.step_performers.user_defined_import import UserDefinedImportStepPerformer
 from mitosheet.telemetry.telemetry_utils import log
 from mitosheet.preprocessing import PREPROCESS_STEP_PERFORMERS
+from mitosheet.preprocessing.preprocess_copy import CopyPreprocessStepPerformer
 from mitosheet.saved_analyses.save_utils import get_analysis_exists
-from mitosheet.state import State
+from mitosheet.state import State, is_copy_on_write_copy_supported
+from mitosheet.state_eviction import evict_states_over_memory_budget, recompute_evicted_states
+from mitosheet.step_dependencies import ChangedColumns, can_reuse_post_state, get_input_column_ids, reuse_post_state
 from mitosheet.step import Step
 from mitosheet.step_performers import EVENT_TYPE_TO_STEP_PERFORMER
 from mitosheet.step_performers.import_steps.excel_import import \
     ExcelImportStepPerformer
+from mitosheet.step_performers.import_steps.import_prefetch import prefetch_import_steps
 from mitosheet.step_performers.import_steps.simple_import import \
     SimpleImportStepPerformer
 from mitosheet.step_performers.import_steps.snowflake_import import \
@@ -38,23 +42,79 @@ from mitosheet.transpiler.transpile_utils import get_default_code_options
 from mitosheet.types import CodeOptions, ColumnDefinintion, ColumnDefinitions, DefaultEditingMode, MitoTheme, ParamMetadata
 from mitosheet.updates import UPDATES
 from mitosheet.user.utils import is_enterprise, is_pro, is_running_test
+from mitosheet.column_statistics import ColumnStatisticsCache
+from mitosheet.search_index import SearchIndex
+from mitosheet.sheet_data_cache import SheetDataCache
 from mitosheet.utils import NpEncoder, dfs_to_array_for_json, get_default_df_formats, get_new_id, is_default_df_names
 from mitosheet.step_performers.utils.user_defined_function_utils import get_user_defined_importers_for_frontend, get_user_defined_editors_for_frontend
 from mitosheet.step_performers.utils.user_defined_function_utils import validate_and_wrap_sheet_functions, validate_user_defined_editors
 
+class StepSkipIndex:
+    """
+    Collects the indexes of the steps that should be skipped in a list of
+    steps, as steps are added to the end of it. 
+
+    This gives the same result as calling Step.step_indexes_to_skip with all 
+    the steps before each step, but rather than scanning all the previous 
+    steps for each step, it keeps the index of the last step with each step_id
+    and each filter key, so adding a step is O(1).
+    """
+
+    def __init__(self, step_list: Optional[List[Step]]=None):
+        self.step_indexes_to_skip: Set[int] = set()
+        self._num_steps = 0
+        self._previous_step: Optional[Step] = None
+        self._last_step_index_by_step_id: Dict[str, int] = {}
+        self._last_step_index_by_filter_key: Dict[Tuple[Any, Any], int] = {}
+
+        if step_list is not None:
+            for step in step_list:
+                self.append(step)
+
+    def append(self, step: Step) -> Set[int]:
+        """
+        Adds the step to the end of the list, and returns the indexes of the
+        steps before it that it skips. 
+        
+        NOTE: this does not include steps that were already skipped by a step
+        after them, as these steps stay skipped whether this step is there or not.
+        """
+        step_index = self._num_steps
+        skipped_step_indexes: Set[int] = set()
+
+        # As steps skip all the steps before them with the same step_id or filter key,
+        # all the steps before the last one were already skipped by it
+        last_step_index = self._last_step_index_by_step_id.get(step.step_id)
+        if last_step_index is not None:
+            skipped_step_indexes.add(last_step_index)
+        self._last_step_index_by_step_id[step.step_id] = step_index
+
+        filter_key = step.get_filter_key()
+        if filter_key is not None:
+            last_step_index = self._last_step_index_by_filter_key.get(filter_key)
+            if last_step_index is not None:
+                skipped_step_indexes.add(last_step_index)
+            self._last_step_index_by_filter_key[filter_key] = step_index
+
+        if self._previous_step is not None and step.overwrites_formula_step(self._previous_step):
+            skipped_step_indexes.add(step_index - 1)
+
+        self.step_indexes_to_skip.update(skipped_step_indexes)
+        self._num_steps += 1
+        self._previous_step = step
+
+        return skipped_step_indexes
+
+    def __len__(self) -> int:
+        return self._num_steps
+
+
 def get_step_indexes_to_skip(step_list: List[Step]) -> Set[int]:
     """
     Given a list of steps, will collect all of the steps
     from this list that should be skipped.
     """
-    step_indexes_to_skip: Set[int] = set()
-
-    for step_index, step in enumerate(step_list):
-        step_indexes_to_skip = step_indexes_to_skip.union(
-            step.step_indexes_to_skip(step_list[:step_index])
-        )
-
-    return step_indexes_to_skip
+    return StepSkipIndex(step_list).step_indexes_to_skip
 
 
 def execute_step_list_from_index(
@@ -83,25 +143,63 @@ def execute_step_list_from_index(
     new_step_list = step_list[: start_index + 1]
     last_valid_step = step_list[start_index]
 
-    for partial_index, step in enumerate(step_list[start_index + 1 :]):
-        step_index = partial_index + start_index + 1
-        # If we're skipping a step, add it to the new step list (since we don't
-        # want to lose it), but don't reexecute it
-        if step_index in step_indexes_to_skip:
-            new_step_list.append(step)
-            continue
+    # We keep track of the steps we actually executed, to pass them to the steps we execute
+    non_skipped_steps = [step for index, step in enumerate(new_step_list) if index not in step_indexes_to_skip]
+
+    # We keep track of the state from the previous execution of these steps that
+    # the last valid step corresponds to, and which columns differ from it, so
+    # that we only reexecute the steps that depend on what changed
+    previous_final_state = last_valid_step.final_defined_state
+    changed_columns = ChangedColumns()
+
+    # The imports that have not been executed before can read their files at the same 
+    # time, on other threads, while we execute the steps in order. See import_prefetch.py
+    new_steps_to_execute = [
+        step for step_index, step in enumerate(step_list[start_index + 1 :], start_index + 1) 
+        if step_index not in step_indexes_to_skip and step.prev_state is None
+    ]
+
+    with prefetch_import_steps(new_steps_to_execute, last_valid_step.final_defined_state):
+        for partial_index, step in enumerate(step_list[start_index + 1 :]):
+            step_index = partial_index + start_index + 1
+            previously_executed_from_final_state = step.prev_state is not None and step.prev_state is previous_final_state
+
+            # If we're skipping a step, add it to the new step list (since we don't
+            # want to lose it), but don't reexecute it
+            if step_index in step_indexes_to_skip:
+                # If this step was not skipped before, then what it modified is now changed
+                if previously_executed_from_final_state:
+                    changed_columns.add_step_modifications(step)
+                    previous_final_state = step.final_defined_state
+
+                new_step_list.append(step)
+                continue
             
-        # Create a new step with the same params
-        new_step = Step(step.step_type, step.step_id, step.params)
+            # Create a new step with the same params
+            new_step = Step(step.step_type, step.step_id, step.params)
+
+            if previously_executed_from_final_state and can_reuse_post_state(step, last_valid_step.final_defined_state, changed_columns):
+                # Nothing this step depends on has changed, so we reuse what it computed last time
+                new_step.prev_state = last_valid_step.final_defined_state
+                new_step.post_state = reuse_post_state(step, last_valid_step.final_defined_state)
+                new_step.execution_data = step.execution_data
+            else:
+                # Set the previous state of the new step, and then update
+                # what the last valid step is. Note that we find the actually
+                # executed steps before passing them
+                new_step.set_prev_state_and_execute(last_valid_step.final_defined_state, non_skipped_steps)
+
+                # If this step is new, or read changed columns, then what it modifies is changed
+                if not previously_executed_from_final_state or changed_columns.intersects(get_input_column_ids(new_step, last_valid_step.final_defined_state)):
+                    changed_columns.add_step_modifications(new_step)
 
-        # Set the previous state of the new step, and then update
-        # what the last valid step is. Note that we find the actually
-        # executed steps before passing them
-        non_skipped_steps = [step for index, step in enumerate(new_step_list) if index not in step_indexes_to_skip]
-        new_step.set_prev_state_and_execute(last_valid_step.final_defined_state, non_skipped_steps)
-        last_valid_step = new_step
+            if previously_executed_from_final_state:
+                previous_final_state = step.final_defined_state
 
-        new_step_list.append(new_step)
+            last_valid_step = new_step
+
+            new_step_list.append(new_step)
+            non_skipped_steps.append(new_step)
 
     return new_step_list
 
@@ -191,6 +289,7 @@ class StepsManager:
             default_editing_mode: Optional[DefaultEditingMode]=None,
             theme: Optional[MitoTheme]=None,
             input_cell_execution_count: Optional[int]=None,
+            copy_args: bool=True,
         ):
         """
         When initalizing the StepsManager, we also do preprocessing
@@ -214,10 +313,15 @@ class StepsManager:
         # inside this folder
         self.import_folder = import_folder
 
+        # If copy_args is False, the caller promises not to change the dataframes it passes, and
+        # so we can share them rather than copying them (e.g. between many sessions with the same
+        # data). This is safe as steps never change the dataframes in a state in place (see State.copy)
+        share_args = not copy_args and is_copy_on_write_copy_supported()
+
         # The args are a tuple of dataframes or strings, and we start by making them
         # into a list, and making copies of them for safe keeping
         self.original_args = [
-            arg.copy(deep=True) if isinstance(arg, pd.DataFrame) else deepcopy(arg)
+            arg if share_args else (arg.copy(deep=True) if isinstance(arg, pd.DataFrame) else deepcopy(arg))
             for arg in args
         ]
 
@@ -226,7 +330,10 @@ class StepsManager:
         self.preprocess_execution_data = {}
         df_names = None
         for preprocess_step_performer in PREPROCESS_STEP_PERFORMERS:
-            args, df_names, execution_data = preprocess_step_performer.execute(args)
+            if share_args and preprocess_step_performer is CopyPreprocessStepPerformer:
+                args, df_names, execution_data = [arg.copy(deep=False) if isinstance(arg, pd.DataFrame) else arg for arg in args], None, None
+            else:
+                args, df_names, execution_data = preprocess_step_performer.execute(args)
             self.preprocess_execution_data[
                 preprocess_step_performer.preprocess_step_type()
             ] = execution_data    
@@ -310,6 +417,7 @@ class StepsManager:
         # into json, so that we can package it and send it to the front-end
         # faster and with less work. Make sure to cache the starting values
         # for the saved sheet data
+        self.sheet_data_cache = SheetDataCache()
         self.saved_sheet_data: List[Dict] = dfs_to_array_for_json(
             self.curr_step.final_defined_state,
             set(range(len(args))),
@@ -321,9 +429,18 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            self.sheet_data_cache
         )
         self.last_step_index_we_wrote_sheet_json_on = 0
 
+        # The strings we search in each column of the sheets, built when the sheet is first searched
+        self.search_index = SearchIndex()
+
+        # The statistics of the columns that were looked at most recently, for the column control panel
+        self.column_statistics_cache = ColumnStatisticsCache(
+            approximate_statistics_min_rows=mito_config.approximate_statistics_min_rows
+        )
+
         # We store the number of update events that have been processed successfully,
         # which allows us to have some awareness about undos and redos in the front-end
         self.update_event_count = 0
@@ -336,6 +453,14 @@ class StepsManager:
         # that corresponds to that backend
         self.render_count = 0
 
+        # The version is incremented on every edit or update event, and whenever steps are 
+        # executed, so data computed from the steps manager can be cached until it changes
+        self.version = 0
+
+        # The code, and the version and code options it was transpiled for. The code is used
+        # both for the frontend and for saving the analysis, so we only transpile it once
+        self._code_cache: Optional[Tuple[Any, List[str]]] = None
+
         # We store the experiment that is currently being run for this user
         self.experiment = get_current_experiment()
 
@@ -378,6 +503,14 @@ class StepsManager:
         for speed reasons. This results in way less data getting
         passed around
         """
+        return self.get_sheet_data_json()
+
+    def get_sheet_data_json(self, sheet_data_id: Optional[str]=None, received_sheet_data_id: Optional[str]=None) -> str:
+        """
+        Returns the sheet_data_json. If sheet_data_id is passed, the data of the columns
+        in the sheet data with received_sheet_data_id, which the frontend already has, 
+        is not sent again (see SheetDataCache.get_sheet_data_array_json).
+        """
         modified_sheet_indexes = get_modified_sheet_indexes(
             self.steps_including_skipped, self.last_step_index_we_wrote_sheet_json_on, self.curr_step_idx
         )
@@ -393,12 +526,15 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            self.sheet_data_cache
         )
 
         self.saved_sheet_data = array
         self.last_step_index_we_wrote_sheet_json_on = self.curr_step_idx
 
-        return json.dumps(array, cls=NpEncoder)
+        return self.sheet_data_cache.get_sheet_data_array_json(
+            array, encoder=NpEncoder, sheet_data_id=sheet_data_id, received_sheet_data_id=received_sheet_data_id
+        )
 
     @property
     def analysis_data_json(self):
@@ -463,11 +599,7 @@ class StepsManager:
             
             # NOTE: we cannot and should not optimize the code chunks here, as
             # rely on getting data out of them is to label the steps correctly
-            code_chunks = step.step_performer.transpile(
-                step.prev_state, # type: ignore
-                step.params,
-                step.execution_data,
-            )
+            code_chunks = step.get_code_chunks()
 
             step_summary_list.append(
                 {
@@ -484,7 +616,17 @@ class StepsManager:
         return step_summary_list
     
     def code(self) -> List[str]:
-        return transpile(self, optimize=True)
+        code_cache_key = (
+            self.version, 
+            self.curr_step_idx, 
+            len(self.steps_including_skipped), 
+            id(self.steps_including_skipped[-1]), 
+            json.dumps(self.code_options, sort_keys=True, default=str)
+        )
+        if self._code_cache is None or self._code_cache[0] != code_cache_key:
+            self._code_cache = (code_cache_key, transpile(self, optimize=True))
+
+        return copy(self._code_cache[1])
     
     @property
     def fully_parameterized_function(self) -> str:
@@ -519,6 +661,8 @@ class StepsManager:
         function will not create the new invalid step.
         """
 
+        self.version += 1
+
         # NOTE: We ignore any edit if we are in a historical state, for now. This is a result
         # of the fact that we don't allow previous editing currently
         if self.curr_step_idx != len(self.steps_including_skipped) - 1:
@@ -565,6 +709,7 @@ class StepsManager:
         other types of new data coming from the frontend (e.g. the df names
         or some existing steps).
         """
+        self.version += 1
 
         for update in UPDATES:
             if update_event["type"] == update["event_type"]:
@@ -592,33 +737,30 @@ class StepsManager:
             # we are losing, and run from right before where we are no longer
             # skipped steps
             no_longer_skipped_indexes: Set[int] = set()
-            for step_index, removed_step in enumerate(self.steps_including_skipped[len(new_steps) :]):
-                previous_steps = self.steps_including_skipped[: len(new_steps) + step_index]
-                no_longer_skipped_indexes = no_longer_skipped_indexes.union(
-                    removed_step.step_indexes_to_skip(previous_steps)
-                )
+            step_skip_index = StepSkipIndex(self.steps_including_skipped[: len(new_steps)])
+            for removed_step in self.steps_including_skipped[len(new_steps) :]:
+                no_longer_skipped_indexes.update(step_skip_index.append(removed_step))
 
             last_valid_index = (
                 min(no_longer_skipped_indexes.union({len(new_steps)})) - 1
             )
+            all_skipped_indexes = get_step_indexes_to_skip(new_steps)
         else:
             # Otherwise, if we're adding steps, we figure out which skipped steps
             # we're adding, and run from right before the oldest new skipped step
 
             # Collect anything that is newly skipped
             newly_skipped_indexes: Set[int] = set()
-            for step_index, new_step in enumerate(new_steps[len(self.steps_including_skipped) :]):
-                previous_steps = new_steps[: len(self.steps_including_skipped) + step_index]
-                newly_skipped_indexes = newly_skipped_indexes.union(
-                    new_step.step_indexes_to_skip(previous_steps)
-                )
+            step_skip_index = StepSkipIndex(new_steps[: len(self.steps_including_skipped)])
+            for new_step in new_steps[len(self.steps_including_skipped) :]:
+                newly_skipped_indexes.update(step_skip_index.append(new_step))
 
             # The last valid index is the minimum of the newly skipped things - 1
             # or the last valid step (if nothing is skipped)
             last_valid_index = min(newly_skipped_indexes.union({len(self.steps_including_skipped)})) - 1
+            all_skipped_indexes = step_skip_index.step_indexes_to_skip
 
         # Make sure that this step isn't itself skipped, and decrement until it is not
-        all_skipped_indexes = get_step_indexes_to_skip(new_steps)
         while last_valid_index in all_skipped_indexes:
             last_valid_index -= 1
 
@@ -765,18 +907,63 @@ class StepsManager:
         if last_valid_index is None:
             last_valid_index = self.find_last_valid_index(new_steps)
 
+        # The state we execute from might have been evicted to save memory, so we recompute it
+        state_recompute_time = recompute_evicted_states(new_steps, last_valid_index, get_step_indexes_to_skip(new_steps))
+
         final_steps = execute_step_list_from_index(
             new_steps, start_index=last_valid_index
         )
         self.steps_including_skipped = final_steps
         self.curr_step_idx = len(self.steps_including_skipped) - 1
 
+        num_states_evicted = self.evict_states_over_memory_budget()
+        if num_states_evicted > 0 or state_recompute_time > 0:
+            self.curr_step.execution_data['num_states_evicted'] = num_states_evicted
+            self.curr_step.execution_data['state_recompute_time'] = state_recompute_time
+
+    def evict_states_over_memory_budget(self) -> int:
+        """
+        If the user has configured a memory budget for the step history, evicts the 
+        states of the steps until the step history is under this budget. 
+        
+        Returns the number of states evicted.
+        """
+        state_memory_budget_mb = self.mito_config.state_memory_budget_mb
+        if state_memory_budget_mb is None:
+            return 0
+
+        return evict_states_over_memory_budget(
+            self.steps_including_skipped,
+            self.curr_step_idx,
+            get_step_indexes_to_skip(self.steps_including_skipped),
+            state_memory_budget_mb * 1024 * 1024,
+            self.mito_config.state_checkpoint_interval,
+            self.mito_config.state_eviction_policy
+        )
+
+    def checkout_step_by_idx(self, step_idx: int) -> None:
+        """
+        Checks out the step at step_idx, recomputing its state if it has 
+        been evicted to save memory.
+        """
+        self.curr_step_idx = step_idx
+
+        state_recompute_time = recompute_evicted_states(
+            self.steps_including_skipped, step_idx, get_step_indexes_to_skip(self.steps_including_skipped)
+        )
+        num_states_evicted = self.evict_states_over_memory_budget()
+        if num_states_evicted > 0 or state_recompute_time > 0:
+            self.curr_step.execution_data['num_states_evicted'] = num_states_evicted
+            self.curr_step.execution_data['state_recompute_time'] = state_recompute_time
+
     def execute_steps_data(self, new_steps_data: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         Given steps data (e.g. from a saved analysis), will turn
         this data  into steps and try to run them. If any of them
         fail, will take none of the new steps
         """
+        self.version += 1
+
         new_steps = copy(self.steps_including_skipped)
         if new_steps_data:
             for step_data in new_steps_data:
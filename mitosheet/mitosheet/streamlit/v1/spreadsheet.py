@@ -50,6 +50,85 @@ def get_dataframe_hash(df: pd.DataFrame) -> bytes:
     
     return _get_dataframe_hash(df)
 
+class SpreadsheetPayloadCache:
+    """
+    Streamlit reruns the whole script whenever any widget on the page changes, and so
+    the spreadsheet is rendered again even if nothing in the Mito backend changed. 
+
+    This caches the json that is passed to the spreadsheet component, and only recomputes 
+    it when the version of the steps manager changes (e.g. after an edit, undo or update).
+
+    It also compacts the responses that the frontend has told us it has received. As the 
+    frontend only adds the responses past the number of responses it already has, we keep
+    an entry for each response, but replace the received ones with just their id and event.
+    """
+
+    def __init__(self, mito_backend: MitoBackend, responses: List[Dict[str, Any]]):
+        self.mito_backend = mito_backend
+        self.responses = responses
+        self.num_received_responses = 0
+
+        self._version: Optional[int] = None
+        self._sheet_data_json = ''
+        self._analysis_data_json = ''
+        self._user_profile_json = ''
+        self._code = ''
+
+        self._responses_json = ''
+        self._responses_json_key: Optional[Tuple[int, int]] = None
+
+    def _update(self) -> None:
+        version = self.mito_backend.steps_manager.version
+        if version == self._version:
+            return
+        
+        self._sheet_data_json = self.mito_backend.steps_manager.sheet_data_json
+        self._analysis_data_json = self.mito_backend.steps_manager.analysis_data_json
+        self._user_profile_json = self.mito_backend.get_user_profile_json()
+        self._code = "\n".join(self.mito_backend.steps_manager.code())
+        self._version = version
+
+    @property
+    def sheet_data_json(self) -> str:
+        self._update()
+        return self._sheet_data_json
+
+    @property
+    def analysis_data_json(self) -> str:
+        self._update()
+        return self._analysis_data_json
+
+    @property
+    def user_profile_json(self) -> str:
+        self._update()
+        return self._user_profile_json
+
+    @property
+    def code(self) -> str:
+        self._update()
+        return self._code
+
+    def set_num_received_responses(self, num_received_responses: int) -> None:
+        """
+        Called with the number of responses the frontend has received, so we don't
+        have to send them again.
+        """
+        num_received_responses = min(num_received_responses, len(self.responses))
+        for index in range(self.num_received_responses, num_received_responses):
+            response = self.responses[index]
+            self.responses[index] = {'event': response.get('event'), 'id': response.get('id')}
+        self.num_received_responses = max(self.num_received_responses, num_received_responses)
+
+    @property
+    def responses_json(self) -> str:
+        # Responses are only ever added to the end of the list, or compacted
+        responses_json_key = (len(self.responses), self.num_received_responses)
+        if responses_json_key != self._responses_json_key:
+            self._responses_json = json.dumps(self.responses[:responses_json_key[0]])
+            self._responses_json_key = responses_json_key
+        return self._responses_json
+
+
 def do_dynamic_imports(code: str) -> None:
     """
     When you get back Mito code, and you want to execute it, it requires imports defined in the global scope
@@ -276,7 +355,7 @@ try:
             df_names: Optional[List[str]]=None,
             session_id: Optional[str]=None,
             key: Optional[str]=None # So it caches on key
-        ) -> Tuple[MitoBackend, List[Any]]: 
+        ) -> Tuple[MitoBackend, List[Any], SpreadsheetPayloadCache]: 
 
         mito_backend = MitoBackend(
             *args, 
@@ -306,7 +385,7 @@ try:
                 }
             )
 
-        return mito_backend, responses
+        return mito_backend, responses, SpreadsheetPayloadCache(mito_backend, responses)
 
     def message_passer_component(key: Optional[str]=None) -> Any:
         """
@@ -367,7 +446,7 @@ try:
         """
         session_id = get_session_id()
 
-        mito_backend, responses = _get_mito_backend(
+        mito_backend, responses, payload_cache = _get_mito_backend(
             *args, 
             _sheet_functions=sheet_functions,
             _importers=importers, 
@@ -387,11 +466,10 @@ try:
         if key is None:
             key = mito_backend.analysis_name
 
-        sheet_data_json = mito_backend.steps_manager.sheet_data_json,
-        analysis_data_json = mito_backend.steps_manager.analysis_data_json,
-        user_profile_json = mito_backend.get_user_profile_json()
-
         msg = message_passer_component(key=str(key) + 'message_passer')
+        if msg is not None and 'num_received_responses' in msg and msg['analysis_name'] == mito_backend.analysis_name:
+            payload_cache.set_num_received_responses(msg['num_received_responses'])
+
         if (
             msg is not None \
             and msg['id'] not in [response['id'] for response in responses] \
@@ -406,8 +484,12 @@ try:
             # when a component value is set, it is always returned by the message_passer_component
             # until a new component value is set            
             mito_backend.receive_message(msg)
-            
-        responses_json = json.dumps(responses)
+
+        # NOTE: these are only recomputed if the backend has changed since the last rerun
+        sheet_data_json = payload_cache.sheet_data_json
+        analysis_data_json = payload_cache.analysis_data_json
+        user_profile_json = payload_cache.user_profile_json
+        responses_json = payload_cache.responses_json
 
         # NOTE: selection is Optional -- as if the user has not set the return type as selected, we don't
         # waste a component value update setting the value
@@ -421,7 +503,7 @@ try:
 
         # We return a mapping from dataframe names to dataframes
         final_state = mito_backend.steps_manager.curr_step.final_defined_state
-        code = "\n".join(mito_backend.steps_manager.code())
+        code = payload_cache.code
 
         ordered_dict = OrderedDict()
         for df_name, df in zip(final_state.df_names, final_state.dfs):
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+An Aho-Corasick automaton, which finds all occurrences of many strings
+in a piece of text in a single pass over the text.
+
+We use this in the parser to find column headers in formulas, as running
+a separate search for every column header is slow on wide sheets.
+"""
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+class MultiStringMatcher:
+    """
+    Built once for a list of patterns, and then can be used to find the
+    occurrences of all of the patterns in any text in O(len(text) + number
+    of occurrences).
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+
+        # The trie: each node has transitions to children on a character, a failure
+        # link to the node for the longest proper suffix that is also in the trie,
+        # and the indexes of the patterns that end at this node (including through
+        # failure links)
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._failure: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+
+        # Empty patterns match at every position, so we handle them separately
+        self._empty_pattern_indexes = [pattern_index for pattern_index, pattern in enumerate(patterns) if pattern == '']
+
+        for pattern_index, pattern in enumerate(patterns):
+            if pattern == '':
+                continue
+
+            node = 0
+            for char in pattern:
+                next_node = self._transitions[node].get(char)
+                if next_node is None:
+                    next_node = len(self._transitions)
+                    self._transitions.append({})
+                    self._failure.append(0)
+                    self._outputs.append([])
+                    self._transitions[node][char] = next_node
+                node = next_node
+            self._outputs[node].append(pattern_index)
+
+        # Set the failure links breadth first, so the failure node is always done first
+        queue = deque(self._transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._transitions[node].items():
+                queue.append(child)
+
+                failure = self._failure[node]
+                while failure != 0 and char not in self._transitions[failure]:
+                    failure = self._failure[failure]
+                child_failure = self._transitions[failure].get(char, 0)
+                self._failure[child] = child_failure if child_failure != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._failure[child]]
+
+    def find_all(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Returns a mapping from pattern index to the (start, end) ranges of all
+        occurrences of that pattern in the text, in order. Overlapping occurrences
+        of the same pattern are all returned.
+        """
+        occurrences: Dict[int, List[Tuple[int, int]]] = {}
+
+        node = 0
+        for position, char in enumerate(text):
+            while node != 0 and char not in self._transitions[node]:
+                node = self._failure[node]
+            node = self._transitions[node].get(char, 0)
+
+            for pattern_index in self._outputs[node]:
+                end = position + 1
+                occurrences.setdefault(pattern_index, []).append((end - len(self.patterns[pattern_index]), end))
+
+        for pattern_index in self._empty_pattern_indexes:
+            occurrences[pattern_index] = [(position, position) for position in range(len(text) + 1)]
+
+        return occurrences
+
+    def find_all_non_overlapping(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Returns the same occurrences as re.finditer(re.escape(pattern), text) would
+        for each pattern: scanning left to right, and skipping occurrences that
+        overlap with the previous occurrence of the same pattern.
+        """
+        non_overlapping_occurrences: Dict[int, List[Tuple[int, int]]] = {}
+        for pattern_index, occurrences in self.find_all(text).items():
+            if self.patterns[pattern_index] == '':
+                non_overlapping_occurrences[pattern_index] = occurrences
+                continue
+
+            kept_occurrences = []
+            last_end = 0
+            for start, end in occurrences:
+                if start >= last_end:
+                    kept_occurrences.append((start, end))
+                    last_end = end
+            non_overlapping_occurrences[pattern_index] = kept_occurrences
+
+        return non_overlapping_occurrences
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the pool of worker threads that handles API calls.
+"""
+import time
+from threading import Event
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from mitosheet.api.api_worker_pool import (HEAVY_LANE, INTERACTIVE_LANE,
+                                           APICall, APICallCancelledError,
+                                           APIWorkerPool, StepsManagerSnapshot,
+                                           raise_if_api_call_cancelled)
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def get_event(api_call_type: str, column_id: Any=None, **kwargs: Any) -> Dict[str, Any]:
+    params = {'sheet_index': 0, 'column_id': column_id} if column_id is not None else {'sheet_index': 0}
+    return {'event': 'api_call', 'id': str(time.perf_counter()), 'type': api_call_type, 'params': params, **kwargs}
+
+
+def wait_for(condition: Any, timeout: float=5) -> None:
+    start_time = time.perf_counter()
+    while not condition() and time.perf_counter() - start_time < timeout:
+        time.sleep(0.005)
+    assert condition()
+
+
+class RecordingPool:
+    """
+    A worker pool whose API calls block until they are released.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self.started: List[APICall] = []
+        self.finished: List[APICall] = []
+        self.dropped: List[APICall] = []
+        self.release = Event()
+        self.pool = APIWorkerPool(self.handle_api_call, self.dropped.append, **kwargs)
+
+    def handle_api_call(self, api_call: APICall) -> None:
+        self.started.append(api_call)
+        self.release.wait(5)
+        self.finished.append(api_call)
+
+    def submit(self, event: Dict[str, Any]) -> APICall:
+        api_call = APICall(event, None) # type: ignore
+        self.pool.submit(api_call)
+        return api_call
+
+
+def test_api_calls_are_split_into_lanes():
+    assert APICall(get_event('get_column_summary_graph', 'A'), None).lane == HEAVY_LANE # type: ignore
+    assert APICall(get_event('get_column_describe', 'A'), None).lane == INTERACTIVE_LANE # type: ignore
+    assert APICall(get_event('get_search_matches'), None).lane == INTERACTIVE_LANE # type: ignore
+
+
+def test_heavy_api_call_does_not_block_interactive_api_calls():
+    finished_types: List[str] = []
+    release_heavy = Event()
+
+    def handle_api_call(api_call: APICall) -> None:
+        if api_call.lane == HEAVY_LANE:
+            release_heavy.wait(5)
+        finished_types.append(api_call.event['type'])
+
+    pool = APIWorkerPool(handle_api_call, lambda api_call: None)
+    pool.submit(APICall(get_event('get_column_summary_graph', 'A'), None)) # type: ignore
+    pool.submit(APICall(get_event('get_column_describe', 'A'), None)) # type: ignore
+
+    wait_for(lambda: finished_types == ['get_column_describe'])
+    release_heavy.set()
+    wait_for(lambda: finished_types == ['get_column_describe', 'get_column_summary_graph'])
+
+
+def test_superseded_api_calls_are_cancelled():
+    recording_pool = RecordingPool(lane_num_workers={INTERACTIVE_LANE: 1, HEAVY_LANE: 1})
+
+    running = recording_pool.submit(get_event('get_unique_value_counts', 'A'))
+    wait_for(lambda: len(recording_pool.started) == 1)
+    queued = recording_pool.submit(get_event('get_unique_value_counts', 'A'))
+    other_column = recording_pool.submit(get_event('get_unique_value_counts', 'B'))
+    newest = recording_pool.submit(get_event('get_unique_value_counts', 'A'))
+
+    # The running call is told to stop, and the queued call is removed
+    assert running.cancelled
+    assert queued.cancelled
+    assert recording_pool.dropped == [queued]
+    assert not other_column.cancelled
+
+    recording_pool.release.set()
+    wait_for(lambda: len(recording_pool.finished) == 3)
+    assert recording_pool.finished == [running, other_column, newest]
+    assert not newest.cancelled
+
+    times = recording_pool.pool.api_call_times.times_info()['get_unique_value_counts']
+    assert times['num_calls'] == 3
+    assert times['num_cancelled'] == 2
+
+
+def test_full_lane_drops_oldest_api_call_but_not_priority():
+    recording_pool = RecordingPool(lane_num_workers={INTERACTIVE_LANE: 1, HEAVY_LANE: 1}, max_queued=2)
+
+    recording_pool.submit(get_event('get_render_count'))
+    wait_for(lambda: len(recording_pool.started) == 1)
+    priority = recording_pool.submit(get_event('get_params', priority=True))
+    first = recording_pool.submit(get_event('get_render_count'))
+    second = recording_pool.submit(get_event('get_render_count'))
+    third = recording_pool.submit(get_event('get_render_count'))
+
+    assert recording_pool.dropped == [first]
+    assert recording_pool.pool.api_call_times.times_info()['get_render_count']['num_dropped'] == 1
+
+    recording_pool.release.set()
+    wait_for(lambda: len(recording_pool.finished) == 4)
+    assert recording_pool.finished[1:] == [priority, second, third]
+
+
+def test_raise_if_api_call_cancelled():
+    errors: List[Exception] = []
+    started = Event()
+    cancelled = Event()
+
+    def handle_api_call(api_call: APICall) -> None:
+        started.set()
+        cancelled.wait(5)
+        try:
+            raise_if_api_call_cancelled()
+        except APICallCancelledError as e:
+            errors.append(e)
+
+    pool = APIWorkerPool(handle_api_call, lambda api_call: None)
+    pool.submit(APICall(get_event('get_column_describe', 'A'), None)) # type: ignore
+    started.wait(5)
+    pool.submit(APICall(get_event('get_column_describe', 'A'), None)) # type: ignore
+    cancelled.set()
+
+    wait_for(lambda: len(errors) == 1)
+    # Outside of an API call, there is nothing to cancel
+    raise_if_api_call_cancelled()
+
+
+def test_steps_manager_snapshot_reads_steps_from_when_it_was_taken():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    steps_manager = mito.mito_backend.steps_manager
+    snapshot = StepsManagerSnapshot(steps_manager)
+
+    mito.add_column(0, 'B')
+    mito.set_formula('=A + 1', 0, 'B')
+
+    assert list(snapshot.dfs[0].columns) == ['A']
+    assert list(snapshot.curr_step.final_defined_state.dfs[0].columns) == ['A']
+    assert snapshot.curr_step_idx == 0
+    assert len(snapshot.steps_including_skipped) == 1
+    assert list(steps_manager.dfs[0].columns) == ['A', 'B']
+    # The other attributes that API calls read are read from the steps manager
+    assert snapshot.column_statistics_cache is steps_manager.column_statistics_cache
+    assert snapshot.search_index is steps_manager.search_index
+    assert snapshot.mito_config is steps_manager.mito_config
+
+
+def test_api_responds_from_worker_threads():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 2]}))
+    responses: List[Dict[str, Any]] = []
+    mito.mito_backend.mito_send = responses.append
+
+    event = get_event('get_column_describe', 'A')
+    mito.mito_backend.api.process_new_api_call(event)
+
+    wait_for(lambda: len(responses) == 1)
+    assert responses[0]['id'] == event['id']
+    assert responses[0]['data']['count'] == '3.0'
+    wait_for(lambda: 'get_column_describe' in mito.mito_backend.api.api_call_times_info())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the column statistics cache used by the column control panel.
+"""
+import pandas as pd
+
+from mitosheet.api.get_column_describe import get_column_describe
+from mitosheet.api.get_column_summary_graph import _get_column_summary_graph, get_column_summary_graph
+from mitosheet.api.get_unique_value_counts import get_unique_value_counts
+from mitosheet.column_statistics import ApproximateColumnStatistics, ColumnStatistics, ColumnStatisticsCache
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def test_column_statistics_match_pandas():
+    series = pd.Series(['a', 'b', 'a', None, 'c', 'a', None])
+    column_statistics = ColumnStatistics(series, series.to_numpy())
+
+    assert column_statistics.value_counts.equals(series.value_counts(dropna=False))
+    assert column_statistics.normalized_value_counts.to_dict() == series.value_counts(normalize=True, dropna=False).to_dict()
+    assert column_statistics.num_nan == series.isna().sum()
+    assert column_statistics.nunique == series.nunique()
+    assert column_statistics.get_most_common_values(2) == series.value_counts().head(2).index.tolist()
+    assert column_statistics.describe.equals(series.describe())
+
+
+def test_column_statistics_computes_each_statistic_once():
+    series = pd.Series([1, 2, 2, 3])
+    column_statistics = ColumnStatistics(series, series.to_numpy())
+
+    num_computed = []
+    def compute():
+        num_computed.append(1)
+        return series.sum()
+
+    assert column_statistics.get_statistic('sum', compute) == 8
+    assert column_statistics.get_statistic('sum', compute) == 8
+    assert len(num_computed) == 1
+
+
+def test_column_statistics_cache_reuses_statistics_until_column_changes():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 2], 'B': ['x', 'y', 'x']}))
+    steps_manager = mito.mito_backend.steps_manager
+    column_statistics_cache: ColumnStatisticsCache = steps_manager.column_statistics_cache
+
+    params = {'sheet_index': 0, 'column_id': 'A'}
+    describe = get_column_describe(params, steps_manager)
+    column_statistics = column_statistics_cache.get_column_statistics(0, 'A', mito.dfs[0]['A'])
+    assert column_statistics_cache.hits == 1
+
+    # The describe and unique values of the same column use the same statistics
+    get_unique_value_counts({**params, 'search_string': '', 'sort': 'Descending Occurence'}, steps_manager)
+    assert column_statistics_cache.hits == 2
+    assert describe['count: NaN'] == '0'
+    assert describe['sum'] == '5'
+
+    # Editing another column does not change the statistics of this one
+    mito.set_formula('=B + "z"', 0, 'B')
+    assert column_statistics_cache.get_column_statistics(0, 'A', mito.dfs[0]['A']) is column_statistics
+
+    # Editing this column does
+    mito.set_formula('=A * 2', 0, 'A')
+    assert column_statistics_cache.get_column_statistics(0, 'A', mito.dfs[0]['A']) is not column_statistics
+    assert get_column_describe(params, steps_manager)['sum'] == '10'
+
+
+def test_unique_value_counts_does_not_change_cached_statistics():
+    mito = create_mito_wrapper(pd.DataFrame({'A': list(range(2000)) + [None]}))
+    steps_manager = mito.mito_backend.steps_manager
+
+    params = {'sheet_index': 0, 'column_id': 'A', 'search_string': '1', 'sort': 'Ascending Value'}
+    first = get_unique_value_counts(params, steps_manager)
+    # Searching a different value, then the same value again, gives the same result
+    get_unique_value_counts({**params, 'search_string': '2'}, steps_manager)
+    second = get_unique_value_counts(params, steps_manager)
+
+    assert first == second
+    assert not first['isAllData']
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(0, 'A', mito.dfs[0]['A'])
+    assert list(column_statistics.get_statistic('unique_value_counts_df', lambda: None).columns) == ['values', 'percents', 'counts']
+
+
+def test_approximate_column_statistics_estimate_statistics():
+    series = pd.Series(['a'] * 5000 + ['b'] * 3000 + ['c'] * 2000 + [None] * 1000)
+    column_statistics = ApproximateColumnStatistics(series, series.to_numpy(), sample_size=1000)
+
+    assert column_statistics.is_approximate
+    assert len(column_statistics.sample) == 1000
+    assert column_statistics.get_most_common_values(3) == ['a', 'b', 'c']
+    assert abs(column_statistics.value_counts['a'] - 5000) < 500
+    assert column_statistics.nunique == 3
+    assert column_statistics.includes_all_values
+    # The NaN count and number of values are exact
+    assert column_statistics.num_nan == 1000
+    assert column_statistics.describe['count'] == 10000
+    assert column_statistics.describe['unique'] == 3
+
+
+def test_approximate_column_statistics_exact_where_cheap():
+    series = pd.Series(range(100_000), dtype=float)
+    column_statistics = ApproximateColumnStatistics(series, series.to_numpy(), sample_size=1000)
+
+    for statistic in ['count', 'mean', 'std', 'min', 'max']:
+        assert column_statistics.describe[statistic] == series.describe()[statistic]
+    assert abs(column_statistics.median - series.median()) < 5000
+    assert column_statistics.sum == series.sum()
+    # All the values are unique, so most are not in the sample
+    assert column_statistics.nunique == 100_000
+    assert not column_statistics.includes_all_values
+
+
+def test_column_statistics_cache_approximate_for_large_columns():
+    small = pd.Series(range(10))
+    large = pd.Series(range(10_000))
+    column_statistics_cache = ColumnStatisticsCache(approximate_statistics_min_rows=1000, approximate_statistics_sample_size=100)
+
+    assert not column_statistics_cache.get_column_statistics(0, 'A', small).is_approximate
+    assert column_statistics_cache.get_column_statistics(0, 'B', large).is_approximate
+    assert not ColumnStatisticsCache().get_column_statistics(0, 'B', large).is_approximate
+
+
+def test_column_statistics_cache_computes_exact_statistics_in_background():
+    large = pd.Series(range(10_000))
+    column_statistics_cache = ColumnStatisticsCache(approximate_statistics_min_rows=1000, approximate_statistics_sample_size=100)
+
+    assert column_statistics_cache.get_exact_column_statistics_future(0, 'A', large) is None
+    column_statistics = column_statistics_cache.get_column_statistics(0, 'A', large, exact=True)
+    assert column_statistics.is_approximate
+
+    future = column_statistics_cache.get_exact_column_statistics_future(0, 'A', large)
+    assert future is not None
+    exact_column_statistics = future.result()
+    assert not exact_column_statistics.is_approximate
+    assert column_statistics_cache.get_column_statistics(0, 'A', large) is exact_column_statistics
+    assert exact_column_statistics.nunique == 10_000
+
+
+def test_apis_mark_approximate_statistics():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [str(i % 3000) for i in range(10_000)]}))
+    steps_manager = mito.mito_backend.steps_manager
+    steps_manager.column_statistics_cache = ColumnStatisticsCache(approximate_statistics_min_rows=1000, approximate_statistics_sample_size=1000)
+
+    params = {'sheet_index': 0, 'column_id': 'A'}
+    describe = get_column_describe(params, steps_manager)
+    assert describe['is_approximate'] == 'true'
+    assert describe['count'] == '10000'
+
+    unique_value_counts = get_unique_value_counts({**params, 'search_string': '', 'sort': 'Descending Occurence'}, steps_manager)
+    assert unique_value_counts['isApproximate']
+    assert not unique_value_counts['isAllData']
+
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(0, 'A', mito.dfs[0]['A'])
+    fig = _get_column_summary_graph(mito.dfs[0]['A'], 'A', column_statistics)
+    assert fig.layout.title.text == 'A Frequencies (approximate)'
+    assert sum(fig.data[0].y) == 10_000
+
+    get_column_describe({**params, 'exact': True}, steps_manager)
+    steps_manager.column_statistics_cache.get_exact_column_statistics_future(0, 'A', mito.dfs[0]['A']).result()
+    assert 'is_approximate' not in get_column_describe(params, steps_manager)
+
+
+def test_column_summary_graph_is_not_cached_after_rename(monkeypatch):
+    import mitosheet.api.get_column_summary_graph
+    monkeypatch.setattr(mitosheet.api.get_column_summary_graph, 'get_html_and_script_from_figure', lambda fig, height, width, include_plotlyjs: {'title': fig.layout.title.text})
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 2]}))
+    steps_manager = mito.mito_backend.steps_manager
+
+    params = {'sheet_index': 0, 'column_id': 'A', 'height': '400px', 'width': '400px', 'include_plotlyjs': False}
+    assert get_column_summary_graph(params, steps_manager)['title'] == 'A Frequencies'
+    mito.rename_column(0, 'A', 'B')
+    assert get_column_summary_graph(params, steps_manager)['title'] == 'B Frequencies'
+
+
+def test_unique_value_counts_searches_all_values_of_approximate_column():
+    mito = create_mito_wrapper(pd.DataFrame({'A': ['common'] * 9_999 + ['rare']}))
+    steps_manager = mito.mito_backend.steps_manager
+    steps_manager.column_statistics_cache = ColumnStatisticsCache(approximate_statistics_min_rows=1000, approximate_statistics_sample_size=100)
+
+    params = {'sheet_index': 0, 'column_id': 'A', 'search_string': '', 'sort': 'Descending Occurence'}
+    assert get_unique_value_counts(params, steps_manager)['isApproximate']
+
+    # Searching finds values that are not in the sample
+    unique_value_counts = get_unique_value_counts({**params, 'search_string': 'rar'}, steps_manager)
+    assert not unique_value_counts['isApproximate']
+    assert unique_value_counts['isAllData']
+    assert 'rare' in str(unique_value_counts['uniqueValueRowDataArray'])
+
+    # And the exact value counts are used from then on
+    assert not get_unique_value_counts(params, steps_manager)['isApproximate']
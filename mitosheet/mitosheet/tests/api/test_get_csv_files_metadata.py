@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the get_csv_files_metadata function.
+"""
+import os
+
+import pandas as pd
+
+from mitosheet.api.get_csv_files_metadata import CSV_FILE_METADATA_CACHE, get_csv_files_metadata
+from mitosheet.step_performers.import_steps.simple_import import SNIFF_SAMPLE_BYTES
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+TEST_FILE = 'test_get_csv_files_metadata.csv'
+OTHER_TEST_FILE = 'test_get_csv_files_metadata_other.csv'
+
+
+def test_get_csv_files_metadata_small_files():
+    mito = create_mito_wrapper()
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv(TEST_FILE, index=False)
+    pd.DataFrame({'C': ['ü', 'ö']}).to_csv(OTHER_TEST_FILE, index=False, sep=';', encoding='latin-1')
+
+    metadata = get_csv_files_metadata({'file_names': [TEST_FILE, OTHER_TEST_FILE, 'not a file.csv']}, mito.mito_backend.steps_manager)
+
+    assert metadata['delimeters'] == [',', ',', ',']
+    assert metadata['encodings'] == ['utf-8', 'latin-1', 'utf-8']
+    assert metadata['estimated_row_counts'] == [3, 2, None]
+    assert metadata['column_previews'] == [['A', 'B'], ['C'], []]
+
+    os.remove(TEST_FILE)
+    os.remove(OTHER_TEST_FILE)
+
+
+def test_get_csv_files_metadata_estimates_row_count_of_large_file():
+    mito = create_mito_wrapper()
+    num_rows = SNIFF_SAMPLE_BYTES // 5
+    pd.DataFrame({'A': ['abc'] * num_rows, 'B': [1] * num_rows}).to_csv(TEST_FILE, index=False, sep='|')
+
+    metadata = get_csv_files_metadata({'file_names': [TEST_FILE]}, mito.mito_backend.steps_manager)
+
+    assert metadata['delimeters'] == ['|']
+    assert metadata['column_previews'] == [['A', 'B']]
+    assert abs(metadata['estimated_row_counts'][0] - num_rows) <= num_rows * 0.01
+
+    os.remove(TEST_FILE)
+
+
+def test_get_csv_files_metadata_probes_file_again_once_changed():
+    mito = create_mito_wrapper()
+    pd.DataFrame({'A': [1, 2, 3]}).to_csv(TEST_FILE, index=False)
+
+    get_csv_files_metadata({'file_names': [TEST_FILE]}, mito.mito_backend.steps_manager)
+    hits = CSV_FILE_METADATA_CACHE.hits
+    metadata = get_csv_files_metadata({'file_names': [TEST_FILE]}, mito.mito_backend.steps_manager)
+    assert CSV_FILE_METADATA_CACHE.hits == hits + 1
+    assert metadata['column_previews'] == [['A']]
+
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv(TEST_FILE, index=False)
+    metadata = get_csv_files_metadata({'file_names': [TEST_FILE]}, mito.mito_backend.steps_manager)
+    assert metadata['column_previews'] == [['A', 'B']]
+
+    os.remove(TEST_FILE)
+
+
+def test_import_with_metadata_guesses_encoding_of_entire_file():
+    mito = create_mito_wrapper()
+    num_rows = SNIFF_SAMPLE_BYTES // 5
+    # The start of the file is utf-8, but there are latin-1 characters after it
+    pd.DataFrame({'A': ['abc'] * num_rows + ['ü', 'ö'], 'B': [1] * (num_rows + 2)}).to_csv(TEST_FILE, index=False, encoding='latin-1')
+
+    # The metadata is guessed from the start of the file
+    metadata = get_csv_files_metadata({'file_names': [TEST_FILE]}, mito.mito_backend.steps_manager)
+    assert metadata['encodings'] == ['utf-8']
+    assert metadata['column_previews'] == [['A', 'B']]
+
+    # Importing with the metadata guesses the encoding again from the entire file
+    mito.simple_import([TEST_FILE], delimeters=metadata['delimeters'], encodings=metadata['encodings'], decimals=metadata['decimals'], skiprows=metadata['skiprows'], error_bad_lines=[True])
+    assert len(mito.dfs) == 1
+    assert mito.dfs[0]['A'].tolist()[-2:] == ['ü', 'ö']
+    assert mito.mito_backend.steps_manager.curr_step.execution_data['file_encodings'] == ['latin-1']
+
+    os.remove(TEST_FILE)
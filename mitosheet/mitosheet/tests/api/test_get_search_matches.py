@@ -13,6 +13,7 @@ import pytest
 from mitosheet.tests.test_utils import create_mito_wrapper, create_mito_wrapper_with_data
 from mitosheet.api.get_search_matches import get_search_matches
 from mitosheet.tests.decorators import pandas_post_1_only
+from mitosheet.search_index import UNINDEXED_MIN_ROWS, SearchColumn, SearchIndex, UnindexedSearchColumn
 
 NUMBER_MATCHES_TESTS = [
     (
@@ -214,4 +215,82 @@ def test_get_number_matches_multiple_dataframes(dfs,sheet_index,search_value,exp
 
     for i, match in enumerate(matches['matches']):
         assert match['rowIndex'] == expected_matches[i][0]
-        assert match['colIndex'] == expected_matches[i][1]
\ No newline at end of file
+        assert match['colIndex'] == expected_matches[i][1]
+
+def test_get_search_matches_after_first_1500_rows():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': ['abc'] + ['def'] * 2000 + ['abc'], 'B': [1] * 2002}))
+
+    matches = get_search_matches({'sheet_index': 0, 'search_value': 'ABC'}, test_wrapper.mito_backend.steps_manager)
+    assert matches['total_number_matches'] == 2
+    assert matches['matches'] == [{'rowIndex': 0, 'colIndex': 0}]
+
+    matches = get_search_matches({'sheet_index': 0, 'search_value': 'ABC', 'start_row': 1500, 'num_rows': 1500}, test_wrapper.mito_backend.steps_manager)
+    assert matches['total_number_matches'] == 2
+    assert matches['matches'] == [{'rowIndex': 2001, 'colIndex': 0}]
+
+
+def test_get_search_matches_as_search_value_changes():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': ['abc', 'abd', 'xbc', None], 'B': ['ab', 'b', 'c', 'nan']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    for search_value, expected_total_matches, expected_matches in [
+        # NOTE: the column header A matches as well
+        ('a', 5, [(0, 0), (0, 1), (1, 0), (3, 1)]),
+        ('ab', 3, [(0, 0), (0, 1), (1, 0)]),
+        ('abc', 1, [(0, 0)]),
+        ('bc', 2, [(0, 0), (2, 0)]),
+        # Null values are displayed, and so are matched, but are not counted
+        ('none', 0, [(3, 0)]),
+        ('nan', 1, [(3, 1)]),
+        ('', 9, [(row_index, column_index) for row_index in range(4) for column_index in range(2)]),
+    ]:
+        matches = get_search_matches({'sheet_index': 0, 'search_value': search_value}, steps_manager)
+        assert matches['total_number_matches'] == expected_total_matches
+        assert [(match['rowIndex'], match['colIndex']) for match in matches['matches'] if match['rowIndex'] != -1] == expected_matches
+
+
+def test_get_search_matches_only_indexes_changed_columns():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    assert get_search_matches({'sheet_index': 0, 'search_value': '4'}, steps_manager)['total_number_matches'] == 0
+    assert steps_manager.search_index.misses == 2
+
+    test_wrapper.set_cell_value(0, 'A', 0, 4)
+    assert get_search_matches({'sheet_index': 0, 'search_value': '4'}, steps_manager)['total_number_matches'] == 1
+    assert steps_manager.search_index.misses == 3
+    assert steps_manager.search_index.hits == 1
+
+
+def test_get_search_matches_does_not_index_distinct_number_columns():
+    df = pd.DataFrame({'A': [i + 0.5 for i in range(UNINDEXED_MIN_ROWS)], 'B': [i % 10 for i in range(UNINDEXED_MIN_ROWS)]})
+    df.loc[3, 'A'] = None
+    test_wrapper = create_mito_wrapper(df)
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    for search_value in ['9', '99', '99.5', '5', 'nan', '']:
+        # NOTE: the column headers match the empty search value
+        expected_total_matches = sum(search_value in str(value) for column_header in df.columns for value in df[column_header].dropna().tolist()) + (2 if search_value == '' else 0)
+        matches = get_search_matches({'sheet_index': 0, 'search_value': search_value}, steps_manager)
+        assert matches['total_number_matches'] == expected_total_matches
+
+    search_columns = steps_manager.search_index._columns[0].values()
+    assert [type(search_column) for search_column in search_columns] == [UnindexedSearchColumn, SearchColumn]
+    # Null values are displayed, and so are matched, but are not counted
+    assert {'rowIndex': 3, 'colIndex': 0} in get_search_matches({'sheet_index': 0, 'search_value': 'nan'}, steps_manager)['matches']
+
+
+def test_get_search_matches_index_is_bounded():
+    df = pd.DataFrame({'A': [str(i) for i in range(1000)], 'B': [str(i) + 'b' for i in range(1000)]})
+    test_wrapper = create_mito_wrapper(df, df.copy())
+    steps_manager = test_wrapper.mito_backend.steps_manager
+    # Only one column fits in the index
+    steps_manager.search_index = SearchIndex(max_bytes=SearchColumn(df['A'], None).nbytes + 100)
+
+    assert get_search_matches({'sheet_index': 0, 'search_value': '99'}, steps_manager)['total_number_matches'] == 19 * 2
+    assert [type(search_column) for search_column in steps_manager.search_index._columns[0].values()] == [SearchColumn, UnindexedSearchColumn]
+
+    # Searching another sheet removes the index of the sheet that was searched before
+    assert get_search_matches({'sheet_index': 1, 'search_value': '99b'}, steps_manager)['total_number_matches'] == 10
+    assert list(steps_manager.search_index._columns.keys()) == [1]
+    assert steps_manager.search_index.num_sheets_evicted == 1
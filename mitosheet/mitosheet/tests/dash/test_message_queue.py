@@ -0,0 +1,102 @@
+import threading
+import time
+
+from mitosheet.mito_dash.v1.message_queue import SessionMessageQueue
+
+
+def test_message_queue_processes_messages_in_order():
+    processed_messages = []
+    message_queue = SessionMessageQueue(lambda message: processed_messages.append(message['id']))
+
+    for i in range(10):
+        message_queue.put_and_process({'id': i})
+
+    assert processed_messages == list(range(10))
+    assert message_queue.queue_info()['num_messages_processed'] == 10
+    assert message_queue.queue_info()['queue_depth'] == 0
+
+
+def test_message_queue_processes_messages_from_many_threads_one_at_a_time():
+    processed_messages = []
+    processing = []
+
+    def process_message(message):
+        # Check no other message is being processed at the same time
+        assert len(processing) == 0
+        processing.append(message)
+        time.sleep(0.001)
+        processed_messages.append(message['id'])
+        processing.pop()
+
+    message_queue = SessionMessageQueue(process_message)
+    threads = [threading.Thread(target=message_queue.put_and_process, args=({'id': i},)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(processed_messages) == list(range(20))
+    assert message_queue.queue_info()['num_messages_processed'] == 20
+
+
+def test_message_queue_returns_once_message_processed_by_other_thread():
+    started_processing = threading.Event()
+    finish_processing = threading.Event()
+    processed_messages = []
+
+    def process_message(message):
+        if message['id'] == 0:
+            started_processing.set()
+            finish_processing.wait()
+        processed_messages.append(message['id'])
+
+    message_queue = SessionMessageQueue(process_message)
+    thread = threading.Thread(target=message_queue.put_and_process, args=({'id': 0},))
+    thread.start()
+    started_processing.wait()
+
+    # The second message waits for the first, and is then processed right away
+    second_thread = threading.Thread(target=message_queue.put_and_process, args=({'id': 1},))
+    second_thread.start()
+    assert message_queue.queue_info()['queue_depth'] <= 1
+    finish_processing.set()
+
+    start_time = time.perf_counter()
+    second_thread.join()
+    thread.join()
+
+    assert processed_messages == [0, 1]
+    assert time.perf_counter() - start_time < 0.1
+
+
+def test_message_queue_coalesces_messages_with_same_id():
+    processed_messages = []
+    message_queue = SessionMessageQueue(lambda message: processed_messages.append(message['id']))
+
+    message_queue.put({'id': 'a'})
+    message_queue.put({'id': 'a'})
+    message_queue.put({'id': 'b'})
+    message_queue.process_pending_messages()
+    message_queue.put_and_process({'id': 'a'})
+
+    assert processed_messages == ['a', 'b']
+    assert message_queue.queue_info()['num_messages_coalesced'] == 2
+    assert message_queue.queue_info()['max_queue_depth'] == 3
+
+
+def test_message_queue_keeps_processing_after_error():
+    processed_messages = []
+
+    def process_message(message):
+        if message['id'] == 0:
+            raise Exception('error')
+        processed_messages.append(message['id'])
+
+    message_queue = SessionMessageQueue(process_message)
+    message_queue.put({'id': 0})
+    message_queue.put({'id': 1})
+    message_queue.process_pending_messages()
+
+    assert processed_messages == [1]
+    assert message_queue.queue_info()['num_messages_processed'] == 2
+    assert message_queue.queue_info()['max_wait_time'] >= message_queue.queue_info()['average_wait_time'] >= 0
@@ -0,0 +1,120 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.mito_dash.v1.session_registry import SpreadsheetSessionRegistry
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def create_spreadsheet(*args):
+    return SimpleNamespace(args=args, mito_backend=MitoBackend(*args, copy_args=False))
+
+
+def create_session(spreadsheet):
+    return create_spreadsheet(*spreadsheet.args)
+
+
+def test_session_registry_creates_session_once():
+    registry = SpreadsheetSessionRegistry()
+    spreadsheet = create_spreadsheet(pd.DataFrame({'A': [1, 2, 3]}))
+    registry.add_spreadsheet('id', spreadsheet)
+
+    session = registry.get_session('id', 'session', create_session)
+    assert session is not spreadsheet
+    assert registry.get_session('id', 'session', create_session) is session
+    assert registry.get_session('id', 'other session', create_session) is not session
+
+    assert registry.session_info()['live_sessions'] == 2
+    assert registry.session_info()['live_sessions_by_mito_id'] == {'id': 2}
+    assert registry.hits == 1
+    assert registry.misses == 2
+
+
+def test_session_registry_no_spreadsheet_returns_none():
+    registry = SpreadsheetSessionRegistry()
+    assert registry.get_session('id', 'session', create_session) is None
+
+
+def test_session_registry_only_adds_first_spreadsheet():
+    registry = SpreadsheetSessionRegistry()
+    spreadsheet = create_spreadsheet(pd.DataFrame({'A': [1, 2, 3]}))
+    registry.add_spreadsheet('id', spreadsheet)
+    registry.add_spreadsheet('id', create_spreadsheet(pd.DataFrame({'A': [1, 2, 3]})))
+
+    assert registry.get_spreadsheet('id') is spreadsheet
+
+
+def test_session_registry_sessions_share_dataframes():
+    registry = SpreadsheetSessionRegistry()
+    df = pd.DataFrame({'A': np.arange(1000)})
+    registry.add_spreadsheet('id', create_spreadsheet(df))
+
+    session = registry.get_session('id', 'session', create_session)
+    other_session = registry.get_session('id', 'other session', create_session)
+
+    assert np.shares_memory(session.mito_backend.steps_manager.dfs[0]['A'].to_numpy(), other_session.mito_backend.steps_manager.dfs[0]['A'].to_numpy())
+    assert registry.session_info()['session_bytes'] == 0
+    assert registry.session_info()['shared_bytes'] > 0
+
+
+def test_session_registry_evicts_least_recently_used_session():
+    registry = SpreadsheetSessionRegistry(max_sessions=2)
+    registry.add_spreadsheet('id', create_spreadsheet(pd.DataFrame({'A': [1, 2, 3]})))
+
+    session_one = registry.get_session('id', 'one', create_session)
+    registry.get_session('id', 'two', create_session)
+    registry.get_session('id', 'one', create_session)
+    registry.get_session('id', 'three', create_session)
+
+    assert registry.session_info()['live_sessions'] == 2
+    assert registry.evictions == 1
+    assert registry.get_session('id', 'one', create_session) is session_one
+
+
+def test_session_registry_evicts_idle_sessions():
+    registry = SpreadsheetSessionRegistry(idle_timeout_seconds=0.01)
+    registry.add_spreadsheet('id', create_spreadsheet(pd.DataFrame({'A': [1, 2, 3]})))
+
+    session = registry.get_session('id', 'session', create_session)
+    time.sleep(0.02)
+
+    assert registry.get_session('id', 'session', create_session) is not session
+    assert registry.evictions == 1
+
+
+def test_session_registry_evicts_sessions_over_memory_limit():
+    registry = SpreadsheetSessionRegistry(max_memory_mb=None)
+    registry.add_spreadsheet('id', create_spreadsheet(pd.DataFrame({'A': np.arange(100_000)})))
+
+    session_one = registry.get_session('id', 'one', create_session)
+    session_two = registry.get_session('id', 'two', create_session)
+    for session in [session_one, session_two]:
+        create_mito_wrapper(mito_backend=session.mito_backend).set_formula('=A + 1', 0, 'B', add_column=True)
+
+    # Allow enough memory for one edited session, but not two
+    registry.update_session_memory_usage('id', 'one')
+    session_memory_usage = registry.session_info()['session_bytes']
+    assert session_memory_usage > 0
+    registry.max_memory_mb = session_memory_usage * 1.5 / 1024 / 1024
+
+    # The second session is the most recently used, so the first session is evicted
+    registry.update_session_memory_usage('id', 'two')
+    assert registry.session_info()['live_sessions'] == 1
+    assert registry.get_session('id', 'two', create_session) is session_two
+    assert registry.session_info()['session_bytes'] > 0
+
+
+def test_session_registry_counts_strings_in_memory_usage():
+    registry = SpreadsheetSessionRegistry()
+    registry.add_spreadsheet('id', create_spreadsheet(pd.DataFrame({'A': np.arange(10_000)})))
+
+    session = registry.get_session('id', 'session', create_session)
+    create_mito_wrapper(mito_backend=session.mito_backend).set_formula('=CONCAT("a", A)', 0, 'B', add_column=True)
+    registry.update_session_memory_usage('id', 'session')
+
+    # The strings in the new column are counted, not just the pointers to them
+    new_column = session.mito_backend.steps_manager.dfs[0]['B']
+    assert registry.session_info()['session_bytes'] >= new_column.memory_usage(index=False, deep=True) * 0.9
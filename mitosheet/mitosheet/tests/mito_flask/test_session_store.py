@@ -0,0 +1,135 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.mito_flask.v1.process_event import get_processed_mito_event
+from mitosheet.mito_flask.v1.session_store import MitoSessionStore
+from mitosheet.utils import get_new_id
+
+
+def get_simple_import_event(file_name):
+    return {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'simple_import_edit',
+        'step_id': get_new_id(),
+        'params': {
+            'file_names': [file_name],
+            'delimeters': None,
+            'encodings': None,
+            'decimals': None,
+            'skiprows': None,
+            'error_bad_lines': None,
+        }
+    }
+
+
+def get_add_column_event(column_header):
+    return {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {
+            'sheet_index': 0,
+            'column_header': column_header,
+            'column_header_index': -1
+        }
+    }
+
+
+def get_backend_state(result):
+    return json.loads(result['state'])['backend_state']
+
+
+def get_sheet_data(result):
+    return json.loads(json.loads(result['state'])['shared_state_variables']['sheet_data_json'])
+
+
+def test_session_store_applies_events_to_live_backend():
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv('test_session_store.csv', index=False)
+    session_store = MitoSessionStore()
+
+    result = get_processed_mito_event(None, None, session_store=session_store)
+    result = get_processed_mito_event(get_backend_state(result), get_simple_import_event('test_session_store.csv'), session_store=session_store)
+    result = get_processed_mito_event(get_backend_state(result), get_add_column_event('C'), session_store=session_store)
+
+    assert session_store.hits == 2
+    assert session_store.misses == 0
+    assert len(session_store) == 1
+
+    # Replaying the analysis gives the same result
+    replayed_result = get_processed_mito_event(get_backend_state(result), None, session_store=None)
+    assert get_backend_state(replayed_result) == get_backend_state(result)
+    assert get_sheet_data(replayed_result) == get_sheet_data(result)
+    assert [column['columnHeader'] for column in get_sheet_data(result)[0]['data']] == ['A', 'B', 'C']
+
+    os.remove('test_session_store.csv')
+
+
+def test_session_store_replays_old_backend_state():
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv('test_session_store.csv', index=False)
+    session_store = MitoSessionStore()
+
+    result = get_processed_mito_event(None, None, session_store=session_store)
+    result = get_processed_mito_event(get_backend_state(result), get_simple_import_event('test_session_store.csv'), session_store=session_store)
+    old_backend_state = get_backend_state(result)
+    get_processed_mito_event(old_backend_state, get_add_column_event('C'), session_store=session_store)
+
+    # The live backend has been edited since, so this backend state must be replayed
+    result = get_processed_mito_event(old_backend_state, get_add_column_event('D'), session_store=session_store)
+
+    assert session_store.misses == 1
+    assert [column['columnHeader'] for column in get_sheet_data(result)[0]['data']] == ['A', 'B', 'D']
+
+    os.remove('test_session_store.csv')
+
+
+def test_session_store_evicts_least_recently_used():
+    session_store = MitoSessionStore(max_sessions=2)
+    session_store.put('a', MitoBackend())
+    session_store.put('b', MitoBackend())
+    session_store.put('c', MitoBackend())
+
+    assert len(session_store) == 2
+    assert session_store.take('a') is None
+    assert session_store.take('b') is not None
+    assert session_store.take('c') is not None
+    assert session_store.session_info()['evictions'] == 1
+
+
+def test_session_store_evicts_expired_sessions():
+    session_store = MitoSessionStore(ttl_seconds=0.01)
+    session_store.put('a', MitoBackend())
+    time.sleep(0.02)
+
+    assert session_store.take('a') is None
+    assert len(session_store) == 0
+
+
+def test_session_store_evicts_over_memory_limit():
+    mito_backend = MitoBackend(pd.DataFrame({'A': range(1_000_000)}))
+    session_store = MitoSessionStore(max_memory_mb=1)
+    session_store.put('a', MitoBackend())
+    session_store.put('b', mito_backend)
+
+    assert len(session_store) == 0
+    assert session_store.session_info()['memory_usage'] == 0
+
+
+def test_session_store_counts_strings_in_memory_limit():
+    # The strings take up more than 1MB, but the pointers to them do not
+    mito_backend = MitoBackend(pd.DataFrame({'A': ['a' * 100 + str(i) for i in range(50_000)]}))
+    session_store = MitoSessionStore(max_memory_mb=1)
+    session_store.put('a', mito_backend)
+
+    assert len(session_store) == 0
+
+def test_session_store_with_no_sessions_does_not_store():
+    session_store = MitoSessionStore(max_sessions=0)
+    session_store.put('a', MitoBackend())
+
+    assert len(session_store) == 0
@@ -30,6 +30,11 @@ IF_TESTS = [
 
     ([pd.Series(['T', 'F']), pd.Series([1, None]), pd.Series([None, 4])], pd.Series([1.0, 4.0])),
     ([pd.Series([1, 0]), pd.Series([1, None]), pd.Series([None, 4])], pd.Series([1.0, 4.0])),
+    ([pd.Series([True, False]), pd.Series([1, 2]), pd.Series([1.5, 2.5])], pd.Series([1.0, 2.5])),
+    ([pd.Series([True, False]), pd.Series([1, 2]), pd.Series(['A', 'B'])], pd.Series([1, 'B'])),
+    ([pd.Series([True, False]), pd.Series([1, 2]), pd.Series([True, False])], pd.Series([1, False], dtype=object)),
+    ([pd.Series([True, False], index=[1, 0]), pd.Series([1, 2]), pd.Series([3, 4])], pd.Series([2, 3], index=[1, 0])),
+    ([pd.Series([], dtype=bool), pd.Series([], dtype=int), pd.Series([], dtype=int)], pd.Series([], dtype=float)),
 ]
 @pytest.mark.parametrize("_argv, expected", IF_TESTS)
 def test_if_direct(_argv, expected):
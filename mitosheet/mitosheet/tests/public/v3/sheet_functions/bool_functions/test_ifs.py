@@ -83,6 +83,13 @@ IFS_TESTS = [
         ],
         pd.Series(['option1', None])
     ),
+    (
+        [
+            pd.Series([True, True]), pd.Series([None, 1.5]),
+            pd.Series([True, False]), 2,
+        ],
+        pd.Series([2.0, 1.5])
+    ),
     (
         [
             True, 'option1',
@@ -10,6 +10,7 @@ Contains tests for the FILLNAN function.
 import pytest
 import pandas as pd
 
+from mitosheet.errors import MitoError
 from mitosheet.public.v3.sheet_functions.misc_functions import GETPREVIOUSVALUE
 
 GETPREVIOUSVALUE_VALID_TESTS = [
@@ -41,6 +42,22 @@ GETPREVIOUSVALUE_VALID_TESTS = [
         [pd.Series(pd.to_datetime(['1/2/23', '1/2/23', '1/2/23'], format='%m/%d/%y')), pd.Series([False, True, True])],  
         pd.Series(pd.to_datetime([pd.NaT, '1/2/23', '1/2/23'], format='%m/%d/%y'))
     ),
+    (
+        [pd.Series([1.5, 2.5, 3.5]), pd.Series([False, False, False])],
+        pd.Series([-1, -1, -1])
+    ),
+    (
+        [pd.Series([1, 'a', 3]), pd.Series([False, True, True])],
+        pd.Series(['', 'a', 3])
+    ),
+    (
+        [pd.Series([1, 2, 3], index=['a', 'b', 'c']), pd.Series([True, False, True], index=['c', 'b', 'a'])],
+        pd.Series([1, 1, 3], index=['a', 'b', 'c'])
+    ),
+    (
+        [pd.Series([1, 2, 3]), True],
+        pd.Series([1, 2, 3])
+    ),
 ]
 @pytest.mark.parametrize("_argv, expected", GETPREVIOUSVALUE_VALID_TESTS)
 def test_bool_direct(_argv, expected):
@@ -48,4 +65,20 @@ def test_bool_direct(_argv, expected):
     if isinstance(result, pd.Series):
         assert result.equals(expected)
     else: 
-        assert result == expected
\ No newline at end of file
+        assert result == expected
+
+
+def test_get_previous_value_with_duplicate_index():
+    series = pd.Series([1, 2, 3, 4], index=[0, 0, 1, 1])
+    result = GETPREVIOUSVALUE(series, pd.Series([False, True, False, True], index=[0, 0, 1, 1]))
+    assert result.equals(pd.Series([-1, 2, 2, 4], index=[0, 0, 1, 1]))
+
+
+def test_get_previous_value_aligns_condition_to_series_index():
+    # The condition is in a different order than the series, and is realigned to it
+    result = GETPREVIOUSVALUE(pd.Series([1, 2, 3, 4]), pd.Series([True, False, False, True], index=[3, 2, 1, 0]))
+    assert result.equals(pd.Series([1, 1, 1, 4]))
+
+    # A condition with duplicate labels that are not the index of the series cannot be realigned
+    with pytest.raises(MitoError):
+        GETPREVIOUSVALUE(pd.Series([1, 2, 3, 4], index=[0, 0, 1, 1]), pd.Series([True, False, False, True], index=[0, 1, 1, 2]))
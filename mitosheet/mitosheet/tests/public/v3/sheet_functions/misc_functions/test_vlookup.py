@@ -10,6 +10,7 @@ Contains tests for the TYPE function.
 import pytest
 import pandas as pd
 
+from mitosheet.public.v3.lookup_index import LOOKUP_INDEX_CACHE
 from mitosheet.public.v3.sheet_functions.misc_functions import VLOOKUP
 
 from mitosheet.errors import MitoError
@@ -191,6 +192,51 @@ VLOOKUP_VALID_TESTS = [
         ],
         pd.Series([None])
     ),
+    # Indexes that are out of the range return None
+    (
+        [
+            pd.Series(['a', 'b', 'c']),
+            pd.DataFrame({0: ['c', 'a', 'b'], 1: ['d', 'e', 'f']}),
+            pd.Series([2, 3, 0])
+        ],
+        pd.Series(['e', None, 'c'])
+    ),
+    # Missing values and NaN lookup values
+    (
+        [
+            pd.Series([1.0, None, 4.0]),
+            pd.DataFrame({'A': [None, 1.0, 2.0], 'B': ['a', 'b', 'c']}),
+            2
+        ],
+        pd.Series(['b', 'a', None])
+    ),
+    # Int columns with unmatched rows become float columns
+    (
+        [
+            pd.Series([3, 1, 4]),
+            pd.DataFrame({'A': [1, 2, 3], 'B': [10, 20, 30]}),
+            2
+        ],
+        pd.Series([30.0, 10.0, None])
+    ),
+    # Empty lookup values
+    (
+        [
+            pd.Series([], dtype='int64'),
+            pd.DataFrame({'A': [1, 2, 3], 'B': [10, 20, 30]}),
+            2
+        ],
+        pd.Series([], dtype='float64')
+    ),
+    # Empty range
+    (
+        [
+            pd.Series(['a', 'b']),
+            pd.DataFrame({'A': pd.Series([], dtype='object'), 'B': pd.Series([], dtype='object')}),
+            2
+        ],
+        pd.Series([None, None])
+    ),
 ]
 
 @pytest.mark.parametrize("_argv, expected", VLOOKUP_VALID_TESTS)
@@ -270,3 +316,45 @@ def test_vlookup_with_datetime():
         })
     )
 
+
+
+def test_vlookup_result_dtypes():
+    where = pd.DataFrame({'A': [1, 2, 3], 'B': [10, 20, 30]})
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 1]), where, 2), pd.Series([30, 10]))
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 4]), where, 2), pd.Series([30.0, None]))
+
+    # Values are returned from rows of the range, which have the common dtype of all the columns
+    where = pd.DataFrame({'A': [1, 2, 3], 'B': [10, 20, 30], 'C': [1.5, 2.5, 3.5]})
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 1]), where, 2), pd.Series([30.0, 10.0]))
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 1]), where, 3), pd.Series([3.5, 1.5]))
+
+
+def test_vlookup_after_editing_range_in_place():
+    where = pd.DataFrame({'A': ['a', 'b', 'c'], 'B': [1, 2, 3]})
+    lookup_value = pd.Series(['c', 'd'])
+
+    pd.testing.assert_series_equal(VLOOKUP(lookup_value, where, 2), pd.Series([3.0, None]))
+    
+    where.loc[1, 'A'] = 'D'
+    pd.testing.assert_series_equal(VLOOKUP(lookup_value, where, 2), pd.Series([3, 2]))
+
+
+def test_lookup_index_is_reused_for_the_same_range():
+    LOOKUP_INDEX_CACHE.clear()
+    where = pd.DataFrame({'A': ['a', 'b', 'c'], 'B': [1, 2, 3], 'C': [4, 5, 6]})
+    
+    VLOOKUP(pd.Series(['a', 'b']), where, 2)
+    VLOOKUP(pd.Series(['c', 'B']), where, 3)
+
+    assert LOOKUP_INDEX_CACHE.cache_info()['hits'] == 1
+    assert LOOKUP_INDEX_CACHE.cache_info()['misses'] == 1
+
+
+def test_vlookup_many_rows():
+    where = pd.DataFrame({'A': list(range(1000))[::-1], 'B': [str(i) for i in range(1000)]})
+    lookup_value = pd.Series(range(-10, 1010))
+
+    result = VLOOKUP(lookup_value, where, 2)
+    
+    expected = pd.Series([str(999 - i) if 0 <= i < 1000 else None for i in range(-10, 1010)])
+    pd.testing.assert_series_equal(result, expected)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the RollingRange window functions, which should give the same
+results as applying the matching pandas aggregation to each window.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.rolling_range import RollingRange
+
+AGGREGATIONS = [
+    ('sum', lambda df: df.sum().sum()),
+    ('count', lambda df: df.count().sum()),
+    ('max', lambda df: df.max().max()),
+    ('min', lambda df: df.min().min()),
+    ('prod', lambda df: df.prod().prod()),
+    ('std', lambda df: df.stack().std()),
+    ('var', lambda df: df.stack().var()),
+]
+
+DATAFRAMES = [
+    pd.DataFrame({'A': [1, 2, 3, 4, 5, 6, 7]}),
+    pd.DataFrame({'A': [1.5, np.nan, -3.0, 4.25, np.nan, np.nan, 7.0]}),
+    pd.DataFrame({'A': [1, 2, 3, 4, 5, 6, 7], 'B': [1.5, np.nan, -3.0, 4.25, np.nan, np.nan, 7.0]}),
+    pd.DataFrame({'A': [np.nan] * 7, 'B': [2, 0, 2, 2, 0, 2, 2]}, index=list('abcdefg')),
+    pd.DataFrame({'A': [2 ** 62, 1, 2 ** 62, 3, 5, 2 ** 62, 1]}),
+    pd.DataFrame({'A': ['a', 'b', 'c', None, 'e', 'f', 'g']}),
+]
+
+WINDOWS_AND_OFFSETS = [
+    (1, 0), (2, 0), (2, -1), (3, -1), (3, 1), (5, -2), (7, 0), (10, -3), (10, 10), (3, -20), (0, 0)
+]
+
+@pytest.mark.parametrize("name, aggregation", AGGREGATIONS)
+@pytest.mark.parametrize("df", DATAFRAMES)
+@pytest.mark.parametrize("window, offset", WINDOWS_AND_OFFSETS)
+def test_rolling_range_functions_match_apply(name, aggregation, df, window, offset):
+    rolling_range = RollingRange(df, window, offset)
+
+    try:
+        expected = rolling_range.apply(aggregation)
+    except TypeError:
+        with pytest.raises(TypeError):
+            getattr(rolling_range, name)()
+        return
+
+    pd.testing.assert_series_equal(getattr(rolling_range, name)(), expected)
+
+
+def test_rolling_range_windows_before_first_row_are_empty():
+    # A5 = SUM(B0:B1)
+    rolling_range = RollingRange(pd.DataFrame({'B': list(range(10))}), 2, -5)
+    expected = pd.Series([0, 0, 0, 0, 0, 1, 3, 5, 7, 9])
+    pd.testing.assert_series_equal(rolling_range.apply(lambda df: df.sum().sum()), expected)
+    pd.testing.assert_series_equal(rolling_range.sum(), expected)
+
+
+def test_rolling_range_uses_default_value_for_empty_windows():
+    rolling_range = RollingRange(pd.DataFrame({'B': [1.5, 2.5, 3.5]}), 2, 2)
+    pd.testing.assert_series_equal(rolling_range.sum(default_value=10), pd.Series([3.5, 10, 10]))
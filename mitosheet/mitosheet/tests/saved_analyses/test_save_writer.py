@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for writing saved analyses in the background.
+"""
+import os
+import time
+
+from mitosheet.saved_analyses import read_analysis
+from mitosheet.saved_analyses.save_writer import SAVED_ANALYSIS_WRITER, SavedAnalysisWriter, write_file_atomically
+from mitosheet.tests.test_utils import create_mito_wrapper_with_data
+
+TEST_FILE = 'test_save_writer.json'
+
+
+def test_write_file_atomically_replaces_file():
+    write_file_atomically(TEST_FILE, 'first')
+    write_file_atomically(TEST_FILE, 'second')
+
+    with open(TEST_FILE) as f:
+        assert f.read() == 'second'
+    assert not any(file_name.endswith('.tmp') for file_name in os.listdir('.'))
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_coalesces_saves():
+    writer = SavedAnalysisWriter(debounce_seconds=60)
+    contents_got = []
+
+    def get_contents(contents):
+        def _get_contents():
+            contents_got.append(contents)
+            return contents
+        return _get_contents
+
+    for i in range(10):
+        writer.schedule(TEST_FILE, get_contents(str(i)))
+    assert not os.path.exists(TEST_FILE)
+
+    writer.flush()
+    with open(TEST_FILE) as f:
+        assert f.read() == '9'
+    # Only the last save is turned into a string
+    assert contents_got == ['9']
+    assert writer.writer_info()['num_saves_coalesced'] == 9
+    assert writer.writer_info()['num_files_written'] == 1
+    assert len(writer) == 0
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_writes_in_background_after_debounce():
+    writer = SavedAnalysisWriter(debounce_seconds=0.01)
+    writer.schedule(TEST_FILE, lambda: 'contents')
+
+    start_time = time.perf_counter()
+    while not os.path.exists(TEST_FILE) and time.perf_counter() - start_time < 5:
+        time.sleep(0.01)
+
+    with open(TEST_FILE) as f:
+        assert f.read() == 'contents'
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_write_drops_older_save():
+    writer = SavedAnalysisWriter(debounce_seconds=60)
+    writer.schedule(TEST_FILE, lambda: 'older')
+    writer.write(TEST_FILE, 'newer')
+    writer.flush()
+
+    with open(TEST_FILE) as f:
+        assert f.read() == 'newer'
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_does_not_overwrite_newer_file():
+    writer = SavedAnalysisWriter(debounce_seconds=60)
+    writer.schedule(TEST_FILE, lambda: 'older')
+    time.sleep(0.05)
+    with open(TEST_FILE, 'w') as f:
+        f.write('newer')
+    writer.flush()
+
+    with open(TEST_FILE) as f:
+        assert f.read() == 'newer'
+    assert writer.writer_info()['num_saves_dropped'] == 1
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_writes_save_made_while_writing_older_save():
+    writer = SavedAnalysisWriter(debounce_seconds=60)
+
+    def get_older_contents():
+        # The newer save is made while the older one is being written
+        writer.schedule(TEST_FILE, lambda: 'newer')
+        time.sleep(0.05)
+        return 'older'
+
+    writer.schedule(TEST_FILE, get_older_contents)
+    writer.flush()
+    with open(TEST_FILE) as f:
+        assert f.read() == 'older'
+
+    writer.flush()
+    with open(TEST_FILE) as f:
+        assert f.read() == 'newer'
+    assert writer.writer_info()['num_saves_dropped'] == 0
+    assert writer.writer_info()['num_files_written'] == 2
+
+    os.remove(TEST_FILE)
+
+
+def test_save_writer_keeps_saving_after_error():
+    writer = SavedAnalysisWriter(debounce_seconds=60)
+
+    def get_contents():
+        raise Exception('error')
+
+    writer.schedule(TEST_FILE, get_contents)
+    writer.flush()
+    writer.schedule(TEST_FILE, lambda: 'contents')
+    writer.flush()
+
+    with open(TEST_FILE) as f:
+        assert f.read() == 'contents'
+    assert writer.writer_info()['num_write_errors'] == 1
+
+    os.remove(TEST_FILE)
+
+
+def test_edits_are_saved_before_analysis_is_read():
+    mito = create_mito_wrapper_with_data([1])
+    mito.add_column(0, 'B')
+    mito.set_formula('=A + 1', 0, 'B')
+
+    analysis = read_analysis(mito.mito_backend.analysis_name)
+
+    assert len(SAVED_ANALYSIS_WRITER) == 0
+    assert [step['step_type'] for step in analysis['steps_data']] == ['add_column', 'set_column_formula']
+    assert analysis['code'] == mito.mito_backend.steps_manager.code()
@@ -724,4 +724,17 @@ def test_set_formula_wrong_column_order_wrong_index_order():
     mito.add_column(0, 'D')
     mito.set_formula('=SUM(C1:A0)', 0, 'D')
 
-    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3], 'C': [1, 2, 3], 'D': [9, 15, 9]}))
\ No newline at end of file
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3], 'C': [1, 2, 3], 'D': [9, 15, 9]}))
+
+
+def test_set_formula_at_index_labels_does_not_change_previous_steps():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+    mito = create_mito_wrapper(df)
+    mito.set_formula('=A + 10', 0, 'B', index_labels=[1])
+    mito.set_formula('=B + 10', 0, 'A', index_labels=[0])
+
+    steps = mito.mito_backend.steps_manager.steps_including_skipped
+    assert steps[0].dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}))
+    assert steps[1].dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 12, 6]}))
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [14, 2, 3], 'B': [4, 12, 6]}))
+    assert df.equals(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}))
@@ -12,6 +12,7 @@ import numpy as np
 
 import pandas as pd
 import pytest
+from openpyxl import load_workbook
 
 from mitosheet.errors import MitoError
 from mitosheet.excel_utils import get_col_and_row_indexes_from_range
@@ -689,3 +690,78 @@ def test_excel_range_import_can_add_multiple_end_conditions_no_error():
     assert range2 == 'A1:A3'
     assert range3 == 'A1:A3'
 
+
+
+@pandas_post_1_2_only
+@python_post_3_6_only
+def test_excel_range_import_reads_sheet_once_and_closes_workbook(monkeypatch):
+    import mitosheet.public.v2.excel_utils
+    from mitosheet.public.v2.excel_utils import EXCEL_FILE_DATA_CACHE
+    with pd.ExcelWriter(TEST_FILE_PATH) as writer:
+        TEST_DF_1.to_excel(writer, sheet_name=TEST_SHEET_NAME, index=False)
+        TEST_DF_2.to_excel(writer, sheet_name=TEST_SHEET_NAME, startrow=3, startcol=3, index=False)
+
+    workbooks = []
+    def load_and_record_workbook(*args, **kwargs):
+        workbooks.append(load_workbook(*args, **kwargs))
+        return workbooks[-1]
+    monkeypatch.setattr(mitosheet.public.v2.excel_utils, 'load_workbook', load_and_record_workbook)
+
+    range_imports = [
+        {'type': 'dynamic', 'start_condition': {'type': 'upper left corner value', 'value': 'header 1'}, 'end_condition': {'type': 'first empty cell'}, 'column_end_condition': {'type': 'first empty cell'}, 'df_name': 'df1'},
+        {'type': 'dynamic', 'start_condition': {'type': 'upper left corner value', 'value': 'header 100'}, 'end_condition': {'type': 'first empty cell'}, 'column_end_condition': {'type': 'first empty cell'}, 'df_name': 'df2'},
+    ]
+    mito = create_mito_wrapper()
+    mito.excel_range_import(TEST_FILE_PATH, {'type': 'sheet name', 'value': TEST_SHEET_NAME}, range_imports, False)
+    assert mito.dfs[0].equals(TEST_DF_1)
+    assert mito.dfs[1].equals(TEST_DF_2)
+
+    # Importing the same ranges again reads the sheet from the cache
+    hits = EXCEL_FILE_DATA_CACHE.hits
+    mito.excel_range_import(TEST_FILE_PATH, {'type': 'sheet name', 'value': TEST_SHEET_NAME}, range_imports, False)
+    assert EXCEL_FILE_DATA_CACHE.hits > hits
+    
+    # The sheet is read from the workbook once for all of the ranges, and the workbook is not kept open
+    assert len(workbooks) == 1
+    assert all(workbook._archive.fp is None for workbook in workbooks)
+
+    # If the file changes, we read the new file
+    with pd.ExcelWriter(TEST_FILE_PATH) as writer:
+        TEST_DF_2.to_excel(writer, sheet_name=TEST_SHEET_NAME, index=False)
+    assert get_table_range(TEST_FILE_PATH, TEST_SHEET_NAME, 'header 100') == 'A1:B2'
+
+    os.remove(TEST_FILE_PATH)
+
+
+@python_post_3_6_only
+def test_get_table_range_sheet_without_dimensions():
+    import re
+    import zipfile
+    TEST_DF_3.to_excel(TEST_FILE_PATH, sheet_name=TEST_SHEET_NAME, index=False, startrow=1, startcol=1)
+
+    # Remove the size of the sheet from the file, as some programs don't write it
+    with zipfile.ZipFile(TEST_FILE_PATH) as zip_file:
+        files = {name: zip_file.read(name) for name in zip_file.namelist()}
+    files['xl/worksheets/sheet1.xml'] = re.sub(b'<dimension[^>]*/>', b'', files['xl/worksheets/sheet1.xml'])
+    with zipfile.ZipFile(TEST_FILE_PATH, 'w') as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+
+    assert get_table_range(TEST_FILE_PATH, TEST_SHEET_NAME, 'header 101') == 'B2:C5'
+    assert get_table_range(TEST_FILE_PATH, TEST_SHEET_NAME, 'header 101', row_entirely_empty=True) == 'B2:C5'
+
+    os.remove(TEST_FILE_PATH)
+
+
+@python_post_3_6_only
+def test_get_excel_file_metadata_lists_sheets():
+    from mitosheet.api.get_excel_file_metadata import get_excel_file_metadata
+    with pd.ExcelWriter(TEST_FILE_PATH) as writer:
+        TEST_DF_1.to_excel(writer, sheet_name=TEST_SHEET_NAME, index=False)
+        TEST_DF_2.to_excel(writer, sheet_name=TEST_SHEET_NAME_2, index=False)
+
+    metadata = get_excel_file_metadata({'file_path': TEST_FILE_PATH}, create_mito_wrapper().mito_backend.steps_manager)
+    assert metadata['sheet_names'] == [TEST_SHEET_NAME, TEST_SHEET_NAME_2]
+    assert metadata['size'] == os.path.getsize(TEST_FILE_PATH)
+
+    os.remove(TEST_FILE_PATH)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for reading the files of import steps ahead of time
+"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from mitosheet.saved_analyses import write_save_analysis_file
+from mitosheet.step_performers.column_steps.set_column_formula import SetColumnFormulaStepPerformer
+from mitosheet.step_performers.import_steps.import_prefetch import PrefetchedReads, PrefetchingPandas, ReadAlreadyTakenError, prefetch_reads
+from mitosheet.step_performers.import_steps.simple_import import SimpleImportStepPerformer
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.transpiler.transpile_utils import get_globals_for_exec
+
+TEST_FILE_PATHS = [
+    'test_prefetch_file.csv',
+    'test_prefetch_file1.csv',
+    'test_prefetch_file2.csv',
+]
+
+
+def _count_reads(monkeypatch):
+    reads = []
+    read_csv = pd.read_csv
+    def counting_read_csv(*args, **kwargs):
+        reads.append((args[0], threading.current_thread().name))
+        # Make reading slow, like reading a big file
+        time.sleep(0.05)
+        return read_csv(*args, **kwargs)
+    monkeypatch.setattr(pd, 'read_csv', counting_read_csv)
+    return reads
+
+
+def test_replay_reads_each_import_once(tmp_path, monkeypatch):
+    file_paths = [str(tmp_path / file_path) for file_path in TEST_FILE_PATHS]
+    for index, file_path in enumerate(file_paths):
+        pd.DataFrame({'A': [index, index + 1], 'B': [index * 2, index * 3]}).to_csv(file_path, index=False)
+
+    mito = create_mito_wrapper()
+    for file_path in file_paths:
+        mito.simple_import([file_path], [','], ['utf-8'], ['.'], [0], [True])
+    mito.set_formula('=A + 1', 0, 'C', add_column=True)
+    write_save_analysis_file(mito.mito_backend.steps_manager)
+
+    reads = _count_reads(monkeypatch)
+    new_mito = create_mito_wrapper()
+    new_mito.replay_analysis(mito.mito_backend.analysis_name)
+
+    assert len(new_mito.dfs) == 3
+    for df, new_df in zip(mito.dfs, new_mito.dfs):
+        assert df.equals(new_df)
+    assert new_mito.df_names == mito.df_names
+    assert new_mito.transpiled_code == mito.transpiled_code
+
+    # Each file is read once for the replay (and once more when the test checks the 
+    # transpiled code), and some of them are read on other threads
+    assert sorted(file_path for file_path, _ in reads) == sorted(file_paths * 2)
+    assert any(thread_name.startswith('mito-import-prefetch') for _, thread_name in reads)
+    # And no files are read once the replay is done
+    assert not any(thread.name.startswith('mito-import-prefetch') for thread in threading.enumerate())
+
+
+def test_prefetched_reads_copy_for_other_threads():
+    prefetched_reads = PrefetchedReads()
+    df = prefetched_reads.read('DataFrame', ({'A': [1, 2, 3]},), {}, take=False)
+    df['A'] = 0
+
+    # The read the result is for gets the original
+    taken_df = prefetched_reads.read('DataFrame', ({'A': [1, 2, 3]},), {}, take=True)
+    assert taken_df['A'].tolist() == [1, 2, 3]
+    assert prefetched_reads.hits == 1
+
+    # Once it is taken, other threads don't need to read it again
+    with pytest.raises(ReadAlreadyTakenError):
+        prefetched_reads.read('DataFrame', ({'A': [1, 2, 3]},), {}, take=False)
+
+    prefetched_reads.read('DataFrame', ({'A': [1, 2, 3]},), {}, take=True)
+    assert prefetched_reads.misses == 1
+
+
+def test_only_import_steps_use_prefetched_reads():
+    state = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]})).mito_backend.steps_manager.curr_step.final_defined_state
+
+    with prefetch_reads([]):
+        assert isinstance(get_globals_for_exec(state, 3, SimpleImportStepPerformer.step_type())['pd'], PrefetchingPandas)
+        exec_globals = get_globals_for_exec(state, 3, SetColumnFormulaStepPerformer.step_type())
+        assert not isinstance(exec_globals.get('pd'), PrefetchingPandas)
+        assert exec_globals == get_globals_for_exec(state, 3)
@@ -528,3 +528,52 @@ def test_can_import_with_invalid_name():
     # Remove the test file
     os.remove(file_path)
 
+
+
+def test_guess_delimeter_and_encoding_from_start_of_file(tmp_path, monkeypatch):
+    from mitosheet.step_performers.import_steps import simple_import
+    monkeypatch.setattr(simple_import, 'SNIFF_SAMPLE_BYTES', 50)
+
+    file_path = str(tmp_path / 'test_file.csv')
+    df = pd.DataFrame({'A': ['Ñ'] * 100, 'B': list(range(100))})
+    df.to_csv(file_path, index=False, sep=';', encoding='utf-8')
+    assert simple_import.guess_delimeter_and_encoding(file_path) == (';', 'utf-8')
+
+    df.to_csv(file_path, index=False, sep='\t', encoding='latin-1')
+    assert simple_import.guess_delimeter_and_encoding(file_path) == ('\t', 'latin-1')
+
+    # Single column files use the default delimeter
+    pd.DataFrame({'A': [1, 2, 3]}).to_csv(file_path, index=False)
+    assert simple_import.guess_delimeter_and_encoding(file_path) == (',', 'utf-8')
+
+
+def test_import_encoding_error_after_start_of_file(tmp_path, monkeypatch):
+    from mitosheet.step_performers.import_steps import simple_import
+    monkeypatch.setattr(simple_import, 'SNIFF_SAMPLE_BYTES', 50)
+
+    file_path = str(tmp_path / 'test_file.csv')
+    df = pd.DataFrame({'A': ['a'] * 100 + ['Ñ'], 'B': list(range(101))})
+    df.to_csv(file_path, index=False, encoding='latin-1')
+
+    mito = create_mito_wrapper()
+    mito.simple_import([file_path])
+
+    assert mito.dfs[0].equals(df)
+    assert mito.curr_step.execution_data['file_encodings'] == ['latin-1']
+
+
+def test_import_multiple_files_reports_read_speed(tmp_path):
+    file_paths = [str(tmp_path / f'test_file_{i}.csv') for i in range(5)]
+    for i, file_path in enumerate(file_paths):
+        pd.DataFrame({'A': [i] * 100, 'B': list(range(100))}).to_csv(file_path, index=False)
+
+    mito = create_mito_wrapper()
+    mito.simple_import(file_paths)
+
+    assert len(mito.dfs) == 5
+    for i, df in enumerate(mito.dfs):
+        assert df.equals(pd.DataFrame({'A': [i] * 100, 'B': list(range(100))}))
+    
+    file_read_bytes_per_second = mito.curr_step.execution_data['file_read_bytes_per_second']
+    assert len(file_read_bytes_per_second) == 5
+    assert all(bytes_per_second > 0 for bytes_per_second in file_read_bytes_per_second)
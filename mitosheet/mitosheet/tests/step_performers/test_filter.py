@@ -601,7 +601,7 @@ def test_transpile_triple_filter():
     assert mito.transpiled_code == [
         'from mitosheet.public.v3 import *', 
         '',
-        "df1 = df1[(df1['name'].apply(lambda val: any(s in str(val) for s in ['e', 'a']))) | (df1['name'] == 'Nate')]",
+        "df1 = df1[(df1['name'].astype(str).str.contains('e|a', regex=True)) | (df1['name'] == 'Nate')]",
         '',
     ]
 
@@ -782,7 +782,7 @@ def test_wrap_lines_on_single_filters():
     assert mito.transpiled_code == [
         'from mitosheet.public.v3 import *', 
         '',
-        "df1 = df1[df1['name'].apply(lambda val: any(s in str(val) for s in ['A', 'A', 'A', 'A', 'A', 'A', 'A', 'A']))]",
+        "df1 = df1[df1['name'].astype(str).str.contains('A', regex=True)]",
         '',
     ]
 
@@ -879,7 +879,7 @@ def test_not_exactly_collapses_to_one_clause():
         'from mitosheet.public.v3 import *', 
         'import pandas as pd',
         '',
-        "df1 = df1[(~df1['A'].isin([1, 2])) & (df1['B'].apply(lambda val: all(val != s for s in ['C', 'D']))) & (~df1['C'].isin(pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[(~df1['A'].isin([1, 2])) & (~df1['B'].isin(['C', 'D'])) & (~df1['C'].isin(pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
         '',
     ]
 
@@ -958,7 +958,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: all(val > n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] > max([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -966,7 +966,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: any(val > n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] > min([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -974,7 +974,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: all(val >= n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] >= max([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -982,7 +982,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: any(val >= n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] >= min([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -990,7 +990,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: all(val == n for n in [1, 2]))]",
+        "df1 = df1[(df1['A'] == min([1, 2])) & (df1['A'] == max([1, 2]))]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -1006,7 +1006,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: all(val < n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] < min([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -1014,7 +1014,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: any(val < n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] < max([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -1022,7 +1022,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: all(val <= n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] <= min([1, 2])]",
     ),
     (
         pd.DataFrame({"A": [1, 2, 3, 4, 5, 6, 7, 8, 9]}),
@@ -1030,7 +1030,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         1,
         2,
-        "df1 = df1[df1['A'].apply(lambda val: any(val <= n for n in [1, 2]))]",
+        "df1 = df1[df1['A'] <= max([1, 2])]",
     ),
     (
         pd.DataFrame(data={"A": [1, 2, 3, 4, 5, 6]}),
@@ -1070,7 +1070,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "1",
         "12",
-        "df1 = df1[df1['A'].apply(lambda val: all(str(val).startswith(s) for s in ['1', '12']))]",
+        "df1 = df1[df1['A'].astype(str).str.contains('(?s)^(?=1)(?=12)', regex=True)]",
     ),
     (
         pd.DataFrame({"A": ["123", "1334", "4567"]}),
@@ -1078,7 +1078,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "1",
         "4",
-        "df1 = df1[df1['A'].apply(lambda val: any(str(val).startswith(s) for s in ['1', '4']))]",
+        "df1 = df1[df1['A'].astype(str).str.startswith(('1', '4'))]",
     ),
     (
         pd.DataFrame({"A": ["123", "1334", "4567"]}),
@@ -1086,7 +1086,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "1",
         "12",
-        "df1 = df1[df1['A'].apply(lambda val: all(str(val).endswith(s) for s in ['1', '12']))]",
+        "df1 = df1[df1['A'].astype(str).str.contains('(?s)^(?=.*1\\Z)(?=.*12\\Z)', regex=True)]",
     ),
     (
         pd.DataFrame({"A": ["123", "1334", "4567"]}),
@@ -1094,7 +1094,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "1",
         "4",
-        "df1 = df1[df1['A'].apply(lambda val: any(str(val).endswith(s) for s in ['1', '4']))]",
+        "df1 = df1[df1['A'].astype(str).str.endswith(('1', '4'))]",
     ),
     (
         pd.DataFrame({"A": ["aBcdef", "ABCdef", "def"]}),
@@ -1102,7 +1102,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "ab",
         "bc",
-        "df1 = df1[df1['A'].apply(lambda val: any(s.upper() in str(val).upper() for s in ['ab', 'bc']))]",
+        "df1 = df1[df1['A'].astype(str).str.upper().str.contains('AB|BC', regex=True)]",
     ),
     (
         pd.DataFrame({"A": ["aBcdef", "ABCdEf", "def"]}),
@@ -1110,7 +1110,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "abcd",
         "ef",
-        "df1 = df1[df1['A'].apply(lambda val: all(s.upper() in str(val).upper() for s in ['abcd', 'ef']))]",
+        "df1 = df1[df1['A'].astype(str).str.upper().str.contains('(?s)^(?=.*ABCD)(?=.*EF)', regex=True)]",
     ),
     (
         pd.DataFrame(
@@ -1134,7 +1134,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: all(val > d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] > max(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1158,7 +1158,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: any(val > d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] > min(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1182,7 +1182,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: all(val >= d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] >= max(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1206,7 +1206,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: any(val >= d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] >= min(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1230,7 +1230,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: all(val == d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[(df1['A'] == min(pd.to_datetime(['11-13-2021', '11-14-2021']))) & (df1['A'] == max(pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
     ),
     (
         pd.DataFrame(
@@ -1278,7 +1278,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: all(val < d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] < min(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1302,7 +1302,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: any(val < d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] < max(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1326,7 +1326,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "And",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: all(val <= d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] <= min(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
     (
         pd.DataFrame(
@@ -1350,7 +1350,7 @@ FILTER_TESTS_MULTIPLE_VALUES_PER_CONDITION = [
         "Or",
         "11-13-2021",
         "11-14-2021",
-        "df1 = df1[df1['A'].apply(lambda val: any(val <= d for d in pd.to_datetime(['11-13-2021', '11-14-2021'])))]",
+        "df1 = df1[df1['A'] <= max(pd.to_datetime(['11-13-2021', '11-14-2021']))]",
     ),
 ]
 
@@ -1385,6 +1385,37 @@ def test_filter_multiple_values_per_clause(
     ]
 
 
+FILTER_TESTS_MULTIPLE_VALUES_RESULTS = [
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_EXACTLY, "And", [2, 2], [1]),
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_EXACTLY, "And", [1, 2], []),
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_NOT_EXACTLY, "Or", [1, 2], [0, 1, 2, 3]),
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_NOT_EXACTLY, "Or", [2, 2], [0, 2, 3]),
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_GREATER, "Or", [3, 1], [1, 2]),
+    (pd.Series([1, 2, 3, np.nan]), FC_NUMBER_LESS_THAN_OR_EQUAL, "And", [3, 2], [0, 1]),
+    (pd.Series(["ab", "Ab", "b", None, 1]), FC_STRING_EXACTLY, "And", ["ab", "Ab"], []),
+    (pd.Series(["ab", "Ab", "b", None, 1]), FC_STRING_NOT_EXACTLY, "Or", ["ab", "ab"], [1, 2, 3, 4]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_CONTAINS, "Or", [".", "y"], [0, 2]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_CONTAINS, "And", ["a", "c"], [0, 1]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_CONTAINS, "Or", ["None", "1"], [3, 4]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_DOES_NOT_CONTAIN, "And", ["b", "z"], [0, 3, 4]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_DOES_NOT_CONTAIN, "Or", ["a", "b"], [0, 2, 3, 4]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_STARTS_WITH, "And", ["a", "ab"], [1]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_ENDS_WITH, "Or", [".c", "z"], [0, 2]),
+    (pd.Series(["a.c", "abc", "xyz", None, 1]), FC_STRING_ENDS_WITH, "And", ["c", "bc"], [1]),
+    (pd.Series(["a\nbc", "ABC", "xyz"]), FC_STRING_CONTAINS_CASE_INSENSITIVE, "And", ["a", "bC"], [0, 1]),
+    (pd.Series(pd.to_datetime(["2021-01-01", "2021-01-02", None])), FC_DATETIME_GREATER_THAN_OR_EQUAL, "Or", ["2021-01-02", "2021-01-03"], [1]),
+    (pd.Series(pd.to_datetime(["2021-01-01", "2021-01-02", None])), FC_DATETIME_NOT_EXACTLY, "Or", ["2021-01-01", "2021-01-01"], [1, 2]),
+]
+
+@pytest.mark.parametrize("series,condition,operator,values,index", FILTER_TESTS_MULTIPLE_VALUES_RESULTS)
+def test_filter_multiple_values_per_clause_results(series, condition, operator, values, index):
+    df = pd.DataFrame({'A': series})
+    mito = create_mito_wrapper(df)
+    mito.filters(0, "A", operator, [{"condition": condition, "value": value} for value in values])
+
+    assert mito.dfs[0].equals(df.loc[index])
+
+
 def test_filter_optimizes_out_after_delete():
     df = pd.DataFrame({"A": ["aaron", "jake", "jon", 1, 2, "nate"]})
     mito = create_mito_wrapper(df)
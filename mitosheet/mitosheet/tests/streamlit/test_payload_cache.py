@@ -0,0 +1,55 @@
+import json
+
+import pandas as pd
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.streamlit.v1.spreadsheet import SpreadsheetPayloadCache
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def test_payload_cache_only_recomputes_after_change():
+    mito_backend = MitoBackend(pd.DataFrame({'A': [1, 2, 3]}))
+    payload_cache = SpreadsheetPayloadCache(mito_backend, [])
+
+    sheet_data_json = payload_cache.sheet_data_json
+    analysis_data_json = payload_cache.analysis_data_json
+    assert payload_cache.sheet_data_json is sheet_data_json
+    assert payload_cache.analysis_data_json is analysis_data_json
+    assert payload_cache.code == "\n".join(mito_backend.steps_manager.code())
+
+    create_mito_wrapper(mito_backend=mito_backend).set_formula('=A + 1', 0, 'B', add_column=True)
+
+    assert payload_cache.sheet_data_json is not sheet_data_json
+    assert payload_cache.sheet_data_json == mito_backend.steps_manager.sheet_data_json
+    assert payload_cache.analysis_data_json == mito_backend.steps_manager.analysis_data_json
+    assert payload_cache.code == "\n".join(mito_backend.steps_manager.code())
+    assert 'B' in payload_cache.code
+
+
+def test_payload_cache_compacts_received_responses():
+    mito_backend = MitoBackend(pd.DataFrame({'A': [1, 2, 3]}))
+    responses = [
+        {'event': 'response', 'id': '1', 'shared_variables': {'sheet_data_json': 'a' * 100}},
+        {'event': 'response', 'id': '2', 'shared_variables': {'sheet_data_json': 'b' * 100}},
+    ]
+    payload_cache = SpreadsheetPayloadCache(mito_backend, responses)
+
+    responses_json = payload_cache.responses_json
+    assert payload_cache.responses_json is responses_json
+    assert json.loads(responses_json)[1]['shared_variables'] is not None
+
+    payload_cache.set_num_received_responses(1)
+    assert json.loads(payload_cache.responses_json) == [
+        {'event': 'response', 'id': '1'},
+        {'event': 'response', 'id': '2', 'shared_variables': {'sheet_data_json': 'b' * 100}},
+    ]
+
+    # New responses are still sent, and more received responses than we have is ignored
+    responses.append({'event': 'response', 'id': '3', 'shared_variables': {}})
+    payload_cache.set_num_received_responses(10)
+    assert json.loads(payload_cache.responses_json) == [
+        {'event': 'response', 'id': '1'},
+        {'event': 'response', 'id': '2'},
+        {'event': 'response', 'id': '3'},
+    ]
+    assert payload_cache.num_received_responses == 3
@@ -151,6 +151,37 @@ def test_call_makes_copies():
     # Test we don't change the headers!
     assert df.columns.tolist() == ['A A']
 
+SHARED_ARGS_EDITS = [
+    lambda mito: mito.set_cell_value(0, 'A', 0, 10),
+    lambda mito: mito.set_cell_value(0, 'C', 1, 'x'),
+    lambda mito: mito.set_formula('=A + 1', 0, 'A', add_column=False),
+    lambda mito: mito.set_formula('=A + 1', 0, 'D', add_column=True),
+    lambda mito: mito.add_column(0, 'D'),
+    lambda mito: mito.fill_na(0, ['B'], {'type': 'value', 'value': 0}),
+    lambda mito: mito.change_column_dtype(0, ['A'], 'float'),
+    lambda mito: mito.rename_column(0, 'A', 'AA'),
+    lambda mito: mito.reorder_column(0, 'A', 2),
+    lambda mito: mito.delete_columns(0, ['A']),
+    lambda mito: mito.sort(0, 'A', 'descending'),
+    lambda mito: mito.filter(0, 'A', 'And', 'greater', 1),
+    lambda mito: mito.delete_row(0, [0]),
+    lambda mito: mito.replace(0, ['C'], 'a', 'b'),
+    lambda mito: mito.duplicate_dataframe(0),
+    lambda mito: mito.delete_dataframe(0),
+]
+@pytest.mark.parametrize("edit", SHARED_ARGS_EDITS)
+def test_dont_copy_args_does_not_change_shared_dataframes(edit):
+    df = pd.DataFrame(data={'A': [1, 2, 3], 'B': [1.0, np.nan, 3.0], 'C': ['a', 'b', 'c']})
+    original_df = df.copy(deep=True)
+
+    mito = create_mito_wrapper(mito_backend=MitoBackend(df, copy_args=False))
+    assert edit(mito)
+    mito.undo()
+    mito.redo()
+
+    assert df.equals(original_df)
+    assert df.columns.tolist() == ['A', 'B', 'C']
+
 def test_can_call_with_indexes():
     df = pd.DataFrame(data={'A': [1, 2, 3], 'B': ['A', 'B', 'C'], 'D': ['E', 'F', 'G']})
 
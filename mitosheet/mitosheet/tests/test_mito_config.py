@@ -5,6 +5,7 @@
 # Distributed under the terms of the Modified BSD License.
 
 import os
+import pytest
 from mitosheet.enterprise.license_key import encode_date_to_license
 from mitosheet.enterprise.mito_config import (
     DEFAULT_MITO_CONFIG_SUPPORT_EMAIL, 
@@ -34,6 +35,10 @@ from mitosheet.enterprise.mito_config import (
     MITO_CONFIG_FEATURE_DISPLAY_CODE_OPTIONS,
     MITO_CONFIG_FEATURE_TELEMETRY,
     MITO_CONFIG_PRO,
+    MITO_CONFIG_STATE_CHECKPOINT_INTERVAL,
+    MITO_CONFIG_STATE_EVICTION_POLICY,
+    MITO_CONFIG_STATE_MEMORY_BUDGET_MB,
+    MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS,
     MitoConfig
 )
 from mitosheet.tests.test_utils import create_mito_wrapper
@@ -336,4 +341,36 @@ def test_mito_config_log_server_url():
 
     delete_all_mito_config_environment_variables()
 
+def test_mito_config_state_memory_budget():
+    mito_config = MitoConfig()
+    assert mito_config.state_memory_budget_mb is None
+    assert mito_config.state_checkpoint_interval == 10
+    assert mito_config.state_eviction_policy == 'oldest'
+
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_STATE_MEMORY_BUDGET_MB] = "100"
+    os.environ[MITO_CONFIG_STATE_CHECKPOINT_INTERVAL] = "5"
+    os.environ[MITO_CONFIG_STATE_EVICTION_POLICY] = "largest"
 
+    mito_config = MitoConfig()
+    assert mito_config.state_memory_budget_mb == 100
+    assert mito_config.state_checkpoint_interval == 5
+    assert mito_config.state_eviction_policy == 'largest'
+
+    os.environ[MITO_CONFIG_STATE_EVICTION_POLICY] = "newest"
+    with pytest.raises(ValueError):
+        MitoConfig().state_eviction_policy
+
+    delete_all_mito_config_environment_variables()
+
+def test_mito_config_approximate_statistics_min_rows():
+    assert MitoConfig().approximate_statistics_min_rows == 10_000_000
+
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS] = "1000"
+    assert MitoConfig().approximate_statistics_min_rows == 1000
+
+    os.environ[MITO_CONFIG_APPROXIMATE_STATISTICS_MIN_ROWS] = "0"
+    assert MitoConfig().approximate_statistics_min_rows is None
+
+    delete_all_mito_config_environment_variables()
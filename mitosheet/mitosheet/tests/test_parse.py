@@ -10,7 +10,8 @@ import pytest
 import pandas as pd
 
 from mitosheet.errors import MitoError
-from mitosheet.parser import get_backend_formula_from_frontend_formula, parse_formula, safe_contains, get_frontend_formula
+from mitosheet.lru_cache import LRUCache
+from mitosheet.parser import PARSE_FORMULA_CACHE, get_backend_formula_from_frontend_formula, get_index_cache_key, get_parse_formula_cache_info, parse_formula, safe_contains, get_frontend_formula
 from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, FORMULA_SPECIFIC_INDEX_LABELS_TYPE
 from mitosheet.tests.decorators import pandas_post_1_2_only
 
@@ -1448,4 +1449,81 @@ def test_get_frontend_formula_reconstucts_properly(formula,column_header,formula
 @pytest.mark.parametrize("formula,column_header,formula_label,dfs,df_names,sheet_index,python_code,functions,columns", VLOOKUP_TESTS)
 def test_get_cross_sheet_frontend_formula_reconstucts_properly(formula,column_header,formula_label,dfs,df_names,sheet_index,python_code,functions,columns):
     frontend_formula = get_frontend_formula(formula, formula_label, dfs, df_names, sheet_index)
-    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, dfs[sheet_index]) == formula
\ No newline at end of file
+    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, dfs[sheet_index]) == formula
+
+def test_parse_formula_cache_hits_for_same_formula_and_schema():
+    PARSE_FORMULA_CACHE.clear()
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+
+    first = parse_formula('=A + B', 'C', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df'], 0)
+    second = parse_formula('=A + B', 'C', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df.copy()], ['df'], 0)
+
+    assert first == second == ("df['C'] = df['A'] + df['B']", set(), {'A', 'B'}, set())
+    assert get_parse_formula_cache_info()['hits'] == 1
+    assert get_parse_formula_cache_info()['misses'] == 1
+
+    # Editing the returned sets does not edit the cache
+    second[2].add('D')
+    assert parse_formula('=A + B', 'C', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df'], 0)[2] == {'A', 'B'}
+
+
+def test_parse_formula_cache_misses_when_schema_changes():
+    PARSE_FORMULA_CACHE.clear()
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+
+    assert parse_formula('=A0', 'C', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df'], 0)[0] == "df['C'] = df['A'].shift(1, fill_value=0)"
+    # A different index gives a different row offset
+    df_new_index = df.set_index(pd.Index([1, 0, 2]))
+    assert parse_formula('=A0', 'C', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df_new_index], ['df'], 0)[0] == "df['C'] = df['A'].shift(-1, fill_value=0)"
+    # A different dtype gives a different shift
+    assert parse_formula('=A0', 'C', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df.astype(str)], ['df'], 0)[0] == "df['C'] = df['A'].shift(1)"
+    # Different df names and headers
+    assert parse_formula('=A0', 'C', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df_other'], 0)[0] == "df_other['C'] = df_other['A'].shift(1, fill_value=0)"
+    assert parse_formula('=A0', 'C', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df.rename(columns={'A': 'A0'})], ['df'], 0)[0] == "df['C'] = df['A0']"
+
+    assert get_parse_formula_cache_info()['hits'] == 0
+    assert get_parse_formula_cache_info()['misses'] == 5
+
+
+
+def test_parse_formula_cache_key_is_same_for_same_index():
+    index = pd.Index(['a', 'b', 'c'])
+    index_cache_key = get_index_cache_key(index)
+    assert get_index_cache_key(index) == index_cache_key
+    # Different index objects get different keys, even with the same labels
+    assert get_index_cache_key(pd.Index(['a', 'b', 'c'])) != index_cache_key
+    assert get_index_cache_key(pd.RangeIndex(3)) == get_index_cache_key(pd.RangeIndex(3))
+
+    PARSE_FORMULA_CACHE.clear()
+    df = pd.DataFrame({'A': [1, 2, 3]}, index=index)
+    parse_formula('=Aa', 'B', 'b', {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df'], 0)
+    parse_formula('=Aa', 'B', 'b', {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df.copy(deep=False)], ['df'], 0)
+    assert get_parse_formula_cache_info()['hits'] == 1
+
+def test_parse_formula_cache_is_bounded():
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.cache_info() == {'hits': 3, 'misses': 1, 'size': 2, 'max_size': 2}
+
+
+def test_parse_formula_on_wide_sheet_with_overlapping_headers():
+    df = pd.DataFrame({f'column_{i}': [1, 2] for i in range(1000)})
+    python_code, _, column_header_dependencies, _ = parse_formula('=column_1 + column_10 + column_100 + "column_11"', 'column_0', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df], ['df'], 0)
+
+    assert python_code == "df['column_0'] = df['column_1'] + df['column_10'] + df['column_100'] + \"column_11\""
+    assert column_header_dependencies == {'column_1', 'column_10', 'column_100'}
+
+
+def test_parse_formula_headers_equal_in_python_are_not_confused():
+    df_bool = pd.DataFrame({True: [1, 2], 'A': [1, 2]})
+    df_int = pd.DataFrame({1: [1, 2], 'A': [1, 2]})
+
+    assert parse_formula('=true + A', 'A', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df_bool], ['df'], 0)[2] == {True, 'A'}
+    assert parse_formula('=1 + A', 'A', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, [df_int], ['df'], 0)[0] == "df['A'] = df[1] + df['A']"
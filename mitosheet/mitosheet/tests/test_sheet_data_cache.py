@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the cache of the sheet data we send to the frontend
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.sheet_data_cache import SheetDataCache
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.utils import NpEncoder, get_column_data_for_json, get_new_id
+
+
+def test_only_converts_modified_columns():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c'], 'C': pd.to_datetime(['2020-01-01', None, '2021-01-01'])})
+    mito = create_mito_wrapper(df)
+    sheet_data_cache = mito.mito_backend.steps_manager.sheet_data_cache
+    sheet_data_cache.hits = sheet_data_cache.misses = 0
+
+    mito.set_cell_value(0, 'B', 0, 'd')
+    mito.sheet_data_json
+
+    assert sheet_data_cache.misses == 1
+    assert sheet_data_cache.hits > 0
+
+
+def test_converts_columns_again_after_undo():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+    mito = create_mito_wrapper(df)
+
+    mito.set_formula('=A + 1', 0, 'B', add_column=False)
+    mito.sheet_data_json
+    mito.undo()
+
+    assert json.loads(mito.sheet_data_json)[0]['data'][1]['columnData'] == [4, 5, 6]
+
+
+def test_multiple_sheets_only_converts_modified_sheet():
+    df1 = pd.DataFrame({'A': [1, 2, 3]})
+    df2 = pd.DataFrame({'B': [4, 5, 6]})
+    mito = create_mito_wrapper(df1, df2)
+    sheet_data_cache = mito.mito_backend.steps_manager.sheet_data_cache
+    sheet_data_cache.hits = sheet_data_cache.misses = 0
+
+    mito.add_column(1, 'C')
+    mito.sheet_data_json
+
+    assert sheet_data_cache.misses == 1
+    assert sheet_data_cache.hits > 0
+
+
+def test_removes_deleted_sheets():
+    df1 = pd.DataFrame({'A': [1, 2, 3]})
+    df2 = pd.DataFrame({'B': [4, 5, 6]})
+    mito = create_mito_wrapper(df1, df2)
+
+    mito.delete_dataframe(1)
+    mito.sheet_data_json
+
+    assert list(mito.mito_backend.steps_manager.sheet_data_cache._column_data.keys()) == [0]
+
+
+SHEET_DATA_ARRAY_JSON_TESTS = [
+    [],
+    [{'data': [], 'index': []}],
+    [{'dfName': 'df', 'data': [{'columnID': 'A', 'columnHeader': 'A', 'columnData': [1, np.int64(2), np.nan, 'a"b', None]}], 'index': [0, 1, 2, 3, 4], 'columnFormulas': {'A': []}}],
+    [{'data': [{'columnData': [1.5]}, {'columnData': ['é']}]}, {'data': [{'columnData': [True]}]}],
+]
+@pytest.mark.parametrize("sheet_data_array", SHEET_DATA_ARRAY_JSON_TESTS)
+def test_get_sheet_data_array_json_same_as_json_dumps(sheet_data_array):
+    sheet_data_cache = SheetDataCache()
+    for sheet_index, sheet_data in enumerate(sheet_data_array):
+        sheet_data_cache.start_sheet(sheet_index)
+        for column_data in sheet_data['data']:
+            column_data['columnData'] = sheet_data_cache.get_column_data(sheet_index, pd.Series(column_data['columnData'], dtype=object), None, lambda series: series.tolist())
+        sheet_data_cache.end_sheet(sheet_index)
+
+    # Twice, so that the second time uses the cached json of the columns
+    assert sheet_data_cache.get_sheet_data_array_json(sheet_data_array, encoder=NpEncoder) == json.dumps(sheet_data_array, cls=NpEncoder)
+    assert sheet_data_cache.get_sheet_data_array_json(sheet_data_array, encoder=NpEncoder) == json.dumps(sheet_data_array, cls=NpEncoder)
+
+
+def test_get_column_data_uses_max_rows():
+    sheet_data_cache = SheetDataCache()
+    series = pd.Series(range(10))
+
+    sheet_data_cache.start_sheet(0)
+    assert sheet_data_cache.get_column_data(0, series, 5, get_column_data_for_json) == [0, 1, 2, 3, 4]
+    assert sheet_data_cache.get_column_data(0, series, None, get_column_data_for_json) == list(range(10))
+    sheet_data_cache.end_sheet(0)
+
+    assert sheet_data_cache.misses == 2
+
+
+def test_sheet_data_json_only_has_data_of_columns_changed_since_received():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    mito = create_mito_wrapper(df)
+    steps_manager = mito.mito_backend.steps_manager
+
+    sheet_data = json.loads(steps_manager.get_sheet_data_json('first'))
+    assert [column['columnData'] for column in sheet_data[0]['data']] == [[1, 2, 3], ['a', 'b', 'c']]
+    column_data_keys = [column['columnDataKey'] for column in sheet_data[0]['data']]
+
+    mito.set_formula('=A + 1', 0, 'B', add_column=False)
+    sheet_data = json.loads(steps_manager.get_sheet_data_json('second', received_sheet_data_id='first'))
+    assert [column['columnData'] for column in sheet_data[0]['data']] == [None, [2, 3, 4]]
+    assert sheet_data[0]['data'][0]['columnDataKey'] == column_data_keys[0]
+    assert sheet_data[0]['data'][1]['columnDataKey'] != column_data_keys[1]
+
+    # If we don't know which sheet data the frontend has, we send all of the data
+    sheet_data = json.loads(steps_manager.get_sheet_data_json('third', received_sheet_data_id='unknown'))
+    assert [column['columnData'] for column in sheet_data[0]['data']] == [[1, 2, 3], [2, 3, 4]]
+
+
+def test_responses_only_have_data_of_columns_changed_since_received():
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    mito = create_mito_wrapper(df)
+    responses = []
+    mito.mito_backend.mito_send = responses.append
+
+    def add_column(column_header, received_sheet_data_id):
+        mito.mito_backend.receive_message({
+            'event': 'edit_event',
+            'id': column_header,
+            'type': 'add_column_edit',
+            'step_id': get_new_id(),
+            'params': {'sheet_index': 0, 'column_header': column_header, 'column_header_index': -1},
+            'received_sheet_data_id': received_sheet_data_id,
+        })
+        return json.loads(responses[-1]['shared_variables']['sheet_data_json'])[0]['data']
+
+    assert [column['columnData'] for column in add_column('B', None)] == [[1, 2, 3], [0, 0, 0]]
+    assert [column['columnData'] for column in add_column('C', 'B')] == [None, None, [0, 0, 0]]
+    # Frontends that do not send the sheet data they received get all of the data
+    mito.add_column(0, 'D')
+    assert 'columnDataKey' not in json.loads(mito.sheet_data_json)[0]['data'][0]
@@ -6,8 +6,11 @@
 """
 Contains tests for the state class
 """
-from mitosheet.state import DATAFRAME_SOURCE_IMPORTED, DATAFRAME_SOURCE_PASSED, State
+import numpy as np
 import pandas as pd
+import pytest
+
+from mitosheet.state import DATAFRAME_SOURCE_IMPORTED, DATAFRAME_SOURCE_PASSED, State, is_copy_on_write_copy_supported
 
 def test_state_can_add_df_to_end():
     df = pd.DataFrame({'A': [123]})
@@ -29,3 +32,32 @@ def test_state_can_add_df_to_middle():
     
     assert state.df_sources == [DATAFRAME_SOURCE_IMPORTED]
 
+
+@pytest.mark.skipif(not is_copy_on_write_copy_supported(), reason='requires pandas 1.5 or above')
+def test_state_copy_on_write_only_copies_modified_columns():
+    df1 = pd.DataFrame({'A': [1.0, 2.0], 'B': ['a', 'b']})
+    df2 = pd.DataFrame({'C': [5, 6]})
+    state = State([df1, df2], 3)
+    new_state = state.copy(deep_sheet_indexes=[0], modified_column_ids={0: {'A'}})
+
+    assert not np.shares_memory(new_state.dfs[0]['A'].values, df1['A'].values)
+    assert np.shares_memory(new_state.dfs[0]['B'].values, df1['B'].values)
+    assert np.shares_memory(new_state.dfs[1]['C'].values, df2['C'].values)
+
+    new_state.dfs[0].loc[0, 'A'] = 100
+    assert df1.loc[0, 'A'] == 1.0
+
+    # Metadata is only copied for the sheets that are modified
+    assert new_state.column_formulas[0] is not state.column_formulas[0]
+    assert new_state.column_formulas[1] is state.column_formulas[1]
+    assert new_state.column_ids.get_column_ids_map(1) is state.column_ids.get_column_ids_map(1)
+    new_state.column_ids.set_column_header(0, 'B', 'D')
+    assert state.column_ids.get_column_header_by_id(0, 'B') == 'B'
+
+def test_state_copy_without_modified_column_ids_deep_copies():
+    df1 = pd.DataFrame({'A': [1.0, 2.0], 'B': [3.0, 4.0]})
+    state = State([df1], 3)
+    new_state = state.copy(deep_sheet_indexes=[0])
+
+    assert not np.shares_memory(new_state.dfs[0]['B'].values, df1['B'].values)
+    assert new_state.column_formulas[0] is not state.column_formulas[0]
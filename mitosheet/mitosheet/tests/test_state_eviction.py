@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for evicting states from the step history when over
+the memory budget.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from mitosheet.enterprise.mito_config import (
+    MITO_CONFIG_STATE_CHECKPOINT_INTERVAL, 
+    MITO_CONFIG_STATE_EVICTION_POLICY,
+    MITO_CONFIG_STATE_MEMORY_BUDGET_MB, 
+    MITO_CONFIG_VERSION
+)
+from mitosheet.state_eviction import get_dataframe_memory_usage, get_state_memory_usage
+from mitosheet.tests.test_mito_config import delete_all_mito_config_environment_variables
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+@pytest.fixture
+def zero_memory_budget():
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_STATE_MEMORY_BUDGET_MB] = "0"
+    os.environ[MITO_CONFIG_STATE_CHECKPOINT_INTERVAL] = "3"
+    yield
+    delete_all_mito_config_environment_variables()
+
+
+def create_mito_with_formula_steps():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    for i in range(1, 7):
+        mito.add_column(0, f'B{i}')
+        mito.set_formula(f'=A + {i}', 0, f'B{i}', add_column=False)
+    return mito
+
+
+def test_no_memory_budget_evicts_nothing():
+    mito = create_mito_with_formula_steps()
+    steps = mito.mito_backend.steps_manager.steps_including_skipped
+    assert not any(step.final_defined_state.evicted for step in steps)
+    assert 'num_states_evicted' not in mito.mito_backend.steps_manager.curr_step.execution_data
+
+
+def test_states_evicted_except_checkpoints(zero_memory_budget):
+    mito = create_mito_with_formula_steps()
+    steps_manager = mito.mito_backend.steps_manager
+    steps = steps_manager.steps_including_skipped
+
+    for step_index, step in enumerate(steps):
+        is_retained = step_index % 3 == 0 or step_index == len(steps) - 1
+        assert step.final_defined_state.evicted != is_retained
+        if step.final_defined_state.evicted:
+            assert len(step.dfs[0]) == 0
+            assert get_state_memory_usage(step.final_defined_state) == 0
+            # Metadata and dtypes are kept for evicted states
+            assert list(step.dfs[0].columns) == list(step.column_ids.get_column_ids_map(0).values())
+            assert step.dfs[0]['A'].dtype == 'int64'
+
+    assert steps_manager.curr_step.execution_data['num_states_evicted'] > 0
+    assert mito.dfs[0]['B6'].tolist() == [7, 8, 9]
+
+
+@pytest.mark.parametrize("eviction_policy", ['oldest', 'largest'])
+def test_checkout_evicted_step_recomputes_state(zero_memory_budget, eviction_policy):
+    os.environ[MITO_CONFIG_STATE_EVICTION_POLICY] = eviction_policy
+    mito = create_mito_with_formula_steps()
+    steps_manager = mito.mito_backend.steps_manager
+    assert steps_manager.steps_including_skipped[5].final_defined_state.evicted
+
+    mito.checkout_step_by_idx(5)
+
+    assert steps_manager.curr_step_idx == 5
+    assert not steps_manager.curr_step.final_defined_state.evicted
+    assert steps_manager.curr_step.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B1': [2, 3, 4], 'B2': [3, 4, 5], 'B3': [0, 0, 0]}))
+    assert steps_manager.curr_step.execution_data['state_recompute_time'] > 0
+
+    mito.checkout_step_by_idx(-1)
+    assert mito.dfs[0]['B6'].tolist() == [7, 8, 9]
+
+
+def test_undo_and_edit_after_eviction(zero_memory_budget):
+    mito = create_mito_with_formula_steps()
+    mito.undo()
+    mito.undo()
+    assert mito.dfs[0].columns.tolist() == ['A', 'B1', 'B2', 'B3', 'B4', 'B5']
+    assert mito.dfs[0]['B5'].tolist() == [6, 7, 8]
+
+    mito.set_formula('=A * 10', 0, 'B2', add_column=False)
+    assert mito.dfs[0]['B2'].tolist() == [10, 20, 30]
+    assert mito.dfs[0]['B5'].tolist() == [6, 7, 8]
+
+
+def test_deep_memory_usage_estimates_strings():
+    df = pd.DataFrame({'A': ['a' * (i % 100) for i in range(10_000)], 'B': range(10_000)}, index=[str(i) for i in range(10_000)])
+    deep_memory_usage = int(df.memory_usage(index=True, deep=True).sum())
+
+    assert get_dataframe_memory_usage(df) == int(df.memory_usage(index=True, deep=False).sum())
+    assert abs(get_dataframe_memory_usage(df, deep=True) - deep_memory_usage) < deep_memory_usage * 0.05
+    assert get_dataframe_memory_usage(df.iloc[:0], deep=True) == int(df.iloc[:0].memory_usage(index=True, deep=False).sum())
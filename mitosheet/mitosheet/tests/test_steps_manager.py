@@ -3,15 +3,19 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
+from typing import List
 import pandas as pd
 import pytest
 from mitosheet.enterprise.mito_config import MitoConfig
-from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE
+from mitosheet.step_performers.column_steps.set_column_formula import SetColumnFormulaStepPerformer
+from mitosheet.step_performers.filter import FC_NUMBER_GREATER_THAN_OR_EQUAL
+from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, ColumnID
 
 from mitosheet.utils import get_new_id
 from mitosheet.errors import MitoError
-from mitosheet.steps_manager import StepsManager
-from mitosheet.tests.test_utils import create_mito_wrapper_with_data
+from mitosheet.step import Step
+from mitosheet.steps_manager import StepSkipIndex, StepsManager, get_step_indexes_to_skip
+from mitosheet.tests.test_utils import create_mito_wrapper, create_mito_wrapper_with_data
 from mitosheet.column_headers import get_column_header_id
 
 
@@ -104,3 +108,105 @@ def test_failed_overwrite_rolls_back_to_previous_state():
     assert mito.dfs[0].equals(pd.DataFrame(data={'A': [1, 2, 3], 'B': [0, 0, 0]}))
 
 
+def _count_formula_executions(monkeypatch: pytest.MonkeyPatch) -> List[ColumnID]:
+    executed_column_ids: List[ColumnID] = []
+    execute = SetColumnFormulaStepPerformer.execute
+
+    def counting_execute(prev_state, params):
+        executed_column_ids.append(params['column_id'])
+        return execute(prev_state, params)
+
+    monkeypatch.setattr(SetColumnFormulaStepPerformer, 'execute', staticmethod(counting_execute))
+    return executed_column_ids
+
+
+def test_editing_filter_only_reexecutes_steps_on_filtered_sheet(monkeypatch):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}), pd.DataFrame({'B': [4, 5, 6]}))
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER_THAN_OR_EQUAL, 1)
+    mito.set_formula('=B + 1', 1, 'C', add_column=True)
+    mito.set_formula('=A * 10', 0, 'D', add_column=True)
+
+    executed_column_ids = _count_formula_executions(monkeypatch)
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER_THAN_OR_EQUAL, 2)
+
+    assert executed_column_ids == ['D']
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [2, 3], 'D': [20, 30]}, index=[1, 2]))
+    assert mito.dfs[1].equals(pd.DataFrame({'B': [4, 5, 6], 'C': [5, 6, 7]}))
+
+
+def test_overwriting_formula_only_reexecutes_dependent_formulas(monkeypatch):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.set_formula('=A + 1', 0, 'B', add_column=True)
+    formula_step_id = mito.mito_backend.steps_manager.curr_step.step_id
+    mito.set_formula('=B * 2', 0, 'C', add_column=True)
+    mito.set_formula('=A * 3', 0, 'D', add_column=True)
+
+    executed_column_ids = _count_formula_executions(monkeypatch)
+    mito.mito_backend.receive_message({
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'set_column_formula_edit',
+        'step_id': formula_step_id,
+        'params': {
+            'sheet_index': 0,
+            'column_id': 'B',
+            'formula_label': 0,
+            'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+            'new_formula': '=A + 100',
+        }
+    })
+
+    # The old formula for B is skipped, so C is reexecuted, D is reused, and the new B formula is executed
+    assert executed_column_ids == ['C', 'B']
+    assert mito.dfs[0]['B'].tolist() == [101, 102, 103]
+    assert mito.dfs[0]['D'].tolist() == [3, 6, 9]
+    assert mito.mito_backend.steps_manager.curr_step.column_formulas[0]['D'][0]['frontend_formula'] == mito.mito_backend.steps_manager.steps_including_skipped[-2].column_formulas[0]['D'][0]['frontend_formula']
+
+
+def test_undo_to_step_index_reuses_formula_steps(monkeypatch):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.set_formula('=A + 1', 0, 'B', add_column=True)
+    mito.set_formula('=B * 2', 0, 'C', add_column=True)
+    mito.set_formula('=A * 3', 0, 'D', add_column=True)
+
+    executed_column_ids = _count_formula_executions(monkeypatch)
+    mito.undo_to_step_index(4)
+
+    assert executed_column_ids == []
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [2, 3, 4], 'C': [4, 6, 8]}))
+
+    mito.undo()
+    assert mito.dfs[0]['D'].tolist() == [3, 6, 9]
+
+
+def test_step_skip_index_matches_skipping_each_step():
+    import random
+    random.seed(0)
+
+    step_list = [Step('initialize', 'initialize', {})]
+    for _ in range(300):
+        step_type = random.choice(['filter_column', 'set_column_formula', 'add_column'])
+        step_id = random.choice(['a', 'b', 'c', get_new_id()])
+        params = {
+            'sheet_index': random.choice([0, 1]),
+            'column_id': random.choice(['A', 'B']),
+            'index_labels_formula_is_applied_to': random.choice([
+                {'type': FORMULA_ENTIRE_COLUMN_TYPE}, 
+                {'type': 'specific_index_labels', 'index_labels': [0]}
+            ]),
+        }
+        step_list.append(Step(step_type, step_id, params))
+
+    expected_step_indexes_to_skip = set()
+    for step_index, step in enumerate(step_list):
+        expected_step_indexes_to_skip.update(step.step_indexes_to_skip(step_list[:step_index]))
+
+    assert get_step_indexes_to_skip(step_list) == expected_step_indexes_to_skip
+
+    # Adding steps one at a time gives the steps each step skips that were not already skipped
+    step_skip_index = StepSkipIndex()
+    for step_index, step in enumerate(step_list):
+        already_skipped_step_indexes = set(step_skip_index.step_indexes_to_skip)
+        skipped_step_indexes = step_skip_index.append(step)
+        assert skipped_step_indexes.union(already_skipped_step_indexes) == step.step_indexes_to_skip(step_list[:step_index]).union(already_skipped_step_indexes)
+    assert len(step_skip_index) == len(step_list)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the multi string matcher used by the parser
+"""
+import re
+
+import pytest
+
+from mitosheet.string_matcher import MultiStringMatcher
+
+
+STRING_MATCHER_TESTS = [
+    (['A'], '=A + B'),
+    (['A', 'AA', 'AAA'], '=AAAAA + A'),
+    (['he', 'she', 'his', 'hers'], 'ushers'),
+    (['column 1', 'column 10', 'olu'], '=column 10 + column 1 * column 100'),
+    (['ab', 'b', 'abc', 'bc', 'c'], 'abcabcbc'),
+    (['A', ''], '=A'),
+    (['A', 'A'], '=A+A'),
+    (['df!', 'df2!'], '=VLOOKUP(A, df2!A:B, 2) + df!'),
+    (['x'], ''),
+]
+
+@pytest.mark.parametrize("patterns, text", STRING_MATCHER_TESTS)
+def test_string_matcher_finds_same_matches_as_regex(patterns, text):
+    matcher = MultiStringMatcher(patterns)
+    all_occurrences = matcher.find_all(text)
+    non_overlapping_occurrences = matcher.find_all_non_overlapping(text)
+
+    for pattern_index, pattern in enumerate(patterns):
+        expected_non_overlapping = [(match.start(), match.end()) for match in re.finditer(re.escape(pattern), text)]
+        assert non_overlapping_occurrences.get(pattern_index, []) == expected_non_overlapping
+
+        expected_all = [(match.start(1), match.end(1)) for match in re.finditer(f'(?=({re.escape(pattern)}))', text)]
+        assert all_occurrences.get(pattern_index, []) == expected_all
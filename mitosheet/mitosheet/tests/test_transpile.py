@@ -1306,4 +1306,45 @@ def test_does_not_reorder_around_empty_code_chunk():
     mito.delete_columns(0, ['A', 'B'])
     result = mito.generate_graph('test', BAR, 0, False, ['C'], [], '400', '400')
     assert result
-    assert mito.dfs[0].equals(pd.DataFrame({'C': [3], 'D': [0]}))
\ No newline at end of file
+    assert mito.dfs[0].equals(pd.DataFrame({'C': [3], 'D': [0]}))
+
+def test_transpile_reuses_code_chunks_of_steps():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.set_formula('=A + 1', 0, 'B', add_column=True)
+    mito.rename_column(0, 'B', 'C')
+    mito.add_column(0, 'D')
+    mito.delete_columns(0, ['D'])
+
+    steps = mito.mito_backend.steps_manager.steps_including_skipped
+    code_chunks = [step.get_code_chunks() for step in steps[1:]]
+    code = mito.transpiled_code
+
+    # Transpiling again does not transpile the steps again
+    assert mito.transpiled_code == code
+    for step, step_code_chunks in zip(steps[1:], code_chunks):
+        assert all(code_chunk is cached_code_chunk for code_chunk, cached_code_chunk in zip(step.get_code_chunks(), step_code_chunks))
+
+    # And the code is the same as if we transpiled everything from scratch
+    for step in steps:
+        step.clear_code_chunks_cache()
+    assert mito.transpiled_code == code
+
+
+def test_transpile_cached_code_after_undo_and_redo():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.set_formula('=A + 1', 0, 'B', add_column=True)
+    code_after_formula = mito.transpiled_code
+    mito.rename_column(0, 'B', 'C')
+    code_after_rename = mito.transpiled_code
+
+    mito.undo()
+    assert mito.transpiled_code == code_after_formula
+    mito.redo()
+    assert mito.transpiled_code == code_after_rename
+
+    # Checking out a previous step gives the same code as transpiling from scratch
+    mito.undo_to_step_index(1)
+    code_at_previous_step = mito.transpiled_code
+    for step in mito.mito_backend.steps_manager.steps_including_skipped:
+        step.clear_code_chunks_cache()
+    assert mito.transpiled_code == code_at_previous_step
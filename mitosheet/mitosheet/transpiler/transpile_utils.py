@@ -375,7 +375,7 @@ def get_default_code_options(analysis_name: str) -> CodeOptions:
     }
 
 
-def get_globals_for_exec(state: State, public_interface: int) -> Dict[str, Any]:
+def get_globals_for_exec(state: State, public_interface: int, step_type: Optional[str]=None) -> Dict[str, Any]:
     """
     Anytime you are exec'ing transpiled code, you need to pass some global variables including:
     1. The public interface exported by Mito for this public interface code
@@ -383,6 +383,8 @@ def get_globals_for_exec(state: State, public_interface: int) -> Dict[str, Any]:
     3. The dataframe names
 
     This function collects these all in one location, so they then can be exec'ed.
+
+    step_type is the type of the step whose code is exec'ed, if the code is for a step.
     """
 
     df_names_to_df = {
@@ -418,4 +420,10 @@ def get_globals_for_exec(state: State, public_interface: int) -> Dict[str, Any]:
         **{f.__name__: f for f in user_defined_editors},
     }
 
+    # If we are reading the files for imports ahead of time, the code of the imports uses what was read
+    from mitosheet.step_performers.import_steps.import_prefetch import PREFETCHABLE_STEP_TYPES, get_prefetching_pandas
+    prefetching_pandas = get_prefetching_pandas()
+    if prefetching_pandas is not None and step_type in PREFETCHABLE_STEP_TYPES:
+        local_vars.update(prefetching_pandas.get_globals_for_exec())
+
     return local_vars
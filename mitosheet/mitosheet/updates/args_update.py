@@ -68,6 +68,10 @@ def do_arg_update(steps_manager: StepsManagerType, args: List[str]) -> None:
     # end of the arguments (not creating phantom tabs that cannot be clicked)
     steps_manager.curr_step.post_state.df_names = final_names[:len(steps_manager.curr_step.dfs)] # type: ignore
 
+    # As we changed the state without executing the steps, we make sure to transpile them again
+    for step in steps_manager.steps_including_skipped:
+        step.clear_code_chunks_cache()
+
     # Save the original args exactly as is, because we might need them for generating a function
     steps_manager.original_args_raw_strings = args
 
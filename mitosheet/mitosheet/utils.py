@@ -20,7 +20,7 @@ import numpy as np
 import pandas as pd
 
 from mitosheet.column_headers import ColumnIDMap, get_column_header_display
-from mitosheet.is_type_utils import get_float_dt_td_columns, is_int_dtype
+from mitosheet.is_type_utils import is_datetime_dtype, is_int_dtype, is_timedelta_dtype
 from mitosheet.types import (FC_BOOLEAN_IS_FALSE, FC_BOOLEAN_IS_TRUE, FC_DATETIME_EXACTLY, FC_DATETIME_GREATER, FC_DATETIME_GREATER_THAN_OR_EQUAL, FC_DATETIME_LESS,
         FC_DATETIME_LESS_THAN_OR_EQUAL, FC_DATETIME_NOT_EXACTLY, FC_EMPTY,
         FC_LEAST_FREQUENT, FC_MOST_FREQUENT, FC_NOT_EMPTY, FC_NUMBER_EXACTLY,
@@ -35,6 +35,7 @@ from mitosheet.types import (FC_BOOLEAN_IS_FALSE, FC_BOOLEAN_IS_TRUE, FC_DATETIM
 from mitosheet.excel_utils import get_df_name_as_valid_sheet_name
 
 from mitosheet.public.v3.formatting import add_formatting_to_excel_sheet
+from mitosheet.sheet_data_cache import SheetDataCache
 
 # We only send the first 1500 rows of a dataframe; note that this
 # must match this variable defined on the front-end
@@ -141,12 +142,16 @@ def dfs_to_array_for_json(
         column_formulas_array: List[Dict[ColumnID, List[FrontendFormulaAndLocation]]],
         column_filters_array: List[Dict[ColumnID, Any]],
         column_ids: ColumnIDMap,
-        df_formats: List[DataframeFormat]
+        df_formats: List[DataframeFormat],
+        sheet_data_cache: Optional[SheetDataCache]=None
     ) -> List:
 
     new_array = []
     for sheet_index, df in enumerate(dfs):
         if sheet_index in modified_sheet_indexes:
+            if sheet_data_cache is not None:
+                sheet_data_cache.start_sheet(sheet_index)
+
             new_array.append(
                 df_to_json_dumpsable(
                     state,
@@ -160,12 +165,19 @@ def dfs_to_array_for_json(
                     df_formats[sheet_index],
                     # We only send the first 1500 rows and 1500 columns
                     max_rows=MAX_ROWS,
-                    max_columns=MAX_COLUMNS
+                    max_columns=MAX_COLUMNS,
+                    sheet_data_cache=sheet_data_cache
                 ) 
             )
+
+            if sheet_data_cache is not None:
+                sheet_data_cache.end_sheet(sheet_index)
         else:
             new_array.append(previous_array[sheet_index])
 
+    if sheet_data_cache is not None:
+        sheet_data_cache.remove_sheets(len(dfs))
+
     return new_array
 
 
@@ -411,7 +423,8 @@ def df_to_json_dumpsable(
         column_headers_to_column_ids: Dict[ColumnHeader, ColumnID],
         df_format: DataframeFormat,
         max_rows: Optional[int]=MAX_ROWS, # How many items you want to display. None when using this function to get unique value counts
-        max_columns: int=MAX_COLUMNS # How many columns you want to display. Unlike max_rows, this is always defined
+        max_columns: int=MAX_COLUMNS, # How many columns you want to display. Unlike max_rows, this is always defined
+        sheet_data_cache: Optional[SheetDataCache]=None # If passed, only the columns that changed since they were last sent are converted
     ) -> Dict[str, Any]:
     """
     Returns a dataframe and other metadata represented in a way that can be turned into a 
@@ -440,25 +453,33 @@ def df_to_json_dumpsable(
     """
 
     (num_rows, num_columns) = original_df.shape 
+    num_rows_displayed = num_rows if max_rows is None else min(num_rows, max_rows)
 
-    json_obj = convert_df_to_parsed_json(original_df, max_rows=max_rows, max_columns=max_columns)
+    # Make sure the column headers can be turned into json
+    json.loads(original_df.iloc[:0, :max_columns].to_json(orient="split"))
 
     final_data = []
     column_dtype_map = {}
     for column_index, column_header in enumerate(original_df.columns):
         column_id = _get_column_id_from_header_safe(column_header, column_headers_to_column_ids)
+        column_dtype = str(original_df.dtypes.iloc[column_index])
+
+        # If we're beyond the max columns, we don't have data, and so the column data is all None
+        column_data: List[Any] = [None] * num_rows_displayed
+        if column_index < max_columns:
+            series = original_df.iloc[:, column_index]
+            if sheet_data_cache is not None:
+                column_data = sheet_data_cache.get_column_data(sheet_index, series, max_rows, get_column_data_for_json)
+            else:
+                column_data = get_column_data_for_json(series if max_rows is None else series.head(max_rows))
 
         column_final_data: Dict[str, Any] = {
             'columnID': column_id,
             'columnHeader': get_column_header_display(column_header),
-            'columnDtype': str(original_df[column_header].dtype),
-            'columnData': [],
+            'columnDtype': column_dtype,
+            'columnData': column_data,
         }
-        column_dtype_map[column_id] = str(original_df[column_header].dtype)
-        for row in json_obj['data']:
-            # If we're beyond the max columns, we might not have data, and we leave column data empty
-            # in this case and don't append anything
-            column_final_data['columnData'].append(row[column_index] if column_index < MAX_COLUMNS else None)
+        column_dtype_map[column_id] = column_dtype
         
         final_data.append(column_final_data) 
 
@@ -480,7 +501,7 @@ def df_to_json_dumpsable(
         'columnFormulasMap': column_formulas,
         'columnFiltersMap': column_filters,
         'columnDtypeMap': column_dtype_map,
-        'index': json_obj['index'],
+        'index': get_index_for_json(original_df.index[:num_rows_displayed]),
         'dfFormat': df_format,
         'conditionalFormattingResult': get_conditonal_formatting_result(
             state,
@@ -505,44 +526,59 @@ def convert_df_to_parsed_json(original_df: pd.DataFrame, max_rows: Optional[int]
     Returns a dataframe as a json object with the correct formatting
     """
     if max_rows is None:
-        df = original_df.copy(deep=True) 
+        df = original_df
     else:
         # we only show the first max_rows rows!
-        df = original_df.head(n=max_rows).copy(deep=True)
+        df = original_df.head(n=max_rows)
 
     # we only show the first max_columns columns!
     df = df.iloc[: , :max_columns]
 
-    float_columns, date_columns, timedelta_columns = get_float_dt_td_columns(df)
-    # We figure out which of the columns contain dates, and we
-    # convert them to string columns (for formatting reasons).
-    # NOTE: we don't use date_format='iso' in df.to_json call as it appends seconds to the object, 
+    # We convert each column on its own, as this is much faster than converting 
+    # the whole dataframe, and allows us to only convert the columns that change
+    columns_data = [get_column_data_for_json(df.iloc[:, column_index]) for column_index in range(df.shape[1])]
+
+    return {
+        'columns': json.loads(df.iloc[:0].to_json(orient="split"))['columns'],
+        'index': get_index_for_json(df.index),
+        'data': [list(row) for row in zip(*columns_data)] if len(columns_data) > 0 else [[] for _ in range(len(df))]
+    }
+
+
+def get_column_data_for_json(series: pd.Series) -> List[Any]:
+    """
+    Returns the values of the series in the format we display them in on the 
+    frontend: dates and timedeltas are formatted as strings, and null values 
+    (and infinities) are set to 'NaN'.
+    """
+    column_dtype = str(series.dtype)
+    if column_dtype == 'datetime64[ns]':
+        # This is the same as .dt.strftime('%Y-%m-%d %X'), but much faster
+        values = np.datetime_as_string(series.to_numpy(), unit='s').tolist()
+        return [value.replace('T', ' ') if value != 'NaT' else 'NaN' for value in values]
+    
+    # NOTE: we don't use date_format='iso' in to_json call as it appends seconds to the object, 
     # see here: https://stackoverflow.com/questions/52730953/pandas-to-json-output-date-format-in-specific-form
-    for column_header in date_columns:
-        df[column_header] = df[column_header].dt.strftime('%Y-%m-%d %X')
-
-    # Third, we figure out which of the columns contain timedeltas, and 
-    # we format the timedeltas as strings to make them readable
-    for column_header in timedelta_columns:
-        df[column_header] = df[column_header].apply(lambda x: str(x))
-
-    # Then, we check the index. If it is a datetime or a timedelta, we have to do
-    # the same conversions that we did above
-    # Then, if we have a datetime index, we update the index to be jsonified better
-    if isinstance(df.index, pd.DatetimeIndex):
-        df.index = df.index.strftime('%Y-%m-%d %X')
-    elif isinstance(df.index, pd.TimedeltaIndex):
-        df.index = df.index.to_series().apply(lambda x: str(x))
-
-    json_obj = json.loads(df.to_json(orient="split"))
-    # Then, we go through and find all the null values (which are infinities),
-    # and set them to 'NaN' for display in the frontend.
-    for d in json_obj['data']:
-        for idx, e in enumerate(d):
-            if e is None:
-                d[idx] = 'NaN'
-
-    return json_obj
+    if is_datetime_dtype(column_dtype):
+        series = series.dt.strftime('%Y-%m-%d %X')
+    elif is_timedelta_dtype(column_dtype):
+        series = series.apply(lambda x: str(x))
+
+    values = json.loads(series.to_json(orient="values"))
+    return [value if value is not None else 'NaN' for value in values]
+
+
+def get_index_for_json(index: pd.Index) -> List[Any]:
+    """
+    Returns the values of the index in the format we display them in on the frontend.
+    """
+    # If it is a datetime or a timedelta, we have to do the same conversions we do for columns
+    if isinstance(index, pd.DatetimeIndex):
+        index = index.strftime('%Y-%m-%d %X')
+    elif isinstance(index, pd.TimedeltaIndex):
+        index = index.to_series().apply(lambda x: str(x))
+
+    return json.loads(pd.DataFrame(index=index).to_json(orient="split"))['index']
 
 
 def get_random_id() -> str:
@@ -17,6 +17,7 @@ import { AvailableSnowflakeOptionsAndDefaults, SnowflakeCredentials, SnowflakeTa
 import { SplitTextToColumnsParams } from "../components/taskpanes/SplitTextToColumns/SplitTextToColumnsTaskpane";
 import { StepImportData } from "../components/taskpanes/UpdateImports/UpdateImportsTaskpane";
 import { AnalysisData, MergeParams, BackendPivotParams, CodeOptions, CodeSnippetAPIResult, ColumnID, DataframeFormat, FeedbackID, FilterGroupType, FilterType, FormulaLocation, GraphID, ParameterizableParams, SheetData, UIState, UserProfile, GraphParamsBackend, GraphParamsFrontend, StepType } from "../types";
+import { fillUnchangedColumnData } from "../utils/sheetData";
 import { SendFunction, SendFunctionErrorReturnType, SendFunctionSuccessReturnType } from "./send";
 
 export type MitoAPIResult<ResultType> = {result: ResultType} | SendFunctionErrorReturnType 
@@ -104,6 +105,9 @@ export class MitoAPI {
     setAnalysisData: React.Dispatch<React.SetStateAction<AnalysisData>>
     setUserProfile: React.Dispatch<React.SetStateAction<UserProfile>>
     setUIState: React.Dispatch<React.SetStateAction<UIState>>
+    // The id of the last message we received the sheet data in response to, so
+    // the backend only sends the data of the columns that changed since then
+    receivedSheetDataID: string | null
     
     constructor(
         getSendFunction: () => Promise<SendFunction | undefined>,
@@ -117,11 +121,21 @@ export class MitoAPI {
         this.setAnalysisData = setAnalysisData; 
         this.setUserProfile = setUserProfile;
         this.setUIState = setUIState;
+        this.receivedSheetDataID = null;
     }
 
-    _updateSharedStateVariables<ResultType>(response: SendFunctionSuccessReturnType<ResultType>) {
+    _updateSharedStateVariables<ResultType>(response: SendFunctionSuccessReturnType<ResultType>, id: string) {
         if (response.sheetDataArray) {
-            this.setSheetDataArray(response.sheetDataArray);
+            const sheetDataArray = response.sheetDataArray;
+            this.receivedSheetDataID = id;
+            this.setSheetDataArray((prevSheetDataArray) => {
+                const [filledSheetDataArray, missingColumnData] = fillUnchangedColumnData(sheetDataArray, prevSheetDataArray);
+                if (missingColumnData) {
+                    console.error(`Missing column data in the response to message: {id: ${id}}`);
+                    this.receivedSheetDataID = null;
+                }
+                return filledSheetDataArray;
+            });
         } 
         if (response.analysisData) {
             this.setAnalysisData(response.analysisData);
@@ -185,6 +199,7 @@ export class MitoAPI {
         // Generate a random id, and add it to the params
         const id = getRandomId();
         msg['id'] = id;
+        msg['received_sheet_data_id'] = this.receivedSheetDataID;
 
         if (this._send === undefined) {
             const _send = await this.getSendFunction();
@@ -205,7 +220,7 @@ export class MitoAPI {
             return this._handleErrorResponse(response);
         } else {
             // Otherwise, we simple update the state variables, and return the response
-            this._updateSharedStateVariables(response);
+            this._updateSharedStateVariables(response, id);
             return {result: response.result}
         }
 
@@ -259,13 +274,16 @@ export class MitoAPI {
     /*
         Returns a string encoding of the CSV file to download
     */
-    async getSearchMatches(sheetIndex: number, searchValue: string): Promise<MitoAPIResult<SearchResults>> {
+    async getSearchMatches(sheetIndex: number, searchValue: string, startRow?: number, numRows?: number): Promise<MitoAPIResult<SearchResults>> {
         return await this.send<SearchResults>({
             'event': 'api_call',
             'type': 'get_search_matches',
             'params': {
                 'sheet_index': sheetIndex,
-                'search_value': searchValue
+                'search_value': searchValue,
+                // If these are undefined, they are not sent, and the matches in the first 1500 rows are returned
+                'start_row': startRow,
+                'num_rows': numRows
             },
         })
     }
@@ -300,6 +318,7 @@ export class MitoAPI {
         column_id: ColumnID,
         height?: string,
         width?: string,
+        exact?: boolean,
     ): Promise<MitoAPIResult<GraphObject>> {
         return await this.send<GraphObject>({
             'event': 'api_call',
@@ -310,6 +329,7 @@ export class MitoAPI {
                 'height': height,
                 'width': width,
                 'include_plotlyjs': (window as any).Plotly === undefined,
+                'exact': exact,
             },
         })
     }
@@ -317,15 +337,18 @@ export class MitoAPI {
 
     /*
         Returns a list of the key, values that is returned by .describing 
-        this column
+        this column. For very large columns, these are estimated from a sample
+        and include is_approximate, unless exact is passed and the exact 
+        statistics have been computed in the background.
     */
-    async getColumnDescribe(sheetIndex: number, columnID: ColumnID): Promise<MitoAPIResult<Record<string, string>>> {
+    async getColumnDescribe(sheetIndex: number, columnID: ColumnID, exact?: boolean): Promise<MitoAPIResult<Record<string, string>>> {
         return await this.send<Record<string, string>>({
             'event': 'api_call',
             'type': 'get_column_describe',
             'params': {
                 'sheet_index': sheetIndex,
-                'column_id': columnID
+                'column_id': columnID,
+                'exact': exact
             },
         })
     }
@@ -435,15 +458,17 @@ export class MitoAPI {
         columnID: ColumnID,
         searchString: string,
         sort: UniqueValueSortType,
-    ): Promise<MitoAPIResult<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean }>> {
-        return await this.send<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean }>({
+        exact?: boolean,
+    ): Promise<MitoAPIResult<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean, isApproximate: boolean }>> {
+        return await this.send<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean, isApproximate: boolean }>({
             'event': 'api_call',
             'type': 'get_unique_value_counts',
             'params': {
                 'sheet_index': sheetIndex,
                 'column_id': columnID,
                 'search_string': searchString,
-                'sort': sort
+                'sort': sort,
+                'exact': exact
             },
         })
     }
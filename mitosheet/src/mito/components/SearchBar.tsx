@@ -94,7 +94,8 @@ export const SearchBar: React.FC<SearchBarProps> = (props) => {
 
         // Call the API to get the total number of matches and the displayed matches. 
         void mitoAPI.getSearchMatches(uiState.selectedSheetIndex, searchValue ?? '').then((response) => {
-            if ('error' in response) {
+            // If this search was superseded by a newer one, the newer one sets the matches
+            if ('error' in response || response.result === null) {
                 return;
             }
             const new_total_number_matches = response.result.total_number_matches;
@@ -168,6 +168,9 @@ export interface CSVFileMetadata {
     encodings: string[],
     decimals: Decimal[]
     skiprows: number[]
+    // Estimated from the start of each file, so these are not exact
+    estimated_row_counts?: (number | null)[]
+    column_previews?: string[][]
 }
 
 export interface CSVImportParams {
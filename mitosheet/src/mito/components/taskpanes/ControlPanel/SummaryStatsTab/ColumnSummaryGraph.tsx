@@ -32,7 +32,7 @@ function ColumnSummaryGraph(props: ColumnSummaryGraphProps): JSX.Element {
             '100%',
         );
         const _graphHTMLAndScript = 'error' in response ? undefined : response.result
-        setGraphObj(_graphHTMLAndScript);
+        setGraphObj(_graphHTMLAndScript ?? undefined);
     }
 
     useEffect(() => {
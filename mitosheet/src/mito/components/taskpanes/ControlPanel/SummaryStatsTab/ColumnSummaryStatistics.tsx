@@ -45,7 +45,7 @@ function ColumnSummaryStatistics(props: ColumnDescribeChartProps): JSX.Element {
                 props.selectedSheetIndex, 
                 props.columnID
             );
-            return 'error' in response ? undefined : response.result;
+            return 'error' in response ? undefined : (response.result ?? undefined);
         },
         undefined,
         []
@@ -59,7 +59,7 @@ function ColumnSummaryStatistics(props: ColumnDescribeChartProps): JSX.Element {
             <div key={loading.toString()}>
                 {!loading &&
                     <table className='column-describe-table-container'>
-                        {Object.keys(describe).map(key => {
+                        {Object.keys(describe).filter(key => key !== 'is_approximate').map(key => {
                             const value = describe[key];
                             let valueToDisplay = value;
                             
@@ -90,6 +90,11 @@ function ColumnSummaryStatistics(props: ColumnDescribeChartProps): JSX.Element {
                         })}
                     </table> 
                 }
+                {!loading && describe['is_approximate'] === 'true' &&
+                    <p className='text-subtext-1'>
+                        This column is very large, so some of these statistics are estimated from a sample of its rows.
+                    </p>
+                }
                 {loading && 
                     <p>
                         Column Summary statistics are loading...
@@ -121,6 +121,11 @@ export function ValuesTab(
         );
         const uniqueValueCountsObj = 'error' in response ? undefined : response.result;
 
+        // If this call was superseded by a newer one, the newer one sets the unique values
+        if (uniqueValueCountsObj === null) {
+            return undefined;
+        }
+
         if (uniqueValueCountsObj === undefined) {
             setUniqueValueCounts([])
             setLoading(false);
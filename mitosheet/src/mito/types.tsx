@@ -301,7 +301,7 @@ export type FrontendFormulaAndLocation = {
  * @param dfSource - the source of the dataframe
  * @param numRows - the number of rows in the data. Should be equal to data[0].length
  * @param numColumns - the number of columns in the data. Should be equal to data.length
- * @param data - a list of the columns to display in the sheet, including their id and header, their dtype, as well as a list of columnData (which is the actual data in this column)
+ * @param data - a list of the columns to display in the sheet, including their id and header, their dtype, as well as a list of columnData (which is the actual data in this column), and the columnDataKey the backend identifies the columnData with
  * @param columnIDsMap - for this dataframe, a map from column id -> column headers
  * @param columnFormulasMap - for this dataframe, a map from column id -> spreadsheet formula
  * @param columnFiltersMap - for this dataframe, a map from column id -> filter objects
@@ -318,6 +318,7 @@ export type SheetData = {
         columnHeader: ColumnHeader;
         columnDtype: string;
         columnData: (string | number | boolean)[];
+        columnDataKey?: string;
     }[];
     columnIDsMap: ColumnIDsMap;
     columnFormulasMap: Record<ColumnID, FrontendFormulaAndLocation[]>;
@@ -0,0 +1,45 @@
+/* 
+    Utility functions for operating on the sheet data we receive from the backend.
+*/
+
+import { SheetData } from "../types";
+
+/* 
+    The backend does not send the data of columns we already have. These columns
+    have a columnData of null, and we fill it in from the column with the same 
+    columnDataKey in the previous sheet data. 
+    
+    Returns the filled in sheet data, and if the data of some column was missing
+    from the previous sheet data, in which case the backend should send all of the 
+    data next time.
+*/
+export function fillUnchangedColumnData(sheetDataArray: SheetData[], prevSheetDataArray: SheetData[]): [SheetData[], boolean] {
+    const columnDataByKey: Record<string, SheetData['data'][number]['columnData']> = {};
+    prevSheetDataArray.forEach(sheetData => {
+        sheetData.data.forEach(column => {
+            if (column.columnDataKey !== undefined && column.columnData !== null) {
+                columnDataByKey[column.columnDataKey] = column.columnData;
+            }
+        })
+    })
+
+    let missingColumnData = false;
+    const filledSheetDataArray = sheetDataArray.map(sheetData => {
+        return {
+            ...sheetData,
+            data: sheetData.data.map(column => {
+                if (column.columnData !== null) {
+                    return column;
+                }
+                const columnData = column.columnDataKey !== undefined ? columnDataByKey[column.columnDataKey] : undefined;
+                if (columnData === undefined) {
+                    missingColumnData = true;
+                    return {...column, columnData: new Array(Math.min(sheetData.numRows, sheetData.index.length)).fill(null)};
+                }
+                return {...column, columnData: columnData};
+            })
+        }
+    })
+
+    return [filledSheetDataArray, missingColumnData];
+}
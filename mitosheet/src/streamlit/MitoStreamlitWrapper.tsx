@@ -147,6 +147,9 @@ class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
         // component "sends" messages even when a new backend is created - and 
         // we don't want to send old messages to the new backend!
         msg['analysis_name'] = this.state.analysisName;
+        // We also tell the backend how many responses we have received, so 
+        // it does not need to send them to us again on every rerun
+        msg['num_received_responses'] = this.state.responses.length;
 
         // First, get the iframe of the MitoMessagePasser component
         const parentWindow = window.parent;